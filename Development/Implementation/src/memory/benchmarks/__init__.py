@@ -0,0 +1,19 @@
+"""
+Memory system benchmarking subpackage.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+from .ann_recall_tests import run_ann_recall_benchmark
+from .token_accounting_tests import run_token_accounting_benchmark
+from .vector_backend_tests import run_vector_backend_benchmark
+from .working_memory_tests import run_working_memory_benchmark
+
+__all__ = [
+    "run_ann_recall_benchmark",
+    "run_token_accounting_benchmark",
+    "run_vector_backend_benchmark",
+    "run_working_memory_benchmark",
+]
@@ -0,0 +1,152 @@
+"""
+Approximate nearest-neighbour recall benchmarks.
+
+Measures the recall/latency trade-off of the IVF index against exact search
+on synthetic clustered corpora.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import time
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from ..storage.ivf_index import IVFVectorIndex
+from ..storage.numpy_index import NumpyVectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+def make_clustered_corpus(size: int,
+                          dim: int = 384,
+                          num_topics: int = 200,
+                          spread: float = 0.5,
+                          seed: int = 0) -> np.ndarray:
+    """Generate unit-length vectors grouped around random topic centres.
+    
+    Real embedding sets are strongly clustered, so uniform random vectors
+    understate what IVF achieves in practice.
+    
+    Args:
+        size: Number of vectors
+        dim: Vector dimension
+        num_topics: Number of topic centres
+        spread: Noise scale relative to the centre norm
+        seed: Random seed
+        
+    Returns:
+        Matrix of shape (size, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((num_topics, dim), dtype=np.float32)
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    
+    topics = rng.integers(num_topics, size=size)
+    noise = rng.standard_normal((size, dim), dtype=np.float32) * (spread / np.sqrt(dim))
+    vectors = centres[topics] + noise
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _recall(found: List[List[str]], truth: List[List[str]]) -> float:
+    """Mean fraction of true neighbours returned per query."""
+    hits = [len(set(f) & set(t)) / max(1, len(t)) for f, t in zip(found, truth)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def _run_queries(index, queries: np.ndarray, k: int) -> Dict[str, Any]:
+    """Run queries one at a time and collect IDs and latencies."""
+    ids = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        result = index.query(query_embeddings=[query], n_results=k, include=[])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        ids.append(result["ids"][0])
+    
+    latencies_arr = np.array(latencies)
+    return {
+        "ids": ids,
+        "mean_ms": float(latencies_arr.mean()),
+        "p50_ms": float(np.percentile(latencies_arr, 50)),
+        "p95_ms": float(np.percentile(latencies_arr, 95)),
+    }
+
+
+def run_ann_recall_benchmark(size: int = 100_000,
+                             dim: int = 384,
+                             num_queries: int = 100,
+                             k: int = 10,
+                             nlist: Optional[int] = None,
+                             nprobes: Sequence[int] = (1, 2, 4, 8, 16, 32, 64),
+                             delete_fraction: float = 0.0,
+                             seed: int = 0) -> Dict[str, Any]:
+    """Benchmark IVF recall and latency against exact search.
+    
+    Args:
+        size: Corpus size
+        dim: Vector dimension
+        num_queries: Number of queries
+        k: Number of neighbours per query
+        nlist: Number of IVF clusters (None for the index default)
+        nprobes: nprobe values to sweep
+        delete_fraction: Fraction of vectors to delete before querying,
+                         to exercise tombstones and compaction
+        seed: Random seed
+        
+    Returns:
+        Benchmark results
+    """
+    corpus = make_clustered_corpus(size, dim, seed=seed)
+    queries = make_clustered_corpus(num_queries, dim, seed=seed + 1)
+    ids = [str(i) for i in range(size)]
+    
+    results: Dict[str, Any] = {
+        "benchmark_type": "ann_recall",
+        "size": size,
+        "dim": dim,
+        "k": k,
+        "num_queries": num_queries,
+        "test_cases": [],
+    }
+    
+    exact = NumpyVectorIndex(name="exact", initial_capacity=size)
+    exact.add(ids=ids, embeddings=corpus)
+    
+    start = time.perf_counter()
+    ivf = IVFVectorIndex(name="ivf", initial_capacity=size, nlist=nlist,
+                         min_train_size=size + 1)
+    ivf.add(ids=ids, embeddings=corpus)
+    ivf.train()
+    results["build_seconds"] = time.perf_counter() - start
+    results["nlist"] = len(ivf._centroids)
+    
+    if delete_fraction > 0:
+        rng = np.random.default_rng(seed)
+        deleted = [ids[i] for i in rng.choice(size, int(size * delete_fraction), replace=False)]
+        exact.delete(deleted)
+        ivf.delete(deleted)
+    
+    baseline = _run_queries(exact, queries, k)
+    results["exact"] = {key: value for key, value in baseline.items() if key != "ids"}
+    
+    for nprobe in nprobes:
+        if nprobe > results["nlist"]:
+            continue
+        logger.info(f"Benchmarking IVF with nprobe={nprobe}")
+        ivf.nprobe = nprobe
+        run = _run_queries(ivf, queries, k)
+        results["test_cases"].append({
+            "nprobe": nprobe,
+            "recall": _recall(run["ids"], baseline["ids"]),
+            "mean_ms": run["mean_ms"],
+            "p50_ms": run["p50_ms"],
+            "p95_ms": run["p95_ms"],
+            "speedup": baseline["mean_ms"] / run["mean_ms"] if run["mean_ms"] > 0 else 0.0,
+        })
+    
+    return results
@@ -0,0 +1,92 @@
+"""
+Token accounting benchmarks.
+
+Measures the per-turn cost of re-counting a growing conversation history, as
+the context-window checks do every turn, with and without the tokenizer
+registry's memoized counts.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from ..utils.tokenizers import DEFAULT_ENCODING, TokenCounter, TokenizerRegistry
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def _make_message(i: int) -> Dict[str, Any]:
+    """Build a synthetic conversational turn."""
+    return {
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": f"Message {i}: could you remind me what we decided about the "
+                   f"schedule for next week, and whether the meeting with the "
+                   f"design team moved to Thursday afternoon or stayed on Friday?",
+    }
+
+
+def _count_history(registry: TokenizerRegistry, messages: List[Dict[str, Any]], name: str) -> int:
+    """Count a message list the way the context-window checks do."""
+    texts = [message["content"] for message in messages]
+    return sum(registry.count_many(texts, name)) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def run_token_accounting_benchmark(num_turns: int = 200,
+                                   counter: Optional[TokenCounter] = None) -> Dict[str, Any]:
+    """Benchmark per-turn token accounting of a growing conversation.
+    
+    Each turn appends a message and re-counts the whole history, once with a
+    registry that memoizes nothing and once with a memoizing registry.
+    
+    Args:
+        num_turns: Number of conversation turns
+        counter: Tokenizer to count with (defaults to tiktoken's
+            DEFAULT_ENCODING, or the estimator if tiktoken is missing)
+        
+    Returns:
+        Benchmark results
+    """
+    name = "benchmark" if counter is not None else DEFAULT_ENCODING
+    results: Dict[str, Any] = {
+        "benchmark_type": "token_accounting",
+        "num_turns": num_turns,
+        "test_cases": [],
+    }
+    
+    for label, cache_size in (("uncached", 0), ("registry", 8192)):
+        logger.info(f"Benchmarking token accounting over {num_turns} turns ({label})")
+        registry = TokenizerRegistry(cache_size=cache_size)
+        if counter is not None:
+            registry.register(name, counter)
+        
+        history: List[Dict[str, Any]] = []
+        latencies = []
+        total = 0
+        for i in range(num_turns):
+            history.append(_make_message(i))
+            start = time.perf_counter()
+            total = _count_history(registry, history, name)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        
+        latencies_arr = np.array(latencies)
+        stats = registry.get_stats()
+        results["test_cases"].append({
+            "mode": label,
+            "exact": registry.has_tokenizer(name),
+            "mean_ms": float(latencies_arr.mean()),
+            "p50_ms": float(np.percentile(latencies_arr, 50)),
+            "p95_ms": float(np.percentile(latencies_arr, 95)),
+            "last_turn_ms": float(latencies_arr[-1]),
+            "token_count": total,
+            "hit_rate": stats["hit_rate"],
+        })
+    
+    return results
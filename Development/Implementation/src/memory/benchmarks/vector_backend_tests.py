@@ -0,0 +1,151 @@
+"""
+Vector storage backend benchmarks.
+
+Compares the in-process NumPy index with ChromaDB on synthetic corpora.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import shutil
+import tempfile
+import time
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+from ..storage.numpy_index import NumpyVectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+def make_synthetic_corpus(size: int, dim: int = 384, seed: int = 0) -> np.ndarray:
+    """Generate a random float32 corpus of unit-length vectors.
+    
+    Args:
+        size: Number of vectors
+        dim: Vector dimension
+        seed: Random seed
+        
+    Returns:
+        Matrix of shape (size, dim)
+    """
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _build_numpy(corpus: np.ndarray, batch_size: int) -> NumpyVectorIndex:
+    """Build a NumPy index from the corpus."""
+    index = NumpyVectorIndex(name="benchmark", initial_capacity=len(corpus))
+    for start in range(0, len(corpus), batch_size):
+        chunk = corpus[start:start + batch_size]
+        index.add(
+            ids=[str(i) for i in range(start, start + len(chunk))],
+            embeddings=chunk,
+            metadatas=[{"bucket": str(i % 10)} for i in range(start, start + len(chunk))],
+        )
+    return index
+
+
+def _build_chroma(corpus: np.ndarray, batch_size: int, path: str):
+    """Build a ChromaDB collection from the corpus."""
+    import chromadb
+
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection(name="benchmark", metadata={"hnsw:space": "cosine"})
+    # Chroma caps the number of rows per add call
+    batch_size = min(batch_size, getattr(client, "get_max_batch_size", lambda: batch_size)())
+    for start in range(0, len(corpus), batch_size):
+        chunk = corpus[start:start + batch_size]
+        collection.add(
+            ids=[str(i) for i in range(start, start + len(chunk))],
+            embeddings=chunk.tolist(),
+            metadatas=[{"bucket": str(i % 10)} for i in range(start, start + len(chunk))],
+        )
+    return collection
+
+
+def _time_queries(collection, queries: np.ndarray, k: int,
+                  where: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+    """Run each query individually and collect latency statistics in milliseconds."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        collection.query(query_embeddings=[query.tolist()], n_results=k, where=where)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    
+    latencies_arr = np.array(latencies)
+    return {
+        "mean_ms": float(latencies_arr.mean()),
+        "p50_ms": float(np.percentile(latencies_arr, 50)),
+        "p95_ms": float(np.percentile(latencies_arr, 95)),
+    }
+
+
+def run_vector_backend_benchmark(sizes: Sequence[int] = (10_000, 100_000, 1_000_000),
+                                 dim: int = 384,
+                                 num_queries: int = 50,
+                                 k: int = 5,
+                                 batch_size: int = 5_000,
+                                 backends: Sequence[str] = ("numpy", "chroma")) -> Dict[str, Any]:
+    """Benchmark build and query latency of vector storage backends.
+    
+    Backends that are not installed are reported as skipped rather than
+    failing the whole run.
+    
+    Args:
+        sizes: Corpus sizes to test
+        dim: Vector dimension (384 matches all-MiniLM-L6-v2)
+        num_queries: Number of timed queries per size
+        k: Number of neighbours per query
+        batch_size: Rows per add call while building
+        backends: Backends to include ('numpy', 'chroma')
+        
+    Returns:
+        Benchmark results
+    """
+    results: Dict[str, Any] = {
+        "benchmark_type": "vector_backend",
+        "dim": dim,
+        "k": k,
+        "num_queries": num_queries,
+        "test_cases": [],
+    }
+    
+    for size in sizes:
+        logger.info(f"Benchmarking vector backends with {size} vectors")
+        corpus = make_synthetic_corpus(size, dim)
+        queries = make_synthetic_corpus(num_queries, dim, seed=1)
+        
+        for backend in backends:
+            case: Dict[str, Any] = {"backend": backend, "size": size}
+            tmp_dir = None
+            try:
+                start = time.perf_counter()
+                if backend == "numpy":
+                    collection = _build_numpy(corpus, batch_size)
+                elif backend == "chroma":
+                    tmp_dir = tempfile.mkdtemp(prefix="vanta_chroma_bench_")
+                    collection = _build_chroma(corpus, batch_size, tmp_dir)
+                else:
+                    raise ValueError(f"Unknown backend: {backend}")
+                case["build_seconds"] = time.perf_counter() - start
+                
+                case["query"] = _time_queries(collection, queries, k)
+                case["filtered_query"] = _time_queries(collection, queries, k, where={"bucket": "3"})
+            except ImportError as e:
+                case["skipped"] = f"Backend not installed: {e}"
+            except Exception as e:
+                logger.error(f"Error benchmarking {backend} at size {size}: {e}")
+                case["error"] = str(e)
+            finally:
+                if tmp_dir:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+            
+            results["test_cases"].append(case)
+    
+    return results
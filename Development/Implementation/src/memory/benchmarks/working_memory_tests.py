@@ -0,0 +1,73 @@
+"""
+Working memory benchmarks.
+
+Measures the per-message cost of WorkingMemoryManager.add_message as the
+conversation history grows.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import time
+from typing import Dict, Any, Sequence
+
+import numpy as np
+
+from ..models.working_memory import WorkingMemoryManager
+
+logger = logging.getLogger(__name__)
+
+
+def _make_message(i: int) -> Dict[str, Any]:
+    """Build a synthetic conversational turn."""
+    return {
+        "role": "user" if i % 2 == 0 else "assistant",
+        "content": f"Message {i}: could you remind me what we decided about the "
+                   f"schedule for next week and whether the meeting moved?",
+    }
+
+
+def run_working_memory_benchmark(history_lengths: Sequence[int] = (100, 1_000, 5_000),
+                                 num_adds: int = 200) -> Dict[str, Any]:
+    """Benchmark add_message latency against history length.
+    
+    For each length the history is pre-filled without pruning (the token
+    budget is set high enough), then ``num_adds`` further messages are timed.
+    
+    Args:
+        history_lengths: Number of messages already in memory
+        num_adds: Number of timed add_message calls per length
+        
+    Returns:
+        Benchmark results
+    """
+    results: Dict[str, Any] = {
+        "benchmark_type": "working_memory",
+        "num_adds": num_adds,
+        "test_cases": [],
+    }
+    
+    for length in history_lengths:
+        logger.info(f"Benchmarking add_message with {length} messages of history")
+        memory = WorkingMemoryManager({"max_tokens": 10**9})
+        for i in range(length):
+            memory.add_message(_make_message(i))
+        
+        latencies = []
+        for i in range(length, length + num_adds):
+            start = time.perf_counter()
+            memory.add_message(_make_message(i))
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        
+        latencies_arr = np.array(latencies)
+        results["test_cases"].append({
+            "history_length": length,
+            "mean_ms": float(latencies_arr.mean()),
+            "p50_ms": float(np.percentile(latencies_arr, 50)),
+            "p95_ms": float(np.percentile(latencies_arr, 95)),
+            "token_count": memory.token_count,
+        })
+    
+    return results
@@ -49,6 +49,30 @@ def get_default_config() -> Dict[str, Any]:
             "embedding_model": "all-MiniLM-L6-v2",  # Default lightweight model
             "distance_metric": "cosine",
             "persist_directory": os.path.join(memory_dir, "vectors", "chroma"),
+            "backend": "chroma",  # Options: chroma, numpy, auto
+            "numpy_directory": os.path.join(memory_dir, "vectors", "numpy"),
+            "persist_every": 100,  # NumPy backend: save after N writes (0 = on flush() and shutdown only)
+            "index_type": "flat",  # NumPy backend: flat (exact) or ivf (approximate)
+            "index_params": {},  # Extra index options, e.g. {"nlist": 1024, "nprobe": 16}
+        },
+        "ingestion": {
+            "write_behind": False,  # Persist interactions on a background flusher
+            "max_queue_size": 256,
+            "batch_size": 16,
+            "flush_interval": 0.5,  # Seconds to wait for a batch to fill
+            "enqueue_timeout": 1.0,  # Seconds to wait on a full queue before writing inline
+            "max_retries": 2,
+            "read_flush_timeout": 0.05,  # Max wait for pending writes before semantic reads (0 = don't wait)
+        },
+        "summarization": {
+            "chunk_size": 5,  # Conversation entries per leaf summary
+            "fanout": 4,  # Summaries per level before merging upwards
+            "max_levels": 3,  # Top level is merged in place
+            "max_summary_tokens": 150,  # Budget for each individual summary
+            "max_pending_chunks": 8,  # Chunks queued on the worker before add blocks
+            "cache_size": 256,  # Summaries cached by content hash
+            "background": True,  # Summarize on a worker thread
+            "max_sessions": 64,  # Sessions with a summarizer kept; least recently used are dropped
         }
     }
 
@@ -98,6 +122,36 @@ def validate_config(config: Dict[str, Any]) -> Dict[str, Any]:
             f"vector_store.distance_metric must be one of {valid_distance_metrics}"
         )
     
+    valid_backends = ["chroma", "numpy", "auto"]
+    if validated["vector_store"]["backend"] not in valid_backends:
+        raise ValueError(
+            f"vector_store.backend must be one of {valid_backends}"
+        )
+    
+    valid_index_types = ["flat", "ivf"]
+    if validated["vector_store"]["index_type"] not in valid_index_types:
+        raise ValueError(
+            f"vector_store.index_type must be one of {valid_index_types}"
+        )
+    
+    if validated["ingestion"]["batch_size"] < 1:
+        raise ValueError("ingestion.batch_size must be at least 1")
+    
+    if validated["ingestion"]["max_queue_size"] < 1:
+        raise ValueError("ingestion.max_queue_size must be at least 1")
+    
+    if validated["summarization"]["chunk_size"] < 1:
+        raise ValueError("summarization.chunk_size must be at least 1")
+    
+    if validated["summarization"]["fanout"] < 2:
+        raise ValueError("summarization.fanout must be at least 2")
+    
+    if validated["summarization"]["max_levels"] < 1:
+        raise ValueError("summarization.max_levels must be at least 1")
+    
+    if validated["summarization"]["max_sessions"] < 1:
+        raise ValueError("summarization.max_sessions must be at least 1")
+    
     # Ensure storage paths exist or can be created
     for path_key in ["data_path"]:
         os.makedirs(validated[path_key], exist_ok=True)
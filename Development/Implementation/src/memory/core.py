@@ -10,9 +10,13 @@ This module provides the central coordination for VANTA's memory system.
 
 import logging
 import os
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Union
 
+from .ingestion import WriteBehindIngestor
 from .models.working_memory import WorkingMemoryManager
+from .summarization import HierarchicalSummarizer
 from .storage.long_term_memory import LongTermMemoryManager
 from .storage.vector_storage import VectorStoreManager
 
@@ -43,6 +47,18 @@ class MemorySystem:
         self.long_term_memory = LongTermMemoryManager(self.config.get("long_term_memory", {}))
         self.vector_store = VectorStoreManager(self.config.get("vector_store", {}))
         
+        # Optional write-behind path for long-term and vector writes
+        ingestion_config = self.config.get("ingestion", {})
+        self.ingestor: Optional[WriteBehindIngestor] = None
+        if ingestion_config.get("write_behind", False):
+            self.ingestor = WriteBehindIngestor(
+                self.long_term_memory, self.vector_store, ingestion_config
+            )
+        
+        # Rolling summaries of history that has left the verbatim context, one per session
+        self._summarizers: "OrderedDict[Optional[str], HierarchicalSummarizer]" = OrderedDict()
+        self._summarizers_lock = threading.Lock()
+        
         self._initialized = False
     
     def initialize(self) -> None:
@@ -66,6 +82,12 @@ class MemorySystem:
         self.long_term_memory.initialize()
         self.vector_store.initialize()
         
+        if self.ingestor:
+            self.ingestor.start()
+        with self._summarizers_lock:
+            for summarizer in self._summarizers.values():
+                summarizer.start()
+        
         self._initialized = True
         logger.info("Memory system initialization complete")
     
@@ -82,6 +104,14 @@ class MemorySystem:
             
         logger.info("Shutting down memory system components")
         
+        # Drain pending writes before the stores close
+        if self.ingestor:
+            self.ingestor.stop()
+        with self._summarizers_lock:
+            summarizers = list(self._summarizers.values())
+        for summarizer in summarizers:
+            summarizer.stop()
+        
         # Shut down components
         self.working_memory.shutdown()
         self.long_term_memory.shutdown()
@@ -109,6 +139,8 @@ class MemorySystem:
         
         # If a query is provided, enhance with relevant long-term memories
         if query:
+            self._flush_pending_writes()
+            
             # Get relevant memories from vector store
             relevant_memories = self.vector_store.search_similar(query, 
                                                             limit=self.config.get("max_relevant_memories", 5))
@@ -124,6 +156,37 @@ class MemorySystem:
         
         return context
     
+    def get_summarizer(self, session_id: Optional[str] = None) -> HierarchicalSummarizer:
+        """
+        Get the rolling summarizer of a session, creating it on first use.
+        
+        Each session has its own summarizer so summaries never mix
+        conversations. Beyond ``summarization.max_sessions`` the least
+        recently used session's summarizer is stopped and dropped.
+        
+        Args:
+            session_id: Session whose history is summarized (None for the default session).
+            
+        Returns:
+            The session's HierarchicalSummarizer.
+        """
+        config = self.config.get("summarization", {})
+        evicted = []
+        with self._summarizers_lock:
+            summarizer = self._summarizers.get(session_id)
+            if summarizer is None:
+                summarizer = HierarchicalSummarizer(config)
+                if self._initialized:
+                    summarizer.start()
+                self._summarizers[session_id] = summarizer
+            self._summarizers.move_to_end(session_id)
+            while len(self._summarizers) > max(1, config.get("max_sessions", 64)):
+                evicted.append(self._summarizers.popitem(last=False)[1])
+        
+        for stale in evicted:
+            stale.stop()
+        return summarizer
+    
     def store_interaction(self, interaction: Dict[str, Any]) -> None:
         """
         Store a complete interaction in both working and long-term memory.
@@ -152,26 +215,51 @@ class MemorySystem:
             "metadata": interaction.get("assistant_metadata", {})
         })
         
+        vector_record = self._vector_record(interaction)
+        
+        # Hand persistence to the background flusher if enabled
+        if self.ingestor:
+            self.ingestor.submit(interaction, vector_record)
+            return
+        
         # Store in long-term memory
         self.long_term_memory.store_conversation(interaction)
         
         # Store in vector store for semantic retrieval
-        # Combine user and assistant messages for better context
-        combined_text = f"""
-        User: {interaction['user_message']}
-        Assistant: {interaction['assistant_message']}
-        """
-        
         self.vector_store.store_embedding(
-            text=combined_text,
-            metadata={
-                "timestamp": interaction.get("timestamp"),
-                "type": "conversation",
-                "user_message": interaction["user_message"],
-                "assistant_message": interaction["assistant_message"],
-            }
+            text=vector_record["text"],
+            metadata=vector_record["metadata"]
         )
     
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for queued interaction writes to reach storage.
+        
+        The NumPy vector index is saved afterwards, since it otherwise only
+        reaches disk every ``persist_every`` writes.
+        
+        Args:
+            timeout: Maximum seconds to wait. None waits indefinitely.
+            
+        Returns:
+            True if all pending writes completed (always True without write-behind).
+        """
+        drained = self.ingestor.flush(timeout) if self.ingestor else True
+        self.vector_store.persist()
+        return drained
+    
+    def get_ingestion_metrics(self) -> Dict[str, Any]:
+        """
+        Get write-behind ingestion metrics.
+        
+        Returns:
+            Dictionary of ingestion metrics, or an empty dictionary when
+            write-behind is disabled.
+        """
+        if not self.ingestor:
+            return {}
+        return self.ingestor.get_metrics()
+    
     def retrieve_relevant(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Retrieve relevant memories for a query.
@@ -184,10 +272,43 @@ class MemorySystem:
             List of relevant memories as dictionaries.
         """
         self._ensure_initialized()
+        self._flush_pending_writes()
         
         # Get semantically similar items from vector store
         return self.vector_store.search_similar(query, limit=limit)
     
+    def _vector_record(self, interaction: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the vector store text and metadata for an interaction.
+        
+        Args:
+            interaction: Interaction dictionary with user and assistant messages.
+            
+        Returns:
+            Dictionary with 'text' and 'metadata' keys.
+        """
+        # Combine user and assistant messages for better context
+        combined_text = f"""
+        User: {interaction['user_message']}
+        Assistant: {interaction['assistant_message']}
+        """
+        
+        return {
+            "text": combined_text,
+            "metadata": {
+                "timestamp": interaction.get("timestamp"),
+                "type": "conversation",
+                "user_message": interaction["user_message"],
+                "assistant_message": interaction["assistant_message"],
+            }
+        }
+    
+    def _flush_pending_writes(self) -> None:
+        """Give queued interactions a short chance to reach semantic search before reading."""
+        timeout = self.config.get("ingestion", {}).get("read_flush_timeout", 0.05)
+        if self.ingestor and timeout > 0 and self.ingestor.has_pending():
+            self.ingestor.flush(timeout)
+    
     def _ensure_initialized(self) -> None:
         """Ensure memory system is initialized before operations."""
         if not self._initialized:
@@ -216,5 +337,14 @@ class MemorySystem:
                 "db_path": "./data/memory/vectors",
                 "collection_name": "vanta_memories",
                 "embedding_model": "all-MiniLM-L6-v2",  # Default lightweight model
+            },
+            "ingestion": {
+                "write_behind": False,
+            },
+            "summarization": {
+                "chunk_size": 5,
+                "fanout": 4,
+                "max_levels": 3,
+                "max_summary_tokens": 150,
             }
         }
\ No newline at end of file
@@ -0,0 +1,338 @@
+"""
+Write-Behind Memory Ingestion
+
+This module provides batched, asynchronous persistence of interactions to
+long-term memory and the vector store, so conversational turns do not wait
+on embedding and disk I/O.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+from .storage.long_term_memory import LongTermMemoryManager
+from .storage.vector_storage import VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+# Queued by flush() and stop() so the flusher writes what it has instead of waiting for a full batch
+_FLUSH_MARKER = object()
+
+
+class WriteBehindIngestor:
+    """
+    Batches interaction writes on a background thread.
+
+    Interactions are placed on a bounded queue. A flusher thread collects up
+    to ``batch_size`` items (waiting at most ``flush_interval`` seconds for a
+    batch to fill), then performs one segment append to long-term memory and
+    one batched embedding + add on the vector store. Each stage is retried
+    independently so a vector store failure never duplicates long-term
+    entries. flush() and stop() cut the wait for a batch short; stop()
+    drains the queue before returning.
+    """
+
+    def __init__(self,
+                 long_term_memory: LongTermMemoryManager,
+                 vector_store: VectorStoreManager,
+                 config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the ingestor.
+
+        Args:
+            long_term_memory: Long-term memory manager to write conversations to.
+            vector_store: Vector store to write embeddings to.
+            config: Configuration dictionary. Supported keys:
+                    max_queue_size, batch_size, flush_interval,
+                    enqueue_timeout, max_retries.
+        """
+        self.config = config or {}
+        self.long_term_memory = long_term_memory
+        self.vector_store = vector_store
+
+        self.max_queue_size = self.config.get("max_queue_size", 256)
+        self.batch_size = self.config.get("batch_size", 16)
+        self.flush_interval = self.config.get("flush_interval", 0.5)
+        self.enqueue_timeout = self.config.get("enqueue_timeout", 1.0)
+        self.max_retries = self.config.get("max_retries", 2)
+
+        self._queue: "queue.Queue[Tuple[float, Dict[str, Any], Dict[str, Any]]]" = queue.Queue(
+            maxsize=self.max_queue_size
+        )
+        self._stop_flag = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metrics_lock = threading.Lock()
+        self._metrics = self._create_empty_metrics()
+
+    def _create_empty_metrics(self) -> Dict[str, Any]:
+        """
+        Create empty metrics dictionary.
+
+        Returns:
+            Empty metrics dictionary with default values.
+        """
+        return {
+            "enqueued": 0,
+            "flushed_batches": 0,
+            "flushed_items": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "last_flush_lag": 0.0,
+            "max_flush_lag": 0.0,
+            "long_term_failures": 0,
+            "vector_failures": 0,
+            "failed_items": 0,
+            "queue_full_count": 0,
+        }
+
+    def start(self) -> None:
+        """Start the background flusher thread."""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning("Write-behind ingestor already running")
+            return
+
+        self._stop_flag.clear()
+        self._thread = threading.Thread(
+            target=self._flush_loop,
+            name="memory-write-behind",
+            daemon=True
+        )
+        self._thread.start()
+        logger.debug("Started write-behind ingestor")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the flusher after draining everything still queued.
+
+        Args:
+            timeout: Maximum seconds to wait for the drain. None waits indefinitely.
+        """
+        if self._thread is None:
+            return
+
+        self._stop_flag.set()
+        self._wake()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Write-behind ingestor did not drain within {timeout}s "
+                         f"({self._queue.qsize()} items pending)")
+        else:
+            # Items enqueued after the flusher exited are written inline
+            self._drain_inline()
+        self._thread = None
+        logger.debug("Stopped write-behind ingestor")
+
+    def submit(self, conversation: Dict[str, Any], vector_record: Dict[str, Any]) -> None:
+        """
+        Queue an interaction for persistence.
+
+        If the queue stays full for ``enqueue_timeout`` seconds the item is
+        written synchronously instead, so backpressure never loses data.
+
+        Args:
+            conversation: Conversation dictionary for long-term memory.
+            vector_record: Dictionary with 'text' and 'metadata' for the vector store.
+        """
+        item = (time.time(), dict(conversation), vector_record)
+
+        if self._thread is None or not self._thread.is_alive():
+            self._flush_batch([item])
+            return
+
+        try:
+            self._queue.put(item, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._metrics_lock:
+                self._metrics["queue_full_count"] += 1
+            logger.warning("Write-behind queue full, writing interaction synchronously")
+            self._flush_batch([item])
+            return
+
+        with self._metrics_lock:
+            self._metrics["enqueued"] += 1
+
+    def has_pending(self) -> bool:
+        """Whether anything queued has not been written yet."""
+        return self._queue.unfinished_tasks > 0
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until everything queued so far has been written.
+
+        Args:
+            timeout: Maximum seconds to wait. None waits indefinitely.
+
+        Returns:
+            True if the queue drained, False on timeout.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._drain_inline()
+            return True
+
+        self._wake()
+        deadline = None if timeout is None else time.time() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get ingestion metrics.
+
+        Returns:
+            Dictionary with batch sizes, flush lag (seconds from the oldest
+            item's enqueue to the end of its flush), failure counts and the
+            current queue depth.
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+
+        metrics["queue_depth"] = self._queue.qsize()
+        metrics["avg_batch_size"] = (
+            metrics["flushed_items"] / metrics["flushed_batches"]
+            if metrics["flushed_batches"] else 0.0
+        )
+        return metrics
+
+    def _flush_loop(self) -> None:
+        """Background loop that collects and flushes batches."""
+        while True:
+            batch = self._collect_batch()
+            if batch:
+                try:
+                    self._flush_batch(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+            elif self._stop_flag.is_set():
+                break
+
+    def _wake(self) -> None:
+        """End the batch being collected so the flusher writes what it has."""
+        try:
+            self._queue.put_nowait(_FLUSH_MARKER)
+        except queue.Full:
+            pass  # A full queue fills the next batch at once anyway
+
+    def _collect_batch(self) -> List[Tuple[float, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Collect up to ``batch_size`` items, waiting at most ``flush_interval``.
+
+        A flush marker ends the batch early so flush() doesn't wait out
+        the interval.
+
+        Returns:
+            List of queued items (possibly empty).
+        """
+        batch = []
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0 and not self._stop_flag.is_set():
+                break
+            try:
+                if self._stop_flag.is_set():
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _FLUSH_MARKER:
+                self._queue.task_done()
+                break
+            batch.append(item)
+            if len(batch) == 1:
+                # Give the batch an interval to fill from its first item
+                deadline = time.time() + self.flush_interval
+        return batch
+
+    def _drain_inline(self) -> None:
+        """Write any remaining queued items on the calling thread."""
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    item = self._queue.get_nowait()
+                    if item is _FLUSH_MARKER:
+                        self._queue.task_done()
+                    else:
+                        batch.append(item)
+            except queue.Empty:
+                pass
+            if not batch:
+                return
+            try:
+                self._flush_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _flush_batch(self, batch: List[Tuple[float, Dict[str, Any], Dict[str, Any]]]) -> None:
+        """
+        Write a batch to long-term memory and the vector store.
+
+        Args:
+            batch: List of (enqueue_time, conversation, vector_record) tuples.
+        """
+        conversations = [conversation for _, conversation, _ in batch]
+        records = [record for _, _, record in batch]
+
+        long_term_ok = self._with_retries(
+            lambda: self.long_term_memory.store_conversations(conversations),
+            "long_term"
+        )
+        vector_ok = self._with_retries(
+            lambda: self.vector_store.store_embeddings(
+                texts=[record["text"] for record in records],
+                metadatas=[record.get("metadata") for record in records]
+            ),
+            "vector"
+        )
+
+        lag = time.time() - min(enqueued_at for enqueued_at, _, _ in batch)
+        with self._metrics_lock:
+            self._metrics["flushed_batches"] += 1
+            self._metrics["flushed_items"] += len(batch)
+            self._metrics["last_batch_size"] = len(batch)
+            self._metrics["max_batch_size"] = max(self._metrics["max_batch_size"], len(batch))
+            self._metrics["last_flush_lag"] = lag
+            self._metrics["max_flush_lag"] = max(self._metrics["max_flush_lag"], lag)
+            if not (long_term_ok and vector_ok):
+                self._metrics["failed_items"] += len(batch)
+
+        logger.debug(f"Flushed {len(batch)} interactions (lag {lag:.3f}s)")
+
+    def _with_retries(self, operation: Callable[[], Any], stage: str) -> bool:
+        """
+        Run a write operation, retrying up to ``max_retries`` times.
+
+        Args:
+            operation: Zero-argument callable performing the write.
+            stage: Stage name ('long_term' or 'vector'), used for the
+                   ``<stage>_failures`` metric and log messages.
+
+        Returns:
+            True if the operation eventually succeeded.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                operation()
+                return True
+            except Exception as e:
+                with self._metrics_lock:
+                    self._metrics[f"{stage}_failures"] += 1
+                logger.warning(f"Write-behind {stage} write failed "
+                               f"(attempt {attempt + 1}/{self.max_retries + 1}): {e}")
+
+        logger.error(f"Giving up on write-behind {stage} batch after {self.max_retries + 1} attempts")
+        return False
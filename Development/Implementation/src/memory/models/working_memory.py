@@ -15,7 +15,11 @@ from typing import Dict, List, Any, Optional, TypedDict, Callable, Union
 from uuid import uuid4
 
 from ..exceptions import ResourceExceededError, ValidationError
-from ..utils.token_management import count_tokens, truncate_messages_to_token_limit
+from ..utils.token_management import (
+    count_message_tokens,
+    conversation_overhead_tokens,
+    truncate_messages_to_token_limit,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +31,7 @@ class Message(TypedDict, total=False):
     content: str
     timestamp: str  # ISO format timestamp
     metadata: Optional[Dict[str, Any]]
+    token_count: int  # Cached token count, computed once on add
 
 
 class WorkingMemoryManager:
@@ -55,6 +60,9 @@ class WorkingMemoryManager:
         }
         self.audio_references: Dict[str, str] = {}
         
+        # Running sum of cached per-message token counts
+        self._message_tokens = 0
+        
         # Set default values from config
         self.max_tokens = self.config.get("max_tokens", 8000)
         self.default_user = self.config.get("default_user", "user")
@@ -106,8 +114,12 @@ class WorkingMemoryManager:
             "metadata": message.get("metadata", {})
         }
         
+        # Tokenize once; pruning and budgeting reuse the cached count
+        message_obj["token_count"] = count_message_tokens(message_obj, use_cache=False)
+        
         # Add to messages
         self.messages.append(message_obj)
+        self._message_tokens += message_obj["token_count"]
         logger.debug(f"Added message: {message_obj['role']} - {message_obj['id']}")
         
         # Check if we need to prune messages to stay within token limit
@@ -202,7 +214,7 @@ class WorkingMemoryManager:
         """Clear conversation history while preserving system context."""
         # Keep system messages
         system_messages = [msg for msg in self.messages if msg["role"] == "system"]
-        self.messages = system_messages
+        self._set_messages(system_messages)
         logger.info(f"Cleared conversation history, kept {len(system_messages)} system messages")
     
     def prune_messages(self, max_tokens: Optional[int] = None) -> int:
@@ -223,7 +235,7 @@ class WorkingMemoryManager:
         max_tokens = max_tokens or self.max_tokens
         
         # Count current tokens
-        current_tokens = count_tokens(self.messages)
+        current_tokens = self.token_count
         
         # If we're under the limit, nothing to do
         if current_tokens <= max_tokens:
@@ -235,6 +247,10 @@ class WorkingMemoryManager:
         # Implement pruning based on strategy
         before_count = len(self.messages)
         
+        # All strategies work on cached per-message counts; the budget for
+        # message tokens excludes the fixed conversation overhead
+        overhead = conversation_overhead_tokens()
+        
         if self.prune_strategy == "recency":
             # Recency strategy: Keep most recent messages, removing oldest first
             # But always preserve system messages
@@ -244,12 +260,12 @@ class WorkingMemoryManager:
             # Truncate to fit within token limit
             truncated = truncate_messages_to_token_limit(
                 messages=non_system,
-                max_tokens=max_tokens - count_tokens(system_messages),
+                max_tokens=max_tokens - self._sum_tokens(system_messages),
                 preserve_latest=True
             )
             
             # Reconstruct messages list
-            self.messages = system_messages + truncated
+            self._set_messages(system_messages + truncated)
             
         elif self.prune_strategy == "importance":
             # Importance strategy: Assign importance to messages and keep the most important
@@ -265,6 +281,8 @@ class WorkingMemoryManager:
             non_system = [msg for msg in self.messages if msg["role"] != "system"]
             
             # Calculate importance score (higher is more important)
+            now = datetime.now()
+            
             def importance_score(msg: Message) -> float:
                 # Start with any explicit importance from metadata (0-1 range)
                 score = msg.get("metadata", {}).get("importance", 0.5)
@@ -272,7 +290,7 @@ class WorkingMemoryManager:
                 # Add recency factor (0-0.5 range for typical conversations)
                 try:
                     msg_time = datetime.fromisoformat(msg["timestamp"])
-                    age_hours = (datetime.now() - msg_time).total_seconds() / 3600
+                    age_hours = (now - msg_time).total_seconds() / 3600
                     recency = max(0, 0.5 - (age_hours / 48))  # Older than 48 hours gets 0
                     score += recency
                 except (ValueError, TypeError):
@@ -285,14 +303,14 @@ class WorkingMemoryManager:
             non_system.sort(key=importance_score, reverse=True)
             
             # Truncate to fit within token limit
-            system_tokens = count_tokens(system_messages)
-            remaining_tokens = max_tokens - system_tokens
+            system_tokens = self._sum_tokens(system_messages)
+            remaining_tokens = max_tokens - overhead - system_tokens
             
             keep_messages = []
             current_token_count = 0
             
             for msg in non_system:
-                msg_tokens = count_tokens([msg])
+                msg_tokens = count_message_tokens(msg)
                 if current_token_count + msg_tokens <= remaining_tokens:
                     keep_messages.append(msg)
                     current_token_count += msg_tokens
@@ -301,7 +319,7 @@ class WorkingMemoryManager:
                     break
             
             # Reconstruct messages list
-            self.messages = system_messages + keep_messages
+            self._set_messages(system_messages + keep_messages)
             
         else:  # Default to hybrid strategy
             # Hybrid strategy: Balance recency and importance
@@ -321,12 +339,14 @@ class WorkingMemoryManager:
             
             # Combine important and recent messages (avoiding duplicates)
             priority_msgs = system_messages.copy()
+            priority_ids = {msg["id"] for msg in priority_msgs}
             for msg in important_messages + recent_messages:
-                if msg not in priority_msgs:
+                if msg["id"] not in priority_ids:
                     priority_msgs.append(msg)
+                    priority_ids.add(msg["id"])
             
             # If we're still over the limit, truncate the remaining messages by recency
-            priority_tokens = count_tokens(priority_msgs)
+            priority_tokens = self._sum_tokens(priority_msgs) + overhead
             
             if priority_tokens > max_tokens:
                 # Even priority messages exceed token limit, need to drop some
@@ -336,13 +356,12 @@ class WorkingMemoryManager:
                     max_tokens=max_tokens,
                     preserve_latest=True
                 )
-                self.messages = truncated
+                self._set_messages(truncated)
             else:
                 # We can keep all priority messages, then add as many others as fit
-                remaining_tokens = max_tokens - priority_tokens
                 
                 # Get remaining messages that aren't in priority list
-                remaining_msgs = [msg for msg in self.messages if msg not in priority_msgs]
+                remaining_msgs = [msg for msg in self.messages if msg["id"] not in priority_ids]
                 
                 # Sort by recency (newer first)
                 remaining_msgs.sort(
@@ -355,7 +374,7 @@ class WorkingMemoryManager:
                 final_messages = priority_msgs.copy()
                 
                 for msg in remaining_msgs:
-                    msg_tokens = count_tokens([msg])
+                    msg_tokens = count_message_tokens(msg)
                     if current_tokens + msg_tokens <= max_tokens:
                         final_messages.append(msg)
                         current_tokens += msg_tokens
@@ -367,7 +386,7 @@ class WorkingMemoryManager:
                     key=lambda msg: msg.get("timestamp", "")
                 )
                 
-                self.messages = final_messages
+                self._set_messages(final_messages)
         
         after_count = len(self.messages)
         removed_count = before_count - after_count
@@ -404,6 +423,40 @@ class WorkingMemoryManager:
             "current_context": self.current_context,
         }
     
+    @property
+    def token_count(self) -> int:
+        """
+        Current token count of the message history.
+        
+        Maintained incrementally from cached per-message counts, so reading
+        it does not re-tokenize the history.
+        """
+        if not self.messages:
+            return 0
+        return self._message_tokens + conversation_overhead_tokens()
+    
+    def _set_messages(self, messages: List[Message]) -> None:
+        """
+        Replace the message history and recompute the running token total.
+        
+        Args:
+            messages: New message list. Counts cached on the messages are reused.
+        """
+        self.messages = messages
+        self._message_tokens = self._sum_tokens(messages)
+    
+    def _sum_tokens(self, messages: List[Message]) -> int:
+        """
+        Sum cached per-message token counts, without conversation overhead.
+        
+        Args:
+            messages: Messages to sum.
+            
+        Returns:
+            Total message tokens.
+        """
+        return sum(count_message_tokens(msg) for msg in messages)
+    
     def _prune_if_needed(self) -> None:
         """
         Check if messages need pruning and do it if necessary.
@@ -411,20 +464,17 @@ class WorkingMemoryManager:
         Raises:
             ResourceExceededError: If pruning doesn't reduce tokens below limit.
         """
-        # Count current tokens
-        current_tokens = count_tokens(self.messages)
-        
         # If we're under the limit, nothing to do
-        if current_tokens <= self.max_tokens:
+        if self.token_count <= self.max_tokens:
             return
         
         # Try to prune messages
         self.prune_messages()
         
         # Check if we're still over the limit
-        new_tokens = count_tokens(self.messages)
+        new_tokens = self.token_count
         if new_tokens > self.max_tokens:
             # We couldn't reduce tokens enough
             raise ResourceExceededError(
                 f"Token limit exceeded even after pruning: {new_tokens} > {self.max_tokens}"
-            )
\ No newline at end of file
+            )
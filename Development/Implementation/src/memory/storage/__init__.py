@@ -8,7 +8,14 @@ This package contains the storage implementations for the memory system.
 # DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
 """
 
+from .ivf_index import IVFVectorIndex
 from .long_term_memory import LongTermMemoryManager
+from .numpy_index import NumpyVectorIndex
 from .vector_storage import VectorStoreManager
 
-__all__ = ["LongTermMemoryManager", "VectorStoreManager"]
\ No newline at end of file
+__all__ = [
+    "IVFVectorIndex",
+    "LongTermMemoryManager",
+    "NumpyVectorIndex",
+    "VectorStoreManager",
+]
\ No newline at end of file
@@ -0,0 +1,445 @@
+"""
+IVF-Flat Vector Index Implementation
+
+This module provides an approximate nearest-neighbour index for large memory
+stores. It extends the exact NumPy index with an inverted-file (IVF) layer:
+vectors are clustered with k-means and a query only scores the rows in the
+few clusters closest to it.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Any, Sequence
+
+import numpy as np
+
+from ..exceptions import VectorStoreError
+from .numpy_index import NumpyVectorIndex, synchronized
+
+logger = logging.getLogger(__name__)
+
+
+def train_kmeans(data: np.ndarray,
+                 n_clusters: int,
+                 n_iter: int = 10,
+                 seed: int = 0,
+                 spherical: bool = False) -> np.ndarray:
+    """
+    Train k-means centroids with Lloyd's algorithm.
+
+    Args:
+        data: Training matrix of shape (n, dim).
+        n_clusters: Number of centroids.
+        n_iter: Number of Lloyd iterations.
+        seed: Random seed.
+        spherical: If True, centroids are re-normalised after every update
+                   (appropriate for cosine similarity).
+
+    Returns:
+        Centroid matrix of shape (n_clusters, dim).
+    """
+    rng = np.random.default_rng(seed)
+    n = data.shape[0]
+    n_clusters = min(n_clusters, n)
+
+    # Seed from distinct random rows; k-means++ is too slow for large nlist
+    centroids = np.array(data[rng.choice(n, n_clusters, replace=False)], dtype=np.float32)
+
+    for _ in range(n_iter):
+        assign = _nearest_centroid(data, centroids)
+        counts = np.bincount(assign, minlength=n_clusters)
+
+        # Per-cluster sums via a segmented reduction over rows sorted by cluster
+        order = np.argsort(assign, kind="stable")
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(data[order], starts[nonempty], axis=0)
+
+        # Re-seed empty clusters from random points
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = data[rng.choice(n, int(empty.sum()), replace=False)]
+            counts[empty] = 1
+
+        centroids = (sums / counts[:, None]).astype(np.float32)
+        if spherical:
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids /= norms
+
+    return centroids
+
+
+def _nearest_centroid(data: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    """Assign each row to its nearest centroid (squared L2), in chunks."""
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    assign = np.empty(data.shape[0], dtype=np.int32)
+    for start in range(0, data.shape[0], chunk):
+        block = data[start:start + chunk]
+        assign[start:start + chunk] = np.argmin(c_sq[None, :] - 2.0 * block @ centroids.T, axis=1)
+    return assign
+
+
+class IVFVectorIndex(NumpyVectorIndex):
+    """
+    Approximate vector index using an inverted file over k-means clusters.
+
+    Until ``min_train_size`` vectors have been added the index behaves
+    exactly like NumpyVectorIndex. Once trained, new vectors are assigned to
+    their nearest centroid as they arrive, and a query scores only the rows
+    in the ``nprobe`` closest clusters. Raising ``nprobe`` trades latency
+    for recall; ``nprobe == nlist`` is an exact search.
+
+    Deletes only mark rows as tombstones. The matrix is compacted once the
+    share of tombstones passes ``compaction_threshold``.
+    """
+
+    CENTROIDS_FILE = "centroids.npy"
+    ASSIGNMENTS_FILE = "assignments.npy"
+
+    def __init__(self,
+                 name: str,
+                 persist_directory: Optional[str] = None,
+                 distance_metric: str = "cosine",
+                 initial_capacity: int = 1024,
+                 nlist: Optional[int] = None,
+                 nprobe: int = 8,
+                 min_train_size: int = 10_000,
+                 max_train_sample: int = 50_000,
+                 retrain_factor: float = 4.0,
+                 compaction_threshold: float = 0.2,
+                 kmeans_iter: int = 10):
+        """
+        Initialize an empty IVF index.
+
+        Args:
+            name: Name of the collection this index represents.
+            persist_directory: Directory used by save() and load().
+            distance_metric: One of 'cosine', 'l2' or 'ip'.
+            initial_capacity: Number of rows to allocate on first insert.
+            nlist: Number of clusters. If None, ~4*sqrt(n) at training time.
+            nprobe: Number of clusters scanned per query.
+            min_train_size: Vector count at which the index trains itself.
+            max_train_sample: Maximum rows sampled for k-means training.
+            retrain_factor: Retrain when the index grows by this factor
+                            since the last training (0 disables).
+            compaction_threshold: Tombstone share that triggers compaction.
+            kmeans_iter: Number of k-means iterations.
+        """
+        super().__init__(name, persist_directory, distance_metric, initial_capacity)
+        self.metadata["backend"] = "ivf"
+
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.max_train_sample = max_train_sample
+        self.retrain_factor = retrain_factor
+        self.compaction_threshold = compaction_threshold
+        self.kmeans_iter = kmeans_iter
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int32)
+        self._deleted = np.zeros(0, dtype=bool)
+        self._tombstones = 0
+        self._trained_size = 0
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether cluster centroids have been trained."""
+        return self._centroids is not None
+
+    # ------------------------------------------------------------------
+    # Collection-compatible API
+    # ------------------------------------------------------------------
+
+    @synchronized
+    def count(self) -> int:
+        """Return the number of live (non-deleted) vectors."""
+        return self._size - self._tombstones
+
+    @synchronized
+    def add(self,
+            ids: Sequence[str],
+            embeddings: Sequence[Sequence[float]],
+            metadatas: Optional[Sequence[Dict[str, str]]] = None,
+            documents: Optional[Sequence[str]] = None) -> None:
+        """
+        Append vectors and assign them to their nearest cluster.
+
+        Triggers (re)training when the size thresholds are crossed.
+        """
+        start = self._size
+        super().add(ids, embeddings, metadatas, documents)
+        self._deleted[start:self._size] = False
+
+        if self.is_trained:
+            if self.retrain_factor and self.count() >= self._trained_size * self.retrain_factor:
+                self.train()
+            else:
+                self._assign_rows(np.arange(start, self._size))
+        elif self.count() >= self.min_train_size:
+            self.train()
+
+    @synchronized
+    def update(self,
+               ids: Sequence[str],
+               embeddings: Optional[Sequence[Sequence[float]]] = None,
+               metadatas: Optional[Sequence[Dict[str, str]]] = None,
+               documents: Optional[Sequence[str]] = None) -> None:
+        """Overwrite existing rows, moving them to a new cluster if needed."""
+        super().update(ids, embeddings, metadatas, documents)
+
+        if embeddings is not None and self.is_trained:
+            rows = np.array([self._id_to_row[id] for id in ids], dtype=np.int64)
+            for row in rows:
+                self._lists[self._assignments[row]].remove(int(row))
+                self._list_arrays.pop(int(self._assignments[row]), None)
+            self._assign_rows(rows)
+
+    @synchronized
+    def delete(self, ids: Sequence[str]) -> None:
+        """
+        Mark rows as deleted.
+
+        Rows stay in place as tombstones until compaction, so deletes are
+        O(1) and do not disturb the cluster lists.
+        """
+        for id in ids:
+            row = self._id_to_row.pop(id, None)
+            if row is None:
+                continue
+            self._deleted[row] = True
+            self._tombstones += 1
+
+        self._dirty = True
+        if self._size and self._tombstones > self.compaction_threshold * self._size:
+            self.compact()
+
+    @synchronized
+    def get(self,
+            ids: Optional[Sequence[str]] = None,
+            limit: Optional[int] = None,
+            include: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Fetch live rows by ID, or the first ``limit`` live rows."""
+        if ids is not None:
+            return super().get(ids=ids, include=include)
+
+        include = ["documents", "metadatas"] if include is None else list(include)
+        rows = np.flatnonzero(~self._deleted[:self._size])
+        if limit is not None:
+            rows = rows[:limit]
+        return self._rows_to_result([int(r) for r in rows], include)
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    @synchronized
+    def train(self) -> None:
+        """
+        Train cluster centroids on a sample of live vectors and rebuild lists.
+
+        Raises:
+            VectorStoreError: If the index is empty.
+        """
+        live = np.flatnonzero(~self._deleted[:self._size])
+        if len(live) == 0:
+            raise VectorStoreError("Cannot train an empty index")
+
+        nlist = self.nlist or max(1, int(4 * np.sqrt(len(live))))
+        nlist = min(nlist, len(live))
+
+        rng = np.random.default_rng(0)
+        sample = live if len(live) <= self.max_train_sample else rng.choice(
+            live, self.max_train_sample, replace=False)
+
+        logger.info(f"Training IVF index with nlist={nlist} on {len(sample)} vectors")
+        self._centroids = train_kmeans(
+            np.asarray(self._vectors[np.sort(sample)], dtype=np.float32),
+            nlist,
+            n_iter=self.kmeans_iter,
+            spherical=self.distance_metric == "cosine",
+        )
+        self._trained_size = len(live)
+        self._lists = [[] for _ in range(len(self._centroids))]
+        self._list_arrays = {}
+        self._assign_rows(live)
+        self._dirty = True
+
+    @synchronized
+    def compact(self) -> None:
+        """Drop tombstoned rows and renumber the remaining ones."""
+        if self._tombstones == 0:
+            return
+
+        self._make_writable()
+        live = np.flatnonzero(~self._deleted[:self._size])
+        n = len(live)
+
+        self._vectors[:n] = self._vectors[live]
+        self._sq_norms[:n] = self._sq_norms[live]
+        self._assignments[:n] = self._assignments[live]
+        for key, column in self._columns.items():
+            column[:n] = column[live]
+            column[n:self._size] = None
+
+        self._ids = [self._ids[r] for r in live]
+        self._documents = [self._documents[r] for r in live]
+        self._metadatas = [self._metadatas[r] for r in live]
+        self._id_to_row = {id: row for row, id in enumerate(self._ids)}
+        self._deleted[:self._size] = False
+
+        logger.debug(f"Compacted IVF index: removed {self._tombstones} tombstones")
+        self._size = n
+        self._tombstones = 0
+        self._rebuild_lists()
+
+    @synchronized
+    def save(self) -> None:
+        """Compact and persist the index, including centroids and assignments."""
+        self.compact()
+        super().save()
+
+        if not self.persist_directory:
+            return
+        centroids_path = os.path.join(self.persist_directory, self.CENTROIDS_FILE)
+        assignments_path = os.path.join(self.persist_directory, self.ASSIGNMENTS_FILE)
+        try:
+            if self.is_trained:
+                np.save(centroids_path, self._centroids)
+                np.save(assignments_path, self._assignments[:self._size])
+            else:
+                for path in (centroids_path, assignments_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+        except OSError as e:
+            error_msg = f"Failed to save IVF index: {e}"
+            logger.error(error_msg)
+            raise VectorStoreError(error_msg) from e
+
+    @synchronized
+    def load(self, mmap: bool = True) -> bool:
+        """Load a saved index; cluster lists are rebuilt from assignments."""
+        if not super().load(mmap=mmap):
+            return False
+
+        self._deleted = np.zeros(max(self._size, 1), dtype=bool)
+        self._tombstones = 0
+        self._assignments = np.zeros(max(self._size, 1), dtype=np.int32)
+
+        centroids_path = os.path.join(self.persist_directory, self.CENTROIDS_FILE)
+        assignments_path = os.path.join(self.persist_directory, self.ASSIGNMENTS_FILE)
+        if os.path.exists(centroids_path) and os.path.exists(assignments_path):
+            assignments = np.load(assignments_path)
+            if len(assignments) != self._size:
+                raise VectorStoreError("IVF index files are inconsistent")
+            self._centroids = np.load(centroids_path)
+            self._assignments[:self._size] = assignments
+            self._trained_size = self._size
+            self._rebuild_lists()
+        return True
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _reserve(self, required: int) -> None:
+        """Grow the per-row IVF arrays alongside the vector matrix."""
+        super()._reserve(required)
+        capacity = self._vectors.shape[0]
+        if len(self._deleted) < capacity:
+            deleted = np.zeros(capacity, dtype=bool)
+            deleted[:len(self._deleted)] = self._deleted
+            self._deleted = deleted
+            assignments = np.zeros(capacity, dtype=np.int32)
+            assignments[:len(self._assignments)] = self._assignments
+            self._assignments = assignments
+
+    def _centroid_scores(self, queries: np.ndarray) -> np.ndarray:
+        """Return query-to-centroid distances (lower is closer)."""
+        if self.distance_metric == "l2":
+            c_sq = np.einsum("ij,ij->i", self._centroids, self._centroids)
+            return c_sq[None, :] - 2.0 * queries @ self._centroids.T
+        return -(queries @ self._centroids.T)
+
+    def _assign_rows(self, rows: np.ndarray) -> None:
+        """Assign rows to clusters and append them to the inverted lists."""
+        if len(rows) == 0:
+            return
+        vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+        assign = np.argmin(self._centroid_scores(vectors), axis=1).astype(np.int32)
+        self._assignments[rows] = assign
+        for row, cluster in zip(rows, assign):
+            self._lists[cluster].append(int(row))
+            self._list_arrays.pop(int(cluster), None)
+
+    def _rebuild_lists(self) -> None:
+        """Rebuild inverted lists from the assignment array."""
+        if not self.is_trained:
+            return
+        self._lists = [[] for _ in range(len(self._centroids))]
+        self._list_arrays = {}
+        order = np.argsort(self._assignments[:self._size], kind="stable")
+        bounds = np.searchsorted(self._assignments[:self._size][order],
+                                 np.arange(len(self._centroids) + 1))
+        for cluster in range(len(self._centroids)):
+            self._lists[cluster] = order[bounds[cluster]:bounds[cluster + 1]].tolist()
+
+    def _list_array(self, cluster: int) -> np.ndarray:
+        """Return (and cache) the row indices of an inverted list as an array."""
+        array = self._list_arrays.get(cluster)
+        if array is None:
+            array = np.array(self._lists[cluster], dtype=np.int64)
+            self._list_arrays[cluster] = array
+        return array
+
+    def _filter_rows(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Evaluate a metadata filter, excluding tombstoned rows."""
+        rows = super()._filter_rows(where)
+        if self._tombstones == 0:
+            return rows
+        live = ~self._deleted[:self._size]
+        if rows is None:
+            return np.flatnonzero(live)
+        return rows[live[rows]]
+
+    def _search(self,
+                queries: np.ndarray,
+                k: int,
+                candidates: Optional[np.ndarray]) -> List[Any]:
+        """Score only the rows in the ``nprobe`` nearest clusters of each query."""
+        if not self.is_trained:
+            return super()._search(queries, k, candidates)
+
+        if self.distance_metric == "cosine":
+            queries = self._normalize(queries)
+
+        nprobe = min(max(1, self.nprobe), len(self._centroids))
+        centroid_dist = self._centroid_scores(queries)
+        if nprobe < len(self._centroids):
+            probes = np.argpartition(centroid_dist, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(nprobe), (len(queries), nprobe))
+
+        allowed = None
+        if candidates is not None:
+            allowed = np.zeros(self._size, dtype=bool)
+            allowed[candidates] = True
+
+        results = []
+        for qi in range(len(queries)):
+            rows = np.concatenate([self._list_array(int(c)) for c in probes[qi]])
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+            if len(rows) == 0:
+                results.append(([], np.empty(0, dtype=np.float32)))
+                continue
+            results.extend(self._top_k(queries[qi:qi + 1], k, rows))
+        return results
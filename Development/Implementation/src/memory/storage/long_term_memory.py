@@ -12,6 +12,7 @@ import json
 import logging
 import os
 import shutil
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Callable
 from uuid import uuid4
@@ -35,6 +36,9 @@ class LongTermMemoryManager:
     and other persistent data that should be available across sessions.
     """
     
+    # Per-day JSON-lines file used by batched conversation writes
+    SEGMENT_FILENAME = "segment.jsonl"
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize long-term memory with the given configuration.
@@ -51,6 +55,7 @@ class LongTermMemoryManager:
         self.compression_enabled = self.config.get("compression_enabled", True)
         
         self._initialized = False
+        self._segment_lock = threading.Lock()  # Serializes segment appends (flusher and inline writes)
         
         logger.info(f"Initialized LongTermMemoryManager with storage_path={self.storage_path}")
     
@@ -140,20 +145,8 @@ class LongTermMemoryManager:
         if "user_message" not in conversation or "assistant_message" not in conversation:
             raise ValueError("Conversation must include user_message and assistant_message")
         
-        # Create a conversation entry
-        entry = create_conversation_entry(
-            user_message=conversation["user_message"],
-            assistant_message=conversation["assistant_message"],
-            metadata=conversation.get("metadata", {}),
-            audio_reference=conversation.get("audio_reference"),
-            timestamp=conversation.get("timestamp", datetime.now().isoformat()),
-            id=conversation.get("id", str(uuid4()))
-        )
-        
-        # Determine storage location by date
-        date_str = datetime.fromisoformat(entry["timestamp"].split("T")[0]).strftime("%Y-%m-%d")
-        date_path = os.path.join(self.conversations_path, date_str)
-        os.makedirs(date_path, exist_ok=True)
+        entry = self._create_entry(conversation)
+        date_path = self._date_path(entry)
         
         # Generate filename
         timestamp_safe = entry["timestamp"].replace(":", "-").replace(".", "-")
@@ -171,6 +164,58 @@ class LongTermMemoryManager:
             logger.error(error_msg)
             raise StorageError(error_msg) from e
     
+    def store_conversations(self, conversations: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store a batch of conversations with one append per day.
+        
+        Entries are appended as JSON lines to a per-day segment file instead
+        of one file per conversation, so a batch costs a single write for
+        each date it spans.
+        
+        Args:
+            conversations: List of conversation dictionaries.
+                          Each must include 'user_message' and 'assistant_message'.
+                          
+        Returns:
+            Identifiers for the stored conversations, in input order.
+            
+        Raises:
+            StorageError: If storage operation fails.
+        """
+        self._ensure_initialized()
+        
+        for conversation in conversations:
+            if "user_message" not in conversation or "assistant_message" not in conversation:
+                raise ValueError("Conversation must include user_message and assistant_message")
+        
+        entries = [self._create_entry(conversation) for conversation in conversations]
+        
+        # Group entries by day so each segment file is written once
+        by_date: Dict[str, List[ConversationEntry]] = {}
+        for entry in entries:
+            by_date.setdefault(self._date_path(entry), []).append(entry)
+        
+        try:
+            for date_path, date_entries in by_date.items():
+                segment_path = os.path.join(date_path, self.SEGMENT_FILENAME)
+                payload = "".join(json.dumps(entry) + "\n" for entry in date_entries)
+                with self._segment_lock:
+                    # Start on a new line if an earlier append was torn by a crash
+                    if os.path.exists(segment_path) and os.path.getsize(segment_path) > 0:
+                        with open(segment_path, 'rb') as f:
+                            f.seek(-1, os.SEEK_END)
+                            if f.read(1) != b"\n":
+                                payload = "\n" + payload
+                    with open(segment_path, 'a') as f:
+                        f.write(payload)
+                logger.debug(f"Appended {len(date_entries)} conversations to {segment_path}")
+        except Exception as e:
+            error_msg = f"Failed to store conversations: {e}"
+            logger.error(error_msg)
+            raise StorageError(error_msg) from e
+        
+        return [entry["id"] for entry in entries]
+    
     def retrieve_conversations(
         self, 
         filter: Optional[Dict[str, Any]] = None, 
@@ -222,9 +267,9 @@ class LongTermMemoryManager:
             if not os.path.exists(date_path) or not os.path.isdir(date_path):
                 continue
             
-            # List all JSON files in the directory
+            # List all JSON files and batch segments in the directory
             try:
-                files = [f for f in os.listdir(date_path) if f.endswith(".json")]
+                files = [f for f in os.listdir(date_path) if f.endswith((".json", ".jsonl"))]
             except Exception as e:
                 logger.warning(f"Could not list files in {date_path}: {e}")
                 continue
@@ -238,11 +283,15 @@ class LongTermMemoryManager:
                 
                 try:
                     with open(file_path, 'r') as f:
-                        entry = json.load(f)
+                        if filename.endswith(".jsonl"):
+                            entries = self._read_segment(f, file_path)
+                        else:
+                            entries = [json.load(f)]
                     
-                    # Check if entry matches filter
-                    if matches_filter(entry):
-                        results.append(entry)
+                    # Check if entries match filter
+                    for entry in entries:
+                        if matches_filter(entry):
+                            results.append(entry)
                 except Exception as e:
                     logger.warning(f"Error reading conversation file {file_path}: {e}")
                     continue
@@ -627,6 +676,64 @@ class LongTermMemoryManager:
         logger.info(f"Cleanup completed, removed {removed_count} directories")
         return removed_count
     
+    def _read_segment(self, f, file_path: str) -> List[ConversationEntry]:
+        """
+        Parse a segment file line by line.
+        
+        A line torn by a crash mid-append is skipped rather than discarding
+        the rest of the day's conversations.
+        
+        Args:
+            f: Open segment file.
+            file_path: Path of the segment, for logging.
+            
+        Returns:
+            The entries that parsed.
+        """
+        entries = []
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping corrupt line {line_number} in {file_path}: {e}")
+        return entries
+    
+    def _create_entry(self, conversation: Dict[str, Any]) -> ConversationEntry:
+        """
+        Build a conversation entry from an interaction dictionary.
+        
+        Args:
+            conversation: Dictionary containing conversation data.
+            
+        Returns:
+            A ConversationEntry object.
+        """
+        return create_conversation_entry(
+            user_message=conversation["user_message"],
+            assistant_message=conversation["assistant_message"],
+            metadata=conversation.get("metadata", {}),
+            audio_reference=conversation.get("audio_reference"),
+            timestamp=conversation.get("timestamp") or datetime.now().isoformat(),
+            id=conversation.get("id", str(uuid4()))
+        )
+    
+    def _date_path(self, entry: ConversationEntry) -> str:
+        """
+        Get (and create) the by-date directory for an entry.
+        
+        Args:
+            entry: Conversation entry with an ISO timestamp.
+            
+        Returns:
+            Path to the date directory.
+        """
+        date_str = datetime.fromisoformat(entry["timestamp"].split("T")[0]).strftime("%Y-%m-%d")
+        date_path = os.path.join(self.conversations_path, date_str)
+        os.makedirs(date_path, exist_ok=True)
+        return date_path
+    
     def _ensure_initialized(self) -> None:
         """
         Ensure that long-term memory storage is initialized.
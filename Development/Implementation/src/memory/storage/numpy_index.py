@@ -0,0 +1,580 @@
+"""
+NumPy Vector Index Implementation
+
+This module provides an in-process vector index for the VANTA memory system.
+It is used by VectorStoreManager when ChromaDB is not available or not wanted,
+and exposes the subset of the Chroma collection API that the manager relies on.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Any, Sequence
+
+import numpy as np
+
+from ..exceptions import VectorStoreError
+
+logger = logging.getLogger(__name__)
+
+
+def synchronized(method):
+    """Run an index method under the index's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class NumpyVectorIndex:
+    """
+    Exact vector index backed by a contiguous float32 matrix.
+
+    Vectors are stored row-wise in a pre-allocated matrix that grows
+    geometrically, so appends are amortised O(1). For the cosine metric the
+    rows are L2-normalised on insert, which turns similarity search into a
+    single matrix-vector product followed by an ``argpartition`` top-k.
+    Metadata values are kept in per-key column arrays so equality filters are
+    evaluated as vectorised masks instead of per-row dictionary lookups.
+
+    Distances follow the Chroma conventions (``1 - cos`` for cosine,
+    squared L2 for l2, ``1 - dot`` for ip) so callers can treat both
+    backends the same way.
+
+    Public methods hold a re-entrant lock, so searches are safe while the
+    write-behind flusher grows or rearranges the matrix.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    RECORDS_FILE = "records.json"
+
+    def __init__(self,
+                 name: str,
+                 persist_directory: Optional[str] = None,
+                 distance_metric: str = "cosine",
+                 initial_capacity: int = 1024):
+        """
+        Initialize an empty index.
+
+        Args:
+            name: Name of the collection this index represents.
+            persist_directory: Directory used by save() and load().
+                               If None, the index is memory-only.
+            distance_metric: One of 'cosine', 'l2' or 'ip'.
+            initial_capacity: Number of rows to allocate on first insert.
+        """
+        if distance_metric not in ("cosine", "l2", "ip"):
+            raise VectorStoreError(f"Unsupported distance metric: {distance_metric}")
+
+        self.name = name
+        self.persist_directory = persist_directory
+        self.distance_metric = distance_metric
+        self.initial_capacity = max(1, initial_capacity)
+        self.metadata = {"hnsw:space": distance_metric, "backend": "numpy"}
+
+        self._dim: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._sq_norms: Optional[np.ndarray] = None
+        self._size = 0
+        self._writable = True
+
+        self._ids: List[str] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Dict[str, str]] = []
+        self._columns: Dict[str, np.ndarray] = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Collection-compatible API
+    # ------------------------------------------------------------------
+
+    @synchronized
+    def count(self) -> int:
+        """Return the number of stored vectors."""
+        return self._size
+
+    @synchronized
+    def add(self,
+            ids: Sequence[str],
+            embeddings: Sequence[Sequence[float]],
+            metadatas: Optional[Sequence[Dict[str, str]]] = None,
+            documents: Optional[Sequence[str]] = None) -> None:
+        """
+        Append one or more vectors to the index.
+
+        Args:
+            ids: Unique IDs for the new rows.
+            embeddings: Vectors to store, one per ID.
+            metadatas: Optional metadata dictionaries, one per ID.
+            documents: Optional source documents, one per ID.
+
+        Raises:
+            VectorStoreError: If an ID already exists or shapes do not match.
+        """
+        batch = self._prepare_batch(embeddings, len(ids))
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in ids]
+        documents = list(documents) if documents is not None else [None for _ in ids]
+
+        seen = set()
+        for id in ids:
+            if id in self._id_to_row or id in seen:
+                raise VectorStoreError(f"ID already exists in index: {id}")
+            seen.add(id)
+
+        self._reserve(self._size + len(ids))
+        start = self._size
+        end = start + len(ids)
+        self._vectors[start:end] = batch
+        self._sq_norms[start:end] = np.einsum("ij,ij->i", batch, batch)
+
+        for offset, id in enumerate(ids):
+            row = start + offset
+            self._ids.append(id)
+            self._id_to_row[id] = row
+            self._documents.append(documents[offset])
+            self._metadatas.append(dict(metadatas[offset] or {}))
+            self._set_columns(row, metadatas[offset] or {})
+
+        self._size = end
+        self._dirty = True
+
+    @synchronized
+    def update(self,
+               ids: Sequence[str],
+               embeddings: Optional[Sequence[Sequence[float]]] = None,
+               metadatas: Optional[Sequence[Dict[str, str]]] = None,
+               documents: Optional[Sequence[str]] = None) -> None:
+        """
+        Overwrite existing rows in place.
+
+        Args:
+            ids: IDs of the rows to update.
+            embeddings: Optional replacement vectors.
+            metadatas: Optional replacement metadata.
+            documents: Optional replacement documents.
+
+        Raises:
+            VectorStoreError: If an ID does not exist.
+        """
+        rows = [self._row_for(id) for id in ids]
+        self._make_writable()
+
+        if embeddings is not None:
+            batch = self._prepare_batch(embeddings, len(ids))
+            self._vectors[rows] = batch
+            self._sq_norms[rows] = np.einsum("ij,ij->i", batch, batch)
+
+        for offset, row in enumerate(rows):
+            if metadatas is not None:
+                for column in self._columns.values():
+                    column[row] = None
+                self._metadatas[row] = dict(metadatas[offset] or {})
+                self._set_columns(row, metadatas[offset] or {})
+            if documents is not None:
+                self._documents[row] = documents[offset]
+
+        self._dirty = True
+
+    @synchronized
+    def delete(self, ids: Sequence[str]) -> None:
+        """
+        Remove rows from the index.
+
+        The last row is moved into the freed slot so the matrix stays
+        contiguous and no compaction pass is required.
+
+        Args:
+            ids: IDs of the rows to remove. Unknown IDs are ignored.
+        """
+        self._make_writable()
+
+        for id in ids:
+            row = self._id_to_row.pop(id, None)
+            if row is None:
+                continue
+
+            last = self._size - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._vectors[row] = self._vectors[last]
+                self._sq_norms[row] = self._sq_norms[last]
+                self._ids[row] = moved_id
+                self._documents[row] = self._documents[last]
+                self._metadatas[row] = self._metadatas[last]
+                for column in self._columns.values():
+                    column[row] = column[last]
+                self._id_to_row[moved_id] = row
+
+            for column in self._columns.values():
+                column[last] = None
+            self._ids.pop()
+            self._documents.pop()
+            self._metadatas.pop()
+            self._size = last
+
+        self._dirty = True
+
+    @synchronized
+    def get(self,
+            ids: Optional[Sequence[str]] = None,
+            limit: Optional[int] = None,
+            include: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch stored rows by ID, or the first ``limit`` rows.
+
+        Args:
+            ids: Optional IDs to fetch. Unknown IDs are skipped.
+            limit: Maximum number of rows when no IDs are given.
+            include: Fields to return ('documents', 'metadatas', 'embeddings').
+
+        Returns:
+            Dictionary shaped like a Chroma ``get`` result.
+        """
+        include = ["documents", "metadatas"] if include is None else list(include)
+
+        if ids is not None:
+            rows = [self._id_to_row[id] for id in ids if id in self._id_to_row]
+        else:
+            rows = list(range(self._size if limit is None else min(limit, self._size)))
+
+        return self._rows_to_result(rows, include)
+
+    @synchronized
+    def query(self,
+              query_embeddings: Sequence[Sequence[float]],
+              n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Optional[Sequence[str]] = None) -> Dict[str, List[Any]]:
+        """
+        Find the nearest rows for a batch of query vectors.
+
+        Args:
+            query_embeddings: One or more query vectors.
+            n_results: Number of neighbours per query.
+            where: Optional equality filter on metadata values.
+            include: Fields to return in addition to IDs and distances.
+
+        Returns:
+            Dictionary shaped like a Chroma ``query`` result, with one inner
+            list per query vector.
+        """
+        include = ["documents", "metadatas", "distances"] if include is None else list(include)
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+
+        result: Dict[str, List[Any]] = {"ids": []}
+        for key in ("documents", "metadatas", "distances"):
+            if key in include:
+                result[key] = []
+
+        if self._size == 0 or n_results <= 0:
+            for key in result:
+                result[key] = [[] for _ in range(len(queries))]
+            return result
+
+        if queries.shape[1] != self._dim:
+            raise VectorStoreError(
+                f"Query dimension {queries.shape[1]} does not match index dimension {self._dim}"
+            )
+
+        candidates = self._filter_rows(where)
+        if candidates is not None and len(candidates) == 0:
+            for key in result:
+                result[key] = [[] for _ in range(len(queries))]
+            return result
+
+        for rows, distances in self._search(queries, n_results, candidates):
+            partial = self._rows_to_result(rows, include)
+            result["ids"].append(partial["ids"])
+            if "documents" in result:
+                result["documents"].append(partial["documents"])
+            if "metadatas" in result:
+                result["metadatas"].append(partial["metadatas"])
+            if "distances" in result:
+                result["distances"].append([float(d) for d in distances])
+
+        return result
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @synchronized
+    def save(self) -> None:
+        """
+        Persist the index to ``persist_directory``.
+
+        Vectors are written with ``np.save`` and the per-row records as JSON.
+        Both files are written to temporary names first and then renamed so a
+        crash never leaves a half-written index behind.
+
+        Raises:
+            VectorStoreError: If the index cannot be written.
+        """
+        if not self.persist_directory:
+            return
+
+        os.makedirs(self.persist_directory, exist_ok=True)
+        vectors_path = os.path.join(self.persist_directory, self.VECTORS_FILE)
+        records_path = os.path.join(self.persist_directory, self.RECORDS_FILE)
+
+        try:
+            vectors = (self._vectors[:self._size] if self._vectors is not None
+                       else np.zeros((0, 0), dtype=np.float32))
+            with open(vectors_path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(vectors))
+
+            records = {
+                "name": self.name,
+                "distance_metric": self.distance_metric,
+                "dim": self._dim,
+                "ids": self._ids,
+                "documents": self._documents,
+                "metadatas": self._metadatas,
+            }
+            with open(records_path + ".tmp", "w") as f:
+                json.dump(records, f)
+
+            os.replace(vectors_path + ".tmp", vectors_path)
+            os.replace(records_path + ".tmp", records_path)
+            self._dirty = False
+            logger.debug(f"Saved {self._size} vectors to {self.persist_directory}")
+        except (OSError, ValueError) as e:
+            error_msg = f"Failed to save vector index: {e}"
+            logger.error(error_msg)
+            raise VectorStoreError(error_msg) from e
+
+    @synchronized
+    def load(self, mmap: bool = True) -> bool:
+        """
+        Load a previously saved index from ``persist_directory``.
+
+        With ``mmap`` enabled the vector matrix is memory-mapped read-only and
+        only copied into an owned, growable buffer on the first write.
+
+        Args:
+            mmap: Whether to memory-map the vector file.
+
+        Returns:
+            True if an index was loaded, False if none exists.
+
+        Raises:
+            VectorStoreError: If the saved index is unreadable or inconsistent.
+        """
+        if not self.persist_directory:
+            return False
+
+        vectors_path = os.path.join(self.persist_directory, self.VECTORS_FILE)
+        records_path = os.path.join(self.persist_directory, self.RECORDS_FILE)
+        if not (os.path.exists(vectors_path) and os.path.exists(records_path)):
+            return False
+
+        try:
+            with open(records_path, "r") as f:
+                records = json.load(f)
+            vectors = np.load(vectors_path, mmap_mode="r" if mmap else None)
+        except (OSError, ValueError) as e:
+            error_msg = f"Failed to load vector index: {e}"
+            logger.error(error_msg)
+            raise VectorStoreError(error_msg) from e
+
+        ids = records.get("ids", [])
+        if len(ids) != (vectors.shape[0] if vectors.ndim == 2 else 0):
+            raise VectorStoreError("Vector index files are inconsistent")
+
+        self._dim = records.get("dim")
+        self._size = len(ids)
+        self._ids = list(ids)
+        self._id_to_row = {id: row for row, id in enumerate(self._ids)}
+        self._documents = list(records.get("documents", [None] * self._size))
+        self._metadatas = list(records.get("metadatas", [{}] * self._size))
+
+        if self._size:
+            self._vectors = vectors
+            self._sq_norms = np.einsum("ij,ij->i", vectors, vectors).astype(np.float32)
+            self._writable = not mmap
+
+        self._columns = {}
+        for row, meta in enumerate(self._metadatas):
+            self._set_columns(row, meta)
+
+        self._dirty = False
+        logger.info(f"Loaded {self._size} vectors from {self.persist_directory}")
+        return True
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the index has changes that have not been saved."""
+        return self._dirty
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _prepare_batch(self, embeddings: Sequence[Sequence[float]], expected: int) -> np.ndarray:
+        """Convert embeddings to a float32 matrix, normalising if required."""
+        batch = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if batch.shape[0] != expected:
+            raise VectorStoreError(
+                f"Expected {expected} embeddings, got {batch.shape[0]}"
+            )
+
+        if self._dim is None:
+            self._dim = int(batch.shape[1])
+        elif batch.shape[1] != self._dim:
+            raise VectorStoreError(
+                f"Embedding dimension {batch.shape[1]} does not match index dimension {self._dim}"
+            )
+
+        if self.distance_metric == "cosine":
+            batch = self._normalize(batch)
+        return batch
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """L2-normalise rows, leaving zero vectors untouched."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _reserve(self, required: int) -> None:
+        """Ensure the matrix has room for ``required`` rows."""
+        self._make_writable()
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if required <= capacity:
+            return
+
+        new_capacity = max(self.initial_capacity, capacity)
+        while new_capacity < required:
+            new_capacity *= 2
+
+        vectors = np.empty((new_capacity, self._dim), dtype=np.float32)
+        sq_norms = np.empty(new_capacity, dtype=np.float32)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            sq_norms[:self._size] = self._sq_norms[:self._size]
+        self._vectors = vectors
+        self._sq_norms = sq_norms
+
+        for key, column in self._columns.items():
+            grown = np.full(new_capacity, None, dtype=object)
+            grown[:len(column)] = column
+            self._columns[key] = grown
+
+    def _make_writable(self) -> None:
+        """Copy a memory-mapped matrix into an owned buffer before mutating it."""
+        if self._writable:
+            return
+        self._vectors = np.array(self._vectors, dtype=np.float32)
+        self._sq_norms = np.array(self._sq_norms, dtype=np.float32)
+        self._writable = True
+
+    def _set_columns(self, row: int, metadata: Dict[str, Any]) -> None:
+        """Record a row's metadata values in the per-key column arrays."""
+        capacity = max(self._size, row + 1,
+                       0 if self._vectors is None else self._vectors.shape[0])
+        for key, value in metadata.items():
+            column = self._columns.get(key)
+            if column is None:
+                column = np.full(capacity, None, dtype=object)
+                self._columns[key] = column
+            column[row] = value
+
+    def _row_for(self, id: str) -> int:
+        """Return the row index for an ID."""
+        row = self._id_to_row.get(id)
+        if row is None:
+            raise VectorStoreError(f"ID not found in index: {id}")
+        return row
+
+    def _filter_rows(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Evaluate an equality filter against the metadata columns.
+
+        Returns:
+            Array of matching row indices, or None if no filter was given.
+        """
+        if not where:
+            return None
+
+        mask = np.ones(self._size, dtype=bool)
+        for key, value in where.items():
+            column = self._columns.get(key)
+            if column is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= column[:self._size] == value
+        return np.flatnonzero(mask)
+
+    def _search(self,
+                queries: np.ndarray,
+                k: int,
+                candidates: Optional[np.ndarray]) -> List[Any]:
+        """
+        Find the ``k`` nearest rows for each query.
+
+        Subclasses override this to restrict the rows that are scored; the
+        base implementation scans every candidate exactly.
+        """
+        return self._top_k(queries, k, candidates)
+
+    def _top_k(self,
+               queries: np.ndarray,
+               k: int,
+               candidates: Optional[np.ndarray]) -> List[Any]:
+        """
+        Compute the ``k`` nearest rows for each query.
+
+        Returns:
+            List of ``(rows, distances)`` pairs, one per query, sorted by
+            ascending distance.
+        """
+        if self.distance_metric == "cosine":
+            queries = self._normalize(queries)
+
+        vectors = self._vectors[:self._size]
+        sq_norms = self._sq_norms[:self._size]
+        if candidates is not None:
+            vectors = vectors[candidates]
+            sq_norms = sq_norms[candidates]
+
+        scores = queries @ vectors.T
+        if self.distance_metric == "l2":
+            q_norms = np.einsum("ij,ij->i", queries, queries)
+            distances = sq_norms[None, :] - 2.0 * scores + q_norms[:, None]
+        else:
+            distances = 1.0 - scores
+
+        n = distances.shape[1]
+        k = min(k, n)
+        if k < n:
+            part = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(n), (len(queries), n))
+
+        results = []
+        for qi in range(len(queries)):
+            cols = part[qi]
+            order = np.argsort(distances[qi, cols], kind="stable")
+            cols = cols[order]
+            rows = candidates[cols] if candidates is not None else cols
+            results.append(([int(r) for r in rows], distances[qi, cols]))
+        return results
+
+    def _rows_to_result(self, rows: List[int], include: Sequence[str]) -> Dict[str, Any]:
+        """Assemble a Chroma-style result dictionary for the given rows."""
+        result: Dict[str, Any] = {"ids": [self._ids[r] for r in rows]}
+        if "documents" in include:
+            result["documents"] = [self._documents[r] for r in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [self._metadatas[r] for r in rows]
+        if "embeddings" in include:
+            result["embeddings"] = [self._vectors[r].tolist() for r in rows]
+        return result
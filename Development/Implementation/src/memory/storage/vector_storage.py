@@ -17,7 +17,9 @@ from uuid import uuid4
 import numpy as np
 
 from ..exceptions import VectorStoreError
-from ..utils.embeddings import get_embedding
+from ..utils.embeddings import get_embedding, batch_get_embeddings
+from .ivf_index import IVFVectorIndex
+from .numpy_index import NumpyVectorIndex
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +29,14 @@ class VectorStoreManager:
     Manages vector embeddings and semantic search for VANTA.
     
     This class provides an interface to Chroma DB for storing and retrieving
-    vector embeddings for semantic search and similarity matching.
+    vector embeddings for semantic search and similarity matching. When the
+    'numpy' backend is selected (or 'auto' is used and ChromaDB is missing),
+    an in-process NumpyVectorIndex is used instead.
     """
     
+    BACKENDS = ("chroma", "numpy", "auto")
+    INDEX_TYPES = {"flat": NumpyVectorIndex, "ivf": IVFVectorIndex}
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize vector storage with the given configuration.
@@ -45,8 +52,21 @@ class VectorStoreManager:
         self.distance_metric = self.config.get("distance_metric", "cosine")
         self.persist_directory = self.config.get("persist_directory", 
                                                  os.path.join(self.db_path, "chroma"))
+        self.backend = self.config.get("backend", "chroma")
+        self.numpy_directory = self.config.get("numpy_directory",
+                                               os.path.join(self.db_path, "numpy"))
+        self.persist_every = self.config.get("persist_every", 100)
+        self.index_type = self.config.get("index_type", "flat")
+        self.index_params = self.config.get("index_params", {})
+        
+        if self.backend not in self.BACKENDS:
+            raise VectorStoreError(f"Unknown vector store backend: {self.backend}")
+        if self.index_type not in self.INDEX_TYPES:
+            raise VectorStoreError(f"Unknown vector index type: {self.index_type}")
         
         self._initialized = False
+        self._active_backend: Optional[str] = None
+        self._writes_since_persist = 0
         self._client = None
         self._collection = None
         
@@ -66,16 +86,25 @@ class VectorStoreManager:
         
         # Create storage directory
         os.makedirs(self.db_path, exist_ok=True)
-        os.makedirs(self.persist_directory, exist_ok=True)
+        
+        if self.backend == "numpy":
+            self._initialize_numpy()
+            return
         
         # Import here to avoid requiring chromadb for simple memory operations
         try:
             import chromadb
         except ImportError:
+            if self.backend == "auto":
+                logger.info("ChromaDB not available, falling back to NumPy vector index")
+                self._initialize_numpy()
+                return
             error_msg = "ChromaDB is required for vector storage. Install with 'pip install chromadb'"
             logger.error(error_msg)
             raise VectorStoreError(error_msg)
         
+        os.makedirs(self.persist_directory, exist_ok=True)
+        
         # Initialize Chroma client
         try:
             self._client = chromadb.PersistentClient(path=self.persist_directory)
@@ -92,6 +121,7 @@ class VectorStoreManager:
                 )
                 logger.info(f"Created new collection: {self.collection_name}")
             
+            self._active_backend = "chroma"
             self._initialized = True
             logger.info("Vector storage initialized")
             
@@ -100,6 +130,28 @@ class VectorStoreManager:
             logger.error(error_msg)
             raise VectorStoreError(error_msg) from e
     
+    def _initialize_numpy(self) -> None:
+        """
+        Initialize the in-process NumPy vector index.
+        
+        Uses an exact index by default, or an approximate IVF index when
+        ``index_type`` is 'ivf'. Loads a previously persisted index for this
+        collection if one exists.
+        """
+        index_cls = self.INDEX_TYPES[self.index_type]
+        index = index_cls(
+            name=self.collection_name,
+            persist_directory=os.path.join(self.numpy_directory, self.collection_name),
+            distance_metric=self.distance_metric,
+            **self.index_params,
+        )
+        index.load()
+        
+        self._collection = index
+        self._active_backend = "numpy"
+        self._initialized = True
+        logger.info(f"Vector storage initialized with NumPy index ({index.count()} vectors)")
+    
     def shutdown(self) -> None:
         """
         Properly close vector storage.
@@ -112,10 +164,15 @@ class VectorStoreManager:
         
         logger.debug("Shutting down vector storage")
         
-        # ChromaDB doesn't need explicit shutdown, but we'll clear references
+        # The NumPy index must be saved; ChromaDB persists on its own
+        if isinstance(self._collection, NumpyVectorIndex) and self._collection.dirty:
+            self._collection.save()
+        
+        # Clear references
         self._collection = None
         self._client = None
         
+        self._active_backend = None
         self._initialized = False
         logger.info("Vector storage shutdown complete")
     
@@ -172,12 +229,73 @@ class VectorStoreManager:
                 documents=[text]
             )
             logger.debug(f"Stored embedding {id}")
+            self._after_write()
             return id
         except Exception as e:
             error_msg = f"Failed to store embedding: {e}"
             logger.error(error_msg)
             raise VectorStoreError(error_msg) from e
     
+    def store_embeddings(self,
+                         texts: List[str],
+                         metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+                         ids: Optional[List[str]] = None,
+                         embeddings: Optional[List[List[float]]] = None) -> List[str]:
+        """
+        Store several texts with a single embedding call and a single add.
+        
+        Args:
+            texts: Texts to embed and store.
+            metadatas: Optional metadata per text.
+            ids: Optional IDs per text. Missing IDs are generated.
+            embeddings: Optional pre-computed embeddings per text.
+            
+        Returns:
+            IDs of the stored embeddings, in input order.
+            
+        Raises:
+            VectorStoreError: If storage operation fails.
+        """
+        self._ensure_initialized()
+        
+        if not texts:
+            return []
+        
+        ids = [id or str(uuid4()) for id in (ids or [None] * len(texts))]
+        metadatas = metadatas or [None] * len(texts)
+        if not (len(ids) == len(metadatas) == len(texts)):
+            raise VectorStoreError("texts, metadatas and ids must have the same length")
+        
+        string_metadatas = []
+        for metadata in metadatas:
+            meta = dict(metadata or {})
+            meta["timestamp"] = meta.get("timestamp") or datetime.now().isoformat()
+            string_metadatas.append(self._convert_metadata_to_strings(meta))
+        
+        # Generate all embeddings in one model call
+        if embeddings is None:
+            try:
+                embeddings = batch_get_embeddings(texts, model_name=self.embedding_model)
+            except Exception as e:
+                error_msg = f"Failed to generate embeddings: {e}"
+                logger.error(error_msg)
+                raise VectorStoreError(error_msg) from e
+        
+        try:
+            self._collection.add(
+                ids=ids,
+                embeddings=embeddings,
+                metadatas=string_metadatas,
+                documents=texts
+            )
+            logger.debug(f"Stored {len(ids)} embeddings")
+            self._after_write()
+            return ids
+        except Exception as e:
+            error_msg = f"Failed to store embeddings: {e}"
+            logger.error(error_msg)
+            raise VectorStoreError(error_msg) from e
+    
     def search_similar(self, 
                       query: str, 
                       limit: int = 5,
@@ -224,7 +342,7 @@ class VectorStoreManager:
             
             # Unpack results
             ids = results.get("ids", [[]])[0]
-            distances = results.get("distances", [[]])[0] if hasattr(results, "distances") else []
+            distances = (results.get("distances") or [[]])[0]
             metadatas = results.get("metadatas", [[]])[0]
             documents = results.get("documents", [[]])[0]
             
@@ -297,6 +415,7 @@ class VectorStoreManager:
                 documents=[text]
             )
             logger.debug(f"Updated embedding {id}")
+            self._after_write()
             return True
         except Exception as e:
             error_msg = f"Failed to update embedding: {e}"
@@ -332,6 +451,7 @@ class VectorStoreManager:
         try:
             self._collection.delete(ids=[id])
             logger.debug(f"Deleted embedding {id}")
+            self._after_write()
             return True
         except Exception as e:
             error_msg = f"Failed to delete embedding: {e}"
@@ -380,6 +500,8 @@ class VectorStoreManager:
                 "latest_timestamp": latest,
                 "embedding_model": self.embedding_model,
                 "distance_metric": self.distance_metric,
+                "backend": self._active_backend,
+                "index_type": self.index_type if self._active_backend == "numpy" else None,
             }
             
         except Exception as e:
@@ -387,6 +509,31 @@ class VectorStoreManager:
             logger.error(error_msg)
             raise VectorStoreError(error_msg) from e
     
+    def persist(self) -> None:
+        """
+        Flush pending changes to disk.
+        
+        Only the NumPy backend buffers writes; for ChromaDB, or when nothing
+        changed since the last save, this is a no-op.
+        
+        Raises:
+            VectorStoreError: If the index cannot be written.
+        """
+        self._ensure_initialized()
+        
+        if isinstance(self._collection, NumpyVectorIndex) and self._collection.dirty:
+            self._collection.save()
+        self._writes_since_persist = 0
+    
+    def _after_write(self) -> None:
+        """Persist the NumPy index every ``persist_every`` writes, if configured."""
+        if self._active_backend != "numpy" or self.persist_every <= 0:
+            return
+        
+        self._writes_since_persist += 1
+        if self._writes_since_persist >= self.persist_every:
+            self.persist()
+    
     def _ensure_initialized(self) -> None:
         """
         Ensure that vector storage is initialized.
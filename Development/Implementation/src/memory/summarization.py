@@ -0,0 +1,409 @@
+"""
+Hierarchical Rolling Summarization
+
+This module maintains a bounded-size summary of an arbitrarily long session.
+Old conversation entries are cut into fixed-size chunks, each chunk is
+summarized once, and summaries are merged into higher levels only when a
+level fills up. Summarization runs on a background worker so it stays off
+the turn's critical path.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import hashlib
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Union
+
+from .utils.token_management import get_encoding, optimize_prompt_for_tokens
+
+logger = logging.getLogger(__name__)
+
+# Signature of a summarization backend: (texts, max_tokens) -> summary
+SummarizeFn = Callable[[List[str], int], str]
+
+# A conversation entry is either plain text or a conversation_history dict
+Entry = Union[str, Dict[str, Any]]
+
+
+def format_entry(entry: Entry) -> str:
+    """
+    Render a conversation entry as text.
+
+    Args:
+        entry: Plain text, a conversation_history dict with 'user_message' and
+               'assistant_message', or a message dict with 'role' and 'content'.
+
+    Returns:
+        Text form of the entry.
+    """
+    if isinstance(entry, str):
+        return entry
+    if "user_message" in entry or "assistant_message" in entry:
+        return (f"User: {entry.get('user_message', '')}\n"
+                f"Assistant: {entry.get('assistant_message', '')}")
+    if "content" in entry:
+        return f"{str(entry.get('role', 'user')).capitalize()}: {entry['content']}"
+    return str(entry)
+
+
+def truncate_text_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text to at most ``max_tokens`` tokens, preferring sentence boundaries.
+
+    Args:
+        text: Text to truncate.
+        max_tokens: Token budget.
+
+    Returns:
+        Truncated text.
+    """
+    truncated = optimize_prompt_for_tokens(text, max_tokens)
+    if truncated:
+        return truncated
+
+    # The first sentence alone is over budget; cut inside it
+    encoding = get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def extractive_summary(texts: List[str], max_tokens: int) -> str:
+    """
+    Model-free summarizer that keeps the leading sentence of each text.
+
+    Args:
+        texts: Texts to summarize, oldest first.
+        max_tokens: Token budget for the summary.
+
+    Returns:
+        Summary text.
+    """
+    leads = []
+    for text in texts:
+        for line in text.splitlines():
+            line = line.strip()
+            if line:
+                leads.append(line.split(". ")[0].rstrip("."))
+    return truncate_text_to_tokens(". ".join(leads), max_tokens)
+
+
+def model_summarizer(generate: Callable[[str], str]) -> SummarizeFn:
+    """
+    Build a summarization backend from a text-generation callable.
+
+    Args:
+        generate: Callable taking a prompt and returning generated text, e.g.
+                  ``lambda prompt: local_model.generate(prompt).text``.
+
+    Returns:
+        Summarization function for HierarchicalSummarizer.
+    """
+    def summarize(texts: List[str], max_tokens: int) -> str:
+        prompt = (
+            f"Summarize the following conversation in at most {max_tokens} tokens. "
+            "Keep names, preferences, decisions and open questions.\n\n"
+            + "\n\n".join(texts)
+        )
+        return truncate_text_to_tokens(generate(prompt).strip(), max_tokens)
+
+    return summarize
+
+
+class HierarchicalSummarizer:
+    """
+    Incremental, hierarchical summary of a long conversation.
+
+    Entries are buffered until ``chunk_size`` of them are available; the chunk
+    is then summarized into level 0. When a level holds ``fanout`` summaries
+    they are merged into one summary on the next level. The top level
+    (``max_levels - 1``) is merged in place, so the rendered summary holds at
+    most ``(fanout - 1) * max_levels`` summaries of at most
+    ``max_summary_tokens`` each, however long the session runs.
+
+    Summaries are cached by a hash of their input, so replaying the same
+    history after a restart does no model calls.
+    """
+
+    def __init__(self,
+                 config: Optional[Dict[str, Any]] = None,
+                 summarize_fn: Optional[SummarizeFn] = None):
+        """
+        Initialize the summarizer.
+
+        Args:
+            config: Configuration dictionary. Supported keys:
+                    chunk_size, fanout, max_levels, max_summary_tokens,
+                    max_pending_chunks, cache_size, background.
+            summarize_fn: Summarization backend. Defaults to extractive_summary.
+        """
+        self.config = config or {}
+        self.summarize_fn = summarize_fn or extractive_summary
+
+        self.chunk_size = self.config.get("chunk_size", 5)
+        self.fanout = self.config.get("fanout", 4)
+        self.max_levels = self.config.get("max_levels", 3)
+        self.max_summary_tokens = self.config.get("max_summary_tokens", 150)
+        self.max_pending_chunks = self.config.get("max_pending_chunks", 8)
+        self.cache_size = self.config.get("cache_size", 256)
+        self.background = self.config.get("background", True)
+
+        if self.chunk_size < 1 or self.fanout < 2 or self.max_levels < 1:
+            raise ValueError("chunk_size must be >= 1, fanout >= 2 and max_levels >= 1")
+
+        self._levels: List[List[str]] = [[] for _ in range(self.max_levels)]
+        self._buffer: List[str] = []
+        # Chunks handed to the worker but not summarized yet, oldest first
+        self._pending: List[List[str]] = []
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self._queue: "queue.Queue[List[str]]" = queue.Queue(maxsize=self.max_pending_chunks)
+        self._stop_flag = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._metrics = {
+            "entries_added": 0,
+            "chunks_summarized": 0,
+            "merges": 0,
+            "cache_hits": 0,
+            "summarize_calls": 0,
+            "failures": 0,
+        }
+
+    def start(self) -> None:
+        """Start the background summarization worker."""
+        if not self.background:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning("Summarization worker already running")
+            return
+
+        self._stop_flag.clear()
+        self._thread = threading.Thread(
+            target=self._worker_loop,
+            name="memory-summarizer",
+            daemon=True
+        )
+        self._thread.start()
+        logger.debug("Started summarization worker")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the worker after summarizing every queued chunk.
+
+        Args:
+            timeout: Maximum seconds to wait. None waits indefinitely.
+        """
+        if self._thread is None:
+            return
+
+        self._stop_flag.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Summarization worker did not finish within {timeout}s")
+        else:
+            self._drain_inline()
+        self._thread = None
+        logger.debug("Stopped summarization worker")
+
+    def add_entries(self, entries: List[Entry]) -> None:
+        """
+        Add conversation entries that have left the verbatim history.
+
+        Each entry must be added exactly once, oldest first. Full chunks are
+        handed to the worker; the remainder waits for more entries.
+
+        Args:
+            entries: Conversation entries to fold into the summary.
+        """
+        chunks = []
+        with self._lock:
+            self._buffer.extend(format_entry(entry) for entry in entries)
+            self._metrics["entries_added"] += len(entries)
+            while len(self._buffer) >= self.chunk_size:
+                chunks.append(self._buffer[:self.chunk_size])
+                del self._buffer[:self.chunk_size]
+
+        for chunk in chunks:
+            self._schedule(chunk)
+
+    def get_summary(self) -> str:
+        """
+        Render the current summary, oldest material first.
+
+        Never waits on summarization. Chunks still queued on the worker and
+        entries below a full chunk are included verbatim, so nothing that
+        left the verbatim history is missing from the summary.
+
+        Returns:
+            Summary text (empty if nothing has been added).
+        """
+        with self._lock:
+            parts = [summary for level in reversed(self._levels) for summary in level]
+            parts.extend(entry for chunk in self._pending for entry in chunk)
+            parts.extend(self._buffer)
+        return "\n".join(parts)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every scheduled chunk has been summarized.
+
+        Args:
+            timeout: Maximum seconds to wait. None waits indefinitely.
+
+        Returns:
+            True if the queue drained, False on timeout.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._drain_inline()
+            return True
+
+        with self._queue.all_tasks_done:
+            if self._queue.unfinished_tasks:
+                self._queue.all_tasks_done.wait_for(
+                    lambda: not self._queue.unfinished_tasks, timeout
+                )
+            return not self._queue.unfinished_tasks
+
+    def reset(self) -> None:
+        """Discard all summaries and buffered entries. The cache is kept."""
+        self.flush()
+        with self._lock:
+            self._levels = [[] for _ in range(self.max_levels)]
+            self._buffer = []
+            self._pending = []
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get summarization metrics.
+
+        Returns:
+            Dictionary of counters plus the current level sizes and queue depth.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["level_sizes"] = [len(level) for level in self._levels]
+            metrics["buffered_entries"] = len(self._buffer)
+            metrics["pending_chunks"] = len(self._pending)
+        return metrics
+
+    def _schedule(self, chunk: List[str]) -> None:
+        """
+        Hand a chunk to the worker, or summarize inline without one.
+
+        When ``max_pending_chunks`` are already queued the caller blocks until
+        the worker catches up, which keeps chunks in order.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            with self._lock:
+                self._pending.append(chunk)
+            self._queue.put(chunk)
+            return
+        self._process_chunk(chunk)
+
+    def _worker_loop(self) -> None:
+        """Background loop that summarizes queued chunks in order."""
+        while True:
+            try:
+                chunk = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop_flag.is_set():
+                    break
+                continue
+            try:
+                self._process_chunk(chunk)
+            finally:
+                self._queue.task_done()
+
+    def _drain_inline(self) -> None:
+        """Summarize any queued chunks on the calling thread."""
+        while True:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self._process_chunk(chunk)
+            finally:
+                self._queue.task_done()
+
+    def _process_chunk(self, chunk: List[str]) -> None:
+        """
+        Summarize a chunk into level 0 and cascade merges upwards.
+
+        Summarization itself runs outside the lock so get_summary stays
+        responsive. Chunks are processed by one thread at a time in order.
+
+        Args:
+            chunk: Formatted entries of one chunk.
+        """
+        summary = self._summarize(chunk, level=0)
+        self._metrics["chunks_summarized"] += 1
+
+        level = 0
+        while True:
+            with self._lock:
+                if self._pending and self._pending[0] is chunk:
+                    # Swap the verbatim chunk for its summary in one step
+                    self._pending.pop(0)
+                self._levels[level].append(summary)
+                if len(self._levels[level]) < self.fanout:
+                    return
+                to_merge = list(self._levels[level])
+
+            merged = self._summarize(to_merge, level=level + 1)
+            self._metrics["merges"] += 1
+
+            with self._lock:
+                # Only drop the summaries that were merged
+                del self._levels[level][:len(to_merge)]
+
+            summary = merged
+            level = min(level + 1, self.max_levels - 1)
+
+    def _summarize(self, texts: List[str], level: int) -> str:
+        """
+        Summarize texts, using the content-hash cache.
+
+        Falls back to the extractive summarizer if the backend fails, so a
+        model error degrades quality rather than losing history.
+
+        Args:
+            texts: Texts to summarize.
+            level: Level the summary is produced for (part of the cache key).
+
+        Returns:
+            Summary text.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{level}:{self.max_summary_tokens}".encode("utf-8"))
+        for text in texts:
+            digest.update(b"\x00")
+            digest.update(text.encode("utf-8"))
+        key = digest.hexdigest()
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._metrics["cache_hits"] += 1
+                return self._cache[key]
+
+        self._metrics["summarize_calls"] += 1
+        try:
+            summary = self.summarize_fn(texts, self.max_summary_tokens)
+        except Exception as e:
+            self._metrics["failures"] += 1
+            logger.error(f"Summarization failed, using extractive fallback: {e}")
+            summary = extractive_summary(texts, self.max_summary_tokens)
+
+        with self._lock:
+            self._cache[key] = summary
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
@@ -9,11 +9,16 @@ This package contains utility functions for the memory system.
 """
 
 from .serialization import serialize_to_json, deserialize_from_json
-from .token_management import count_tokens, truncate_messages_to_token_limit
+from .token_management import count_tokens, count_message_tokens, truncate_messages_to_token_limit
+from .tokenizers import TokenizerRegistry, get_tokenizer_registry, count_many
 
 __all__ = [
     "serialize_to_json", 
     "deserialize_from_json",
     "count_tokens",
-    "truncate_messages_to_token_limit"
+    "count_message_tokens",
+    "truncate_messages_to_token_limit",
+    "TokenizerRegistry",
+    "get_tokenizer_registry",
+    "count_many"
 ]
\ No newline at end of file
@@ -11,57 +11,86 @@ This module provides utilities for managing tokens in the context window.
 import logging
 from typing import Dict, List, Any, Optional, Union, Callable
 
+from .tokenizers import DEFAULT_ENCODING, get_tokenizer_registry
+
 logger = logging.getLogger(__name__)
 
 
 # Type for messages with required fields
 MessageLike = Dict[str, Any]
 
+# Approximate formatting overhead per message and per conversation
+MESSAGE_OVERHEAD_TOKENS = 4
+CONVERSATION_OVERHEAD_TOKENS = 2
 
-def count_tokens(messages: List[MessageLike]) -> int:
+# Message key under which a per-message token count is cached
+TOKEN_COUNT_KEY = "token_count"
+
+
+def get_encoding(name: str = DEFAULT_ENCODING):
     """
-    Count the number of tokens in a list of messages.
+    Get a tiktoken encoding, loading it only once per process.
     
     Args:
-        messages: List of message objects with 'content' field.
+        name: Name of the tiktoken encoding.
         
     Returns:
-        Estimated token count.
+        The encoding, or None if tiktoken is not available.
     """
-    try:
-        # First try to use tiktoken for accurate counting if available
-        import tiktoken
-        encoding = tiktoken.get_encoding("cl100k_base")  # Default for recent models
-        
-        token_count = 0
-        for msg in messages:
-            # Count tokens in the message content
-            content = msg.get('content', '')
-            if content:
-                token_count += len(encoding.encode(content))
-            
-            # Count tokens in role (typically small)
-            role = msg.get('role', '')
-            if role:
-                token_count += len(encoding.encode(role))
-            
-            # Add overhead for message formatting (varies by model)
-            token_count += 4  # Approximate overhead per message
-        
-        # Add base overhead for the conversation
-        token_count += 2
+    return get_tokenizer_registry().encoding(name)
+
+
+def conversation_overhead_tokens() -> int:
+    """
+    Get the fixed per-conversation token overhead added by count_tokens.
+    
+    Returns:
+        Overhead in tokens (0 when using the approximate counter).
+    """
+    return CONVERSATION_OVERHEAD_TOKENS if get_encoding() is not None else 0
+
+
+def count_message_tokens(message: MessageLike, use_cache: bool = True) -> int:
+    """
+    Count the tokens in a single message, excluding conversation overhead.
+    
+    Args:
+        message: Message object with 'content' and 'role' fields.
+        use_cache: If True, return the count cached on the message under
+                   TOKEN_COUNT_KEY when present.
         
-        return token_count
+    Returns:
+        Estimated token count for the message.
+    """
+    if use_cache:
+        cached = message.get(TOKEN_COUNT_KEY)
+        if cached is not None:
+            return cached
+    
+    # The registry memoizes counts and estimates when tiktoken is missing
+    registry = get_tokenizer_registry()
+    token_count = 0
+    
+    # Count tokens in the message content
+    content = message.get('content', '')
+    if content and isinstance(content, str):
+        token_count += registry.count(content)
     
-    except ImportError:
-        # Fall back to a simple approximation if tiktoken is not available
-        logger.warning("tiktoken not available, using approximate token counting")
-        return _approximate_token_count(messages)
+    # Count tokens in role (typically small)
+    role = message.get('role', '')
+    if role:
+        token_count += registry.count(role)
+    
+    # Add overhead for message formatting (varies by model)
+    return token_count + MESSAGE_OVERHEAD_TOKENS
 
 
-def _approximate_token_count(messages: List[MessageLike]) -> int:
+def count_tokens(messages: List[MessageLike]) -> int:
     """
-    Approximate the number of tokens in a list of messages.
+    Count the number of tokens in a list of messages.
+    
+    Per-message counts cached on the messages are reused, so counting a
+    history that has already been measured does not re-tokenize it.
     
     Args:
         messages: List of message objects with 'content' field.
@@ -69,20 +98,7 @@ def _approximate_token_count(messages: List[MessageLike]) -> int:
     Returns:
         Estimated token count.
     """
-    # Simple approximation: ~4 characters per token on average
-    chars_per_token = 4.0
-    
-    total_chars = 0
-    for msg in messages:
-        content = msg.get('content', '')
-        if isinstance(content, str):
-            total_chars += len(content)
-        
-        # Add a small overhead for message metadata
-        total_chars += 10
-    
-    # Convert character count to token count
-    return int(total_chars / chars_per_token) + (len(messages) * 4)
+    return sum(count_message_tokens(msg) for msg in messages) + conversation_overhead_tokens()
 
 
 def truncate_messages_to_token_limit(
@@ -109,31 +125,33 @@ def truncate_messages_to_token_limit(
     if current_tokens <= max_tokens:
         return messages.copy()
     
+    # Budget for the messages themselves, after the conversation overhead
+    budget = max_tokens - conversation_overhead_tokens()
+    
     # Clone the message list
     if preserve_latest:
         # Remove from beginning (oldest first)
-        working_messages = messages.copy()
         result = []
         
         # Add messages from newest to oldest until we hit the limit
         token_count = 0
-        for msg in reversed(working_messages):
-            msg_tokens = count_tokens([msg])
-            if token_count + msg_tokens <= max_tokens:
-                result.insert(0, msg)
+        for msg in reversed(messages):
+            msg_tokens = count_message_tokens(msg)
+            if token_count + msg_tokens <= budget:
+                result.append(msg)
                 token_count += msg_tokens
             else:
                 break
+        result.reverse()
     else:
         # Remove from end (newest first)
-        working_messages = messages.copy()
         result = []
         
         # Add messages from oldest to newest until we hit the limit
         token_count = 0
-        for msg in working_messages:
-            msg_tokens = count_tokens([msg])
-            if token_count + msg_tokens <= max_tokens:
+        for msg in messages:
+            msg_tokens = count_message_tokens(msg)
+            if token_count + msg_tokens <= budget:
                 result.append(msg)
                 token_count += msg_tokens
             else:
@@ -185,13 +203,8 @@ def optimize_prompt_for_tokens(
         if tokenizer:
             return len(tokenizer(text))
         
-        try:
-            import tiktoken
-            encoding = tiktoken.get_encoding("cl100k_base")
-            return len(encoding.encode(text))
-        except ImportError:
-            # Fall back to character approximation
-            return int(len(text) / 4.0)
+        # tiktoken if installed, otherwise the registry's estimate
+        return get_tokenizer_registry().count(text)
     
     # Check if we're already under the limit
     current_tokens = count_string_tokens(prompt)
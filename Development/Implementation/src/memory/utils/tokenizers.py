@@ -0,0 +1,346 @@
+"""
+Tokenizer Registry
+
+One place for token counting across the memory system, the API clients and
+the workflow nodes. Each tokenizer is loaded once per process, counts of
+recently seen strings are memoized in a bounded LRU (conversation history
+is re-counted every turn), and when no tokenizer is installed counts come
+from a fast estimator calibrated against real counts seen in this process.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Any
+
+logger = logging.getLogger(__name__)
+
+# Default encoding for recent models
+DEFAULT_ENCODING = "cl100k_base"
+
+# English prose averages about 4 characters per cl100k/o200k token
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Encodings by model-name prefix, most specific first
+MODEL_ENCODINGS = (
+    ("gpt-4o", "o200k_base"),
+    ("gpt-4.1", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("o4", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+)
+
+TokenCounter = Callable[[str], int]
+
+
+def encoding_for_model(model: Optional[str]) -> str:
+    """
+    Get the tiktoken encoding name for a model.
+
+    Args:
+        model: Model name, e.g. "gpt-4o-mini".
+
+    Returns:
+        Encoding name (DEFAULT_ENCODING for unknown models).
+    """
+    for prefix, name in MODEL_ENCODINGS:
+        if model and model.startswith(prefix):
+            return name
+    return DEFAULT_ENCODING
+
+
+class TokenizerRegistry:
+    """Loads tokenizers once and memoizes token counts."""
+
+    def __init__(self, cache_size: int = 8192, max_cached_chars: int = 16384):
+        """
+        Initialize the registry.
+
+        Args:
+            cache_size: Number of (tokenizer, text) counts kept.
+            max_cached_chars: Texts longer than this are counted but not
+                memoized, so a few huge documents can't evict the history.
+        """
+        self.cache_size = cache_size
+        self.max_cached_chars = max_cached_chars
+
+        self._tokenizers: Dict[str, Optional[Any]] = {}
+        self._counters: Dict[str, Optional[TokenCounter]] = {}
+        self._counts: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Characters per token observed from real tokenization, for the estimator
+        self._calibration_chars = 0
+        self._calibration_tokens = 0
+
+        self._stats = {"hits": 0, "misses": 0, "estimated": 0, "loads": 0}
+
+    def register(self, name: str, counter: Optional[TokenCounter]) -> None:
+        """
+        Register a token counting function under a name.
+
+        Args:
+            name: Tokenizer name, e.g. "anthropic" or a local model path.
+            counter: Function returning the token count of a text, or None
+                if this tokenizer is only ever estimated.
+        """
+        with self._lock:
+            self._counters[name] = counter
+            self._forget(name)
+
+    def encoding(self, name: str = DEFAULT_ENCODING) -> Optional[Any]:
+        """
+        Get a tiktoken encoding, loading it only once per process.
+
+        Args:
+            name: Name of the tiktoken encoding.
+
+        Returns:
+            The encoding, or None if tiktoken or the encoding is unavailable.
+        """
+        if name in self._tokenizers:
+            return self._tokenizers[name]
+
+        encoding = None
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(name)
+        except ImportError:
+            logger.warning("tiktoken not available, using approximate token counting")
+        except Exception as e:
+            logger.warning(f"Failed to load tiktoken encoding {name}: {e}")
+
+        with self._lock:
+            self._tokenizers.setdefault(name, encoding)
+            self._stats["loads"] += 1
+            return self._tokenizers[name]
+
+    def has_tokenizer(self, name: str = DEFAULT_ENCODING) -> bool:
+        """Whether counts under this name are exact rather than estimated."""
+        if name in self._counters:
+            return self._counters[name] is not None
+        return self.encoding(name) is not None
+
+    def count(self, text: str, name: str = DEFAULT_ENCODING) -> int:
+        """
+        Count the tokens in a text.
+
+        Args:
+            text: Text to count.
+            name: Registered tokenizer or tiktoken encoding name.
+
+        Returns:
+            Token count; estimated if the tokenizer is unavailable.
+        """
+        if not text:
+            return 0
+
+        key = (name, text)
+        cacheable = len(text) <= self.max_cached_chars
+        if cacheable:
+            with self._lock:
+                cached = self._counts.get(key)
+                if cached is not None:
+                    self._counts.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return cached
+
+        counter = self._counter(name)
+        if counter is None:
+            count = self.estimate(text)
+        else:
+            count = counter(text)
+            self._calibrate(len(text), count)
+
+        with self._lock:
+            self._stats["misses"] += 1
+            if counter is None:
+                self._stats["estimated"] += 1
+            if cacheable:
+                self._store(key, count)
+        return count
+
+    def count_many(self, texts: Sequence[str], name: str = DEFAULT_ENCODING) -> List[int]:
+        """
+        Count the tokens in several texts, tokenizing uncached ones in one batch.
+
+        Args:
+            texts: Texts to count.
+            name: Registered tokenizer or tiktoken encoding name.
+
+        Returns:
+            Token counts in the order of texts.
+        """
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                if not text:
+                    counts[i] = 0
+                    continue
+                cached = self._counts.get((name, text))
+                if cached is not None:
+                    self._counts.move_to_end((name, text))
+                    self._stats["hits"] += 1
+                    counts[i] = cached
+                else:
+                    missing.setdefault(text, []).append(i)
+
+        if missing:
+            unique = list(missing)
+            encoding = None if name in self._counters else self.encoding(name)
+            if encoding is not None and hasattr(encoding, "encode_batch"):
+                batch_counts = [len(tokens) for tokens in encoding.encode_batch(unique, disallowed_special=())]
+                self._calibrate(sum(map(len, unique)), sum(batch_counts))
+                estimated = False
+            else:
+                counter = self._counter(name)
+                estimated = counter is None
+                batch_counts = [self.estimate(text) if estimated else counter(text) for text in unique]
+                if not estimated:
+                    self._calibrate(sum(map(len, unique)), sum(batch_counts))
+
+            with self._lock:
+                for text, count in zip(unique, batch_counts):
+                    self._stats["misses"] += 1
+                    if estimated:
+                        self._stats["estimated"] += 1
+                    if len(text) <= self.max_cached_chars:
+                        self._store((name, text), count)
+                    for i in missing[text]:
+                        counts[i] = count
+
+        return counts
+
+    def estimate(self, text: str, chars_per_token: Optional[float] = None) -> int:
+        """
+        Estimate a token count without a tokenizer.
+
+        Uses the characters-per-token ratio observed from real tokenization
+        in this process when there is enough of it, else
+        DEFAULT_CHARS_PER_TOKEN. A token never spans words, so the estimate
+        is at least the word count.
+
+        Args:
+            text: Text to estimate.
+            chars_per_token: Ratio to use instead of the calibrated one.
+
+        Returns:
+            Estimated token count (at least 1 for non-empty text).
+        """
+        if not text:
+            return 0
+        ratio = chars_per_token or self.chars_per_token
+        return max(1, len(text.split()), int(len(text) / ratio + 0.5))
+
+    @property
+    def chars_per_token(self) -> float:
+        """Characters per token used by the estimator."""
+        if self._calibration_tokens < 1000:
+            return DEFAULT_CHARS_PER_TOKEN
+        return self._calibration_chars / self._calibration_tokens
+
+    def clear(self) -> None:
+        """Forget memoized counts (loaded tokenizers are kept)."""
+        with self._lock:
+            self._counts.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dictionary with cache hits and misses, hit rate, estimated counts
+            and the estimator's characters-per-token ratio.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_counts"] = len(self._counts)
+            stats["tokenizers"] = sorted(
+                [name for name, encoding in self._tokenizers.items() if encoding is not None]
+                + [name for name, counter in self._counters.items() if counter is not None]
+            )
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["chars_per_token"] = self.chars_per_token
+        return stats
+
+    def _counter(self, name: str) -> Optional[TokenCounter]:
+        """Counting function for a name, or None to estimate."""
+        if name in self._counters:
+            return self._counters[name]
+        encoding = self.encoding(name)
+        if encoding is None:
+            return None
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+    def _calibrate(self, chars: int, tokens: int) -> None:
+        with self._lock:
+            self._calibration_chars += chars
+            self._calibration_tokens += tokens
+
+    def _store(self, key: tuple, count: int) -> None:
+        """Memoize a count. Caller holds the lock."""
+        self._counts[key] = count
+        self._counts.move_to_end(key)
+        while len(self._counts) > self.cache_size:
+            self._counts.popitem(last=False)
+
+    def _forget(self, name: str) -> None:
+        """Drop memoized counts for a tokenizer. Caller holds the lock."""
+        for key in [key for key in self._counts if key[0] == name]:
+            del self._counts[key]
+
+
+_registry: Optional[TokenizerRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tokenizer_registry() -> TokenizerRegistry:
+    """
+    Get the process-wide tokenizer registry.
+
+    Returns:
+        The shared TokenizerRegistry.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TokenizerRegistry()
+    return _registry
+
+
+def count_text_tokens(text: str, name: str = DEFAULT_ENCODING) -> int:
+    """
+    Count the tokens in a text with the shared registry.
+
+    Args:
+        text: Text to count.
+        name: Registered tokenizer or tiktoken encoding name.
+
+    Returns:
+        Token count.
+    """
+    return get_tokenizer_registry().count(text, name)
+
+
+def count_many(texts: Sequence[str], name: str = DEFAULT_ENCODING) -> List[int]:
+    """
+    Count the tokens in several texts with the shared registry.
+
+    Args:
+        texts: Texts to count.
+        name: Registered tokenizer or tiktoken encoding name.
+
+    Returns:
+        Token counts in the order of texts.
+    """
+    return get_tokenizer_registry().count_many(texts, name)
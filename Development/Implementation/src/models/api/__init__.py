@@ -16,6 +16,16 @@ from .interface import APIModelInterface
 from .api_manager import APIModelManager
 from .anthropic_client import AnthropicClient
 from .openai_client import OpenAIClient
+from .async_http import AsyncHTTPPool, get_pool, close_pools
+from .rate_limiter import (
+    RateLimiter,
+    get_rate_limiter,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_DEFAULT,
+    PRIORITY_BACKGROUND
+)
+from .retry_strategy import RetryBudget, get_retry_budget
+from .hedging import HedgingPolicy, LatencyTracker
 from .exceptions import (
     APIModelError,
     APIInitializationError,
@@ -69,6 +79,24 @@ __all__ = [
     'AnthropicClient',
     'OpenAIClient',
     
+    # Async transport
+    'AsyncHTTPPool',
+    'get_pool',
+    'close_pools',
+    
+    # Rate limiting
+    'RateLimiter',
+    'get_rate_limiter',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_DEFAULT',
+    'PRIORITY_BACKGROUND',
+    
+    # Hedging and retry budgets
+    'HedgingPolicy',
+    'LatencyTracker',
+    'RetryBudget',
+    'get_retry_budget',
+    
     # Exceptions
     'APIModelError',
     'APIInitializationError',
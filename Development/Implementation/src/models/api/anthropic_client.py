@@ -10,16 +10,21 @@ This module provides integration with the Anthropic Claude API.
 # DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
 
 import os
+import json
 import logging
 import importlib.util
-from typing import Any, Dict, Iterator, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
 from .interface import APIModelInterface, PromptType, ParamsType
 from .credentials import get_credential
 from .token_counter import count_tokens_anthropic
 from .request_builder import format_anthropic_request
-from .response_parser import parse_anthropic_response, check_for_content_filter
-from .retry_strategy import with_retry
+from .response_parser import (
+    parse_anthropic_response, check_for_content_filter, extract_response_metadata, extract_token_usage, add_token_usage
+)
+from .retry_strategy import with_retry, get_retry_budget
+from .async_http import AsyncHTTPPool, Deadline, get_pool
+from .hedging import HedgingPolicy, LatencyTracker
 from .exceptions import (
     APIInitializationError,
     APICredentialError,
@@ -27,11 +32,15 @@ from .exceptions import (
     APITimeoutError,
     APIRateLimitError,
     APIContentFilterError,
-    APIInvalidResponseError
+    APIInvalidResponseError,
+    APIServiceUnavailableError
 )
 
 logger = logging.getLogger(__name__)
 
+ANTHROPIC_BASE_URL = "https://api.anthropic.com"
+ANTHROPIC_VERSION = "2023-06-01"
+
 
 class MockAnthropicClient:
     """Mock implementation for the Anthropic client when SDK is not available."""
@@ -95,6 +104,9 @@ class AnthropicClient(APIModelInterface):
         self.api_key = None
         self.model_id = None
         self.client = None
+        self.hedging = HedgingPolicy()
+        # Prompt, completion and prompt-cache read/write token totals
+        self.token_usage: Dict[str, int] = {}
         self.initialized = False
         self._anthropic_available = self._check_anthropic_available()
     
@@ -124,6 +136,12 @@ class AnthropicClient(APIModelInterface):
             # Set model ID
             self.model_id = self.config.get("model_id", "claude-3-opus-20240229")
             
+            # Hedge async requests that are slower to start than usual
+            self.hedging = HedgingPolicy(LatencyTracker(
+                percentile=self.config.get("hedge_percentile", 0.95),
+                default_threshold=self.config.get("hedge_default_threshold", 2.0)
+            ))
+            
             # Set up client
             self.client = self._setup_client()
             
@@ -194,7 +212,9 @@ class AnthropicClient(APIModelInterface):
             response = with_retry(
                 lambda: self.client.messages.create(**anthropic_params),
                 max_attempts=self.config.get("retry_attempts", 3),
-                backoff_factor=self.config.get("backoff_factor", 1.5)
+                backoff_factor=self.config.get("backoff_factor", 1.5),
+                deadline=params.get("deadline"),
+                budget=get_retry_budget(params["session_id"]) if params.get("session_id") else None
             )
             
             # Check for content filtering
@@ -202,6 +222,7 @@ class AnthropicClient(APIModelInterface):
                 raise APIContentFilterError("Response was filtered by Anthropic's content policy")
             
             # Parse response
+            add_token_usage(self.token_usage, extract_response_metadata(response).get("token_usage"))
             return parse_anthropic_response(response)
         except APIContentFilterError:
             raise  # Re-raise content filter errors
@@ -275,6 +296,119 @@ class AnthropicClient(APIModelInterface):
             else:
                 raise APIRequestError(f"Anthropic API streaming request failed: {str(e)}")
     
+    def _pool(self) -> AsyncHTTPPool:
+        """Shared keep-alive connection pool for this key on the running event loop."""
+        return get_pool(
+            "anthropic",
+            self.config.get("base_url", ANTHROPIC_BASE_URL),
+            {"x-api-key": self.api_key, "anthropic-version": self.config.get("anthropic_version", ANTHROPIC_VERSION)},
+            credential=self.api_key,
+            max_connections=self.config.get("max_connections", 8),
+            keepalive_expiry=self.config.get("keepalive_expiry", 30.0),
+            http2=self.config.get("http2", True)
+        )
+    
+    async def agenerate(self, prompt: PromptType, params: ParamsType = None) -> str:
+        """Generate a response from Claude over the pooled async transport.
+        
+        Args:
+            prompt: Prompt data (string or message list)
+            params: Optional generation parameters; "timeout" and "deadline"
+                (a time.monotonic() instant) bound the request, "session_id"
+                selects the retry budget hedges are taken from
+            
+        Returns:
+            Generated response
+            
+        Raises:
+            APITimeoutError: If the deadline passes
+            APIRequestError: If the request fails
+            APIContentFilterError: If content is filtered
+        """
+        self._ensure_initialized()
+        params = params or {}
+        anthropic_params = format_anthropic_request(prompt, self.model_id, {**params, "stream": False})
+        deadline = Deadline.until(params.get("deadline"), params.get("timeout", self.config.get("timeout", 30)))
+        
+        async def attempt() -> Dict[str, Any]:
+            return await self._pool().post_json("/v1/messages", anthropic_params, timeout=deadline.remaining())
+        
+        response = await self.hedging.call(
+            attempt,
+            hedge=attempt if self.config.get("hedge_requests", True) else None,
+            deadline=deadline,
+            budget=get_retry_budget(params.get("session_id"))
+        )
+        if check_for_content_filter(response):
+            raise APIContentFilterError("Response was filtered by Anthropic's content policy")
+        add_token_usage(self.token_usage, extract_response_metadata(response).get("token_usage"))
+        return parse_anthropic_response(response)
+    
+    async def agenerate_stream(self, prompt: PromptType, params: ParamsType = None) -> AsyncIterator[str]:
+        """Stream a response from Claude over the pooled async transport.
+        
+        Args:
+            prompt: Prompt data (string or message list)
+            params: Optional generation parameters; "timeout" and "deadline"
+                bound the whole stream, "session_id" selects the retry budget
+            
+        Returns:
+            Async iterator of text deltas; a hedge is started if the first
+            delta is slower than the recent p95
+            
+        Raises:
+            APITimeoutError: If the deadline passes mid-stream
+            APIRequestError: If the request fails or the stream reports an error
+            APIContentFilterError: If content is filtered
+        """
+        self._ensure_initialized()
+        params = params or {}
+        anthropic_params = format_anthropic_request(prompt, self.model_id, {**params, "stream": True})
+        deadline = Deadline.until(params.get("deadline"), params.get("timeout", self.config.get("timeout", 30)))
+        
+        def attempt() -> AsyncIterator[str]:
+            return self._astream(anthropic_params, deadline)
+        
+        chunks = self.hedging.stream(
+            attempt,
+            hedge=attempt if self.config.get("hedge_requests", True) else None,
+            deadline=deadline,
+            budget=get_retry_budget(params.get("session_id"))
+        )
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+    
+    async def _astream(self, anthropic_params: Dict[str, Any], deadline: Deadline) -> AsyncIterator[str]:
+        """Run one streaming request and yield its text deltas."""
+        events = self._pool().stream_events("/v1/messages", anthropic_params, timeout=deadline.remaining())
+        async for event, data in events:
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                raise APIInvalidResponseError(f"Invalid Anthropic stream event: {data[:200]}")
+            
+            event_type = payload.get("type", event)
+            if event_type == "message_start":
+                usage = payload.get("message", {}).get("usage")
+                if usage:
+                    add_token_usage(self.token_usage, extract_token_usage(usage))
+            elif event_type == "content_block_delta":
+                text = payload.get("delta", {}).get("text")
+                if text:
+                    yield text
+            elif event_type == "message_delta":
+                if payload.get("delta", {}).get("stop_reason") == "content_filtered":
+                    raise APIContentFilterError("Response was filtered by Anthropic's content policy")
+            elif event_type == "error":
+                error = payload.get("error", {})
+                message = f"Anthropic stream error: {error.get('message', data[:200])}"
+                if error.get("type") == "overloaded_error":
+                    raise APIServiceUnavailableError(message)
+                raise APIRequestError(message)
+    
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using Anthropic's tokenizer.
         
@@ -364,7 +498,8 @@ class AnthropicClient(APIModelInterface):
                 "function_calling": "function_calling" in capabilities["capabilities"]
             },
             "context_window": capabilities["context_window"],
-            "max_output_tokens": capabilities["max_output_tokens"]
+            "max_output_tokens": capabilities["max_output_tokens"],
+            "token_usage": dict(self.token_usage)
         }
     
     def list_available_models(self) -> List[Dict[str, Any]]:
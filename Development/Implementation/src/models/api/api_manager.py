@@ -18,6 +18,7 @@ from .config import load_config
 from .exceptions import APIModelError, APIInitializationError, APIConfigurationError
 from .streaming.stream_handler import StreamHandler
 from .streaming.stream_manager import StreamManager
+from ..utils.cancellation import CancellationToken
 
 logger = logging.getLogger(__name__)
 
@@ -314,7 +315,8 @@ class APIModelManager:
     def generate_stream_with_handlers(
         self, prompt: PromptType, model_id: Optional[str] = None, 
         params: ParamsType = None, handlers: Optional[List[StreamHandler]] = None,
-        stream_config: Optional[Dict[str, Any]] = None
+        stream_config: Optional[Dict[str, Any]] = None,
+        cancel: Optional[CancellationToken] = None
     ) -> StreamManager:
         """Generate a streaming response with handlers.
         
@@ -324,6 +326,8 @@ class APIModelManager:
             params: Optional generation parameters
             handlers: Optional list of stream handlers
             stream_config: Optional streaming configuration
+            cancel: Optional cancellation token; cancelling it stops the
+                stream and closes the provider connection
             
         Returns:
             StreamManager instance managing the stream
@@ -368,9 +372,10 @@ class APIModelManager:
                 "provider": provider_name,
                 "model": model_name or client.model_id,
                 "prompt": prompt,
-                "request_id": model_id or f"{provider_name}:{model_name or client.model_id}"
+                "request_id": model_id or f"{provider_name}:{model_name or client.model_id}",
+                "max_tokens": params.get("max_tokens")
             }
-            stream_manager.start_stream(stream, metadata)
+            stream_manager.start_stream(stream, metadata, cancel=cancel)
             
             return stream_manager
         except Exception as e:
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pooled asyncio HTTP transport for API model clients.
+
+One pool per provider and event loop keeps connections alive between
+requests, bounds the number of requests in flight, and enforces a deadline
+across connect, response headers and every streamed chunk. httpx is used
+when installed (with HTTP/2 when h2 is installed too); otherwise a small
+HTTP/1.1 keep-alive pool over asyncio streams is used.
+"""
+# TASK-REF: AM_001 - API Model Client
+# TASK-REF: AM_002 - Streaming Response Handling
+# CONCEPT-REF: CON-AM-001 - API Model Client
+# DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
+
+import ssl
+import json
+import socket
+import time
+import asyncio
+import logging
+import contextlib
+from urllib.parse import urlsplit
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+from .exceptions import (
+    APIRequestError,
+    APITimeoutError,
+    APIRateLimitError,
+    APIAuthenticationError,
+    APIInvalidRequestError,
+    APIInvalidResponseError,
+    APIServiceUnavailableError
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = HTTPX_AVAILABLE
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def raise_for_status(status: int, body: bytes, provider: str, headers: Optional[Mapping[str, str]] = None) -> None:
+    """Raise the API exception matching an HTTP error status.
+
+    Args:
+        status: HTTP status code
+        body: Response body, included in the message
+        provider: Provider name for the message
+        headers: Response headers; a 429's retry-after is kept on the error
+
+    Raises:
+        APIRequestError: Or the subclass matching the status
+    """
+    if status < 400:
+        return
+    message = f"{provider} API returned HTTP {status}: {body[:500].decode('utf-8', 'replace')}"
+    if status in (401, 403):
+        raise APIAuthenticationError(message)
+    if status == 429:
+        error = APIRateLimitError(message)
+        error.retry_after = (headers or {}).get("retry-after")
+        raise error
+    if status in (400, 404, 413, 422):
+        raise APIInvalidRequestError(message)
+    if status >= 500:
+        raise APIServiceUnavailableError(message)
+    raise APIRequestError(message)
+
+
+class Deadline:
+    """Absolute deadline shared by every step of one request."""
+
+    def __init__(self, timeout: Optional[float]):
+        """Start the deadline.
+
+        Args:
+            timeout: Seconds the whole request may take, or None for no limit
+        """
+        self.timeout = timeout
+        self.expires = time.monotonic() + timeout if timeout else None
+
+    @classmethod
+    def until(cls, expires: Optional[float], timeout: Optional[float] = None) -> "Deadline":
+        """Deadline at a time.monotonic() instant, or after timeout if that is sooner.
+
+        Args:
+            expires: Absolute deadline propagated from the caller, or None
+            timeout: Per-request timeout in seconds, or None
+        """
+        deadline = cls(timeout)
+        if expires is not None and (deadline.expires is None or expires < deadline.expires):
+            deadline.expires = expires
+            deadline.timeout = round(max(expires - time.monotonic(), 0.0), 3)
+        return deadline
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a deadline.
+
+        Raises:
+            APITimeoutError: If the deadline has passed
+        """
+        if self.expires is None:
+            return None
+        remaining = self.expires - time.monotonic()
+        if remaining <= 0:
+            raise APITimeoutError(f"Request deadline of {self.timeout}s exceeded")
+        return remaining
+
+    async def run(self, awaitable):
+        """Await within the deadline.
+
+        Raises:
+            APITimeoutError: If the deadline passes first
+        """
+        try:
+            remaining = self.remaining()
+        except APITimeoutError:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            raise APITimeoutError(f"Request deadline of {self.timeout}s exceeded")
+
+
+class _Connection:
+    """One HTTP/1.1 keep-alive connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.reusable = True
+        self.complete = False
+        self.reused = False
+
+    async def send(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> None:
+        lines = [f"{method} {target} HTTP/1.1"] + [f"{name}: {value}" for name, value in headers.items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+    async def read_head(self) -> Tuple[int, Dict[str, str]]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        status = int(status_line.decode("latin-1").split(" ", 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        self.reusable = headers.get("connection", "").lower() != "close"
+        return status, headers
+
+    async def iter_body(self, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                data = await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+                yield data
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                data = await self.reader.read(min(remaining, 65536))
+                if not data:
+                    raise ConnectionResetError("Connection closed mid-body")
+                remaining -= len(data)
+                yield data
+        else:
+            # Body delimited by connection close
+            self.reusable = False
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                yield data
+        self.complete = True
+
+    def close(self) -> None:
+        self.reusable = False
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHTTPPool:
+    """Keep-alive connections to one API host, shared by requests on one event loop."""
+
+    def __init__(self,
+                 base_url: str,
+                 headers: Optional[Dict[str, str]] = None,
+                 max_connections: int = 8,
+                 keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0,
+                 http2: bool = True,
+                 provider: str = "api"):
+        """Initialize the pool.
+
+        Args:
+            base_url: Scheme, host and optional path prefix of the API
+            headers: Headers sent with every request (auth, version)
+            max_connections: Most requests in flight, and connections kept open
+            keepalive_expiry: Seconds an idle connection is reused for
+            connect_timeout: Seconds allowed to open a connection
+            http2: Use HTTP/2 when httpx and h2 are installed
+            provider: Provider name for errors and logs
+        """
+        split = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.scheme = split.scheme or "https"
+        self.host = split.hostname
+        self.port = split.port or (443 if self.scheme == "https" else 80)
+        self.base_path = split.path.rstrip("/")
+        self.headers = dict(headers or {})
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.connect_timeout = connect_timeout
+        self.provider = provider
+
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._idle: List[_Connection] = []
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0,
+                      "timeouts": 0, "in_flight": 0}
+
+        if HTTPX_AVAILABLE:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                http2=http2 and HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections,
+                                    keepalive_expiry=keepalive_expiry),
+                timeout=httpx.Timeout(None, connect=connect_timeout)
+            )
+            self.transport = "httpx-h2" if http2 and HTTP2_AVAILABLE else "httpx"
+        else:
+            self.transport = "asyncio-http1.1"
+
+    async def _connect(self, deadline: Deadline) -> _Connection:
+        """Reuse an idle connection or open a new one."""
+        now = time.monotonic()
+        while self._idle:
+            connection = self._idle.pop()
+            if now - connection.last_used < self.keepalive_expiry and not connection.reader.at_eof():
+                self.stats["connections_reused"] += 1
+                connection.reused = True
+                return connection
+            connection.close()
+
+        ssl_context = ssl.create_default_context() if self.scheme == "https" else None
+        reader, writer = await deadline.run(asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_context),
+            self.connect_timeout
+        ))
+        self.stats["connections_opened"] += 1
+        return _Connection(reader, writer)
+
+    def _release(self, connection: _Connection) -> None:
+        if connection.reusable and connection.complete and len(self._idle) < self.max_connections:
+            connection.last_used = time.monotonic()
+            connection.complete = False
+            connection.reused = False
+            self._idle.append(connection)
+        else:
+            connection.close()
+
+    @contextlib.asynccontextmanager
+    async def _open(self, path: str, payload: Dict[str, Any], deadline: Deadline):
+        """POST a JSON payload; yields the status, headers and an async iterator of body bytes."""
+        await deadline.run(self._semaphore.acquire())
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        try:
+            if self._client is not None:
+                async with contextlib.AsyncExitStack() as stack:
+                    # The deadline also covers the wait for the response headers
+                    response = await deadline.run(stack.enter_async_context(self._client.stream(
+                        "POST", path, json=payload, timeout=self._request_timeout(deadline)
+                    )))
+                    yield response.status_code, response.headers, response.aiter_bytes()
+                return
+
+            body = json.dumps(payload).encode("utf-8")
+            headers = {
+                "Host": self.host if self.port in (80, 443) else f"{self.host}:{self.port}",
+                "Content-Type": "application/json",
+                "Content-Length": str(len(body)),
+                "Connection": "keep-alive",
+                **self.headers,
+            }
+            for attempt in range(2):
+                connection = await self._connect(deadline)
+                try:
+                    await deadline.run(connection.send("POST", self.base_path + path, headers, body))
+                    status, response_headers = await deadline.run(connection.read_head())
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    connection.close()
+                    # The server may have dropped an idle connection; retry once on a new one
+                    if attempt or not connection.reused:
+                        raise
+                except BaseException:
+                    connection.close()
+                    raise
+            try:
+                yield status, response_headers, connection.iter_body(response_headers)
+            finally:
+                self._release(connection)
+        except APITimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except (ConnectionError, OSError, asyncio.IncompleteReadError) as e:
+            raise APIServiceUnavailableError(f"{self.provider} API connection failed: {e}")
+        except Exception as e:
+            if HTTPX_AVAILABLE and isinstance(e, httpx.TimeoutException):
+                self.stats["timeouts"] += 1
+                raise APITimeoutError(f"{self.provider} API request timed out: {e}")
+            if HTTPX_AVAILABLE and isinstance(e, httpx.HTTPError):
+                raise APIServiceUnavailableError(f"{self.provider} API connection failed: {e}")
+            raise
+        finally:
+            self.stats["in_flight"] -= 1
+            self._semaphore.release()
+
+    def _request_timeout(self, deadline: Deadline):
+        """httpx timeouts for one request: connecting as configured, the rest within the deadline."""
+        remaining = deadline.remaining()
+        if not HTTPX_AVAILABLE:
+            return remaining
+        connect = self.connect_timeout if remaining is None else min(self.connect_timeout, remaining)
+        return httpx.Timeout(remaining, connect=connect)
+
+    async def _read_all(self, chunks: AsyncIterator[bytes], deadline: Deadline) -> bytes:
+        data = []
+        iterator = chunks.__aiter__()
+        while True:
+            try:
+                data.append(await deadline.run(iterator.__anext__()))
+            except StopAsyncIteration:
+                return b"".join(data)
+
+    async def post_json(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """POST a JSON request and parse the JSON response.
+
+        Args:
+            path: Request path below the base URL
+            payload: JSON request body
+            timeout: Deadline for the whole request in seconds
+
+        Returns:
+            Parsed response body
+
+        Raises:
+            APITimeoutError: If the deadline passes
+            APIRequestError: Or a subclass, for HTTP errors
+        """
+        deadline = Deadline(timeout)
+        async with self._open(path, payload, deadline) as (status, headers, chunks):
+            body = await self._read_all(chunks, deadline)
+        raise_for_status(status, body, self.provider, headers)
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise APIInvalidResponseError(f"{self.provider} API returned invalid JSON: {e}")
+
+    async def stream_events(self,
+                            path: str,
+                            payload: Dict[str, Any],
+                            timeout: Optional[float] = None) -> AsyncIterator[Tuple[Optional[str], str]]:
+        """POST a streaming request and yield its server-sent events.
+
+        Args:
+            path: Request path below the base URL
+            payload: JSON request body
+            timeout: Deadline for the whole stream in seconds
+
+        Yields:
+            (event name or None, data) for each event
+
+        Raises:
+            APITimeoutError: If the deadline passes mid-stream
+            APIRequestError: Or a subclass, for HTTP errors
+        """
+        deadline = Deadline(timeout)
+        async with self._open(path, payload, deadline) as (status, headers, chunks):
+            if status >= 400:
+                raise_for_status(status, await self._read_all(chunks, deadline), self.provider, headers)
+
+            buffer = b""
+            event = None
+            data_lines: List[str] = []
+            iterator = chunks.__aiter__()
+            while True:
+                try:
+                    buffer += await deadline.run(iterator.__anext__())
+                except StopAsyncIteration:
+                    break
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    line = line.rstrip(b"\r").decode("utf-8")
+                    if not line:
+                        if data_lines:
+                            yield event, "\n".join(data_lines)
+                        event, data_lines = None, []
+                    elif line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        data_lines.append(line[5:].lstrip())
+            if data_lines:
+                yield event, "\n".join(data_lines)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request and connection counters."""
+        return {**self.stats, "idle_connections": len(self._idle), "transport": self.transport}
+
+    async def aclose(self) -> None:
+        """Close every connection."""
+        if self._client is not None:
+            await self._client.aclose()
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
+
+    def discard(self) -> None:
+        """Tear down the connections of a pool whose event loop has closed.
+
+        aclose() can't run without the loop, so idle sockets are shut down
+        directly; the httpx client's connections are released with it.
+        """
+        for connection in self._idle:
+            sock = connection.writer.get_extra_info("socket")
+            if sock is not None:
+                with contextlib.suppress(OSError):
+                    sock.shutdown(socket.SHUT_RDWR)
+        self._idle.clear()
+        self._client = None
+
+
+# Pools by (provider, base URL, credential, event loop)
+_pools: Dict[Tuple[str, str, str, int], AsyncHTTPPool] = {}
+
+
+def get_pool(provider: str,
+             base_url: str,
+             headers: Dict[str, str],
+             credential: str = "",
+             **options) -> AsyncHTTPPool:
+    """Get the shared pool for a provider on the running event loop.
+
+    Args:
+        provider: Provider name
+        base_url: API base URL
+        headers: Headers sent with every request
+        credential: Distinguishes pools for different API keys
+        **options: AsyncHTTPPool options for a newly created pool
+
+    Returns:
+        Pool bound to the current event loop
+    """
+    loop = asyncio.get_running_loop()
+    key = (provider, base_url, credential, id(loop))
+    pool = _pools.get(key)
+    if pool is None or pool._loop is not loop:
+        pool = AsyncHTTPPool(base_url, headers, provider=provider, **options)
+        pool._loop = loop
+        _pools[key] = pool
+        # Close and forget pools of closed loops
+        for stale_key in [k for k, p in _pools.items() if p._loop is not None and p._loop.is_closed()]:
+            _pools.pop(stale_key).discard()
+    return pool
+
+
+async def close_pools() -> None:
+    """Close every pool bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    for key, pool in list(_pools.items()):
+        if pool._loop is loop:
+            await pool.aclose()
+            del _pools[key]
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hedged API requests.
+
+A request that hasn't produced its first token by the p95 of recent
+first-token latencies is usually stuck behind a slow replica rather than
+doing useful work, so a second attempt (another API request, or the local
+track) is started and whichever produces a first token first is kept. The
+loser is cancelled: a losing streamed primary may be kept until its first
+token to time it, then closed, and any other loser is closed at once.
+Hedges are taken from the session's RetryBudget so a struggling provider
+doesn't receive twice the load.
+"""
+# TASK-REF: AM_001 - API Model Client
+# TASK-REF: AM_002 - Streaming Response Handling
+# CONCEPT-REF: CON-AM-001 - API Model Client
+# CONCEPT-REF: CON-AM-003 - API Fallback Mechanisms
+# DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
+
+import time
+import asyncio
+import logging
+import threading
+import contextlib
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set, TypeVar
+
+from .async_http import Deadline
+from .exceptions import APITimeoutError
+from .rate_limiter import is_rate_limit_error
+from .retry_strategy import RetryBudget, is_retryable_error
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+StreamFactory = Callable[[], AsyncIterator[T]]
+
+
+class LatencyTracker:
+    """Recent first-token latencies and the hedging threshold derived from them."""
+
+    def __init__(self,
+                 percentile: float = 0.95,
+                 window: int = 256,
+                 min_samples: int = 20,
+                 default_threshold: float = 2.0,
+                 min_threshold: float = 0.1):
+        """Initialize the tracker.
+
+        Args:
+            percentile: Latency percentile after which a request is hedged
+            window: Latencies kept
+            min_samples: Latencies needed before the percentile is trusted
+            default_threshold: Threshold in seconds until then
+            min_threshold: Lower bound, so hedging can't fire on every request
+        """
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.default_threshold = default_threshold
+        self.min_threshold = min_threshold
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def threshold(self) -> float:
+        """Seconds to wait for a first token before hedging."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.default_threshold
+            samples = sorted(self._samples)
+        return max(self.min_threshold, samples[min(len(samples) - 1, int(self.percentile * len(samples)))])
+
+
+class _Attempt:
+    """One stream racing for the first token."""
+
+    def __init__(self, label: str, stream: AsyncIterator[Any]):
+        self.label = label
+        self.started = time.monotonic()
+        self.iterator = stream.__aiter__()
+        self.first = asyncio.ensure_future(self.iterator.__anext__())
+        self.first_at: Optional[float] = None
+
+    def succeeded(self) -> bool:
+        return self.first.done() and not self.first.cancelled() and (
+            self.first.exception() is None or isinstance(self.first.exception(), StopAsyncIteration))
+
+    async def close(self) -> None:
+        if not self.first.done():
+            self.first.cancel()
+        with contextlib.suppress(BaseException):
+            await self.first
+        aclose = getattr(self.iterator, "aclose", None)
+        if aclose is not None:
+            with contextlib.suppress(Exception):
+                await aclose()
+
+
+class HedgingPolicy:
+    """Races a second attempt against requests that are slow to start."""
+
+    def __init__(self,
+                 tracker: Optional[LatencyTracker] = None,
+                 observe_losers: bool = True,
+                 call_tracker: Optional[LatencyTracker] = None):
+        """Initialize the policy.
+
+        Args:
+            tracker: First-token latency tracker for stream() (defaults to a new one)
+            observe_losers: After a hedge wins, keep a streamed primary
+                until its first token (or the deadline) to measure the time
+                saved and keep the latency percentile honest, then close it.
+                call() never does: its first token is the whole response.
+            call_tracker: Whole-response latency tracker for call(), kept
+                apart so first-token latencies don't set its threshold
+                (defaults to a new one configured like tracker)
+        """
+        self.tracker = tracker or LatencyTracker()
+        self.call_tracker = call_tracker or LatencyTracker(
+            percentile=self.tracker.percentile,
+            window=self.tracker.window,
+            min_samples=self.tracker.min_samples,
+            default_threshold=self.tracker.default_threshold,
+            min_threshold=self.tracker.min_threshold
+        )
+        self.observe_losers = observe_losers
+        self._observers: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "budget_denied": 0,
+                      "latency_saved_seconds": 0.0}
+
+    async def stream(self,
+                     primary: StreamFactory,
+                     hedge: Optional[StreamFactory] = None,
+                     deadline: Optional[Deadline] = None,
+                     budget: Optional[RetryBudget] = None,
+                     hedge_label: str = "hedge",
+                     observe_losers: Optional[bool] = None,
+                     tracker: Optional[LatencyTracker] = None) -> AsyncIterator[Any]:
+        """Stream from the primary, hedging if its first item is late.
+
+        A primary that fails before its first item with a retryable error is
+        also retried through the hedge, budget permitting. Rate limit errors
+        are not: the provider's retry-after applies to the hedge too.
+
+        Args:
+            primary: Starts the primary stream
+            hedge: Starts the backup stream (None disables hedging)
+            deadline: Deadline for the whole stream
+            budget: Retry budget the hedge is taken from
+            hedge_label: Name of the backup in stats ("hedge", "local")
+            observe_losers: Overrides the policy's observe_losers
+            tracker: Latency tracker to hedge on (defaults to the first-token tracker)
+
+        Yields:
+            Items of whichever stream produced a first item first
+
+        Raises:
+            APITimeoutError: If the deadline passes
+            Exception: The last error if every attempt failed
+        """
+        deadline = deadline or Deadline(None)
+        tracker = tracker or self.tracker
+        if observe_losers is None:
+            observe_losers = self.observe_losers
+        if budget is not None:
+            budget.deposit()
+        self.stats["requests"] += 1
+
+        attempts = [_Attempt("primary", primary())]
+        hedge_at = attempts[0].started + tracker.threshold()
+        winner: Optional[_Attempt] = None
+        observed: Optional[_Attempt] = None
+        try:
+            while winner is None:
+                winner = next((attempt for attempt in attempts if attempt.succeeded()), None)
+                if winner is not None:
+                    break
+                pending = {attempt.first for attempt in attempts if not attempt.first.done()}
+                can_hedge = hedge is not None and len(attempts) == 1
+                if not pending and not can_hedge:
+                    # Every attempt failed
+                    raise attempts[-1].first.exception()
+                if not pending and not self._retryable(attempts[0].first.exception()):
+                    raise attempts[0].first.exception()
+
+                now = time.monotonic()
+                if can_hedge and (not pending or now >= hedge_at):
+                    if budget is None or budget.try_spend():
+                        logger.debug(f"Starting {hedge_label} attempt after {now - attempts[0].started:.2f}s")
+                        self.stats["hedged"] += 1
+                        attempts.append(_Attempt(hedge_label, hedge()))
+                    else:
+                        self.stats["budget_denied"] += 1
+                        hedge = None
+                    continue
+
+                remaining = deadline.remaining()
+                timeout = remaining
+                if can_hedge:
+                    timeout = hedge_at - now if timeout is None else min(timeout, hedge_at - now)
+                await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            winner.first_at = time.monotonic()
+            if winner is attempts[0]:
+                tracker.record(winner.first_at - winner.started)
+            else:
+                self.stats["hedge_wins"] += 1
+
+            for attempt in attempts:
+                if attempt is winner:
+                    continue
+                if attempt is attempts[0] and not attempt.first.done():
+                    if observe_losers:
+                        observed = attempt
+                        self._observe(attempt, winner.first_at, deadline, tracker)
+                        continue
+                    # Closed unfinished: record how long it had been waiting at least,
+                    # so slow primaries don't drop out of the percentile
+                    tracker.record(winner.first_at - attempt.started)
+                await attempt.close()
+
+            if winner.first.exception() is not None:
+                return  # Empty stream
+            yield winner.first.result()
+            while True:
+                try:
+                    item = await deadline.run(winner.iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            for attempt in attempts:
+                if attempt is not observed:
+                    await attempt.close()
+
+    async def call(self,
+                   primary: Callable[[], Awaitable[T]],
+                   hedge: Optional[Callable[[], Awaitable[T]]] = None,
+                   deadline: Optional[Deadline] = None,
+                   budget: Optional[RetryBudget] = None,
+                   hedge_label: str = "hedge") -> T:
+        """Await a request, hedging if it hasn't completed by the threshold.
+
+        For non-streaming requests the whole response is the first token,
+        so a losing request is closed as soon as the other one completes.
+        Completion times are tracked apart from stream() first-token times.
+
+        Args:
+            primary: Starts the primary request
+            hedge: Starts the backup request (None disables hedging)
+            deadline: Deadline for the request
+            budget: Retry budget the hedge is taken from
+            hedge_label: Name of the backup in stats
+
+        Returns:
+            The first successful result
+        """
+        def as_stream(factory):
+            async def stream():
+                yield await factory()
+            return stream
+
+        results = self.stream(as_stream(primary), as_stream(hedge) if hedge else None,
+                              deadline, budget, hedge_label, observe_losers=False,
+                              tracker=self.call_tracker)
+        try:
+            async for result in results:
+                return result
+        finally:
+            await results.aclose()
+        raise RuntimeError("Hedged request produced no result")
+
+    @staticmethod
+    def _retryable(error: BaseException) -> bool:
+        return isinstance(error, Exception) and is_retryable_error(error) and not is_rate_limit_error(error)
+
+    def _observe(self, attempt: _Attempt, winner_first_at: float, deadline: Deadline,
+                 tracker: LatencyTracker) -> None:
+        """Time a losing primary's first token in the background, then close it."""
+        async def observe():
+            try:
+                await deadline.run(asyncio.shield(attempt.first))
+                first_at = time.monotonic()
+                tracker.record(first_at - attempt.started)
+                self.stats["latency_saved_seconds"] += first_at - winner_first_at
+            except StopAsyncIteration:
+                pass
+            except APITimeoutError:
+                # Still no first token at the deadline: at least this much was saved
+                now = time.monotonic()
+                tracker.record(now - attempt.started)
+                self.stats["latency_saved_seconds"] += now - winner_first_at
+            except Exception:
+                pass  # The primary failed; nothing to measure
+            finally:
+                await attempt.close()
+
+        task = asyncio.ensure_future(observe())
+        self._observers.add(task)
+        task.add_done_callback(self._observers.discard)
+
+    async def drain(self) -> None:
+        """Wait for background loser observations to finish."""
+        if self._observers:
+            await asyncio.gather(*list(self._observers), return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedge rate, wins and time saved."""
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "hedge_rate": self.stats["hedged"] / requests if requests else 0.0,
+            "threshold_seconds": self.tracker.threshold(),
+            "call_threshold_seconds": self.call_tracker.threshold(),
+        }
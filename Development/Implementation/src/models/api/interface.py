@@ -10,8 +10,9 @@ This module defines the interface for API-based language models.
 # CONCEPT-REF: CON-VANTA-012 - Dual-Track Processing
 # DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Iterator, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
 PromptType = Union[str, List[Dict[str, str]]]
 ParamsType = Optional[Dict[str, Any]]
@@ -59,6 +60,41 @@ class APIModelInterface(ABC):
         """
         pass
     
+    async def agenerate(self, prompt: PromptType, params: ParamsType = None) -> str:
+        """Generate a response without blocking the event loop.
+        
+        Clients with a native async transport override this; the default
+        runs generate() on the loop's executor.
+        
+        Args:
+            prompt: Input prompt (string or message list)
+            params: Optional generation parameters
+            
+        Returns:
+            Generated text response
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.generate, prompt, params)
+    
+    async def agenerate_stream(self, prompt: PromptType, params: ParamsType = None) -> AsyncIterator[str]:
+        """Stream a response without blocking the event loop.
+        
+        Args:
+            prompt: Input prompt (string or message list)
+            params: Optional generation parameters
+            
+        Returns:
+            Async iterator yielding response chunks as they arrive
+        """
+        loop = asyncio.get_running_loop()
+        iterator = iter(self.generate_stream(prompt, params))
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(None, next, iterator, done)
+            if chunk is done:
+                return
+            yield chunk
+    
     @abstractmethod
     def count_tokens(self, text: str) -> int:
         """Count tokens in the input text.
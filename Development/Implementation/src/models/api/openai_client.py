@@ -10,16 +10,21 @@ This module provides integration with the OpenAI GPT-4 and other models.
 # DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
 
 import os
+import json
 import logging
 import importlib.util
-from typing import Any, Dict, Iterator, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
 from .interface import APIModelInterface, PromptType, ParamsType
 from .credentials import get_credential
 from .token_counter import count_tokens_openai
 from .request_builder import format_openai_request
-from .response_parser import parse_openai_response, check_for_content_filter
-from .retry_strategy import with_retry
+from .response_parser import (
+    parse_openai_response, check_for_content_filter, extract_response_metadata, extract_token_usage, add_token_usage
+)
+from .retry_strategy import with_retry, get_retry_budget
+from .async_http import AsyncHTTPPool, Deadline, get_pool
+from .hedging import HedgingPolicy, LatencyTracker
 from .exceptions import (
     APIInitializationError,
     APICredentialError,
@@ -32,6 +37,8 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+OPENAI_BASE_URL = "https://api.openai.com"
+
 
 class MockOpenAIClient:
     """Mock implementation for the OpenAI client when SDK is not available."""
@@ -121,6 +128,9 @@ class OpenAIClient(APIModelInterface):
         self.api_key = None
         self.model_id = None
         self.client = None
+        self.hedging = HedgingPolicy()
+        # Prompt, completion and prompt-cache read/write token totals
+        self.token_usage: Dict[str, int] = {}
         self.initialized = False
         self._openai_available = self._check_openai_available()
         self._tiktoken_available = self._check_tiktoken_available()
@@ -159,6 +169,12 @@ class OpenAIClient(APIModelInterface):
             # Set model ID
             self.model_id = self.config.get("model_id", "gpt-4o")
             
+            # Hedge async requests that are slower to start than usual
+            self.hedging = HedgingPolicy(LatencyTracker(
+                percentile=self.config.get("hedge_percentile", 0.95),
+                default_threshold=self.config.get("hedge_default_threshold", 2.0)
+            ))
+            
             # Set up client
             self.client = self._setup_client()
             
@@ -229,7 +245,9 @@ class OpenAIClient(APIModelInterface):
             response = with_retry(
                 lambda: self.client.chat.completions.create(**openai_params),
                 max_attempts=self.config.get("retry_attempts", 3),
-                backoff_factor=self.config.get("backoff_factor", 1.5)
+                backoff_factor=self.config.get("backoff_factor", 1.5),
+                deadline=params.get("deadline"),
+                budget=get_retry_budget(params["session_id"]) if params.get("session_id") else None
             )
             
             # Check for content filtering
@@ -237,6 +255,7 @@ class OpenAIClient(APIModelInterface):
                 raise APIContentFilterError("Response was filtered by OpenAI's content policy")
             
             # Parse response
+            add_token_usage(self.token_usage, extract_response_metadata(response).get("token_usage"))
             return parse_openai_response(response)
         except APIContentFilterError:
             raise  # Re-raise content filter errors
@@ -303,6 +322,118 @@ class OpenAIClient(APIModelInterface):
             else:
                 raise APIRequestError(f"OpenAI API streaming request failed: {str(e)}")
     
+    def _pool(self) -> AsyncHTTPPool:
+        """Shared keep-alive connection pool for this key on the running event loop."""
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if self.config.get("organization"):
+            headers["OpenAI-Organization"] = self.config["organization"]
+        return get_pool(
+            "openai",
+            self.config.get("base_url", OPENAI_BASE_URL),
+            headers,
+            credential=self.api_key,
+            max_connections=self.config.get("max_connections", 8),
+            keepalive_expiry=self.config.get("keepalive_expiry", 30.0),
+            http2=self.config.get("http2", True)
+        )
+    
+    async def agenerate(self, prompt: PromptType, params: ParamsType = None) -> str:
+        """Generate a response from GPT over the pooled async transport.
+        
+        Args:
+            prompt: Prompt data (string or message list)
+            params: Optional generation parameters; "timeout" and "deadline"
+                (a time.monotonic() instant) bound the request, "session_id"
+                selects the retry budget hedges are taken from
+            
+        Returns:
+            Generated response
+            
+        Raises:
+            APITimeoutError: If the deadline passes
+            APIRequestError: If the request fails
+            APIContentFilterError: If content is filtered
+        """
+        self._ensure_initialized()
+        params = params or {}
+        openai_params = format_openai_request(prompt, self.model_id, {**params, "stream": False})
+        deadline = Deadline.until(params.get("deadline"), params.get("timeout", self.config.get("timeout", 30)))
+        
+        async def attempt() -> Dict[str, Any]:
+            return await self._pool().post_json("/v1/chat/completions", openai_params, timeout=deadline.remaining())
+        
+        response = await self.hedging.call(
+            attempt,
+            hedge=attempt if self.config.get("hedge_requests", True) else None,
+            deadline=deadline,
+            budget=get_retry_budget(params.get("session_id"))
+        )
+        if check_for_content_filter(response):
+            raise APIContentFilterError("Response was filtered by OpenAI's content policy")
+        add_token_usage(self.token_usage, extract_response_metadata(response).get("token_usage"))
+        return parse_openai_response(response)
+    
+    async def agenerate_stream(self, prompt: PromptType, params: ParamsType = None) -> AsyncIterator[str]:
+        """Stream a response from GPT over the pooled async transport.
+        
+        Args:
+            prompt: Prompt data (string or message list)
+            params: Optional generation parameters; "timeout" and "deadline"
+                bound the whole stream, "session_id" selects the retry budget
+            
+        Returns:
+            Async iterator of content deltas; a hedge is started if the first
+            delta is slower than the recent p95
+            
+        Raises:
+            APITimeoutError: If the deadline passes mid-stream
+            APIRequestError: If the request fails or the stream reports an error
+            APIContentFilterError: If content is filtered
+        """
+        self._ensure_initialized()
+        params = params or {}
+        openai_params = format_openai_request(prompt, self.model_id, {**params, "stream": True})
+        deadline = Deadline.until(params.get("deadline"), params.get("timeout", self.config.get("timeout", 30)))
+        
+        def attempt() -> AsyncIterator[str]:
+            return self._astream(openai_params, deadline)
+        
+        chunks = self.hedging.stream(
+            attempt,
+            hedge=attempt if self.config.get("hedge_requests", True) else None,
+            deadline=deadline,
+            budget=get_retry_budget(params.get("session_id"))
+        )
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+    
+    async def _astream(self, openai_params: Dict[str, Any], deadline: Deadline) -> AsyncIterator[str]:
+        """Run one streaming request and yield its content deltas."""
+        events = self._pool().stream_events("/v1/chat/completions", openai_params, timeout=deadline.remaining())
+        async for _, data in events:
+            # Read through the terminator so the connection goes back to the pool
+            if data.strip() == "[DONE]":
+                continue
+            try:
+                payload = json.loads(data)
+            except ValueError:
+                raise APIInvalidResponseError(f"Invalid OpenAI stream chunk: {data[:200]}")
+            
+            if "error" in payload:
+                raise APIRequestError(f"OpenAI stream error: {payload['error'].get('message', data[:200])}")
+            if check_for_content_filter(payload):
+                raise APIContentFilterError("Response was filtered by OpenAI's content policy")
+            if payload.get("usage"):
+                # Final chunk when stream_options.include_usage is set
+                add_token_usage(self.token_usage, extract_token_usage(payload["usage"]))
+            for choice in payload.get("choices", []):
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    yield content
+    
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using tiktoken if available.
         
@@ -385,7 +516,8 @@ class OpenAIClient(APIModelInterface):
                 "function_calling": "function_calling" in capabilities["capabilities"]
             },
             "context_window": capabilities["context_window"],
-            "max_output_tokens": capabilities["max_output_tokens"]
+            "max_output_tokens": capabilities["max_output_tokens"],
+            "token_usage": dict(self.token_usage)
         }
     
     def list_available_models(self) -> List[Dict[str, Any]]:
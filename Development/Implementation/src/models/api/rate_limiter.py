@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Token-bucket rate limiting for API requests.
+
+Requests per minute and tokens per minute are each a bucket that refills
+continuously, so there is no window boundary at which a second burst is
+allowed. Requests that don't fit wait in a priority queue (interactive
+turns first) up to a deadline instead of failing, and a server's
+retry-after pauses admission for everyone sharing the limiter.
+"""
+# TASK-REF: AM_001 - API Model Client
+# CONCEPT-REF: CON-AM-001 - API Model Client
+# CONCEPT-REF: CON-AM-003 - API Fallback Mechanisms
+# DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .exceptions import APIRateLimitError
+
+logger = logging.getLogger(__name__)
+
+# Admission priorities, lowest first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITIES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "default": PRIORITY_DEFAULT,
+    "background": PRIORITY_BACKGROUND,
+}
+
+# Queue wait samples kept for percentiles
+WAIT_SAMPLES = 1024
+
+
+class TokenBucket:
+    """Bucket of `capacity` units refilled at `rate` units per second."""
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        if now > self.updated:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` units are available (after refill)."""
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        # Oversized requests drain the bucket rather than waiting forever
+        self.level -= min(amount, self.capacity)
+
+    def drain(self) -> None:
+        self.level = min(self.level, 0.0)
+
+
+class RateTicket:
+    """A request's place in the admission queue."""
+
+    def __init__(self, tokens: int, priority: int, sequence: int, enqueued: float, deadline: Optional[float]):
+        self.tokens = tokens
+        self.priority = priority
+        self.sequence = sequence
+        self.enqueued = enqueued
+        self.deadline = deadline
+        self.admitted = False
+        self.cancelled = False
+        self.wait_seconds = 0.0
+        self.event = threading.Event()
+
+    def __lt__(self, other: "RateTicket") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class RateLimiter:
+    """Shared requests-per-minute and tokens-per-minute limiter with queued admission."""
+
+    def __init__(self,
+                 requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None,
+                 burst_seconds: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Optional[Callable[[float], None]] = None,
+                 name: str = "api"):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request limit, or None for unlimited
+            tokens_per_minute: Token limit (prompt plus max output), or None
+            burst_seconds: Seconds of refill each bucket holds, which bounds
+                bursts after idle periods
+            clock: Monotonic time source
+            sleep: Called to wait instead of blocking on the ticket (for
+                simulated clocks)
+            name: Name for logs
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self.name = name
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._queue: List[RateTicket] = []
+        self._sequence = itertools.count()
+        self._blocked_until = 0.0
+
+        now = clock()
+        self._buckets: List[Tuple[TokenBucket, bool]] = []
+        if requests_per_minute:
+            rate = requests_per_minute / 60.0
+            self._buckets.append((TokenBucket(max(1.0, rate * burst_seconds), rate, now), False))
+        if tokens_per_minute:
+            rate = tokens_per_minute / 60.0
+            self._buckets.append((TokenBucket(max(1.0, rate * burst_seconds), rate, now), True))
+
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self.stats = {"admitted": 0, "throttled": 0, "rejected": 0, "server_throttles": 0,
+                      "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+    def _unlimited(self) -> bool:
+        """No limits configured and no server pause in effect."""
+        return not self._buckets and self.clock() >= self._blocked_until
+
+    def enqueue(self, tokens: int = 0, priority: int = PRIORITY_DEFAULT, timeout: Optional[float] = None) -> RateTicket:
+        """Join the admission queue.
+
+        Args:
+            tokens: Estimated tokens the request will use
+            priority: PRIORITY_INTERACTIVE, PRIORITY_DEFAULT or PRIORITY_BACKGROUND
+            timeout: Most seconds to wait for admission, or None
+
+        Returns:
+            Ticket, admitted immediately if the buckets allow
+        """
+        now = self.clock()
+        ticket = RateTicket(tokens, priority, next(self._sequence), now,
+                            now + timeout if timeout is not None else None)
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            self._admit_ready(now)
+        return ticket
+
+    def poll(self) -> Optional[float]:
+        """Admit every ticket that fits now.
+
+        Returns:
+            Seconds until the next ticket could be admitted, or None if the
+            queue is empty
+        """
+        now = self.clock()
+        with self._lock:
+            return self._admit_ready(now)
+
+    def cancel(self, ticket: RateTicket) -> None:
+        """Leave the queue without being admitted."""
+        with self._lock:
+            if not ticket.admitted and not ticket.cancelled:
+                ticket.cancelled = True
+                self.stats["rejected"] += 1
+                # Someone behind the cancelled head may fit now
+                self._admit_ready(self.clock())
+
+    def _admit_ready(self, now: float) -> Optional[float]:
+        for bucket, _ in self._buckets:
+            bucket.refill(now)
+        while self._queue:
+            head = self._queue[0]
+            if head.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            wait = max((bucket.time_until(head.tokens if by_tokens else 1) for bucket, by_tokens in self._buckets),
+                       default=0.0)
+            if wait > 0:
+                return wait
+            for bucket, by_tokens in self._buckets:
+                bucket.take(head.tokens if by_tokens else 1)
+            heapq.heappop(self._queue)
+            self._admitted(head, now)
+        return None
+
+    def _admitted(self, ticket: RateTicket, now: float) -> None:
+        ticket.admitted = True
+        ticket.wait_seconds = now - ticket.enqueued
+        self.stats["admitted"] += 1
+        if ticket.wait_seconds > 0:
+            self.stats["throttled"] += 1
+            self.stats["total_wait_seconds"] += ticket.wait_seconds
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], ticket.wait_seconds)
+        self._waits.append(ticket.wait_seconds)
+        ticket.event.set()
+
+    def _next_wait(self, ticket: RateTicket) -> Optional[float]:
+        """Poll, then return seconds to wait, or None once admitted.
+
+        Raises:
+            APIRateLimitError: If the ticket's deadline has passed, or if it
+                is first in line and can't be admitted before the deadline
+        """
+        now = self.clock()
+        with self._lock:
+            wait = self._admit_ready(now)
+            if ticket.admitted:
+                return None
+            first = bool(self._queue) and self._queue[0] is ticket
+        if ticket.deadline is not None and (now >= ticket.deadline or (first and now + wait > ticket.deadline)):
+            self.cancel(ticket)
+            raise APIRateLimitError(
+                f"{self.name} rate limit: not admitted within {ticket.deadline - ticket.enqueued:.1f}s"
+            )
+        if ticket.deadline is not None:
+            wait = min(wait, ticket.deadline - now)
+        return max(wait, 0.001)
+
+    def acquire(self, tokens: int = 0, priority: int = PRIORITY_DEFAULT, timeout: Optional[float] = None) -> float:
+        """Wait until a request may be sent.
+
+        Args:
+            tokens: Estimated tokens the request will use
+            priority: PRIORITY_INTERACTIVE, PRIORITY_DEFAULT or PRIORITY_BACKGROUND
+            timeout: Most seconds to wait, or None to wait as long as needed
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            APIRateLimitError: If the request can't be admitted in time
+        """
+        if self._unlimited():
+            return 0.0
+        ticket = self.enqueue(tokens, priority, timeout)
+        while True:
+            wait = self._next_wait(ticket)
+            if wait is None:
+                return ticket.wait_seconds
+            if self._sleep is not None:
+                self._sleep(wait)
+            else:
+                ticket.event.wait(wait)
+
+    async def aacquire(self, tokens: int = 0, priority: int = PRIORITY_DEFAULT, timeout: Optional[float] = None) -> float:
+        """Wait on the event loop until a request may be sent.
+
+        Args:
+            tokens: Estimated tokens the request will use
+            priority: PRIORITY_INTERACTIVE, PRIORITY_DEFAULT or PRIORITY_BACKGROUND
+            timeout: Most seconds to wait, or None to wait as long as needed
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            APIRateLimitError: If the request can't be admitted in time
+        """
+        if self._unlimited():
+            return 0.0
+        ticket = self.enqueue(tokens, priority, timeout)
+        try:
+            while True:
+                wait = self._next_wait(ticket)
+                if wait is None:
+                    return ticket.wait_seconds
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self.cancel(ticket)
+            raise
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once a request's real usage is known.
+
+        Args:
+            estimated_tokens: Tokens charged at admission
+            actual_tokens: Tokens the provider reported
+        """
+        with self._lock:
+            for bucket, by_tokens in self._buckets:
+                if by_tokens:
+                    bucket.level = min(bucket.capacity, bucket.level + estimated_tokens - actual_tokens)
+
+    def note_retry_after(self, retry_after: Optional[float]) -> None:
+        """Pause admission after the server throttled a request.
+
+        Args:
+            retry_after: Seconds from the retry-after header (one refill
+                second of the request bucket if absent)
+        """
+        if retry_after is None:
+            retry_after = 60.0 / self.requests_per_minute if self.requests_per_minute else 1.0
+        now = self.clock()
+        with self._lock:
+            self.stats["server_throttles"] += 1
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+            # Our estimate of the server's buckets was too generous
+            for bucket, _ in self._buckets:
+                bucket.refill(now)
+                bucket.drain()
+        logger.warning(f"{self.name} API throttled; pausing requests for {retry_after:.1f}s")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Admission counters and queue wait percentiles."""
+        with self._lock:
+            waits = sorted(self._waits)
+            queued = sum(1 for ticket in self._queue if not ticket.cancelled)
+
+        def percentile(fraction: float) -> float:
+            return waits[min(len(waits) - 1, int(fraction * len(waits)))] if waits else 0.0
+
+        return {
+            **self.stats,
+            "queued": queued,
+            "wait_p50_seconds": percentile(0.50),
+            "wait_p95_seconds": percentile(0.95),
+            "blocked_for_seconds": max(0.0, self._blocked_until - self.clock()),
+        }
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds a rate-limit error asked us to wait, if it said.
+
+    Works for APIRateLimitError from the async transport and for SDK
+    exceptions that carry the HTTP response.
+
+    Args:
+        error: Exception raised by a request
+
+    Returns:
+        Seconds to wait, or None
+    """
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            retry_after = headers.get("retry-after")
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception is a provider 429, from our transport or an SDK."""
+    if isinstance(error, APIRateLimitError):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+# Limiters by (provider, key), shared by every client using the same account
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str,
+                     credential: str = "",
+                     requests_per_minute: Optional[int] = None,
+                     tokens_per_minute: Optional[int] = None,
+                     **options) -> RateLimiter:
+    """Get the limiter shared by clients of one provider account.
+
+    Args:
+        provider: Provider name
+        credential: Distinguishes limiters for different API keys
+        requests_per_minute: Request limit for a newly created limiter
+        tokens_per_minute: Token limit for a newly created limiter
+        **options: Other RateLimiter options for a newly created limiter
+
+    Returns:
+        Shared RateLimiter
+    """
+    key = (provider, credential)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_minute, tokens_per_minute, name=provider, **options)
+            _limiters[key] = limiter
+        return limiter
@@ -4,13 +4,22 @@
 API Model Request Builder for VANTA.
 
 This module handles formatting and building requests for API models.
+
+Requests are laid out for provider prompt caching: stable prefix blocks
+(system prompt, user profile, long-term summary) come first and are kept
+byte-identical across turns, then the conversation history, then the
+volatile tail (per-turn context and the new user message). System messages
+with ``"cache": True`` are stable prefix blocks and ``"cache": False`` marks
+volatile context; if none is marked, the first system message is taken as
+the stable system prompt. Anthropic gets explicit cache breakpoints; OpenAI
+caches matching prefixes automatically.
 """
 # TASK-REF: AM_001 - API Model Client
 # CONCEPT-REF: CON-AM-001 - API Model Client
 # DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
 
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from .exceptions import APIInvalidRequestError
 
@@ -20,6 +29,9 @@ logger = logging.getLogger(__name__)
 PromptType = Union[str, List[Dict[str, str]]]
 MessageType = Dict[str, str]
 
+# Anthropic cache breakpoint; cached prefixes live for five minutes after last use
+CACHE_CONTROL = {"type": "ephemeral"}
+
 
 def sanitize_parameters(params: Dict[str, Any], allowed_params: List[str]) -> Dict[str, Any]:
     """Filter parameters to only include allowed ones.
@@ -34,6 +46,151 @@ def sanitize_parameters(params: Dict[str, Any], allowed_params: List[str]) -> Di
     return {k: v for k, v in params.items() if k in allowed_params}
 
 
+def split_prompt_blocks(messages: List[MessageType]) -> Tuple[List[str], List[str], List[MessageType]]:
+    """Separate stable prefix blocks and volatile context from the conversation.
+    
+    Args:
+        messages: Message list, system messages anywhere
+        
+    Returns:
+        (stable system texts, volatile system texts, non-system messages),
+        each in their original order
+        
+    Raises:
+        APIInvalidRequestError: If a message is malformed
+    """
+    stable, volatile, conversation = [], [], []
+    marked = any(msg.get("cache") is True for msg in messages if isinstance(msg, dict))
+    
+    for msg in messages:
+        if not isinstance(msg, dict) or "role" not in msg or "content" not in msg:
+            raise APIInvalidRequestError(
+                "Messages must be dictionaries with 'role' and 'content' keys"
+            )
+        
+        if msg.get("role", "").lower() != "system":
+            conversation.append(msg)
+            continue
+        
+        content = msg.get("content", "")
+        if not content:
+            continue
+        cache = msg.get("cache")
+        if cache is True or (cache is None and not marked and not stable and not volatile):
+            stable.append(content)
+        else:
+            volatile.append(content)
+    
+    return stable, volatile, conversation
+
+
+def build_anthropic_prompt(
+    messages: List[MessageType],
+    prompt_cache: bool = True
+) -> Tuple[Optional[Union[str, List[Dict[str, Any]]]], List[Dict[str, Any]]]:
+    """Build the Anthropic system parameter and message list.
+    
+    With prompt caching, the system parameter is a list of text blocks with a
+    cache breakpoint after the stable blocks, and another breakpoint ends
+    the conversation history. Volatile context is moved into the final user
+    turn so it doesn't invalidate the cached history.
+    
+    Args:
+        messages: Message list
+        prompt_cache: Whether to lay out the request for prompt caching
+        
+    Returns:
+        (system, messages); system is None if there is no system content
+    """
+    stable, volatile, conversation = split_prompt_blocks(messages)
+    
+    chat = []
+    for msg in conversation:
+        role = msg.get("role", "").lower()
+        if role in ["user", "assistant"]:
+            chat.append({"role": role, "content": msg.get("content", "")})
+        else:
+            logger.warning(f"Ignoring message with unknown role: {role}")
+    
+    if not prompt_cache:
+        system_text = "\n\n".join(stable + volatile)
+        return system_text or None, chat
+    
+    # Content as blocks throughout, so a turn serializes the same before and after its breakpoint
+    chat = [{"role": msg["role"], "content": _text_blocks(msg["content"])} for msg in chat]
+    
+    system = [{"type": "text", "text": text} for text in stable]
+    if system:
+        system[-1]["cache_control"] = CACHE_CONTROL
+    
+    if volatile and chat and chat[-1]["role"] == "user":
+        chat[-1] = {"role": "user", "content": [
+            *({"type": "text", "text": text} for text in volatile),
+            *chat[-1]["content"]
+        ]}
+    else:
+        system += [{"type": "text", "text": text} for text in volatile]
+    
+    # Everything before the newest turn is next turn's history
+    if len(chat) >= 2:
+        blocks = list(chat[-2]["content"])
+        if blocks:
+            blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+            chat[-2] = {"role": chat[-2]["role"], "content": blocks}
+    
+    return system or None, chat
+
+
+def build_openai_messages(messages: List[MessageType], prompt_cache: bool = True) -> List[MessageType]:
+    """Build the OpenAI message list.
+    
+    OpenAI caches the longest previously seen prefix automatically, so with
+    prompt caching the stable system messages lead, the history follows
+    unchanged and volatile system messages go just before the newest turn.
+    
+    Args:
+        messages: Message list
+        prompt_cache: Whether to lay out the request for prompt caching
+        
+    Returns:
+        Message list in OpenAI format
+    """
+    if prompt_cache:
+        stable, volatile, conversation = split_prompt_blocks(messages)
+        ordered = [{"role": "system", "content": text} for text in stable] + conversation[:-1]
+        ordered += [{"role": "system", "content": text} for text in volatile] + conversation[-1:]
+    else:
+        ordered = messages
+    
+    formatted = []
+    for msg in ordered:
+        if not isinstance(msg, dict) or "role" not in msg or "content" not in msg:
+            raise APIInvalidRequestError(
+                "Messages must be dictionaries with 'role' and 'content' keys"
+            )
+        
+        role = msg.get("role", "").lower()
+        content = msg.get("content", "")
+        
+        if role in ["system", "user", "assistant", "function", "tool"]:
+            formatted.append({"role": role, "content": content})
+            
+            # Handle function/tool responses
+            if "name" in msg and role in ["function", "tool"]:
+                formatted[-1]["name"] = msg["name"]
+        else:
+            logger.warning(f"Ignoring message with unknown role: {role}")
+    
+    return formatted
+
+
+def _text_blocks(content: Any) -> List[Dict[str, Any]]:
+    """Message content as a list of Anthropic content blocks."""
+    if isinstance(content, list):
+        return list(content)
+    return [{"type": "text", "text": content}] if content else []
+
+
 def format_anthropic_request(
     prompt: PromptType, 
     model_id: str, 
@@ -44,7 +201,8 @@ def format_anthropic_request(
     Args:
         prompt: Input prompt (string or message list)
         model_id: Model identifier
-        params: Optional generation parameters
+        params: Optional generation parameters; "prompt_cache" (default
+            True) lays the request out for prompt caching
         
     Returns:
         Dictionary with formatted request parameters
@@ -65,7 +223,7 @@ def format_anthropic_request(
     
     # Add optional parameters if present
     optional_params = [
-        "top_k", "stop_sequences", "system", "metadata"
+        "top_k", "stop_sequences", "metadata"
     ]
     
     for param in optional_params:
@@ -75,34 +233,16 @@ def format_anthropic_request(
     # Format prompt based on type
     if isinstance(prompt, str):
         # Simple string prompt (legacy format - converted to messages)
-        request["messages"] = [{"role": "user", "content": prompt}]
-    elif isinstance(prompt, list):
-        # Message list format
-        messages = []
-        system_content = None
-        
-        for msg in prompt:
-            if not isinstance(msg, dict) or "role" not in msg or "content" not in msg:
-                raise APIInvalidRequestError(
-                    "Messages must be dictionaries with 'role' and 'content' keys"
-                )
-            
-            role = msg.get("role", "").lower()
-            content = msg.get("content", "")
-            
-            if role == "system":
-                # Extract system message for special handling
-                system_content = content
-            elif role == "user":
-                messages.append({"role": "user", "content": content})
-            elif role == "assistant":
-                messages.append({"role": "assistant", "content": content})
-            else:
-                logger.warning(f"Ignoring message with unknown role: {role}")
+        prompt = [{"role": "user", "content": prompt}]
+    if isinstance(prompt, list):
+        # A "system" parameter is the stable system prompt
+        if params.get("system"):
+            prompt = [{"role": "system", "content": params["system"], "cache": True}] + prompt
+        system, messages = build_anthropic_prompt(prompt, params.get("prompt_cache", True))
         
         # Set system content if present
-        if system_content:
-            request["system"] = system_content
+        if system:
+            request["system"] = system
         
         # Set messages
         request["messages"] = messages
@@ -124,7 +264,8 @@ def format_openai_request(
     Args:
         prompt: Input prompt (string or message list)
         model_id: Model identifier
-        params: Optional generation parameters
+        params: Optional generation parameters; "prompt_cache" (default
+            True) lays the request out for prompt caching
         
     Returns:
         Dictionary with formatted request parameters
@@ -146,7 +287,7 @@ def format_openai_request(
     # Add optional parameters if present
     optional_params = [
         "n", "stop", "presence_penalty", "frequency_penalty", "logit_bias",
-        "user", "response_format", "seed"
+        "user", "response_format", "seed", "prompt_cache_key", "stream_options"
     ]
     
     for param in optional_params:
@@ -159,28 +300,7 @@ def format_openai_request(
         request["messages"] = [{"role": "user", "content": prompt}]
     elif isinstance(prompt, list):
         # Message list format - convert to OpenAI format
-        messages = []
-        
-        for msg in prompt:
-            if not isinstance(msg, dict) or "role" not in msg or "content" not in msg:
-                raise APIInvalidRequestError(
-                    "Messages must be dictionaries with 'role' and 'content' keys"
-                )
-            
-            role = msg.get("role", "").lower()
-            content = msg.get("content", "")
-            
-            if role in ["system", "user", "assistant", "function", "tool"]:
-                messages.append({"role": role, "content": content})
-                
-                # Handle function/tool responses
-                if "name" in msg and role in ["function", "tool"]:
-                    messages[-1]["name"] = msg["name"]
-            else:
-                logger.warning(f"Ignoring message with unknown role: {role}")
-        
-        # Set messages
-        request["messages"] = messages
+        request["messages"] = build_openai_messages(prompt, params.get("prompt_cache", True))
     else:
         raise APIInvalidRequestError(
             f"Invalid prompt format. Expected string or message list, got {type(prompt)}"
@@ -183,19 +183,9 @@ def extract_response_metadata(response: Any) -> Dict[str, Any]:
     
     # Extract token usage
     if hasattr(response, "usage"):
-        usage = response.usage
-        metadata["token_usage"] = {
-            "prompt_tokens": getattr(usage, "prompt_tokens", None),
-            "completion_tokens": getattr(usage, "completion_tokens", None),
-            "total_tokens": getattr(usage, "total_tokens", None)
-        }
+        metadata["token_usage"] = extract_token_usage(response.usage)
     elif isinstance(response, dict) and "usage" in response:
-        usage = response["usage"]
-        metadata["token_usage"] = {
-            "prompt_tokens": usage.get("prompt_tokens"),
-            "completion_tokens": usage.get("completion_tokens"),
-            "total_tokens": usage.get("total_tokens")
-        }
+        metadata["token_usage"] = extract_token_usage(response["usage"])
     
     # Extract finish reason
     if hasattr(response, "choices") and response.choices and len(response.choices) > 0:
@@ -211,4 +201,73 @@ def extract_response_metadata(response: Any) -> Dict[str, Any]:
     elif isinstance(response, dict) and "stop_reason" in response:
         metadata["stop_reason"] = response["stop_reason"]
     
-    return metadata
\ No newline at end of file
+    return metadata
+
+
+def _usage_field(usage: Any, name: str) -> Any:
+    """Read a usage field from an SDK object or a dictionary."""
+    if isinstance(usage, dict):
+        return usage.get(name)
+    value = getattr(usage, name, None)
+    # Mocks and SDK objects may report absent fields as non-numbers
+    return value if isinstance(value, (int, float)) or value is None else None
+
+
+def extract_token_usage(usage: Any) -> Dict[str, Any]:
+    """Normalize Anthropic or OpenAI token usage, including prompt cache use.
+    
+    Anthropic reports uncached input, cache reads and cache writes
+    separately; OpenAI reports the cached part of the prompt in
+    prompt_tokens_details. prompt_tokens is the whole prompt in both cases.
+    
+    Args:
+        usage: Usage object or dictionary from a response
+        
+    Returns:
+        Dictionary with prompt, completion and total tokens and the prompt
+        tokens read from and written to the provider's cache (None where
+        the provider doesn't report it)
+    """
+    prompt_tokens = _usage_field(usage, "prompt_tokens")
+    completion_tokens = _usage_field(usage, "completion_tokens")
+    cache_read = _usage_field(usage, "cache_read_input_tokens")
+    cache_write = _usage_field(usage, "cache_creation_input_tokens")
+    
+    input_tokens = _usage_field(usage, "input_tokens")
+    if input_tokens is not None:
+        # Anthropic
+        prompt_tokens = input_tokens + (cache_read or 0) + (cache_write or 0)
+        completion_tokens = _usage_field(usage, "output_tokens")
+    else:
+        details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+        if details is not None:
+            cache_read = _usage_field(details, "cached_tokens")
+    
+    total_tokens = _usage_field(usage, "total_tokens")
+    if total_tokens is None and prompt_tokens is not None and completion_tokens is not None:
+        total_tokens = prompt_tokens + completion_tokens
+    
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": total_tokens,
+        "cache_read_tokens": cache_read,
+        "cache_write_tokens": cache_write
+    }
+
+
+def add_token_usage(totals: Dict[str, int], token_usage: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Accumulate a response's token usage into running totals.
+    
+    Args:
+        totals: Running totals, updated in place
+        token_usage: Usage from extract_token_usage, or None
+        
+    Returns:
+        The updated totals
+    """
+    if token_usage:
+        for key in ("prompt_tokens", "completion_tokens", "cache_read_tokens", "cache_write_tokens"):
+            totals[key] = totals.get(key, 0) + (token_usage.get(key) or 0)
+        totals["requests"] = totals.get("requests", 0) + 1
+    return totals
@@ -13,7 +13,9 @@ This module implements retry strategies for API requests.
 import time
 import logging
 import random
-from typing import Any, Callable, List, Optional, Type, TypeVar
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Type, TypeVar
 
 from .exceptions import (
     APIModelError, 
@@ -26,6 +28,82 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')  # Generic type for function return value
 
+# Sessions whose retry budgets are remembered
+MAX_SESSION_BUDGETS = 1024
+
+
+class RetryBudget:
+    """Caps retries and hedges at a fraction of a session's requests.
+    
+    Every request earns `ratio` of a retry, up to `cap`; a retry or hedge
+    spends one. When a provider is struggling, retries then stop adding
+    load once the session's allowance is used up instead of multiplying it.
+    """
+    
+    def __init__(self, ratio: float = 0.2, initial: float = 2.0, cap: float = 5.0):
+        """Initialize the budget.
+        
+        Args:
+            ratio: Retries earned per request
+            initial: Retries available before any requests
+            cap: Most retries that can be saved up
+        """
+        self.ratio = ratio
+        self.cap = cap
+        self.balance = min(initial, cap)
+        self.spent = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+    
+    def deposit(self) -> None:
+        """Credit the budget for one request."""
+        with self._lock:
+            self.balance = min(self.cap, self.balance + self.ratio)
+    
+    def try_spend(self) -> bool:
+        """Take one retry from the budget.
+        
+        Returns:
+            True if a retry may be made
+        """
+        with self._lock:
+            if self.balance >= 1.0:
+                self.balance -= 1.0
+                self.spent += 1
+                return True
+            self.denied += 1
+            return False
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {"balance": self.balance, "spent": self.spent, "denied": self.denied}
+
+
+_budgets: "OrderedDict[str, RetryBudget]" = OrderedDict()
+_budgets_lock = threading.Lock()
+
+
+def get_retry_budget(session_id: Optional[str] = None, **options) -> RetryBudget:
+    """Get the retry budget of a session.
+    
+    Args:
+        session_id: Session (conversation) ID; None shares one default budget
+        **options: RetryBudget options for a newly created budget
+        
+    Returns:
+        The session's RetryBudget
+    """
+    key = session_id or ""
+    with _budgets_lock:
+        budget = _budgets.get(key)
+        if budget is None:
+            budget = RetryBudget(**options)
+            _budgets[key] = budget
+            while len(_budgets) > MAX_SESSION_BUDGETS:
+                _budgets.popitem(last=False)
+        else:
+            _budgets.move_to_end(key)
+        return budget
+
 
 def is_retryable_error(error: Exception) -> bool:
     """Determine if an error should trigger a retry.
@@ -71,7 +149,9 @@ def with_retry(
     max_attempts: int = 3,
     backoff_factor: float = 1.5,
     jitter: bool = True,
-    retryable_errors: Optional[List[Type[Exception]]] = None
+    retryable_errors: Optional[List[Type[Exception]]] = None,
+    deadline: Optional[float] = None,
+    budget: Optional[RetryBudget] = None
 ) -> T:
     """Execute a function with exponential backoff retry.
     
@@ -81,6 +161,9 @@ def with_retry(
         backoff_factor: Factor to increase delay between attempts
         jitter: Whether to add random jitter to delay
         retryable_errors: List of exception types that should trigger a retry
+        deadline: time.monotonic() after which no retry is started; a retry
+            whose backoff would end past it is not attempted
+        budget: Retry budget each retry is taken from
             
     Returns:
         Result of the function
@@ -89,6 +172,8 @@ def with_retry(
         Exception: The last exception encountered if all attempts fail
     """
     last_error = None
+    if budget is not None:
+        budget.deposit()
     
     for attempt in range(max_attempts):
         try:
@@ -114,6 +199,15 @@ def with_retry(
             # Add jitter to prevent thundering herd problem
             if jitter:
                 delay *= (0.5 + random.random())
+            
+            # Don't sleep into a deadline the retry couldn't meet anyway
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                logger.warning(f"Not retrying after {str(e)}: backoff would pass the request deadline")
+                raise
+            
+            if budget is not None and not budget.try_spend():
+                logger.warning(f"Not retrying after {str(e)}: session retry budget exhausted")
+                raise
                 
             logger.warning(
                 f"Attempt {attempt + 1}/{max_attempts} failed with error: {str(e)}. "
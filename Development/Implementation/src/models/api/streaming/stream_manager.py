@@ -18,6 +18,7 @@ from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 from .stream_handler import StreamHandler
 from .stream_processor import StreamProcessor
 from .stream_config import StreamConfig
+from ...utils.cancellation import CancellationToken, CancellationStats, REASON_CANCELLED
 from .exceptions import (
     StreamingError,
     StreamProcessingError,
@@ -59,6 +60,10 @@ class StreamManager:
         
         # Stream source
         self.current_stream: Optional[Iterator[str]] = None
+        self.cancel_token: Optional[CancellationToken] = None
+        
+        # Streams cancelled before they completed, and what stopping them saved
+        self.cancellation = CancellationStats()
         
         # Statistics
         self.stats = {
@@ -104,13 +109,16 @@ class StreamManager:
             return False
     
     def start_stream(
-        self, stream_source: Iterator[str], metadata: Optional[Dict[str, Any]] = None
+        self, stream_source: Iterator[str], metadata: Optional[Dict[str, Any]] = None,
+        cancel: Optional[CancellationToken] = None
     ) -> str:
         """Start processing a stream.
         
         Args:
             stream_source: Iterator producing tokens
-            metadata: Optional metadata about the stream
+            metadata: Optional metadata about the stream ("max_tokens" is
+                used to estimate the work a cancelled stream saved)
+            cancel: Optional cancellation token; cancelling it cancels the stream
             
         Returns:
             Stream ID for tracking
@@ -129,6 +137,7 @@ class StreamManager:
             self.stream_result = None
             self.stream_error = None
             self.current_stream = stream_source
+            self.cancel_token = cancel
             
             # Reset statistics
             self.stats = {
@@ -141,6 +150,8 @@ class StreamManager:
             
             # Notify handlers of stream start
             stream_metadata = metadata or {}
+            if stream_metadata.get("max_tokens"):
+                self.cancellation.max_tokens = stream_metadata["max_tokens"]
             for handler in self.handlers:
                 try:
                     handler.on_stream_start(stream_metadata)
@@ -148,6 +159,9 @@ class StreamManager:
                     logger.error(f"Error in stream start handler: {str(e)}")
                     self.stats["errors"] += 1
             
+            if cancel is not None:
+                cancel.add_callback(self.cancel_stream)
+            
             # Start processing
             use_threads = self.config.get("use_threads", True)
             if use_threads:
@@ -240,10 +254,17 @@ class StreamManager:
                                     self.stats["errors"] += 1
                             
                             return
+                
+                # Don't pull another token from a stream cancelled while paused
+                with self.stream_lock:
+                    if self.stream_state == self.STATE_CANCELLED:
+                        raise StreamCancelledError("Stream was cancelled")
             
             # Stream completed normally
             with self.stream_lock:
                 if self.stream_state != self.STATE_CANCELLED:
+                    self.cancellation.record_completed(self.stats["tokens_received"],
+                                                       time.time() - self.stats["start_time"])
                     self.stream_state = self.STATE_COMPLETED
                     complete_response = "".join(full_response)
                     self.stream_result = complete_response
@@ -257,8 +278,15 @@ class StreamManager:
                             self.stats["errors"] += 1
         
         except StreamCancelledError:
-            # Stream was cancelled, no need to notify again
-            pass
+            # Stream was cancelled, no need to notify again. Closing the source
+            # ends the request, so the provider stops generating
+            self._close_source()
+            reason = (self.cancel_token.reason if self.cancel_token is not None else None) or REASON_CANCELLED
+            estimate = self.cancellation.record_cancelled(
+                self.stats["tokens_received"], time.time() - self.stats["start_time"], reason
+            )
+            with self.stream_lock:
+                self.stats.update(estimate)
         
         except Exception as e:
             # Stream encountered an error
@@ -276,6 +304,19 @@ class StreamManager:
             
                     self.stats["errors"] += 1
                     logger.error(f"Stream processing error: {str(e)}")
+        
+        finally:
+            if self.cancel_token is not None:
+                self.cancel_token.remove_callback(self.cancel_stream)
+    
+    def _close_source(self) -> None:
+        """Close the token source (e.g. an HTTP response stream) if it can be closed."""
+        close = getattr(self.current_stream, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.debug(f"Error closing cancelled stream: {str(e)}")
     
     def pause_stream(self) -> bool:
         """Pause the current stream.
@@ -306,6 +347,9 @@ class StreamManager:
     def cancel_stream(self) -> bool:
         """Cancel the current stream.
         
+        The processing thread stops before dispatching another token and
+        closes the stream source.
+        
         Returns:
             True if successful, False otherwise
         """
@@ -329,7 +373,8 @@ class StreamManager:
                 "stats": self.stats.copy(),
                 "has_result": self.stream_result is not None,
                 "has_error": self.stream_error is not None,
-                "processor_stats": self.processor.get_statistics()
+                "processor_stats": self.processor.get_statistics(),
+                "cancellation": self.cancellation.get_stats()
             }
     
     def get_result(self, timeout: Optional[float] = None) -> str:
@@ -4,6 +4,8 @@
 Token Counting Utilities for API Models.
 
 This module provides utilities for estimating token usage in API models.
+Counting goes through the shared tokenizer registry, which loads each
+encoding once and memoizes counts of recently seen strings.
 """
 # TASK-REF: AM_001 - API Model Client
 # CONCEPT-REF: CON-AM-001 - API Model Client
@@ -11,28 +13,51 @@ This module provides utilities for estimating token usage in API models.
 
 import json
 import logging
-import importlib.util
+import threading
 from typing import Dict, List, Optional, Union, Any
 
+from ...memory.utils.tokenizers import encoding_for_model, get_tokenizer_registry
+
 logger = logging.getLogger(__name__)
 
 PromptType = Union[str, List[Dict[str, str]]]
 
-# Default tokens per character ratios for estimation
-DEFAULT_TOKENS_PER_CHAR = {
-    "anthropic": 0.25,  # ~4 characters per token for Claude
-    "openai": 0.25,     # ~4 characters per token for GPT models
-    "default": 0.25     # Default fallback
-}
+# Registry name of Claude's tokenizer
+ANTHROPIC_TOKENIZER = "anthropic"
+
+_anthropic_lock = threading.Lock()
+_anthropic_registered = False
 
 
-def _has_tiktoken() -> bool:
-    """Check if tiktoken is available.
+def _anthropic_tokenizer() -> str:
+    """Register Claude's tokenizer with the registry on first use.
+    
+    Older SDKs ship a local count_tokens; otherwise Claude tokens are
+    estimated (there is no local Claude tokenizer).
     
     Returns:
-        True if tiktoken is available, False otherwise
+        The registry name to count Claude tokens under
     """
-    return importlib.util.find_spec("tiktoken") is not None
+    global _anthropic_registered
+    if not _anthropic_registered:
+        with _anthropic_lock:
+            if not _anthropic_registered:
+                counter = None
+                try:
+                    import anthropic
+                    counter = getattr(anthropic, "count_tokens", None)
+                except ImportError:
+                    logger.debug("Anthropic package not available for token counting")
+                get_tokenizer_registry().register(ANTHROPIC_TOKENIZER, counter)
+                _anthropic_registered = True
+    return ANTHROPIC_TOKENIZER
+
+
+def _tokenizer_name(provider: str, model: Optional[str]) -> str:
+    """Registry name of the tokenizer for a provider and model."""
+    if provider == "anthropic":
+        return _anthropic_tokenizer()
+    return encoding_for_model(model)
 
 
 def estimate_token_count(text: str, provider: str = "default") -> int:
@@ -40,14 +65,13 @@ def estimate_token_count(text: str, provider: str = "default") -> int:
     
     Args:
         text: Text to estimate tokens for
-        provider: Provider name for ratio selection
+        provider: Provider name (all providers share the registry's
+            calibrated estimator)
         
     Returns:
         Estimated token count
     """
-    # Calculate based on character count and provider-specific ratio
-    ratio = DEFAULT_TOKENS_PER_CHAR.get(provider, DEFAULT_TOKENS_PER_CHAR["default"])
-    return max(1, int(len(text) * ratio))
+    return max(1, get_tokenizer_registry().estimate(text))
 
 
 def count_tokens_anthropic(text: str) -> int:
@@ -59,16 +83,7 @@ def count_tokens_anthropic(text: str) -> int:
     Returns:
         Token count
     """
-    try:
-        # Try to use Anthropic's tokenizer if it's available
-        import anthropic
-        if hasattr(anthropic, 'count_tokens'):
-            return anthropic.count_tokens(text)
-    except ImportError:
-        logger.debug("Anthropic package not available for token counting")
-    
-    # Fallback to estimation
-    return estimate_token_count(text, "anthropic")
+    return get_tokenizer_registry().count(text, _anthropic_tokenizer())
 
 
 def count_tokens_openai(text: str, model: str = "gpt-4") -> int:
@@ -81,25 +96,7 @@ def count_tokens_openai(text: str, model: str = "gpt-4") -> int:
     Returns:
         Token count
     """
-    if _has_tiktoken():
-        try:
-            import tiktoken
-            
-            # Select the right encoding based on model
-            if model.startswith("gpt-4"):
-                encoding = tiktoken.encoding_for_model("gpt-4")
-            elif model.startswith("gpt-3.5"):
-                encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-            else:
-                encoding = tiktoken.get_encoding("cl100k_base")  # Default to cl100k
-                
-            # Count tokens
-            return len(encoding.encode(text))
-        except Exception as e:
-            logger.warning(f"Error using tiktoken: {str(e)}")
-    
-    # Fallback to estimation
-    return estimate_token_count(text, "openai")
+    return get_tokenizer_registry().count(text, encoding_for_model(model))
 
 
 def count_message_tokens(
@@ -118,65 +115,47 @@ def count_message_tokens(
     if not messages:
         return 0
     
+    registry = get_tokenizer_registry()
+    name = _tokenizer_name(provider, model)
     total_tokens = 0
     
     # Format-specific token counting
-    if provider == "openai":
-        # Use tiktoken for precise counting if available
-        if _has_tiktoken():
-            try:
-                import tiktoken
-                
-                # Select encoding based on model
-                if model and model.startswith("gpt-4"):
-                    encoding = tiktoken.encoding_for_model("gpt-4")
-                elif model and model.startswith("gpt-3.5"):
-                    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-                else:
-                    encoding = tiktoken.get_encoding("cl100k_base")
-                
-                # Count per OpenAI's formula: https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_tokens_with_tiktoken.ipynb
-                # Every message follows <im_start>{role/name}\n{content}<im_end>\n
-                # 3 tokens for im_start and im_end, 1 for \n after role
-                tokens_per_message = 3
-                
-                for message in messages:
-                    total_tokens += tokens_per_message
-                    
-                    for key, value in message.items():
-                        if isinstance(value, str):
-                            total_tokens += len(encoding.encode(value))
-                        elif isinstance(value, (dict, list)):
-                            # Handle JSON objects by serializing
-                            value_str = json.dumps(value)
-                            total_tokens += len(encoding.encode(value_str))
-                    
-                    # Add tokens for the name if present
-                    if message.get("name"):
-                        total_tokens += 1  # Extra token for name
-                
-                # Add 3 tokens for assistant label at the end
-                total_tokens += 3
-                
-                return total_tokens
-            except Exception as e:
-                logger.warning(f"Error counting tokens with tiktoken: {str(e)}")
+    if provider == "openai" and registry.has_tokenizer(name):
+        # Count per OpenAI's formula: https://github.com/openai/openai-cookbook/blob/main/examples/How_to_count_tokens_with_tiktoken.ipynb
+        # Every message follows <im_start>{role/name}\n{content}<im_end>\n
+        # 3 tokens for im_start and im_end, 1 for \n after role
+        tokens_per_message = 3
+        
+        texts = []
+        for message in messages:
+            total_tokens += tokens_per_message
+            
+            for key, value in message.items():
+                if isinstance(value, str):
+                    texts.append(value)
+                elif isinstance(value, (dict, list)):
+                    # Handle JSON objects by serializing
+                    texts.append(json.dumps(value))
+            
+            # Add tokens for the name if present
+            if message.get("name"):
+                total_tokens += 1  # Extra token for name
+        
+        # Add 3 tokens for assistant label at the end
+        return total_tokens + sum(registry.count_many(texts, name)) + 3
     
-    # Fallback: convert to strings and estimate
+    # Other providers: role and content of each message, plus formatting overhead
+    texts = []
     for message in messages:
-        role = message.get("role", "")
         content = message.get("content", "")
+        texts.append(message.get("role", ""))
         
-        # Add tokens for role
-        total_tokens += estimate_token_count(role, provider)
-        
-        # Add tokens for content
         if isinstance(content, str):
-            total_tokens += estimate_token_count(content, provider)
+            texts.append(content)
         elif isinstance(content, (dict, list)):
             # Handle structured content
-            content_str = json.dumps(content)
-            total_tokens += estimate_token_count(content_str, provider)
+            texts.append(json.dumps(content))
+    total_tokens += sum(registry.count_many(texts, name))
     
     # Add overhead for message formatting
     message_overhead = len(messages) * 4  # Approximate overhead per message
@@ -203,7 +182,7 @@ def count_prompt_tokens(prompt: PromptType, provider: str = "openai", model: Opt
         elif provider == "openai":
             return count_tokens_openai(prompt, model or "gpt-4")
         else:
-            return estimate_token_count(prompt, provider)
+            return get_tokenizer_registry().count(prompt, encoding_for_model(model))
     elif isinstance(prompt, list):
         # Message list format
         return count_message_tokens(prompt, provider, model)
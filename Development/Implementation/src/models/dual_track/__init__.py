@@ -14,9 +14,12 @@ between local and API models, coordinates their execution, and integrates respon
 
 # Core classes
 from .router import ProcessingRouter, RoutingDecision, QueryFeatures
+from .route_classifier import RouteClassifier, RouteOutcome
+from .latency_model import LatencyModel
 from .local_model import LocalModel, LocalModelController, LocalModelResponse
 from .api_client import APIClient, APIModelController, APIModelResponse
 from .integrator import ResponseIntegrator, IntegrationResult
+from .race import ParallelRace, PhraseSplitter, SpokenPhrase, RaceResult
 # Optional optimizer imports (requires psutil)
 try:
     from .optimizer import (
@@ -55,16 +58,21 @@ from .exceptions import (
 
 # Convenience functions
 from .router import determine_path, calculate_query_features
+from .route_classifier import evaluate_router, load_traces, save_traces
 from .integrator import integrate_responses
 
 __all__ = [
     # Core classes
     "ProcessingRouter",
+    "RouteClassifier",
+    "LatencyModel",
     "LocalModel", 
     "LocalModelController",
     "APIClient",
     "APIModelController", 
     "ResponseIntegrator",
+    "ParallelRace",
+    "PhraseSplitter",
     "DualTrackOptimizer",
     "MetricsCollector",
     "ResourceMonitor",
@@ -73,9 +81,12 @@ __all__ = [
     # Data classes
     "RoutingDecision",
     "QueryFeatures",
+    "RouteOutcome",
     "LocalModelResponse",
     "APIModelResponse", 
     "IntegrationResult",
+    "SpokenPhrase",
+    "RaceResult",
     "PerformanceMetrics",
     "ResourceConstraints",
     "OptimizationConfig",
@@ -116,6 +127,9 @@ __all__ = [
     # Convenience functions
     "determine_path",
     "calculate_query_features",
+    "evaluate_router",
+    "load_traces",
+    "save_traces",
     "integrate_responses",
     "create_default_optimizer",
     "create_optimized_config"
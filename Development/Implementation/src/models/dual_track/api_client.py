@@ -6,21 +6,40 @@
 API model client for dual-track processing system.
 """
 
+import json
 import time
 import logging
 import asyncio
-from typing import Dict, Any, Optional, List, Union
+import contextlib
+from typing import Dict, Any, Optional, List, Union, Callable, Awaitable, AsyncIterator
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, CancelledError
 
 from .config import APIModelConfig, DEFAULT_CONFIG
 from .exceptions import (
     APIModelError, APIConnectionError, APIRateLimitError, 
     APITimeoutError, ConfigurationError
 )
+from ..api import async_http
+from ..api.exceptions import APITimeoutError as TransportTimeoutError
+from ..api.exceptions import APIRateLimitError as TransportRateLimitError
+from ..api.rate_limiter import (
+    PRIORITY_INTERACTIVE, get_rate_limiter, is_rate_limit_error, retry_after_seconds
+)
+from ..api.async_http import Deadline
+from ..api.hedging import HedgingPolicy, LatencyTracker
+from ..api.retry_strategy import get_retry_budget
+from ..api.token_counter import count_prompt_tokens
+from ..api.request_builder import build_anthropic_prompt, build_openai_messages
+from ..api.response_parser import extract_token_usage
+from ..utils.cancellation import CancellationToken, CancellationStats, REASON_CANCELLED
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Context keys that steer the request rather than describe the conversation
+CONTROL_KEYS = ("session_id", "priority", "deadline")
+
 
 @dataclass
 class APIModelResponse:
@@ -53,6 +72,7 @@ class APIClient:
         
         self.provider = self.config.provider.lower()
         self.client = None
+        self.api_key = None
         self.is_initialized = False
         
         # Performance tracking
@@ -62,16 +82,29 @@ class APIClient:
         self.successful_requests = 0
         self.failed_requests = 0
         
+        # Requests abandoned through a cancel token, and what stopping them saved
+        self.cancellation = CancellationStats(self.config.max_tokens)
+        
         # Rate limiting
         self.last_request_time = 0.0
-        self.requests_this_minute = 0
-        self.minute_start = 0.0
+        self.rate_limiter = None
+        
+        # Hedging of requests slower to start than the recent p95
+        self.hedging = HedgingPolicy(LatencyTracker(percentile=self.config.hedge_percentile))
         
         # Thread pool for async operations
         self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="api-client")
         
         # Initialize client
         self._initialize_client()
+        
+        # Shared by every client using the same provider account
+        self.rate_limiter = get_rate_limiter(
+            self.provider,
+            self.api_key or "",
+            requests_per_minute=self.config.requests_per_minute,
+            tokens_per_minute=self.config.tokens_per_minute
+        )
     
     def _initialize_client(self):
         """Initialize the appropriate API client."""
@@ -112,6 +145,7 @@ class APIClient:
             if not api_key:
                 raise ConfigurationError("Anthropic API key not found in config or environment")
             
+            self.api_key = api_key
             self.client = anthropic.Anthropic(api_key=api_key)
             
         except ImportError:
@@ -133,6 +167,7 @@ class APIClient:
             if not api_key:
                 raise ConfigurationError("OpenAI API key not found in config or environment")
             
+            self.api_key = api_key
             self.client = openai.OpenAI(api_key=api_key)
             
         except ImportError:
@@ -140,41 +175,258 @@ class APIClient:
                 "openai package not installed. Install with: pip install openai"
             )
     
-    def generate(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None) -> APIModelResponse:
-        """Generate a response using the API model."""
+    def generate(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None,
+                 priority: int = PRIORITY_INTERACTIVE,
+                 cancel: Optional[CancellationToken] = None) -> APIModelResponse:
+        """Generate a response using the API model.
+        
+        Waits (up to config.rate_limit_wait) for the shared rate limiter;
+        voice turns use the default interactive priority and go ahead of
+        background requests. A context "deadline" (time.monotonic()) from
+        the turn shortens config.timeout.
+        
+        With a `cancel` token the response is streamed, so cancelling it
+        closes the connection at the next event instead of paying for the
+        rest of the answer; the text so far comes back with finish_reason
+        "cancelled".
+        """
         if not self.is_initialized:
             raise APIModelError("API client not initialized")
         
-        # Check rate limits
-        self._check_rate_limits()
+        if cancel is not None and cancel.is_set():
+            return self._record_cancelled(self._cancelled_response(""), cancel)
+        
+        deadline = self._deadline(context)
         
+        # Wait for rate limit admission
+        estimated_tokens = self._estimate_tokens(messages, context)
+        self._admit(estimated_tokens, priority, deadline)
+        
+        drop_queued = None
         try:
             # Submit generation task to thread pool with timeout
-            future = self.executor.submit(self._generate_sync, messages, context)
-            response = future.result(timeout=self.config.timeout)
+            future = self.executor.submit(self._generate_sync, messages, context, cancel)
+            if cancel is not None:
+                drop_queued = future.cancel
+                cancel.add_callback(drop_queued)
+            response = future.result(timeout=deadline.remaining())
+            
+            # Update rate limiting
+            self._update_rate_limits(estimated_tokens, response)
             
-            # Track statistics
             self.request_count += 1
-            self.successful_requests += 1
             self.total_tokens += response.total_tokens
+            if response.finish_reason == "cancelled":
+                return self._record_cancelled(response, cancel)
             
-            # Update rate limiting
-            self._update_rate_limits()
+            # Track statistics
+            self.successful_requests += 1
+            if response.error is None:
+                self.cancellation.record_completed(self._completion_tokens(response.usage),
+                                                   response.completion_time)
             
             return response
             
-        except TimeoutError:
+        except CancelledError:
+            # Dropped before a worker picked it up; its rate limit reservation is returned
+            self.rate_limiter.record_usage(estimated_tokens, 0)
+            return self._record_cancelled(self._cancelled_response(""), cancel)
+        except (TimeoutError, TransportTimeoutError):
+            self.failed_requests += 1
+            error_msg = f"API request timed out after {deadline.timeout}s"
+            self.logger.warning(error_msg)
+            raise APITimeoutError(error_msg)
+        except Exception as e:
+            self.failed_requests += 1
+            error_msg = f"API generation failed: {str(e)}"
+            self.logger.error(error_msg)
+            raise APIModelError(error_msg)
+        finally:
+            if drop_queued is not None:
+                cancel.remove_callback(drop_queued)
+    
+    async def agenerate(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None,
+                        priority: int = PRIORITY_INTERACTIVE,
+                        fallback: Optional[Callable[[], Awaitable[APIModelResponse]]] = None,
+                        cancel: Optional[CancellationToken] = None) -> APIModelResponse:
+        """Generate a response on the event loop over the pooled HTTP transport.
+        
+        Unlike generate(), no worker thread is held while waiting: the request
+        goes out on a kept-alive connection and config.timeout (or the turn's
+        context "deadline", if sooner) bounds the whole exchange. If no
+        response arrives by the recent p95, a second request is raced against
+        it, or `fallback` (e.g. the local track) when given; hedges come out
+        of the session's retry budget.
+        
+        With a `cancel` token the response is streamed in a task of its own,
+        so cancelling the token (from any thread) closes the connection at
+        the next event instead of paying for the rest of the answer; as with
+        generate(), the text so far comes back with finish_reason
+        "cancelled". Streamed attempts are hedged on their first delta
+        rather than on the whole response. Cancelling the awaiting task closes the in-flight
+        request and raises asyncio.CancelledError.
+        """
+        if not self.is_initialized:
+            raise APIModelError("API client not initialized")
+        
+        start_time = time.time()
+        if cancel is None:
+            try:
+                return await self._agenerate(messages, context, priority, fallback)
+            except asyncio.CancelledError:
+                # Abandoned by the caller (the other track won, or a barge-in)
+                self.cancellation.record_cancelled(0, time.time() - start_time, REASON_CANCELLED)
+                raise
+        
+        if cancel.is_set():
+            return self._record_cancelled(self._cancelled_response(""), cancel)
+        
+        # Each streamed attempt collects its text here as it arrives
+        streams: List[Dict[str, Any]] = []
+        request = asyncio.ensure_future(self._agenerate(messages, context, priority, fallback, streams))
+        loop = asyncio.get_running_loop()
+        
+        def cancel_request() -> None:
+            try:
+                loop.call_soon_threadsafe(request.cancel)
+            except RuntimeError:
+                pass  # The loop already closed
+        
+        cancel.add_callback(cancel_request)
+        try:
+            return await request
+        except asyncio.CancelledError:
+            if not cancel.is_set():
+                # The caller itself was cancelled
+                raise
+            state = max(streams, key=lambda stream: len(stream["pieces"]), default=None)
+            if state is None:
+                response = self._cancelled_response("")
+            else:
+                response = self._streamed_response(state, "cancelled", self.provider)
+            response.usage["completion_time"] = time.time() - start_time
+            return self._record_cancelled(response, cancel)
+        finally:
+            cancel.remove_callback(cancel_request)
+    
+    async def _agenerate(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]],
+                         priority: int,
+                         fallback: Optional[Callable[[], Awaitable[APIModelResponse]]],
+                         streams: Optional[List[Dict[str, Any]]] = None) -> APIModelResponse:
+        """Run agenerate()'s request; with `streams`, each attempt streams into it."""
+        context = context or {}
+        deadline = self._deadline(context)
+        estimated_tokens = self._estimate_tokens(messages, context)
+        try:
+            await self.rate_limiter.aacquire(estimated_tokens, priority, timeout=self._admission_wait(deadline))
+        except TransportRateLimitError as e:
+            raise APIRateLimitError(str(e))
+        start_time = time.time()
+        
+        prepared_messages = self._prepare_messages(messages, context)
+        
+        async def attempt() -> APIModelResponse:
+            if self.provider == "anthropic":
+                data = await self._pool().post_json(
+                    "/v1/messages", self._anthropic_request(prepared_messages), timeout=deadline.remaining()
+                )
+                return self._parse_anthropic_json(data)
+            elif self.provider == "openai":
+                data = await self._pool().post_json(
+                    "/v1/chat/completions", self._openai_request(prepared_messages), timeout=deadline.remaining()
+                )
+                return self._parse_openai_json(data)
+            raise APIModelError(f"Unsupported provider: {self.provider}")
+        
+        async def streamed_attempt() -> AsyncIterator[Optional[APIModelResponse]]:
+            # Yields None at the first delta, so the race is decided on it, then the response
+            state: Dict[str, Any] = {"pieces": [], "usage": {}, "first_delta": asyncio.Event()}
+            streams.append(state)
+            if self.provider == "anthropic":
+                task = asyncio.ensure_future(self._astream_anthropic(prepared_messages, deadline, state))
+            else:
+                task = asyncio.ensure_future(self._astream_openai(prepared_messages, deadline, state))
+            first_delta = asyncio.ensure_future(state["first_delta"].wait())
+            try:
+                await asyncio.wait({task, first_delta}, return_when=asyncio.FIRST_COMPLETED)
+                if not task.done():
+                    yield None
+                yield await task
+            finally:
+                first_delta.cancel()
+                if not task.done():
+                    task.cancel()
+                    with contextlib.suppress(BaseException):
+                        await task
+        
+        async def streamed_fallback() -> AsyncIterator[APIModelResponse]:
+            yield await fallback()
+        
+        hedge_label = "local" if fallback else "hedge"
+        budget = get_retry_budget(context.get("session_id"))
+        try:
+            if streams is not None and self.provider in ("anthropic", "openai"):
+                hedge = streamed_fallback if fallback else (streamed_attempt if self.config.hedge_requests else None)
+                items = self.hedging.stream(streamed_attempt, hedge=hedge, deadline=deadline,
+                                            budget=budget, hedge_label=hedge_label)
+                try:
+                    response = None
+                    async for item in items:
+                        if item is not None:
+                            response = item
+                finally:
+                    await items.aclose()
+                if response is None:
+                    raise APIModelError("Streamed request produced no response")
+            else:
+                hedge = fallback or (attempt if self.config.hedge_requests else None)
+                response = await self.hedging.call(attempt, hedge=hedge, deadline=deadline,
+                                                   budget=budget, hedge_label=hedge_label)
+        except asyncio.CancelledError:
+            self.request_count += 1
+            # The prompt may have been read; the unused output budget goes back
+            self.rate_limiter.record_usage(estimated_tokens, estimated_tokens - self.config.max_tokens)
+            raise
+        except TransportTimeoutError:
             self.failed_requests += 1
-            error_msg = f"API request timed out after {self.config.timeout}s"
+            error_msg = f"API request timed out after {deadline.timeout}s"
             self.logger.warning(error_msg)
             raise APITimeoutError(error_msg)
+        except TransportRateLimitError as e:
+            self.failed_requests += 1
+            self.rate_limiter.note_retry_after(retry_after_seconds(e))
+            raise APIRateLimitError(f"API rate limited: {str(e)}")
         except Exception as e:
             self.failed_requests += 1
             error_msg = f"API generation failed: {str(e)}"
             self.logger.error(error_msg)
             raise APIModelError(error_msg)
+        
+        response.usage["completion_time"] = time.time() - start_time
+        self.request_count += 1
+        self.successful_requests += 1
+        self.total_tokens += response.total_tokens
+        if response.provider != "local":
+            self._update_rate_limits(estimated_tokens, response)
+            self.cancellation.record_completed(self._completion_tokens(response.usage),
+                                               response.completion_time)
+        return response
+    
+    def _pool(self) -> async_http.AsyncHTTPPool:
+        """Shared keep-alive connection pool for this provider on the running loop."""
+        if self.provider == "anthropic":
+            base_url = self.config.base_url or "https://api.anthropic.com"
+            headers = {"x-api-key": self.api_key, "anthropic-version": "2023-06-01"}
+        else:
+            base_url = self.config.base_url or "https://api.openai.com"
+            headers = {"Authorization": f"Bearer {self.api_key}"}
+        return async_http.get_pool(
+            self.provider, base_url, headers, credential=self.api_key,
+            max_connections=self.config.max_connections
+        )
     
-    def _generate_sync(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]]) -> APIModelResponse:
+    def _generate_sync(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]],
+                       cancel: Optional[CancellationToken] = None) -> APIModelResponse:
         """Synchronous generation method."""
         start_time = time.time()
         
@@ -183,10 +435,18 @@ class APIClient:
             prepared_messages = self._prepare_messages(messages, context)
             
             # Generate response based on provider
-            if self.provider == "anthropic":
-                response = self._generate_anthropic(prepared_messages)
+            if cancel is not None and cancel.is_set():
+                response = self._cancelled_response("")
+            elif self.provider == "anthropic":
+                if cancel is not None:
+                    response = self._stream_anthropic(prepared_messages, cancel)
+                else:
+                    response = self._generate_anthropic(prepared_messages)
             elif self.provider == "openai":
-                response = self._generate_openai(prepared_messages)
+                if cancel is not None:
+                    response = self._stream_openai(prepared_messages, cancel)
+                else:
+                    response = self._generate_openai(prepared_messages)
             else:
                 raise APIModelError(f"Unsupported provider: {self.provider}")
             
@@ -202,6 +462,10 @@ class APIClient:
             completion_time = time.time() - start_time
             error_msg = str(e)
             
+            # Back off everyone sharing the limiter when the provider throttles us
+            if is_rate_limit_error(e):
+                self.rate_limiter.note_retry_after(retry_after_seconds(e))
+            
             return APIModelResponse(
                 content="I apologize, but I encountered an issue while processing your request.",
                 usage={"completion_time": completion_time, "total_tokens": 0},
@@ -211,17 +475,10 @@ class APIClient:
                 error=error_msg
             )
     
-    def _generate_anthropic(self, messages: List[Dict[str, str]]) -> APIModelResponse:
-        """Generate response using Anthropic API."""
-        # Separate system messages from conversation
-        system_message = None
-        conversation_messages = []
-        
-        for msg in messages:
-            if msg.get("role") == "system":
-                system_message = msg.get("content", "")
-            else:
-                conversation_messages.append(msg)
+    def _anthropic_request(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build Anthropic request parameters from chat messages."""
+        # Stable system blocks and history are marked for prompt caching
+        system_message, conversation_messages = build_anthropic_prompt(messages, self.config.prompt_cache)
         
         # Prepare request parameters
         params = {
@@ -234,8 +491,33 @@ class APIClient:
         if system_message:
             params["system"] = system_message
         
+        return params
+    
+    def _parse_anthropic_json(self, data: Dict[str, Any]) -> APIModelResponse:
+        """Convert a raw Anthropic messages response into an APIModelResponse."""
+        content = "".join(block.get("text", "") for block in data.get("content", [])
+                          if block.get("type", "text") == "text")
+        usage = data.get("usage", {})
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        
+        return APIModelResponse(
+            content=content,
+            usage={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                **self._cache_usage(usage)
+            },
+            finish_reason=data.get("stop_reason") or "stop",
+            model=self.config.model,
+            provider="anthropic"
+        )
+    
+    def _generate_anthropic(self, messages: List[Dict[str, str]]) -> APIModelResponse:
+        """Generate response using Anthropic API."""
         # Make API request
-        response = self.client.messages.create(**params)
+        response = self.client.messages.create(**self._anthropic_request(messages))
         
         # Extract response content
         content = ""
@@ -251,7 +533,8 @@ class APIClient:
             usage = {
                 "input_tokens": getattr(response.usage, 'input_tokens', 0),
                 "output_tokens": getattr(response.usage, 'output_tokens', 0),
-                "total_tokens": getattr(response.usage, 'input_tokens', 0) + getattr(response.usage, 'output_tokens', 0)
+                "total_tokens": getattr(response.usage, 'input_tokens', 0) + getattr(response.usage, 'output_tokens', 0),
+                **self._cache_usage(response.usage)
             }
         
         return APIModelResponse(
@@ -262,19 +545,88 @@ class APIClient:
             provider="anthropic"
         )
     
-    def _generate_openai(self, messages: List[Dict[str, str]]) -> APIModelResponse:
-        """Generate response using OpenAI API."""
-        # Prepare request parameters
-        params = {
+    def _stream_anthropic(self, messages: List[Dict[str, str]], cancel: CancellationToken) -> APIModelResponse:
+        """Stream a response from the Anthropic API, stopping once cancel is set."""
+        stream = self.client.messages.create(**self._anthropic_request(messages), stream=True)
+        
+        pieces: List[str] = []
+        usage: Dict[str, Any] = {}
+        input_tokens = output_tokens = 0
+        finish_reason = "stop"
+        try:
+            for event in stream:
+                if cancel.is_set():
+                    finish_reason = "cancelled"
+                    break
+                if event.type == "message_start":
+                    input_tokens = getattr(event.message.usage, 'input_tokens', 0)
+                    usage.update(self._cache_usage(event.message.usage))
+                elif event.type == "content_block_delta" and hasattr(event.delta, 'text'):
+                    pieces.append(event.delta.text)
+                elif event.type == "message_delta":
+                    output_tokens = getattr(event.usage, 'output_tokens', output_tokens)
+                    finish_reason = getattr(event.delta, 'stop_reason', None) or finish_reason
+        finally:
+            # Closing the stream releases the connection; the rest is never generated
+            stream.close()
+        
+        if finish_reason == "cancelled":
+            # No final usage event: count the text deltas received, about a token each
+            output_tokens = len(pieces)
+        usage.update({
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        })
+        return APIModelResponse(
+            content="".join(pieces),
+            usage=usage,
+            finish_reason=finish_reason,
+            model=self.config.model,
+            provider="anthropic"
+        )
+    
+    def _openai_request(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Build OpenAI request parameters from chat messages."""
+        return {
             "model": self.config.model,
-            "messages": messages,
+            "messages": build_openai_messages(messages, self.config.prompt_cache),
             "max_tokens": self.config.max_tokens,
             "temperature": self.config.temperature,
             "stream": False  # Non-streaming for now
         }
+    
+    @staticmethod
+    def _cache_usage(usage: Any) -> Dict[str, int]:
+        """Prompt tokens read from and written to the provider's prompt cache."""
+        token_usage = extract_token_usage(usage)
+        return {
+            "cache_read_tokens": token_usage["cache_read_tokens"] or 0,
+            "cache_write_tokens": token_usage["cache_write_tokens"] or 0
+        }
+    
+    def _parse_openai_json(self, data: Dict[str, Any]) -> APIModelResponse:
+        """Convert a raw OpenAI chat completion into an APIModelResponse."""
+        choices = data.get("choices") or [{}]
+        usage = data.get("usage", {})
         
+        return APIModelResponse(
+            content=(choices[0].get("message") or {}).get("content") or "",
+            usage={
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("total_tokens", 0),
+                **self._cache_usage(usage)
+            },
+            finish_reason=choices[0].get("finish_reason") or "stop",
+            model=self.config.model,
+            provider="openai"
+        )
+    
+    def _generate_openai(self, messages: List[Dict[str, str]]) -> APIModelResponse:
+        """Generate response using OpenAI API."""
         # Make API request
-        response = self.client.chat.completions.create(**params)
+        response = self.client.chat.completions.create(**self._openai_request(messages))
         
         # Extract response content
         content = ""
@@ -289,7 +641,8 @@ class APIClient:
             usage = {
                 "prompt_tokens": getattr(response.usage, 'prompt_tokens', 0),
                 "completion_tokens": getattr(response.usage, 'completion_tokens', 0),
-                "total_tokens": getattr(response.usage, 'total_tokens', 0)
+                "total_tokens": getattr(response.usage, 'total_tokens', 0),
+                **self._cache_usage(response.usage)
             }
         
         # Get finish reason
@@ -305,6 +658,143 @@ class APIClient:
             provider="openai"
         )
     
+    def _stream_openai(self, messages: List[Dict[str, str]], cancel: CancellationToken) -> APIModelResponse:
+        """Stream a response from the OpenAI API, stopping once cancel is set."""
+        request = {**self._openai_request(messages), "stream": True, "stream_options": {"include_usage": True}}
+        stream = self.client.chat.completions.create(**request)
+        
+        pieces: List[str] = []
+        usage: Dict[str, Any] = {}
+        finish_reason = "stop"
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    finish_reason = "cancelled"
+                    break
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if getattr(choice.delta, 'content', None):
+                        pieces.append(choice.delta.content)
+                    finish_reason = getattr(choice, 'finish_reason', None) or finish_reason
+                if getattr(chunk, 'usage', None):
+                    usage = {
+                        "prompt_tokens": getattr(chunk.usage, 'prompt_tokens', 0),
+                        "completion_tokens": getattr(chunk.usage, 'completion_tokens', 0),
+                        "total_tokens": getattr(chunk.usage, 'total_tokens', 0),
+                        **self._cache_usage(chunk.usage)
+                    }
+        finally:
+            # Closing the stream releases the connection; the rest is never generated
+            stream.close()
+        
+        if not usage:
+            # Cancelled before the usage chunk: count the deltas received, about a token each
+            usage = {"prompt_tokens": 0, "completion_tokens": len(pieces), "total_tokens": len(pieces)}
+        return APIModelResponse(
+            content="".join(pieces),
+            usage=usage,
+            finish_reason=finish_reason,
+            model=self.config.model,
+            provider="openai"
+        )
+    
+    async def _astream_anthropic(self, messages: List[Dict[str, str]], deadline: Deadline,
+                                 state: Dict[str, Any]) -> APIModelResponse:
+        """Stream a response from the Anthropic API over the pool, collecting it in state."""
+        request = {**self._anthropic_request(messages), "stream": True}
+        events = self._pool().stream_events("/v1/messages", request, timeout=deadline.remaining())
+        usage = state["usage"]
+        finish_reason = "stop"
+        async for event, data in events:
+            payload = json.loads(data)
+            event_type = payload.get("type", event)
+            if event_type == "message_start":
+                message_usage = payload.get("message", {}).get("usage") or {}
+                usage["input_tokens"] = message_usage.get("input_tokens", 0)
+                usage.update(self._cache_usage(message_usage))
+            elif event_type == "content_block_delta" and payload.get("delta", {}).get("text"):
+                state["pieces"].append(payload["delta"]["text"])
+                state["first_delta"].set()
+            elif event_type == "message_delta":
+                usage["output_tokens"] = (payload.get("usage") or {}).get("output_tokens", 0)
+                finish_reason = payload.get("delta", {}).get("stop_reason") or finish_reason
+            elif event_type == "error":
+                raise APIModelError(f"Anthropic stream error: {payload.get('error', {}).get('message', data[:200])}")
+        return self._streamed_response(state, finish_reason, "anthropic")
+    
+    async def _astream_openai(self, messages: List[Dict[str, str]], deadline: Deadline,
+                              state: Dict[str, Any]) -> APIModelResponse:
+        """Stream a response from the OpenAI API over the pool, collecting it in state."""
+        request = {**self._openai_request(messages), "stream": True, "stream_options": {"include_usage": True}}
+        events = self._pool().stream_events("/v1/chat/completions", request, timeout=deadline.remaining())
+        finish_reason = "stop"
+        async for _, data in events:
+            # Read through the terminator so the connection goes back to the pool
+            if data.strip() == "[DONE]":
+                continue
+            payload = json.loads(data)
+            if "error" in payload:
+                raise APIModelError(f"OpenAI stream error: {payload['error'].get('message', data[:200])}")
+            for choice in payload.get("choices") or []:
+                if (choice.get("delta") or {}).get("content"):
+                    state["pieces"].append(choice["delta"]["content"])
+                    state["first_delta"].set()
+                finish_reason = choice.get("finish_reason") or finish_reason
+            if payload.get("usage"):
+                usage = payload["usage"]
+                state["usage"] = {
+                    "prompt_tokens": usage.get("prompt_tokens", 0),
+                    "completion_tokens": usage.get("completion_tokens", 0),
+                    "total_tokens": usage.get("total_tokens", 0),
+                    **self._cache_usage(usage)
+                }
+        return self._streamed_response(state, finish_reason, "openai")
+    
+    def _streamed_response(self, state: Dict[str, Any], finish_reason: str, provider: str) -> APIModelResponse:
+        """Response from a stream's collected text and usage, complete or cut off."""
+        pieces, usage = state["pieces"], dict(state["usage"])
+        if provider == "anthropic":
+            if finish_reason == "cancelled" or "output_tokens" not in usage:
+                # No final usage event: count the text deltas received, about a token each
+                usage["output_tokens"] = len(pieces)
+            usage.setdefault("input_tokens", 0)
+            usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        elif "total_tokens" not in usage:
+            # Cancelled before the usage chunk: count the deltas received, about a token each
+            usage = {"prompt_tokens": 0, "completion_tokens": len(pieces), "total_tokens": len(pieces)}
+        return APIModelResponse(
+            content="".join(pieces),
+            usage=usage,
+            finish_reason=finish_reason,
+            model=self.config.model,
+            provider=provider
+        )
+    
+    def _cancelled_response(self, content: str) -> APIModelResponse:
+        """Response for a request cancelled before it produced anything."""
+        return APIModelResponse(
+            content=content,
+            usage={"total_tokens": 0, "completion_time": 0.0},
+            finish_reason="cancelled",
+            model=self.config.model,
+            provider=self.provider
+        )
+    
+    def _record_cancelled(self, response: APIModelResponse,
+                          cancel: Optional[CancellationToken]) -> APIModelResponse:
+        """Record a cancelled request and what stopping it saved."""
+        response.usage["cancellation"] = self.cancellation.record_cancelled(
+            self._completion_tokens(response.usage),
+            response.completion_time,
+            (cancel.reason if cancel is not None else None) or REASON_CANCELLED
+        )
+        return response
+    
+    @staticmethod
+    def _completion_tokens(usage: Dict[str, Any]) -> int:
+        """Generated tokens in a response's usage, for either provider."""
+        return usage.get("output_tokens", usage.get("completion_tokens", 0)) or 0
+    
     def _prepare_messages(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
         """Prepare messages with context for API request."""
         prepared = []
@@ -313,6 +803,8 @@ class APIClient:
         if context and isinstance(context, dict):
             context_parts = []
             for key, value in context.items():
+                if key in CONTROL_KEYS:
+                    continue
                 if isinstance(value, (str, int, float)):
                     context_parts.append(f"- {key}: {value}")
                 elif isinstance(value, list) and value:
@@ -321,7 +813,8 @@ class APIClient:
             if context_parts:
                 context_str = "Context information:\n" + "\n".join(context_parts)
                 system_message = f"{context_str}\n\nRespond to the user's queries based on this context."
-                prepared.append({"role": "system", "content": system_message})
+                # Per-turn context belongs in the volatile tail, after the cached prefix
+                prepared.append({"role": "system", "content": system_message, "cache": False})
         
         # Add all provided messages
         for msg in messages:
@@ -330,27 +823,37 @@ class APIClient:
         
         return prepared
     
-    def _check_rate_limits(self):
-        """Check if we're within rate limits."""
-        if not self.config.requests_per_minute:
-            return
-        
-        current_time = time.time()
-        
-        # Reset minute counter if needed
-        if current_time - self.minute_start >= 60.0:
-            self.minute_start = current_time
-            self.requests_this_minute = 0
-        
-        # Check rate limit
-        if self.requests_this_minute >= self.config.requests_per_minute:
-            wait_time = 60.0 - (current_time - self.minute_start)
-            raise APIRateLimitError(f"Rate limit exceeded. Wait {wait_time:.1f}s")
+    def _estimate_tokens(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]]) -> int:
+        """Tokens a request may use: the prepared prompt plus the output limit."""
+        prepared = self._prepare_messages(messages, context)
+        return count_prompt_tokens(prepared, provider=self.provider, model=self.config.model) + self.config.max_tokens
+    
+    def _deadline(self, context: Optional[Dict[str, Any]]) -> Deadline:
+        """The request's deadline: config.timeout, or the turn's deadline if sooner."""
+        return Deadline.until((context or {}).get("deadline"), self.config.timeout)
+    
+    def _admission_wait(self, deadline: Deadline) -> Optional[float]:
+        """Longest rate limiter wait that leaves the request time to run."""
+        try:
+            remaining = deadline.remaining()
+        except TransportTimeoutError:
+            raise APITimeoutError("Turn deadline passed before the API request started")
+        if self.config.rate_limit_wait is None:
+            return remaining
+        return min(self.config.rate_limit_wait, remaining) if remaining is not None else self.config.rate_limit_wait
     
-    def _update_rate_limits(self):
-        """Update rate limiting counters."""
+    def _admit(self, estimated_tokens: int, priority: int, deadline: Deadline) -> float:
+        """Wait for the shared rate limiter; returns seconds waited."""
+        try:
+            return self.rate_limiter.acquire(estimated_tokens, priority, timeout=self._admission_wait(deadline))
+        except TransportRateLimitError as e:
+            raise APIRateLimitError(str(e))
+    
+    def _update_rate_limits(self, estimated_tokens: int, response: APIModelResponse):
+        """Update rate limiting with the tokens the request actually used."""
         self.last_request_time = time.time()
-        self.requests_this_minute += 1
+        if response.total_tokens:
+            self.rate_limiter.record_usage(estimated_tokens, response.total_tokens)
     
     def get_client_stats(self) -> Dict[str, Any]:
         """Get API client performance statistics."""
@@ -368,7 +871,9 @@ class APIClient:
             "total_tokens": self.total_tokens,
             "total_cost": self.total_cost,
             "average_tokens_per_request": avg_tokens,
-            "requests_this_minute": self.requests_this_minute
+            "rate_limiter": self.rate_limiter.get_stats() if self.rate_limiter else {},
+            "hedging": self.hedging.get_stats(),
+            "cancellation": self.cancellation.get_stats()
         }
     
     def reset_stats(self):
@@ -378,6 +883,7 @@ class APIClient:
         self.total_cost = 0.0
         self.successful_requests = 0
         self.failed_requests = 0
+        self.cancellation.reset()
     
     def __del__(self):
         """Cleanup when object is destroyed."""
@@ -395,47 +901,144 @@ class APIModelController:
         
         self.client = APIClient(config)
         self.request_count = 0
+        
+        self.response_cache = None
+        if self.config.response_cache:
+            self.response_cache = ResponseCache(
+                max_entries=self.config.response_cache_size,
+                ttl_seconds=self.config.response_cache_ttl,
+                semantic=self.config.semantic_cache,
+                similarity_threshold=self.config.semantic_cache_threshold
+            )
     
-    def process_query(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Process a query with the API model."""
+    def process_query(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None,
+                      cancel: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Process a query with the API model; `cancel` abandons it (see APIClient.generate)."""
         self.request_count += 1
         
         try:
             self.logger.debug(f"Processing query with API model: {messages[-1].get('content', '')[:50]}...")
             
+            cached = self._cached_response(messages, context)
+            if cached is not None:
+                return cached
+            
             # Generate response
-            response = self.client.generate(messages, context)
+            response = self.client.generate(messages, context, cancel=cancel)
+            self._cache_response(messages, context, response)
+            return self._format_response(response)
             
-            # Format response for dual-track system
-            return {
-                "content": response.content,
-                "source": "api_model",
-                "metadata": {
-                    "usage": response.usage,
-                    "finish_reason": response.finish_reason,
-                    "model": response.model,
-                    "provider": response.provider,
-                    "request_id": self.request_count
-                },
-                "error": response.error,
-                "success": response.error is None
-            }
+        except Exception as e:
+            self.logger.error(f"API model processing failed: {e}")
+            return self._format_error(e)
+    
+    async def aprocess_query(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None,
+                             fallback: Optional[Callable[[], Awaitable[APIModelResponse]]] = None,
+                             cancel: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Process a query with the API model without blocking the event loop.
+        
+        `fallback` is raced against a request that is slow to respond, and
+        `cancel` abandons the request (see APIClient.agenerate).
+        """
+        self.request_count += 1
+        
+        try:
+            self.logger.debug(f"Processing query with API model: {messages[-1].get('content', '')[:50]}...")
+            
+            cached = self._cached_response(messages, context)
+            if cached is not None:
+                return cached
+            
+            response = await self.client.agenerate(messages, context, fallback=fallback, cancel=cancel)
+            self._cache_response(messages, context, response)
+            return self._format_response(response)
             
         except Exception as e:
             self.logger.error(f"API model processing failed: {e}")
-            return {
-                "content": "I'm sorry, but I'm having trouble connecting to the API service right now.",
-                "source": "api_model",
-                "metadata": {
-                    "usage": {"total_tokens": 0, "completion_time": 0.0},
-                    "finish_reason": "error",
-                    "model": self.config.model,
-                    "provider": self.config.provider,
-                    "request_id": self.request_count
-                },
-                "error": str(e),
-                "success": False
-            }
+            return self._format_error(e)
+    
+    def _cache_params(self) -> Dict[str, Any]:
+        """Request parameters a cached response must match."""
+        return {
+            "provider": self.config.provider,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature
+        }
+    
+    def _cached_response(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Serve a query from the response cache, if it may be and is cached."""
+        if self.response_cache is None:
+            return None
+        if not self.response_cache.is_cacheable(messages, context):
+            self.response_cache.record_uncacheable()
+            return None
+        
+        found = self.response_cache.lookup(
+            self.client._prepare_messages(messages, context), self.config.model, self._cache_params()
+        )
+        if found is None:
+            return None
+        entry, level = found
+        response = APIModelResponse(
+            content=entry.content,
+            # A hit uses no API tokens
+            usage={"total_tokens": 0, "cached_tokens": entry.usage.get("total_tokens", 0), "completion_time": 0.0},
+            finish_reason=entry.finish_reason,
+            model=entry.model,
+            provider=entry.provider
+        )
+        result = self._format_response(response)
+        result["metadata"]["cached"] = level
+        return result
+    
+    def _cache_response(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]],
+                        response: APIModelResponse):
+        """Cache a successful API response to a cacheable query."""
+        if self.response_cache is None or response.error is not None or response.provider == "local":
+            return
+        if response.finish_reason == "cancelled":
+            return
+        if not response.content or not self.response_cache.is_cacheable(messages, context):
+            return
+        self.response_cache.store(
+            self.client._prepare_messages(messages, context), self.config.model, self._cache_params(),
+            content=response.content,
+            usage=response.usage,
+            finish_reason=response.finish_reason,
+            provider=response.provider
+        )
+    
+    def _format_response(self, response: APIModelResponse) -> Dict[str, Any]:
+        """Format a response for the dual-track system."""
+        return {
+            "content": response.content,
+            "source": "local_model" if response.provider == "local" else "api_model",
+            "metadata": {
+                "usage": response.usage,
+                "finish_reason": response.finish_reason,
+                "model": response.model,
+                "provider": response.provider,
+                "request_id": self.request_count
+            },
+            "error": response.error,
+            "success": response.error is None
+        }
+    
+    def _format_error(self, e: Exception) -> Dict[str, Any]:
+        """Format a failed request for the dual-track system."""
+        return {
+            "content": "I'm sorry, but I'm having trouble connecting to the API service right now.",
+            "source": "api_model",
+            "metadata": {
+                "usage": {"total_tokens": 0, "completion_time": 0.0},
+                "finish_reason": "error",
+                "model": self.config.model,
+                "provider": self.config.provider,
+                "request_id": self.request_count
+            },
+            "error": str(e),
+            "success": False
+        }
     
     def is_available(self) -> bool:
         """Check if the API model is available."""
@@ -449,6 +1052,7 @@ class APIModelController:
             "available": self.is_available(),
             "request_count": self.request_count,
             "client_stats": stats,
+            "response_cache": self.response_cache.get_stats() if self.response_cache else None,
             "config": {
                 "provider": self.config.provider,
                 "model": self.config.model,
@@ -53,6 +53,24 @@ class RouterConfig:
         "creativity_required": 0.1
     })
 
+    # Learned routing from logged outcomes (see route_classifier.py)
+    learned_routing: bool = False  # Let the trained classifier route once it is confident
+    classifier_path: Optional[str] = None  # Saved RouteClassifier weights to start from
+    min_training_samples: int = 200  # Outcomes learned before the classifier is trusted
+    min_classifier_confidence: float = 0.6  # Below this the rules decide
+    online_learning: bool = True  # Update the classifier with every recorded outcome
+    target_latency_ms: float = 2000.0  # Slower answers count as bad outcomes
+
+    # Latency routing from live per-path estimates (see latency_model.py)
+    latency_routing: bool = False  # Pick the acceptable path with the lowest predicted tail latency
+    latency_quantile: float = 0.95  # Latency quantile to minimize
+    latency_min_samples: int = 20  # Observations before a path's estimate is used
+    latency_margin: float = 0.1  # Leave the chosen path only for this relative improvement
+    latency_half_life: float = 100.0  # Observations after which an observation counts half
+    latency_max_age: int = 500  # Forget a path not observed in this many observations of all paths
+    min_path_success_rate: float = 0.8  # Paths failing more often are avoided
+    min_path_quality: float = 0.0  # Paths with a lower recent quality score are avoided
+
 
 @dataclass 
 class LocalModelConfig:
@@ -65,15 +83,29 @@ class LocalModelConfig:
     repeat_penalty: float = 1.1
     context_window: int = 2048
     preload: bool = True
+    background_preload: bool = False  # Preload on a background thread instead of blocking construction
     
     # Performance settings
     n_threads: Optional[int] = None  # Auto-detect if None
     n_gpu_layers: int = -1  # Use all GPU layers if available
     memory_limit: Optional[int] = None  # Memory limit in MB
+    use_mmap: bool = True  # Memory-map the weights (lazy paging, shared between contexts)
+    use_mlock: bool = False  # Keep the weights resident; worth it for the voice-path model
     
     # Timeout settings
     generation_timeout: float = 15.0  # Max time for generation in seconds
     loading_timeout: float = 30.0  # Max time for model loading
+    
+    # Prompt-prefix KV cache
+    prompt_cache: bool = True  # Reuse KV state of the stable prompt prefix across turns
+    prompt_cache_sessions: int = 4  # Inactive session snapshots kept in memory
+    prompt_cache_dir: Optional[str] = None  # Persist session snapshots here (None = memory only)
+    system_prompt_snapshot: bool = True  # Restore the system-prompt KV state instead of re-evaluating it
+    snapshot_dir: Optional[str] = "./data/kv_snapshots"  # On-disk system-prompt snapshots (None = memory only)
+    
+    # Concurrent inference
+    inference_contexts: int = 1  # Contexts sharing the mmapped weights (>1 enables the token-level scheduler)
+    max_queued_requests: int = 16  # Requests waiting for a context before new ones are rejected
 
 
 @dataclass
@@ -87,9 +119,29 @@ class APIModelConfig:
     timeout: float = 30.0  # Request timeout in seconds
     retry_attempts: int = 3
     
+    # Async transport
+    base_url: Optional[str] = None  # Provider endpoint override (proxies, mock servers)
+    max_connections: int = 8  # Concurrent requests per provider pool
+    
     # Cost and rate limiting
     max_cost_per_request: Optional[float] = None  # Max cost in dollars
     requests_per_minute: Optional[int] = None  # Rate limit
+    tokens_per_minute: Optional[int] = None  # Token rate limit (prompt + max_tokens)
+    rate_limit_wait: Optional[float] = 10.0  # Max seconds to queue for the rate limiter
+    
+    # Hedging (async requests)
+    hedge_requests: bool = True  # Race a second request when the first is slower than the p95
+    hedge_percentile: float = 0.95
+    
+    # Provider prompt caching (stable prefix blocks marked, volatile context last)
+    prompt_cache: bool = True
+    
+    # Response cache (single-turn, context-free queries only)
+    response_cache: bool = True
+    response_cache_size: int = 1024  # Cached responses
+    response_cache_ttl: float = 3600.0  # Seconds
+    semantic_cache: bool = False  # Also match similar prompts (needs sentence-transformers)
+    semantic_cache_threshold: float = 0.92  # Minimum cosine similarity of a semantic hit
     
     # Fallback configuration
     fallback_provider: Optional[str] = None
@@ -109,6 +161,10 @@ class IntegrationConfig:
     api_timeout: float = 8.0  # Max wait for API response
     integration_delay: float = 0.5  # Delay before integrating responses
     
+    # Parallel path: speak the first ready phrase instead of waiting for both tracks
+    parallel_race: bool = True
+    min_phrase_chars: int = 20  # Shortest phrase cut at a comma (sentence ends are always cut)
+    
     # Quality thresholds
     min_response_length: int = 10  # Minimum response length to consider
     max_response_length: int = 2000  # Maximum response length
@@ -14,8 +14,9 @@ enhanced with memory context integration.
 import logging
 import time
 import asyncio
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple, Awaitable
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 from langchain_core.messages import AIMessage, HumanMessage
@@ -24,8 +25,11 @@ from ...vanta_workflow.state.vanta_state import VANTAState, ActivationStatus, Pr
 from ...vanta_workflow.nodes.memory_nodes import build_prompt_with_memory
 from .router import ProcessingRouter
 from .local_model import LocalModelController
-from .api_client import APIModelController
+from .api_client import APIModelController, APIModelResponse
 from .integrator import ResponseIntegrator, IntegrationResult
+from .race import ParallelRace, SpokenPhrase
+from ..api.async_http import close_pools
+from ..utils.cancellation import TurnCancellation, REASON_BARGE_IN, REASON_NOT_SELECTED
 from .config import DEFAULT_CONFIG, DualTrackConfig
 from .exceptions import DualTrackError, LocalModelError, APIModelError, IntegrationError
 
@@ -38,14 +42,32 @@ class DualTrackGraphNodes:
     def __init__(self, config: Optional[DualTrackConfig] = None):
         """Initialize dual-track graph nodes."""
         self.config = config or DEFAULT_CONFIG
-        self.router = ProcessingRouter(self.config.router)
         self.local_controller = LocalModelController(self.config.local_model)
+        # Latency routing sees how many requests the local model has queued
+        self.router = ProcessingRouter(self.config.router, queue_depth=self.local_controller.model.queue_depth)
         self.api_controller = APIModelController(self.config.api_model)
         self.integrator = ResponseIntegrator(self.config.integration)
         
         # Thread pool for parallel processing
         self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dual_track")
         
+        # Consumers of local-track tokens as they are generated (integrator, TTS)
+        self.local_token_callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        
+        # Parallel path: speak whichever track has a phrase ready first
+        self.race = ParallelRace(self.local_controller, self.api_controller, self.integrator,
+                                 self.config.integration, self.executor)
+        self.phrase_callbacks: List[Callable[[SpokenPhrase], None]] = []
+        
+        # Cancellation tokens of the turns in flight, so abandoned work stops
+        self.turns = TurnCancellation()
+        
+        # Event loop the sync race node runs on, started on first use, so the
+        # API connection pools it creates are kept alive across turns
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        
         # Performance tracking
         self.processing_stats = {
             "total_requests": 0,
@@ -94,6 +116,9 @@ class DualTrackGraphNodes:
             if not user_message or not user_message.content:
                 return {}
             
+            # A new turn while the last one is still generating is a barge-in
+            self.turns.cancel(self._session_id(state), REASON_BARGE_IN)
+            
             # Get context for routing
             memory = state.get("memory", {})
             context = {
@@ -125,6 +150,7 @@ class DualTrackGraphNodes:
                 "routing_time": routing_time,
                 "timestamp": datetime.now().isoformat(),
                 "query_text": user_message.content,
+                "race": (routing_decision.path.value == "parallel" and self.config.integration.parallel_race),
                 
                 # Initialize processing results
                 "local_response": None,
@@ -132,6 +158,7 @@ class DualTrackGraphNodes:
                 "local_completed": False,
                 "api_completed": False,
                 "local_processing_time": 0.0,
+                "local_time_to_first_token": None,
                 "api_processing_time": 0.0,
                 "integration_result": None,
                 "final_response": None,
@@ -194,47 +221,25 @@ class DualTrackGraphNodes:
             if processing.get("local_completed", False):
                 return {}
             
-            # Get query and context
-            messages = state.get("messages", [])
-            user_message = None
-            for message in reversed(messages):
-                if isinstance(message, HumanMessage):
-                    user_message = message
-                    break
-            
-            if not user_message:
+            request = self._prepare_local_request(state)
+            if request is None:
                 return {}
-            
-            memory = state.get("memory", {})
-            
-            # Build context with conversation history for local model
-            memory_context = memory.get("retrieved_context", {})
-            conversation_summary = memory.get("conversation_summary")
-            
-            # USE LANGGRAPH'S BUILT-IN MESSAGE HANDLING - No manual parsing needed!
-            # The messages list IS the conversation history, managed by add_messages reducer
-            
-            # Simply pass the conversation messages to the local model
-            # LangGraph handles all the conversation history automatically
-            context = {
-                "messages": messages,  # LangGraph's conversation history
-                "retrieved_context": memory_context,
-                "user_preferences": memory.get("user_preferences", {}),
-                "memory_references": memory.get("memory_references", []),
-                "memory_context_used": bool(memory_context.get("results")),
-                "conversation_summary": conversation_summary
-            }
-            
-            logger.info(f"🔍 SIMPLIFIED DEBUG - Message count: {len(messages)}, using LangGraph conversation history")
+            query, context = request
             
             # Process with local model using raw user input + context
             start_time = time.time()
             
             try:
-                local_response = self.local_controller.process_query(user_message.content, context)
+                local_response = self.local_controller.process_query_stream(
+                    query, context, on_token=self._local_token_emitter(),
+                    cancel=self.turns.track(self._session_id(state), "local")
+                )
                 local_time = time.time() - start_time
+                response_metadata = local_response.get("metadata", {})
+                time_to_first_token = response_metadata.get("time_to_first_token")
                 
-                logger.info(f"Local processing completed in {local_time:.2f}s")
+                logger.info(f"Local processing completed in {local_time:.2f}s "
+                            f"(first token after {time_to_first_token or 0.0:.2f}s)")
                 
                 # Merge with existing processing data
                 processing_update = {
@@ -242,14 +247,9 @@ class DualTrackGraphNodes:
                     "local_response": local_response,
                     "local_completed": True,
                     "local_processing_time": local_time,
+                    "local_time_to_first_token": time_to_first_token,
                     "local_error": None,
-                    "local_metadata": {
-                        "model_name": getattr(self.local_controller, 'model_name', 'unknown'),
-                        "generation_time": local_response.get("generation_time", local_time),
-                        "tokens_generated": local_response.get("tokens_generated", 0),
-                        "finish_reason": local_response.get("finish_reason", "completed"),
-                        "timestamp": datetime.now().isoformat()
-                    }
+                    "local_metadata": self._local_metadata(response_metadata, local_time)
                 }
                 
                 return {
@@ -286,123 +286,480 @@ class DualTrackGraphNodes:
                 }
             }
     
-    def enhanced_api_processing_node(self, state: VANTAState) -> Dict[str, Any]:
+    def _prepare_local_request(self, state: VANTAState) -> Optional[Tuple[str, Dict[str, Any]]]:
         """
-        Enhanced API processing node with fallback handling.
+        Build the local model query and context for a state.
         
-        Uses the APIModelController with provider fallback and streaming support
-        for robust cloud model integration.
+        Args:
+            state: Current VANTA state
+            
+        Returns:
+            (query, context), or None if there is no user message
+        """
+        # Get query and context
+        messages = state.get("messages", [])
+        user_message = None
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                user_message = message
+                break
+        
+        if not user_message:
+            return None
+        
+        memory = state.get("memory", {})
+        
+        # Build context with conversation history for local model
+        memory_context = memory.get("retrieved_context", {})
+        conversation_summary = memory.get("conversation_summary")
+        
+        # USE LANGGRAPH'S BUILT-IN MESSAGE HANDLING - No manual parsing needed!
+        # The messages list IS the conversation history, managed by add_messages reducer
+        
+        # Simply pass the conversation messages to the local model
+        # LangGraph handles all the conversation history automatically
+        context = {
+            "messages": messages,  # LangGraph's conversation history
+            "retrieved_context": memory_context,
+            "user_preferences": memory.get("user_preferences", {}),
+            "memory_references": memory.get("memory_references", []),
+            "memory_context_used": bool(memory_context.get("results")),
+            "conversation_summary": conversation_summary,
+            "priority": "voice"  # Live turn: scheduled ahead of background generation
+        }
+        
+        logger.info(f"🔍 SIMPLIFIED DEBUG - Message count: {len(messages)}, using LangGraph conversation history")
+        return user_message.content, context
+    
+    def _local_metadata(self, response_metadata: Dict[str, Any], local_time: float) -> Dict[str, Any]:
+        """Local processing metadata for the processing state."""
+        return {
+            "model_name": getattr(self.local_controller, 'model_name', 'unknown'),
+            "generation_time": response_metadata.get("generation_time", local_time),
+            "time_to_first_token": response_metadata.get("time_to_first_token"),
+            "tokens_generated": response_metadata.get("tokens_used", 0),
+            "finish_reason": response_metadata.get("finish_reason", "completed"),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def add_local_token_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a consumer of local-track tokens.
+        
+        The callback receives each chunk from LocalModel.generate_stream as it
+        is generated, so speech synthesis can start on the first phrase
+        instead of waiting for the complete local response.
+        
+        Args:
+            callback: Called with each token chunk
+        """
+        self.local_token_callbacks.append(callback)
+    
+    def remove_local_token_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Unregister a consumer of local-track tokens."""
+        if callback in self.local_token_callbacks:
+            self.local_token_callbacks.remove(callback)
+    
+    def _local_token_emitter(self) -> Callable[[Dict[str, Any]], None]:
+        """Forward local tokens to registered callbacks and LangGraph's custom stream."""
+        writer = None
+        try:
+            # Only available while the node runs inside a LangGraph graph
+            from langgraph.config import get_stream_writer
+            writer = get_stream_writer()
+        except Exception:
+            pass
+        
+        def emit(chunk: Dict[str, Any]) -> None:
+            if writer is not None:
+                writer({"local_token": chunk})
+            for callback in list(self.local_token_callbacks):
+                callback(chunk)
+        
+        return emit
+    
+    def add_phrase_callback(self, callback: Callable[[SpokenPhrase], None]) -> None:
+        """
+        Register a consumer of spoken phrases on the parallel race path.
+        
+        The callback receives each phrase as soon as it should be spoken,
+        whichever track it comes from, including the transition when the
+        answer hands off from the local to the API response.
+        
+        Args:
+            callback: Called with each SpokenPhrase
+        """
+        self.phrase_callbacks.append(callback)
+    
+    def remove_phrase_callback(self, callback: Callable[[SpokenPhrase], None]) -> None:
+        """Unregister a consumer of spoken phrases."""
+        if callback in self.phrase_callbacks:
+            self.phrase_callbacks.remove(callback)
+    
+    def _phrase_emitter(self) -> Callable[[SpokenPhrase], None]:
+        """Forward race phrases to registered callbacks and LangGraph's custom stream."""
+        writer = None
+        try:
+            # Only available while the node runs inside a LangGraph graph
+            from langgraph.config import get_stream_writer
+            writer = get_stream_writer()
+        except Exception:
+            pass
+        
+        def emit(phrase: SpokenPhrase) -> None:
+            if writer is not None:
+                writer({"phrase": {"text": phrase.text, "source": phrase.source, "elapsed": phrase.elapsed}})
+            for callback in list(self.phrase_callbacks):
+                callback(phrase)
+        
+        return emit
+    
+    def enhanced_parallel_race_node(self, state: VANTAState) -> Dict[str, Any]:
+        """
+        Parallel processing node that speaks the first ready phrase.
+        
+        Runs aenhanced_parallel_race_node on the nodes' long-lived event
+        loop, for graphs invoked synchronously. Every turn reuses the loop and
+        its kept-alive API connections.
         
         Args:
             state: Current VANTA state
             
         Returns:
-            Dict: API processing results
+            Dict: Results of both tracks and the spoken answer
+        """
+        return self._run_on_loop(self.aenhanced_parallel_race_node(state))
+    
+    def _run_on_loop(self, coro: Awaitable[Any]) -> Any:
+        """Run a coroutine on the nodes' event loop thread and wait for its result."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever,
+                                                     name="dual_track_loop", daemon=True)
+                self._loop_thread.start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+    
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        Close the API connection pools of the nodes' event loop and stop it.
+        
+        Args:
+            timeout: Seconds to wait for the pools to close and the loop to stop
         """
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is None:
+            return
+        
         try:
-            processing = state.get("processing", {})
-            path = processing.get("path")
+            asyncio.run_coroutine_threadsafe(close_pools(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Error closing API connection pools: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+    
+    async def aenhanced_parallel_race_node(self, state: VANTAState) -> Dict[str, Any]:
+        """
+        Parallel processing node that races the tracks for the first phrase.
+        
+        Instead of waiting for both tracks, the first phrase of whichever
+        track is ready first goes to the phrase callbacks, and the answer
+        continues or hands off to the API response according to the
+        integration strategy (see ParallelRace). The losing track is cancelled.
+        
+        Args:
+            state: Current VANTA state
             
-            # Skip if not using API processing
-            if path not in ["api", "parallel", "staged"]:
+        Returns:
+            Dict: Results of both tracks and the spoken answer
+        """
+        try:
+            processing = state.get("processing", {})
+            if processing.get("path") != "parallel" or processing.get("local_completed") or processing.get("api_completed"):
                 return {}
             
-            # Skip if already completed
-            if processing.get("api_completed", False):
+            local_request = self._prepare_local_request(state)
+            api_request = self._prepare_api_request(state)
+            if local_request is None or api_request is None:
                 return {}
+            query, local_context = local_request
+            api_messages, api_context = api_request
             
-            # For staged processing, check if local response is sufficient
-            if path == "staged" and processing.get("local_completed", False):
-                local_response = processing.get("local_response", {})
-                if local_response and self._is_local_response_sufficient(local_response):
-                    logger.info("Local response sufficient for staged processing, skipping API")
-                    return {}
+            result = await self.race.run(query, local_context, api_messages, api_context,
+                                         on_phrase=self._phrase_emitter(),
+                                         cancel=self.turns.turn(self._session_id(state)))
             
-            # Get conversation for API
-            messages = state.get("messages", [])
-            memory = state.get("memory", {})
+            local_response = result.local_response
+            api_response = result.api_response
+            local_metadata = (local_response or {}).get("metadata", {})
             
-            # Build enhanced conversation context for API with memory
-            memory_context = memory.get("retrieved_context", {})
-            conversation_summary = memory.get("conversation_summary")
-            api_messages = self._build_api_conversation_with_memory(messages, memory, memory_context, conversation_summary)
-            
-            # Extract conversation history from accumulated messages for API too
-            api_conversation_history = []
-            for i in range(0, len(messages) - 1, 2):  # Skip current message, pair user/ai
-                if i + 1 < len(messages):
-                    user_msg = messages[i]
-                    ai_msg = messages[i + 1]
-                    if hasattr(user_msg, 'content') and hasattr(ai_msg, 'content'):
-                        api_conversation_history.append({
-                            "user_message": user_msg.content,
-                            "assistant_message": ai_msg.content
-                        })
+            return {
+                "processing": {
+                    # A cancelled track is complete: it won't contribute to this turn
+                    "local_response": local_response,
+                    "local_completed": True,
+                    "local_processing_time": result.local_processing_time,
+                    "local_time_to_first_token": local_metadata.get("time_to_first_token"),
+                    "local_error": (local_response or {}).get("error"),
+                    "local_metadata": self._local_metadata(local_metadata, result.local_processing_time),
+                    "api_response": api_response,
+                    "api_completed": True,
+                    "api_processing_time": result.api_processing_time,
+                    "api_error": (api_response or {}).get("error"),
+                    "cancelled_tracks": result.cancelled,
+                    "time_to_first_phrase": result.time_to_first_phrase,
+                    "race_result": result.to_dict()
+                }
+            }
             
-            context = {
-                "conversation_history": api_conversation_history,  # ALL conversation history - no limits!
-                "retrieved_context": memory_context,
-                "user_preferences": memory.get("user_preferences", {}),
-                "memory_references": memory.get("memory_references", []),
-                "memory_context_used": bool(memory_context.get("results")),
-                "conversation_summary": conversation_summary
+        except Exception as e:
+            logger.error(f"Error in parallel race node: {e}")
+            return {
+                "processing": {
+                    "local_completed": True,
+                    "api_completed": True,
+                    "local_error": str(e),
+                    "api_error": str(e)
+                }
             }
+    
+    def enhanced_api_processing_node(self, state: VANTAState) -> Dict[str, Any]:
+        """
+        Enhanced API processing node with fallback handling.
+        
+        Uses the APIModelController with provider fallback and streaming support
+        for robust cloud model integration.
+        
+        Args:
+            state: Current VANTA state
+            
+        Returns:
+            Dict: API processing results
+        """
+        try:
+            request = self._prepare_api_request(state)
+            if request is None:
+                return {}
+            api_messages, context = request
             
             # Process with API model using enhanced context
             start_time = time.time()
             
             try:
-                api_response = self.api_controller.process_query(api_messages, context)
-                api_time = time.time() - start_time
-                
-                logger.info(f"API processing completed in {api_time:.2f}s")
-                
-                return {
-                    "processing": {
-                        "api_response": api_response,
-                        "api_completed": True,
-                        "api_processing_time": api_time,
-                        "api_error": None,
-                        "api_metadata": {
-                            "provider": getattr(self.api_controller, 'provider', 'unknown'),
-                            "model_name": getattr(self.api_controller, 'model_name', 'unknown'),
-                            "tokens_used": api_response.get("usage", {}).get("total_tokens", 0),
-                            "completion_time": api_response.get("completion_time", api_time),
-                            "finish_reason": api_response.get("finish_reason", "completed"),
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    }
-                }
+                api_response = self.api_controller.process_query(
+                    api_messages, context, cancel=self.turns.track(self._session_id(state), "api")
+                )
+                return self._api_result(api_response, start_time)
+            except APIModelError as e:
+                return self._api_error_result(e, start_time)
                 
+        except Exception as e:
+            return self._api_node_failure(e)
+    
+    async def aenhanced_api_processing_node(self, state: VANTAState) -> Dict[str, Any]:
+        """
+        Async variant of enhanced_api_processing_node.
+        
+        Awaits the API over the pooled asyncio transport, so a parallel or
+        staged graph running on an event loop doesn't tie up a thread per
+        in-flight API request. On the API-only path, a request slower than
+        usual is hedged with the local track.
+        
+        Args:
+            state: Current VANTA state
+            
+        Returns:
+            Dict: API processing results
+        """
+        try:
+            request = self._prepare_api_request(state)
+            if request is None:
+                return {}
+            api_messages, context = request
+            
+            start_time = time.time()
+            
+            try:
+                api_response = await self.api_controller.aprocess_query(
+                    api_messages, context, fallback=self._local_fallback(state),
+                    cancel=self.turns.track(self._session_id(state), "api")
+                )
+                return self._api_result(api_response, start_time)
             except APIModelError as e:
-                logger.error(f"API model error: {e}")
-                return {
-                    "processing": {
-                        "api_response": None,
-                        "api_completed": True,  # Mark as completed to not block workflow
-                        "api_processing_time": time.time() - start_time,
-                        "api_error": str(e),
-                        "api_metadata": {
-                            "error_type": e.__class__.__name__,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    }
-                }
+                return self._api_error_result(e, start_time)
                 
         except Exception as e:
-            logger.error(f"Error in enhanced API processing node: {e}")
-            return {
-                "processing": {
-                    "api_response": None,
-                    "api_completed": True,
-                    "api_processing_time": 0.0,
-                    "api_error": str(e),
-                    "api_metadata": {
-                        "error_type": "GeneralError",
-                        "timestamp": datetime.now().isoformat()
-                    }
+            return self._api_node_failure(e)
+    
+    def _prepare_api_request(self, state: VANTAState) -> Optional[Tuple[List[Dict[str, str]], Dict[str, Any]]]:
+        """
+        Build the API messages and context for a state.
+        
+        Args:
+            state: Current VANTA state
+            
+        Returns:
+            (messages, context), or None if the API track should not run
+        """
+        processing = state.get("processing", {})
+        path = processing.get("path")
+        
+        # Skip if not using API processing
+        if path not in ["api", "parallel", "staged"]:
+            return None
+        
+        # Skip if already completed
+        if processing.get("api_completed", False):
+            return None
+        
+        # For staged processing, check if local response is sufficient
+        if path == "staged" and processing.get("local_completed", False):
+            local_response = processing.get("local_response", {})
+            if local_response and self._is_local_response_sufficient(local_response):
+                logger.info("Local response sufficient for staged processing, skipping API")
+                return None
+        
+        # Get conversation for API
+        messages = state.get("messages", [])
+        memory = state.get("memory", {})
+        
+        # Build enhanced conversation context for API with memory
+        memory_context = memory.get("retrieved_context", {})
+        conversation_summary = memory.get("conversation_summary")
+        api_messages = self._build_api_conversation_with_memory(messages, memory, memory_context, conversation_summary)
+        
+        # Extract conversation history from accumulated messages for API too
+        api_conversation_history = []
+        for i in range(0, len(messages) - 1, 2):  # Skip current message, pair user/ai
+            if i + 1 < len(messages):
+                user_msg = messages[i]
+                ai_msg = messages[i + 1]
+                if hasattr(user_msg, 'content') and hasattr(ai_msg, 'content'):
+                    api_conversation_history.append({
+                        "user_message": user_msg.content,
+                        "assistant_message": ai_msg.content
+                    })
+        
+        context = {
+            "conversation_history": api_conversation_history,  # ALL conversation history - no limits!
+            "retrieved_context": memory_context,
+            "user_preferences": memory.get("user_preferences", {}),
+            "memory_references": memory.get("memory_references", []),
+            "memory_context_used": bool(memory_context.get("results")),
+            "conversation_summary": conversation_summary,
+            # The turn's latency budget and retry budget carry into the API layer
+            "deadline": processing.get("deadline") or time.monotonic() + self.config.integration.api_timeout,
+            "session_id": state.get("config", {}).get("session_id")
+        }
+        return api_messages, context
+    
+    def _local_fallback(self, state: VANTAState) -> Optional[Callable[[], Awaitable[APIModelResponse]]]:
+        """
+        Local-track generation to hedge an API-only request with.
+        
+        Parallel and staged paths already run the local track, so only the
+        API path gets a fallback, and only when the local model is loaded.
+        If the API answers first the fallback is cancelled, which stops
+        decoding and frees the local generation thread.
+        
+        Args:
+            state: Current VANTA state
+            
+        Returns:
+            Coroutine factory producing an APIModelResponse, or None
+        """
+        if state.get("processing", {}).get("path") != "api" or not self.local_controller.is_available():
+            return None
+        query = next((message.content for message in reversed(state.get("messages", []))
+                      if isinstance(message, HumanMessage)), None)
+        if not query:
+            return None
+        session_id = state.get("config", {}).get("session_id")
+        context = {"priority": "voice", "session_id": session_id}
+        
+        async def fallback() -> APIModelResponse:
+            loop = asyncio.get_running_loop()
+            cancel = self.turns.track(session_id, "local")
+            try:
+                local = await loop.run_in_executor(
+                    self.executor, self.local_controller.process_query, query, context, cancel
+                )
+            except asyncio.CancelledError:
+                # The hedge lost; the executor thread keeps running until told to stop
+                cancel.cancel(REASON_NOT_SELECTED)
+                raise
+            if not local.get("success"):
+                raise LocalModelError(local.get("error") or "Local fallback failed")
+            metadata = local.get("metadata", {})
+            return APIModelResponse(
+                content=local.get("text", ""),
+                usage={"total_tokens": metadata.get("tokens_used", 0)},
+                finish_reason=metadata.get("finish_reason") or "stop",
+                model=str(metadata.get("model_info", {}).get("model_name", "local")),
+                provider="local"
+            )
+        
+        return fallback
+    
+    def _api_result(self, api_response: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """State update for a completed API request."""
+        api_time = time.time() - start_time
+        
+        logger.info(f"API processing completed in {api_time:.2f}s")
+        
+        return {
+            "processing": {
+                "api_response": api_response,
+                "api_completed": True,
+                "api_processing_time": api_time,
+                "api_error": None,
+                "api_metadata": {
+                    "provider": getattr(self.api_controller, 'provider', 'unknown'),
+                    "model_name": getattr(self.api_controller, 'model_name', 'unknown'),
+                    "tokens_used": api_response.get("usage", {}).get("total_tokens", 0),
+                    "completion_time": api_response.get("completion_time", api_time),
+                    "finish_reason": api_response.get("finish_reason", "completed"),
+                    "timestamp": datetime.now().isoformat()
+                }
+            }
+        }
+    
+    def _api_error_result(self, e: APIModelError, start_time: float) -> Dict[str, Any]:
+        """State update for an API request that failed."""
+        logger.error(f"API model error: {e}")
+        return {
+            "processing": {
+                "api_response": None,
+                "api_completed": True,  # Mark as completed to not block workflow
+                "api_processing_time": time.time() - start_time,
+                "api_error": str(e),
+                "api_metadata": {
+                    "error_type": e.__class__.__name__,
+                    "timestamp": datetime.now().isoformat()
                 }
             }
+        }
+    
+    def _api_node_failure(self, e: Exception) -> Dict[str, Any]:
+        """State update when the API node itself fails."""
+        logger.error(f"Error in enhanced API processing node: {e}")
+        return {
+            "processing": {
+                "api_response": None,
+                "api_completed": True,
+                "api_processing_time": 0.0,
+                "api_error": str(e),
+                "api_metadata": {
+                    "error_type": "GeneralError",
+                    "timestamp": datetime.now().isoformat()
+                }
+            }
+        }
     
     def enhanced_integration_node(self, state: VANTAState) -> Dict[str, Any]:
         """
@@ -451,14 +808,25 @@ class DualTrackGraphNodes:
             start_time = time.time()
             
             try:
-                integration_result = self.integrator.integrate_responses(
-                    local_response=local_response,
-                    api_response=api_response,
-                    processing_path=path
-                )
+                race_result = processing.get("race_result")
+                if race_result:
+                    # The parallel race already spoke the integrated answer
+                    integration_result = IntegrationResult(**race_result)
+                else:
+                    integration_result = self.integrator.integrate_responses(
+                        local_response=local_response,
+                        api_response=api_response,
+                        processing_path=path
+                    )
                 
                 integration_time = time.time() - start_time
                 
+                # The answer is settled: a track still generating (staged path) is stopped
+                self.turns.end(self._session_id(state))
+                
+                # Teach the learned router how the chosen path did
+                self._record_routing_outcome(state, processing, integration_result)
+                
                 # Update statistics
                 self.processing_stats["successful_integrations"] += 1
                 self._update_average_processing_time(
@@ -513,6 +881,56 @@ class DualTrackGraphNodes:
             self.processing_stats["failed_integrations"] += 1
             return self._create_fallback_response(processing, error=str(e))
     
+    def _record_routing_outcome(self, state: VANTAState, processing: Dict[str, Any],
+                                integration_result: IntegrationResult) -> None:
+        """Report the outcome of a routed turn to the router for online learning."""
+        path = processing.get("path")
+        local_time = processing.get("local_processing_time", 0.0)
+        api_time = processing.get("api_processing_time", 0.0)
+        # Latency is the time until the answer the turn used was complete, the
+        # same measure on every path so the router can compare them: the API
+        # track isn't streamed, and a parallel turn's first phrase is usually
+        # the local track's whatever the final answer is
+        if path == "local":
+            success, latency = not processing.get("local_error"), local_time
+        elif path == "api":
+            success, latency = not processing.get("api_error"), api_time
+        elif path == "parallel":
+            success = integration_result.source != "fallback"
+            latency = {"local": local_time, "api": api_time}.get(integration_result.source,
+                                                                 max(local_time, api_time))
+        else:
+            return
+        
+        self.router.record_outcome(processing.get("query_text", ""), path, success, latency * 1000,
+                                   context=state.get("memory", {}),
+                                   queue_depth=(processing.get("features") or {}).get("local_queue_depth", 0))
+    
+    def cancel_turn(self, session_id: Optional[str] = None, reason: str = REASON_BARGE_IN) -> bool:
+        """
+        Cancel a session's turn in flight, e.g. when the user barges in.
+        
+        Safe to call from any thread. Local decoding stops at its next
+        token, API requests close their connection, and a parallel race
+        stops speaking.
+        
+        Args:
+            session_id: Session of the turn (None for the default session)
+            reason: Why the turn was abandoned, as recorded in the stats
+            
+        Returns:
+            True if a turn in flight was cancelled
+        """
+        cancelled = self.turns.cancel(session_id, reason)
+        if cancelled:
+            logger.info(f"Turn cancelled ({reason}) for session {session_id}")
+        return cancelled
+    
+    @staticmethod
+    def _session_id(state: VANTAState) -> Optional[str]:
+        """Session a state belongs to."""
+        return state.get("config", {}).get("session_id")
+    
     def _is_local_response_sufficient(self, local_response: Dict[str, Any]) -> bool:
         """Check if local response is sufficient for staged processing."""
         if not local_response:
@@ -577,9 +995,11 @@ class DualTrackGraphNodes:
         
         # Add conversation summary if available
         if conversation_summary:
+            # The long-term summary changes rarely, so it's part of the cached prefix
             api_messages.append({
                 "role": "system",
-                "content": f"Conversation Summary: {conversation_summary}"
+                "content": f"Conversation Summary: {conversation_summary}",
+                "cache": True
             })
         
         # Add enhanced memory context
@@ -592,7 +1012,8 @@ class DualTrackGraphNodes:
             
             api_messages.append({
                 "role": "system", 
-                "content": context_content.strip()
+                "content": context_content.strip(),
+                "cache": False
             })
         
         # Extract conversation history from accumulated messages (not from memory field)
@@ -692,6 +1113,11 @@ class DualTrackGraphNodes:
         return {
             **self.processing_stats,
             "integrator_stats": self.integrator.get_integration_stats(),
+            "race_stats": self.race.get_stats(),
+            "cancellation_stats": {
+                "local": self.local_controller.model.cancellation.get_stats(),
+                "api": self.api_controller.client.cancellation.get_stats()
+            },
             "router_stats": getattr(self.router, 'stats', {}),
             "local_controller_stats": getattr(self.local_controller, 'stats', {}),
             "api_controller_stats": getattr(self.api_controller, 'stats', {})
@@ -709,6 +1135,7 @@ class DualTrackGraphNodes:
         
         if hasattr(self.integrator, 'reset_stats'):
             self.integrator.reset_stats()
+        self.race.reset_stats()
         if hasattr(self.router, 'reset_stats'):
             self.router.reset_stats()
         if hasattr(self.local_controller, 'reset_stats'):
@@ -724,8 +1151,17 @@ _default_nodes = DualTrackGraphNodes()
 enhanced_router_node = _default_nodes.enhanced_router_node
 enhanced_local_processing_node = _default_nodes.enhanced_local_processing_node
 enhanced_api_processing_node = _default_nodes.enhanced_api_processing_node
+aenhanced_api_processing_node = _default_nodes.aenhanced_api_processing_node
+enhanced_parallel_race_node = _default_nodes.enhanced_parallel_race_node
+aenhanced_parallel_race_node = _default_nodes.aenhanced_parallel_race_node
 enhanced_integration_node = _default_nodes.enhanced_integration_node
 
 # Export stats functions
 get_dual_track_stats = _default_nodes.get_processing_stats
 reset_dual_track_stats = _default_nodes.reset_stats
+
+# Export barge-in cancellation
+cancel_dual_track_turn = _default_nodes.cancel_turn
+
+# Export shutdown of the race loop and its connection pools
+shutdown_dual_track = _default_nodes.shutdown
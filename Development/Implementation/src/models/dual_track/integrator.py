@@ -103,6 +103,26 @@ class ResponseIntegrator:
             self.logger.error(f"Integration failed: {e}")
             return self._create_fallback_result(start_time, f"Integration error: {str(e)}")
     
+    def extract_text(self, response: Dict[str, Any]) -> str:
+        """Text content of a track's response."""
+        return self._extract_text(response)
+    
+    def similarity(self, text1: str, text2: str) -> float:
+        """Similarity of two responses, from 0.0 to 1.0."""
+        return self._calculate_similarity(text1, text2)
+    
+    def prefer(self, local_text: str, api_text: str) -> Dict[str, Any]:
+        """Choose between two responses by weighted quality, as the preference strategy does."""
+        return self._integrate_with_preference(local_text, api_text, 0.0)
+    
+    def transition_phrase(self) -> str:
+        """Phrase spoken when handing off to another response, per the interrupt style."""
+        return self._get_transition()
+    
+    def fallback_result(self, start_time: float, reason: str) -> IntegrationResult:
+        """Result used when no response is available."""
+        return self._create_fallback_result(start_time, reason)
+    
     def _extract_text(self, response: Dict[str, Any]) -> str:
         """Extract text content from response."""
         if isinstance(response, dict):
@@ -0,0 +1,300 @@
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-012 - Dual-Track Optimization
+# DOC-REF: DOC-DEV-ARCH-COMP-2 - Dual-Track Processing Component Specification
+
+"""
+Live latency model of the processing paths.
+
+The local track has a single generation thread, so its latency is the time
+the query waits behind the requests already queued plus its own generation
+time; the API track's latency does not depend on the local queue but has a
+long tail of its own. LatencyModel keeps a decaying quantile sketch of the
+observed latency of each path, per query-length bucket and (for the paths
+that use the local model) per local queue depth, so the router can predict
+the p95 of each path for the query in front of it under the current load.
+
+Recent observations count more than old ones (half_life), so the model
+follows the API slowing down or the local model being swapped. Once the
+router moves traffic off a slow or failing path, that path gets no new
+observations to show it has recovered, so a path not observed for max_age
+observations of the other paths is forgotten: the router then keeps the
+rules' choice for it again until it has fresh estimates. A queue
+depth seen too rarely to have its own estimate is predicted from the
+deepest shallower one seen, plus a mean generation time for each further
+queued request.
+"""
+
+import math
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# Query length buckets, in words
+LENGTH_BUCKETS = (8, 32, 128)
+
+# Paths whose latency depends on the local generation queue
+QUEUED_PATHS = ("local", "parallel", "staged")
+
+# Sketch bins: 1 ms to about 2 minutes, 25% apart
+_BIN_RATIO = 1.25
+_BIN_COUNT = 53
+_LOG_RATIO = math.log(_BIN_RATIO)
+
+
+def context_queue_depth(context: Optional[Any]) -> int:
+    """Local queue depth recorded in a routing context's system_state, or 0."""
+    if not isinstance(context, dict):
+        return 0
+    return int((context.get("system_state") or {}).get("local_queue_depth", 0) or 0)
+
+
+def length_bucket(prompt_tokens: int) -> int:
+    """Index of the length bucket of a query."""
+    for i, limit in enumerate(LENGTH_BUCKETS):
+        if prompt_tokens < limit:
+            return i
+    return len(LENGTH_BUCKETS)
+
+
+class LatencySketch:
+    """Quantile sketch over log-spaced bins with exponential forgetting."""
+
+    def __init__(self, half_life: float = 100.0):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            half_life: Observations after which an observation's weight halves
+        """
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.bins = [0.0] * _BIN_COUNT
+        self.total = 0.0
+        self.weighted_sum = 0.0
+        self.count = 0
+        # Instead of decaying every bin, each new observation weighs more
+        self._increment = 1.0
+
+    def add(self, latency_ms: float) -> None:
+        """Add one observation."""
+        self._increment /= self.decay
+        if self._increment > 1e100:
+            self._rescale()
+        self.bins[self._bin(latency_ms)] += self._increment
+        self.total += self._increment
+        self.weighted_sum += self._increment * latency_ms
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Latency below which a fraction q of the (weighted) observations fall."""
+        if self.total <= 0:
+            return 0.0
+        target = q * self.total
+        cumulative = 0.0
+        for i, weight in enumerate(self.bins):
+            cumulative += weight
+            if cumulative >= target:
+                # Geometric midpoint of the bin
+                return _BIN_RATIO ** (i + 0.5)
+        return _BIN_RATIO ** (_BIN_COUNT - 0.5)
+
+    @property
+    def mean(self) -> float:
+        """Weighted mean latency."""
+        return self.weighted_sum / self.total if self.total > 0 else 0.0
+
+    def _bin(self, latency_ms: float) -> int:
+        if latency_ms <= 1.0:
+            return 0
+        return min(int(math.log(latency_ms) / _LOG_RATIO), _BIN_COUNT - 1)
+
+    def _rescale(self) -> None:
+        scale = 1.0 / self._increment
+        self.bins = [weight * scale for weight in self.bins]
+        self.total *= scale
+        self.weighted_sum *= scale
+        self._increment = 1.0
+
+
+class LatencyModel:
+    """Per-path latency estimates conditioned on query length and local queue depth."""
+
+    def __init__(self, half_life: float = 100.0, min_samples: int = 20, max_queue_depth: int = 4,
+                 max_age: int = 500):
+        """
+        Initialize an empty model.
+
+        Args:
+            half_life: Observations of a path after which an observation's weight halves
+            min_samples: Observations a sketch needs before it is used
+            max_queue_depth: Deeper queues share the last depth bucket
+            max_age: Observations of any path after which a path not observed
+                since is forgotten
+        """
+        self.half_life = half_life
+        self.min_samples = min_samples
+        self.max_queue_depth = max_queue_depth
+        self.max_age = max_age
+
+        self._sketches: Dict[Tuple[str, Optional[int], Optional[int]], LatencySketch] = {}
+        self._success: Dict[str, float] = {}
+        self._quality: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._observations = 0
+        self._last_observed: Dict[str, int] = {}
+        self.expired = 0
+        self._alpha = 1.0 - 0.5 ** (1.0 / half_life)
+        self._lock = threading.Lock()
+
+    def observe(self,
+                path: str,
+                latency_ms: float,
+                prompt_tokens: int = 0,
+                queue_depth: int = 0,
+                success: bool = True,
+                quality_score: float = 0.0) -> None:
+        """
+        Record how long a query took on a path.
+
+        Failed requests only count towards the success rate: their latency
+        (often a timeout) says little about the next request's.
+
+        Args:
+            path: Path the query took
+            latency_ms: Time until the answer
+            prompt_tokens: Query length in words
+            queue_depth: Local requests queued or running when it was routed
+            success: Whether the path produced an answer
+            quality_score: Answer quality when scored, else 0
+        """
+        with self._lock:
+            self._observations += 1
+            self._last_observed[path] = self._observations
+            self._samples[path] = self._samples.get(path, 0) + 1
+            self._success[path] = self._ewma(self._success.get(path), float(success))
+            if quality_score > 0:
+                self._quality[path] = self._ewma(self._quality.get(path), quality_score)
+            if not success:
+                return
+
+            bucket = length_bucket(prompt_tokens)
+            depth = self._depth(path, queue_depth)
+            for key in ((path, bucket, depth), (path, None, None), (path, None, depth)):
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = LatencySketch(self.half_life)
+                sketch.add(latency_ms)
+
+    def predict(self, path: str, prompt_tokens: int = 0, queue_depth: int = 0,
+                quantile: float = 0.95) -> Optional[float]:
+        """
+        Predict a latency quantile of a path for a query.
+
+        Args:
+            path: Processing path
+            prompt_tokens: Query length in words
+            queue_depth: Local requests queued or running now
+            quantile: Quantile to predict, e.g. 0.95
+
+        Returns:
+            Predicted latency in milliseconds, or None before enough observations
+        """
+        bucket = length_bucket(prompt_tokens)
+        depth = self._depth(path, queue_depth)
+        with self._lock:
+            self._expire(path)
+            cell = self._sketch(path, bucket, depth)
+            if cell is not None:
+                return cell.quantile(quantile)
+
+            # Unseen depth: the deepest shallower one seen, plus a mean
+            # generation time for each further request in the queue
+            for seen in range(depth - 1, -1, -1):
+                shallower = self._sketch(path, bucket, seen) or self._sketch(path, None, seen)
+                if shallower is not None:
+                    service = self._sketch("local", None, 0) or shallower
+                    return shallower.quantile(quantile) + (depth - seen) * service.mean
+
+            overall = self._sketch(path, None, None)
+            return overall.quantile(quantile) if overall is not None else None
+
+    def success_rate(self, path: str) -> Optional[float]:
+        """Recent share of successful requests on a path, or None before any."""
+        with self._lock:
+            self._expire(path)
+            return self._success.get(path)
+
+    def quality(self, path: str) -> Optional[float]:
+        """Recent mean quality score of a path, or None if none was scored."""
+        with self._lock:
+            self._expire(path)
+            return self._quality.get(path)
+
+    def samples(self, path: str) -> int:
+        """Observations of a path since it was last forgotten."""
+        with self._lock:
+            self._expire(path)
+            return self._samples.get(path, 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get latency statistics.
+
+        Returns:
+            Dictionary per path with samples, success rate, quality, and
+            p50/p95 latency overall and by local queue depth
+        """
+        with self._lock:
+            for path in list(self._samples):
+                self._expire(path)
+            stats: Dict[str, Any] = {}
+            for path, samples in self._samples.items():
+                overall = self._sketches.get((path, None, None))
+                by_depth = {
+                    depth: round(sketch.quantile(0.95), 1)
+                    for (name, bucket, depth), sketch in sorted(
+                        ((key, sketch) for key, sketch in self._sketches.items()
+                         if key[0] == path and key[1] is None and key[2] is not None),
+                        key=lambda item: item[0][2]
+                    )
+                }
+                stats[path] = {
+                    "samples": samples,
+                    "success_rate": self._success.get(path),
+                    "quality": self._quality.get(path),
+                    "p50_ms": overall.quantile(0.5) if overall else None,
+                    "p95_ms": overall.quantile(0.95) if overall else None,
+                    "p95_ms_by_queue_depth": by_depth
+                }
+            return stats
+
+    def reset(self) -> None:
+        """Forget all observations."""
+        with self._lock:
+            self._sketches.clear()
+            self._success.clear()
+            self._quality.clear()
+            self._samples.clear()
+            self._last_observed.clear()
+            self._observations = 0
+            self.expired = 0
+
+    def _expire(self, path: str) -> None:
+        """Forget a path not observed for max_age observations. Caller holds the lock."""
+        last = self._last_observed.get(path)
+        if last is None or self._observations - last <= self.max_age:
+            return
+        for key in [key for key in self._sketches if key[0] == path]:
+            del self._sketches[key]
+        for values in (self._success, self._quality, self._samples, self._last_observed):
+            values.pop(path, None)
+        self.expired += 1
+
+    def _depth(self, path: str, queue_depth: int) -> int:
+        return min(max(queue_depth, 0), self.max_queue_depth) if path in QUEUED_PATHS else 0
+
+    def _sketch(self, path: str, bucket: Optional[int], depth: Optional[int]) -> Optional[LatencySketch]:
+        """A sketch with enough observations, or None. Caller holds the lock."""
+        sketch = self._sketches.get((path, bucket, depth))
+        return sketch if sketch is not None and sketch.count >= self.min_samples else None
+
+    def _ewma(self, current: Optional[float], value: float) -> float:
+        return value if current is None else current + self._alpha * (value - current)
@@ -0,0 +1,163 @@
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-012 - Dual-Track Optimization
+# DOC-REF: DOC-DEV-ARCH-COMP-2 - Dual-Track Processing Component Specification
+
+"""
+Load simulation for comparing routers' tail latency.
+
+Replays a synthetic stream of queries through a ProcessingRouter against
+simulated tracks: a local model with a single generation thread, where
+queries wait in line, and an API with a long-tailed latency but no queue.
+The parallel path answers when the first track does; when the API answers
+first, the local request is cancelled, freeing the generation thread (or
+dropped from the queue if it had not started). Each outcome reaches the
+router when the query finishes, as it would in production, so a latency
+model learns online during the run.
+
+Latencies are the time until the answer starts, in milliseconds.
+"""
+
+import heapq
+import random
+from dataclasses import dataclass
+from typing import Dict, Any, List
+
+from .config import ProcessingPath
+from .route_classifier import RouteOutcome
+
+# Query templates by the kind of track the rules send them to
+SHORT_QUERIES = ["hi there", "thanks", "good morning", "what is the capital of {}", "how far is {}",
+                 "set a timer for ten minutes", "what is the weather in {}"]
+MEDIUM_QUERIES = ["which museums in {} are open on mondays and which ones need tickets in advance",
+                  "how long does the train from {} to the airport take on a weekday morning"]
+LONG_QUERIES = ["write a short poem about autumn in {}",
+                "compare the cost of living in {} and Madrid and explain why rents differ so much"]
+PLACES = ["Paris", "Lisbon", "Tokyo", "Berlin", "Lima", "Oslo", "Cairo", "Quito"]
+
+
+@dataclass
+class SimulatedQuery:
+    """A query of the synthetic load and how long each track takes for it."""
+    arrival_ms: float
+    query: str
+    local_ms: float  # Generation time on an idle local model
+    api_ms: float  # API latency
+
+
+def synthetic_load(duration_s: float = 600.0,
+                   base_rate: float = 0.6,
+                   burst_rate: float = 3.0,
+                   burst_every_s: float = 60.0,
+                   burst_length_s: float = 12.0,
+                   seed: int = 0) -> List[SimulatedQuery]:
+    """
+    Generate a bursty stream of queries.
+
+    Arrivals are Poisson at base_rate per second, rising to burst_rate for
+    burst_length_s every burst_every_s, e.g. several users of a shared
+    device talking at once. Local generation time grows with the query
+    length; API latency is log-normal with a long tail.
+
+    Args:
+        duration_s: Length of the stream in seconds
+        base_rate: Queries per second between bursts
+        burst_rate: Queries per second during bursts
+        burst_every_s: Seconds between the starts of bursts
+        burst_length_s: Length of each burst in seconds
+        seed: Random seed
+
+    Returns:
+        Queries in arrival order
+    """
+    rng = random.Random(seed)
+    queries = []
+    now = 0.0
+    while True:
+        rate = burst_rate if now % burst_every_s < burst_length_s else base_rate
+        now += rng.expovariate(rate)
+        if now >= duration_s:
+            return queries
+        kind = rng.random()
+        templates = SHORT_QUERIES if kind < 0.6 else MEDIUM_QUERIES if kind < 0.85 else LONG_QUERIES
+        query = rng.choice(templates).format(rng.choice(PLACES))
+        words = len(query.split())
+        queries.append(SimulatedQuery(
+            arrival_ms=now * 1000,
+            query=query,
+            local_ms=(250 + 15 * words) * rng.lognormvariate(0, 0.2),
+            api_ms=(700 + 5 * words) * rng.lognormvariate(0, 0.4)
+        ))
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def simulate(router: Any, queries: List[SimulatedQuery]) -> Dict[str, Any]:
+    """
+    Replay queries through a router against the simulated tracks.
+
+    Args:
+        router: ProcessingRouter to route with (it learns from the outcomes)
+        queries: Queries in arrival order, e.g. from synthetic_load()
+
+    Returns:
+        Dictionary with queries, latency mean/p50/p95/p99 in milliseconds,
+        the share of each path and the largest local queue depth seen
+    """
+    local_free = 0.0  # When the generation thread finishes its queue
+    local_jobs: List[float] = []  # When each local request leaves the queue
+    pending: List[Any] = []  # Outcomes not yet finished: (finish_ms, seq, outcome)
+    latencies: List[float] = []
+    paths: Dict[str, int] = {}
+    max_depth = 0
+
+    for seq, item in enumerate(queries):
+        now = item.arrival_ms
+        while pending and pending[0][0] <= now:
+            router.learn(heapq.heappop(pending)[2])
+        local_jobs = [finish for finish in local_jobs if finish > now]
+        depth = len(local_jobs)
+        max_depth = max(max_depth, depth)
+
+        decision = router.determine_path(item.query, {"system_state": {"local_queue_depth": depth}})
+        path = decision.path
+        start = max(now, local_free)
+        if path == ProcessingPath.API:
+            finish = now + item.api_ms
+        elif path == ProcessingPath.PARALLEL:
+            local_finish, api_finish = start + item.local_ms, now + item.api_ms
+            if local_finish <= api_finish:
+                finish = local_free = local_finish
+            else:
+                # The API answered first: the local request is cancelled, or
+                # dropped if it was still waiting (then it never held the thread)
+                finish = api_finish
+                if start < api_finish:
+                    local_free = api_finish
+            local_jobs.append(min(local_finish, api_finish))
+        else:
+            finish = local_free = start + item.local_ms
+            local_jobs.append(finish)
+
+        latency = finish - now
+        latencies.append(latency)
+        paths[path.value] = paths.get(path.value, 0) + 1
+        outcome = RouteOutcome(query=item.query, path=path.value, latency_ms=latency,
+                               prompt_tokens=len(item.query.split()), queue_depth=depth,
+                               timestamp=finish / 1000)
+        heapq.heappush(pending, (finish, seq, outcome))
+
+    if not latencies:
+        return {"queries": 0}
+    count = len(latencies)
+    latencies.sort()
+    return {
+        "queries": count,
+        "mean_ms": sum(latencies) / count,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "path_distribution": {path: n / count for path, n in sorted(paths.items())},
+        "max_queue_depth": max_depth
+    }
@@ -7,24 +7,45 @@ Local model controller for dual-track processing system.
 """
 
 import time
+import queue
 import logging
 import threading
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Iterator, Tuple
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, CancelledError
 
 from .config import LocalModelConfig, DEFAULT_CONFIG
 from .exceptions import LocalModelError, ModelLoadError, GenerationError, TimeoutError as DualTrackTimeoutError
 from .model_manager import model_manager
+from .prompt_cache import PromptPrefixCache
+from ..utils.kv_snapshot import SystemPromptSnapshot
+from ..utils.inference_scheduler import InferenceScheduler
+from ..utils.cancellation import CancellationToken, CancellationStats, REASON_CANCELLED
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a stream produced on the generation thread
+_STREAM_END = object()
+
+# Fixed system prompt that starts every local-model prompt
+VANTA_SYSTEM_PROMPT = """You are VANTA, a helpful AI assistant. Instructions:
+
+- Be conversational, helpful, and proactive in your responses
+- When recalling user information, ONLY use facts explicitly mentioned in the conversation history
+- If asked about user details not in the conversation, say "I don't have that information from our conversation"
+- For general questions or conversation, respond naturally without needing prior information
+- When user asks you to ask them something, be specific and direct (e.g., "What's your name?" or "What do you do for work?")
+- Keep responses concise but friendly
+- Be honest about memory limitations only when relevant
+
+Be natural and helpful in conversation while being factual about user information."""
+
 
 @dataclass
 class LocalModelResponse:
     """Response from local model generation."""
     text: str
-    tokens_used: int
+    tokens_used: int  # Tokens generated (completion tokens), also when cancelled
     generation_time: float
     finish_reason: str
     model_info: Dict[str, Any]
@@ -61,14 +82,57 @@ class LocalModel:
         self.total_tokens = 0
         self.total_time = 0.0
         
+        # Generation abandoned through a cancel token, and what stopping it saved
+        self.cancellation = CancellationStats(self.config.max_tokens)
+        
         # Thread pool for generation
         self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-model")
+        self._queued = 0  # Generation tasks waiting for or running on the executor
+        self._queued_lock = threading.Lock()
+        
+        # Token-level scheduler over several contexts, when configured
+        self.scheduler: Optional[InferenceScheduler] = None
+        self.context_caches: Dict[int, PromptPrefixCache] = {}
+        
+        # KV state of the system prompt, computed once per model and prompt
+        self.system_snapshot: Optional[SystemPromptSnapshot] = None
+        if self.config.system_prompt_snapshot:
+            self.system_snapshot = SystemPromptSnapshot(
+                model_path=self.config.model_path,
+                context_size=self.config.context_window,
+                prompt=VANTA_SYSTEM_PROMPT,
+                snapshot_dir=self.config.snapshot_dir
+            )
+        
+        # KV state of the stable prompt prefix, per conversation session
+        self.prefix_cache: Optional[PromptPrefixCache] = None
+        if self.config.prompt_cache:
+            self.prefix_cache = PromptPrefixCache(
+                model_key=f"{self.config.model_path}:{self.config.context_window}",
+                max_sessions=self.config.prompt_cache_sessions,
+                persist_directory=self.config.prompt_cache_dir
+            )
+            self.prefix_cache.base_snapshot = self.system_snapshot
         
+        self.load_error: Optional[str] = None
         if self.config.preload:
-            try:
-                self.load_model()
-            except Exception as e:
-                self.logger.warning(f"Failed to preload model: {e}")
+            if self.config.background_preload:
+                # The first generate() waits on loading_lock instead of loading itself
+                threading.Thread(target=self._preload, name="local-model-preload", daemon=True).start()
+            else:
+                self._preload()
+    
+    def _preload(self) -> None:
+        """Load the model ahead of the first request."""
+        try:
+            self.load_model()
+        except Exception as e:
+            self.load_error = str(e)
+            self.logger.warning(f"Failed to preload model: {e}")
+    
+    def is_ready(self) -> bool:
+        """Readiness probe: True when generate() will not have to load the model."""
+        return self.is_loaded
     
     def load_model(self) -> bool:
         """Load the local model."""
@@ -95,6 +159,8 @@ class LocalModel:
                     "n_ctx": self.config.context_window,
                     "verbose": False,
                     "seed": -1,  # Random seed
+                    "use_mmap": self.config.use_mmap,
+                    "use_mlock": self.config.use_mlock,
                 }
                 
                 # Add optional parameters
@@ -117,7 +183,15 @@ class LocalModel:
                     "n_gpu_layers": getattr(self.model, 'n_gpu_layers', None),
                 }
                 
+                # Start from the precomputed system-prompt state
+                if self.system_snapshot is not None:
+                    self._warm_system_prompt()
+                
+                if self.config.inference_contexts > 1:
+                    self._start_scheduler(Llama, model_params)
+                
                 self.is_loaded = True
+                self.load_error = None
                 self.logger.info(f"Model loaded successfully in {load_time:.2f}s")
                 return True
                 
@@ -125,15 +199,72 @@ class LocalModel:
                 self.logger.error(f"Failed to load model: {e}")
                 raise ModelLoadError(f"Failed to load model: {str(e)}")
     
-    def generate(self, query: str, context: Optional[Dict[str, Any]] = None) -> LocalModelResponse:
-        """Generate a response to the given query."""
+    def _warm_system_prompt(self) -> None:
+        """Restore or compute the system-prompt KV state after a load."""
+        try:
+            restored = self.system_snapshot.warm(self.model)
+            self.model_info["system_prompt_restored"] = restored
+            self.model_info["system_prompt_warm_time"] = self.system_snapshot.stats["last_warm_seconds"]
+        except Exception as e:
+            # A missing snapshot only costs latency, never correctness
+            self.logger.warning(f"Failed to warm system prompt state: {e}")
+    
+    def _start_scheduler(self, llama_class, model_params: Dict[str, Any]) -> None:
+        """Open extra contexts on the same weights and start the scheduler."""
+        contexts = [self.model]
+        for _ in range(self.config.inference_contexts - 1):
+            # use_mmap shares the weights; each context only adds a KV cache
+            context = llama_class(**{**model_params, "use_mmap": True})
+            if self.system_snapshot is not None:
+                self.system_snapshot.restore(context)
+            contexts.append(context)
+        
+        # Each context keeps its own per-session KV snapshots
+        self.context_caches = {}
+        for context in contexts:
+            cache = self.prefix_cache
+            if context is not self.model and self.prefix_cache is not None:
+                cache = PromptPrefixCache(
+                    model_key=self.prefix_cache.model_key,
+                    max_sessions=self.config.prompt_cache_sessions
+                )
+                cache.base_snapshot = self.system_snapshot
+            if cache is not None:
+                self.context_caches[id(context)] = cache
+        
+        self.scheduler = InferenceScheduler(contexts, {"max_queue_size": self.config.max_queued_requests})
+        self.scheduler.start()
+        self.model_info["inference_contexts"] = len(contexts)
+    
+    def generate(self,
+                 query: str,
+                 context: Optional[Dict[str, Any]] = None,
+                 cancel: Optional[CancellationToken] = None) -> LocalModelResponse:
+        """
+        Generate a response to the given query.
+        
+        When `cancel` is cancelled (e.g. because the other track won),
+        a request still waiting for the generation thread is dropped and a
+        running one stops at its next token; the text so far is returned
+        with finish_reason "cancelled".
+        """
         if not self.is_loaded:
             if not self.load_model():
                 raise LocalModelError("Model not loaded and failed to load")
         
+        if cancel is not None and cancel.is_set():
+            return self._cancelled_response("", 0, 0.0, cancel)
+        
+        if self.scheduler is not None:
+            return self._generate_scheduled(query, context, cancel)
+        
+        drop_queued = None
         try:
             # Submit generation task to thread pool with timeout
-            future = self.executor.submit(self._generate_sync, query, context)
+            future = self._submit(self._generate_sync, query, context, cancel)
+            if cancel is not None:
+                drop_queued = future.cancel
+                cancel.add_callback(drop_queued)
             response = future.result(timeout=self.config.generation_timeout)
             
             # Track statistics
@@ -143,6 +274,9 @@ class LocalModel:
             
             return response
             
+        except CancelledError:
+            # Dropped before the generation thread picked it up
+            return self._cancelled_response("", 0, 0.0, cancel)
         except TimeoutError:
             error_msg = f"Generation timed out after {self.config.generation_timeout}s"
             self.logger.warning(error_msg)
@@ -151,44 +285,67 @@ class LocalModel:
             error_msg = f"Generation failed: {str(e)}"
             self.logger.error(error_msg)
             raise GenerationError(error_msg)
+        finally:
+            if drop_queued is not None:
+                cancel.remove_callback(drop_queued)
     
-    def _generate_sync(self, query: str, context: Optional[Dict[str, Any]]) -> LocalModelResponse:
+    def _generate_sync(self,
+                       query: str,
+                       context: Optional[Dict[str, Any]],
+                       cancel: Optional[CancellationToken] = None) -> LocalModelResponse:
         """Synchronous generation method."""
         start_time = time.time()
         
         try:
+            if cancel is not None and cancel.is_set():
+                return self._cancelled_response("", 0, 0.0, cancel)
+            
             # Build prompt with context
             prompt = self._build_prompt(query, context)
             
-            # Set generation parameters
-            params = {
-                "prompt": prompt,
-                "max_tokens": self.config.max_tokens,
-                "temperature": self.config.temperature,
-                "top_p": self.config.top_p,
-                "top_k": self.config.top_k,
-                "repeat_penalty": self.config.repeat_penalty,
-                "stop": ["USER:", "Human:", "\n\n"],  # Stop sequences
-                "echo": False
-            }
+            # Restore this session's KV state so only the new suffix is evaluated
+            cached_tokens = 0
+            if self.prefix_cache is not None:
+                session_id = context.get("session_id") if context else None
+                cached_tokens = self.prefix_cache.prepare(self.model, prompt, session_id)
+            
+            model_info = self.model_info.copy()
+            model_info["cached_prompt_tokens"] = cached_tokens
+            
+            if cancel is not None:
+                # Streamed so decoding can stop between tokens
+                text, completion_tokens, finish_reason = self._complete_cancellable(prompt, cancel)
+                generation_time = time.time() - start_time
+                if finish_reason == "cancelled":
+                    return self._cancelled_response(text.strip(), completion_tokens, generation_time, cancel,
+                                                    model_info)
+                self.cancellation.record_completed(completion_tokens, generation_time)
+                return LocalModelResponse(
+                    text=text.strip(),
+                    tokens_used=completion_tokens,
+                    generation_time=generation_time,
+                    finish_reason=finish_reason,
+                    model_info=model_info
+                )
             
             # Generate response
-            result = self.model(**params)
+            result = self.model(prompt=prompt, **self._completion_params())
             
             # Extract response text
             response_text = result["choices"][0]["text"].strip()
             
             # Calculate metrics
             generation_time = time.time() - start_time
-            tokens_used = result["usage"]["total_tokens"]
+            tokens_used = result["usage"].get("completion_tokens", 0)
             finish_reason = result["choices"][0]["finish_reason"]
+            self.cancellation.record_completed(tokens_used, generation_time)
             
             return LocalModelResponse(
                 text=response_text,
                 tokens_used=tokens_used,
                 generation_time=generation_time,
                 finish_reason=finish_reason,
-                model_info=self.model_info.copy()
+                model_info=model_info
             )
             
         except Exception as e:
@@ -204,20 +361,285 @@ class LocalModel:
                 error=error_msg
             )
     
+    def _complete_cancellable(self, prompt: str, cancel: CancellationToken) -> Tuple[str, int, str]:
+        """Run a completion token by token, stopping once cancel is set."""
+        pieces: List[str] = []
+        finish_reason = "length"
+        stream = self.model(prompt=prompt, stream=True, **self._completion_params())
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    finish_reason = "cancelled"
+                    break
+                choice = chunk["choices"][0]
+                pieces.append(choice["text"])
+                if choice.get("finish_reason"):
+                    finish_reason = choice["finish_reason"]
+        finally:
+            stream.close()
+        return "".join(pieces), len(pieces), finish_reason
+    
+    def _cancelled_response(self,
+                            text: str,
+                            completion_tokens: int,
+                            generation_time: float,
+                            cancel: Optional[CancellationToken],
+                            model_info: Optional[Dict[str, Any]] = None) -> LocalModelResponse:
+        """Record abandoned generation and return what was generated before it stopped."""
+        model_info = dict(model_info if model_info is not None else self.model_info)
+        model_info["cancellation"] = self.cancellation.record_cancelled(
+            completion_tokens, generation_time, (cancel.reason if cancel is not None else None) or REASON_CANCELLED
+        )
+        return LocalModelResponse(
+            text=text,
+            tokens_used=completion_tokens,
+            generation_time=generation_time,
+            finish_reason="cancelled",
+            model_info=model_info
+        )
+    
+    def _generate_scheduled(self,
+                            query: str,
+                            context: Optional[Dict[str, Any]],
+                            cancel: Optional[CancellationToken] = None) -> LocalModelResponse:
+        """Generate through the scheduler alongside other in-flight requests."""
+        prompt = self._build_prompt(query, context)
+        session_id = context.get("session_id") if context else None
+        priority = context.get("priority") if context else None
+        
+        def prepare(model) -> int:
+            cache = self.context_caches.get(id(model))
+            return cache.prepare(model, prompt, session_id) if cache is not None else 0
+        
+        request = None
+        try:
+            request = self.scheduler.submit(
+                prompt, self._completion_params(), priority, affinity=session_id, prepare=prepare
+            )
+            if cancel is not None:
+                # The scheduler drops or stops the request at its next step
+                cancel.add_callback(request.cancel)
+            result = request.result(timeout=self.config.generation_timeout)
+        except TimeoutError:
+            request.cancel()
+            error_msg = f"Generation timed out after {self.config.generation_timeout}s"
+            self.logger.warning(error_msg)
+            raise DualTrackTimeoutError(error_msg)
+        except Exception as e:
+            error_msg = f"Generation failed: {str(e)}"
+            self.logger.error(error_msg)
+            raise GenerationError(error_msg)
+        finally:
+            if cancel is not None and request is not None:
+                cancel.remove_callback(request.cancel)
+        
+        model_info = self.model_info.copy()
+        model_info["cached_prompt_tokens"] = request.prepare_result or 0
+        model_info["queue_time"] = result["queue_time"]
+        
+        completion_tokens = result["usage"]["completion_tokens"]
+        if request.cancelled and request.finish_reason is None:
+            return self._cancelled_response(result["text"].strip(), completion_tokens,
+                                            result["generation_time"], cancel, model_info)
+        self.cancellation.record_completed(completion_tokens, result["generation_time"])
+        
+        response = LocalModelResponse(
+            text=result["text"].strip(),
+            tokens_used=completion_tokens,
+            generation_time=result["generation_time"],
+            finish_reason=result["finish_reason"],
+            model_info=model_info
+        )
+        
+        self.generation_count += 1
+        self.total_tokens += response.tokens_used
+        self.total_time += response.generation_time
+        return response
+    
+    def generate_stream(self,
+                        query: str,
+                        context: Optional[Dict[str, Any]] = None,
+                        cancel: Optional[CancellationToken] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a response to the given query token by token.
+        
+        Yields chunks with the new "text", "finish_reason" (None until the
+        last chunk), running "usage" and "generation_time" since the request
+        started. The first chunk also carries "time_to_first_token" and the
+        last one the "model_info". Closing the generator or setting `cancel`
+        stops generation; the stream then ends without a finish_reason.
+        """
+        if not self.is_loaded:
+            if not self.load_model():
+                raise LocalModelError("Model not loaded and failed to load")
+        
+        prompt = self._build_prompt(query, context)
+        session_id = context.get("session_id") if context else None
+        model_info = self.model_info.copy()
+        model_info["cached_prompt_tokens"] = 0
+        
+        start_time = time.perf_counter()
+        if self.scheduler is not None:
+            priority = context.get("priority") if context else None
+            pieces = self._scheduled_pieces(prompt, session_id, priority, model_info, cancel)
+        else:
+            pieces = self._executor_pieces(prompt, session_id, start_time + self.config.generation_timeout,
+                                           model_info, cancel)
+        
+        completion_tokens = 0
+        time_to_first_token = None
+        finished = failed = False
+        try:
+            for text, finish_reason in pieces:
+                elapsed = time.perf_counter() - start_time
+                completion_tokens += 1
+                chunk = {
+                    "text": text,
+                    "finish_reason": finish_reason,
+                    "usage": {"completion_tokens": completion_tokens},
+                    "generation_time": elapsed,
+                }
+                if time_to_first_token is None:
+                    time_to_first_token = elapsed
+                    chunk["time_to_first_token"] = elapsed
+                if finish_reason is not None:
+                    finished = True
+                    chunk["model_info"] = model_info
+                yield chunk
+        except DualTrackTimeoutError:
+            failed = True
+            raise
+        except Exception as e:
+            failed = True
+            error_msg = f"Streaming generation failed: {str(e)}"
+            self.logger.error(error_msg)
+            raise GenerationError(error_msg)
+        finally:
+            pieces.close()
+            elapsed = time.perf_counter() - start_time
+            self.generation_count += 1
+            self.total_tokens += completion_tokens
+            self.total_time += elapsed
+            if finished:
+                self.cancellation.record_completed(completion_tokens, elapsed)
+            elif not failed:
+                # Closed or cancelled before the model finished
+                model_info["cancellation"] = self.cancellation.record_cancelled(
+                    completion_tokens, elapsed, (cancel.reason if cancel is not None else None) or REASON_CANCELLED
+                )
+    
+    def _executor_pieces(self,
+                         prompt: str,
+                         session_id: Optional[str],
+                         deadline: float,
+                         model_info: Dict[str, Any],
+                         cancel: Optional[CancellationToken] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """Stream from the generation thread, so requests stay serialized on the model."""
+        chunks: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+        future = self._submit(self._stream_sync, prompt, session_id, chunks, cancelled, model_info, cancel)
+        
+        def drop_queued() -> None:
+            # Not started yet: it never will, so end the stream here
+            if future.cancel():
+                chunks.put(_STREAM_END)
+        
+        if cancel is not None:
+            cancel.add_callback(drop_queued)
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=max(deadline - time.perf_counter(), 0.0))
+                except queue.Empty:
+                    error_msg = f"Generation timed out after {self.config.generation_timeout}s"
+                    self.logger.warning(error_msg)
+                    raise DualTrackTimeoutError(error_msg)
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            if cancel is not None:
+                cancel.remove_callback(drop_queued)
+    
+    def _stream_sync(self,
+                     prompt: str,
+                     session_id: Optional[str],
+                     chunks: queue.Queue,
+                     cancelled: threading.Event,
+                     model_info: Dict[str, Any],
+                     cancel: Optional[CancellationToken] = None) -> None:
+        """Run a streaming completion on the generation thread."""
+        def stopped() -> bool:
+            return cancelled.is_set() or (cancel is not None and cancel.is_set())
+        
+        try:
+            if stopped():
+                return
+            if self.prefix_cache is not None:
+                model_info["cached_prompt_tokens"] = self.prefix_cache.prepare(self.model, prompt, session_id)
+            
+            stream = self.model(prompt=prompt, stream=True, **self._completion_params())
+            try:
+                for chunk in stream:
+                    if stopped():
+                        break
+                    choice = chunk["choices"][0]
+                    chunks.put((choice["text"], choice.get("finish_reason")))
+            finally:
+                stream.close()
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_STREAM_END)
+    
+    def _scheduled_pieces(self,
+                          prompt: str,
+                          session_id: Optional[str],
+                          priority: Optional[str],
+                          model_info: Dict[str, Any],
+                          cancel: Optional[CancellationToken] = None) -> Iterator[Tuple[str, Optional[str]]]:
+        """Stream through the scheduler alongside other in-flight requests."""
+        def prepare(model) -> int:
+            cache = self.context_caches.get(id(model))
+            return cache.prepare(model, prompt, session_id) if cache is not None else 0
+        
+        request = self.scheduler.submit(
+            prompt, self._completion_params(), priority, affinity=session_id, prepare=prepare
+        )
+        if cancel is not None:
+            cancel.add_callback(request.cancel)
+        try:
+            for chunk in request.stream(timeout=self.config.generation_timeout):
+                model_info["cached_prompt_tokens"] = request.prepare_result or 0
+                yield chunk["text"], chunk["finish_reason"]
+        except TimeoutError:
+            error_msg = f"Generation timed out after {self.config.generation_timeout}s"
+            self.logger.warning(error_msg)
+            raise DualTrackTimeoutError(error_msg)
+        finally:
+            request.cancel()
+            if cancel is not None:
+                cancel.remove_callback(request.cancel)
+    
+    def _completion_params(self) -> Dict[str, Any]:
+        """Completion parameters shared by every request."""
+        return {
+            "max_tokens": self.config.max_tokens,
+            "temperature": self.config.temperature,
+            "top_p": self.config.top_p,
+            "top_k": self.config.top_k,
+            "repeat_penalty": self.config.repeat_penalty,
+            "stop": ["USER:", "Human:", "\n\n"],  # Stop sequences
+            "echo": False
+        }
+    
     def _build_prompt(self, query: str, context: Optional[Dict[str, Any]]) -> str:
         """Build a prompt with query and LangGraph conversation context."""
         # VANTA system prompt for natural conversation with memory safety
-        system_prompt = """You are VANTA, a helpful AI assistant. Instructions:
-
-- Be conversational, helpful, and proactive in your responses
-- When recalling user information, ONLY use facts explicitly mentioned in the conversation history
-- If asked about user details not in the conversation, say "I don't have that information from our conversation"
-- For general questions or conversation, respond naturally without needing prior information
-- When user asks you to ask them something, be specific and direct (e.g., "What's your name?" or "What do you do for work?")
-- Keep responses concise but friendly
-- Be honest about memory limitations only when relevant
-
-Be natural and helpful in conversation while being factual about user information."""
+        system_prompt = VANTA_SYSTEM_PROMPT
         
         # Build conversation history from LangGraph messages
         conversation_str = ""
@@ -250,9 +672,11 @@ Be natural and helpful in conversation while being factual about user informatio
             # Add other context if provided
             other_context = []
             for key, value in context.items():
-                if key not in ["messages", "conversation_history"] and isinstance(value, (str, int, float)) and value:
+                if key in ["messages", "conversation_history", "session_id", "priority"]:
+                    continue
+                if isinstance(value, (str, int, float)) and value:
                     other_context.append(f"- {key}: {value}")
-                elif key not in ["messages", "conversation_history"] and isinstance(value, list) and value:
+                elif isinstance(value, list) and value:
                     other_context.append(f"- {key}: {', '.join(map(str, value[:3]))}")
             
             if other_context:
@@ -261,6 +685,33 @@ Be natural and helpful in conversation while being factual about user informatio
         # Build the complete prompt with conversation context
         return f"{system_prompt}{conversation_str}\n\nUSER: {query}\nASSISTANT:"
     
+    def _submit(self, fn, *args) -> Future:
+        """Submit generation work to the executor, counting it until it finishes."""
+        with self._queued_lock:
+            self._queued += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._finished(None)
+            raise
+        future.add_done_callback(self._finished)
+        return future
+    
+    def _finished(self, future: Optional[Future]) -> None:
+        with self._queued_lock:
+            self._queued -= 1
+    
+    def queue_depth(self) -> int:
+        """
+        Requests a new one would wait behind.
+        
+        Counts the requests queued or running on the generation thread, or
+        with the scheduler, the requests still waiting for a context.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.queue_depth()
+        return self._queued
+    
     def get_model_stats(self) -> Dict[str, Any]:
         """Get model performance statistics."""
         avg_time = self.total_time / self.generation_count if self.generation_count > 0 else 0
@@ -274,7 +725,12 @@ Be natural and helpful in conversation while being factual about user informatio
             "total_time": self.total_time,
             "average_generation_time": avg_time,
             "average_tokens_per_generation": avg_tokens,
-            "tokens_per_second": self.total_tokens / self.total_time if self.total_time > 0 else 0
+            "tokens_per_second": self.total_tokens / self.total_time if self.total_time > 0 else 0,
+            "prefix_cache": self.prefix_cache.get_stats() if self.prefix_cache else None,
+            "system_snapshot": self.system_snapshot.get_stats() if self.system_snapshot else None,
+            "scheduler": self.scheduler.get_stats() if self.scheduler else None,
+            "cancellation": self.cancellation.get_stats(),
+            "queue_depth": self.queue_depth()
         }
     
     def reset_stats(self):
@@ -282,11 +738,21 @@ Be natural and helpful in conversation while being factual about user informatio
         self.generation_count = 0
         self.total_tokens = 0
         self.total_time = 0.0
+        self.cancellation.reset()
     
     def unload_model(self):
         """Unload the model to free memory."""
         with self.loading_lock:
+            if self.scheduler is not None:
+                self.scheduler.stop()
+                self.scheduler = None
+                self.context_caches = {}
+            
             if self.model is not None:
+                # Keep sessions warm across the reload
+                if self.prefix_cache is not None:
+                    self.prefix_cache.detach(self.model)
+                    self.prefix_cache.persist()
                 del self.model
                 self.model = None
                 self.is_loaded = False
@@ -296,6 +762,8 @@ Be natural and helpful in conversation while being factual about user informatio
         """Cleanup when object is destroyed."""
         if hasattr(self, 'executor'):
             self.executor.shutdown(wait=False)
+        if getattr(self, 'scheduler', None) is not None:
+            self.scheduler.stop(timeout=0)
         if hasattr(self, 'model') and self.model is not None:
             del self.model
 
@@ -311,15 +779,18 @@ class LocalModelController:
         self.model = LocalModel(config)
         self.request_count = 0
         
-    def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Process a query with the local model."""
+    def process_query(self,
+                      query: str,
+                      context: Optional[Dict[str, Any]] = None,
+                      cancel: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Process a query with the local model; `cancel` abandons it (see LocalModel.generate)."""
         self.request_count += 1
         
         try:
             self.logger.debug(f"Processing query with local model: {query[:50]}...")
             
             # Generate response
-            response = self.model.generate(query, context)
+            response = self.model.generate(query, context, cancel=cancel)
             
             # Format response for dual-track system
             return {
@@ -352,6 +823,97 @@ class LocalModelController:
                 "success": False
             }
     
+    def process_query_stream(self,
+                             query: str,
+                             context: Optional[Dict[str, Any]] = None,
+                             on_token: Optional[Callable[[Dict[str, Any]], None]] = None,
+                             cancel: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """
+        Process a query with the local model, streaming tokens as they are generated.
+        
+        Args:
+            query: User query
+            context: Conversation context
+            on_token: Called with each chunk from LocalModel.generate_stream
+            cancel: When cancelled, generation stops at the next token and the
+                text so far is returned with finish_reason "cancelled"
+        
+        Returns:
+            The same result as process_query, with the time to first token
+            reported separately from the total generation time
+        """
+        self.request_count += 1
+        start_time = time.perf_counter()
+        
+        text = ""
+        tokens_used = 0
+        finish_reason = None
+        time_to_first_token = None
+        model_info: Dict[str, Any] = {}
+        
+        try:
+            self.logger.debug(f"Streaming query with local model: {query[:50]}...")
+            
+            # The token also reaches the generation thread, which stops
+            # decoding even while no token is being consumed here
+            stream = self.model.generate_stream(query, context, cancel=cancel)
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    stream.close()
+                    finish_reason = "cancelled"
+                    break
+                text += chunk["text"]
+                tokens_used = chunk["usage"]["completion_tokens"]
+                if "time_to_first_token" in chunk:
+                    time_to_first_token = chunk["time_to_first_token"]
+                if chunk["finish_reason"] is not None:
+                    finish_reason = chunk["finish_reason"]
+                    model_info = chunk.get("model_info", model_info)
+                
+                if on_token is not None:
+                    try:
+                        on_token(chunk)
+                    except Exception as e:
+                        # A slow or broken consumer must not cost the response
+                        self.logger.warning(f"Token callback failed: {e}")
+            if finish_reason is None:
+                # Stopped on the generation thread before another token arrived
+                finish_reason = "cancelled" if cancel is not None and cancel.is_set() else "length"
+            
+            return {
+                "text": text.strip(),
+                "source": "local_model",
+                "metadata": {
+                    "tokens_used": tokens_used,
+                    "generation_time": time.perf_counter() - start_time,
+                    "time_to_first_token": time_to_first_token,
+                    "finish_reason": finish_reason,
+                    "model_info": model_info,
+                    "request_id": self.request_count,
+                    "streamed": True
+                },
+                "error": None,
+                "success": True
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Local model streaming failed: {e}")
+            return {
+                "text": text.strip() or "I'm sorry, but I'm having trouble processing your request right now.",
+                "source": "local_model",
+                "metadata": {
+                    "tokens_used": tokens_used,
+                    "generation_time": time.perf_counter() - start_time,
+                    "time_to_first_token": time_to_first_token,
+                    "finish_reason": "error",
+                    "model_info": model_info,
+                    "request_id": self.request_count,
+                    "streamed": True
+                },
+                "error": str(e),
+                "success": False
+            }
+    
     def is_available(self) -> bool:
         """Check if the local model is available."""
         return self.model.is_loaded or self.model.load_model()
@@ -23,6 +23,7 @@ class ModelInfo:
     max_tokens: int
     recommended_temp: float = 0.7
     quality_tier: str = "standard"  # basic, standard, high, premium
+    draft_model: Optional[str] = None  # Key of a smaller model with the same tokenizer, for speculative decoding
 
 
 class ModelManager:
@@ -42,7 +43,8 @@ class ModelManager:
                 memory_usage="~4GB",
                 context_window=2048,
                 max_tokens=512,
-                quality_tier="basic"
+                quality_tier="basic",
+                draft_model="tinyllama-1.1b-q4"
             ),
             "llama31-70b-q8": ModelInfo(
                 name="Llama 3.1 70B (Q8_0)",
@@ -52,7 +54,8 @@ class ModelManager:
                 context_window=8192,
                 max_tokens=1024,
                 recommended_temp=0.7,
-                quality_tier="premium"
+                quality_tier="premium",
+                draft_model="llama32-1b-q8"
             ),
             "llama31-70b-base": ModelInfo(
                 name="Llama 3.1 70B (Base)",
@@ -72,7 +75,27 @@ class ModelManager:
                 context_window=8192,
                 max_tokens=1024,
                 recommended_temp=0.7,
-                quality_tier="high"
+                quality_tier="high",
+                draft_model="llama32-1b-q8"
+            ),
+            # Draft models: propose tokens for a larger model with the same tokenizer
+            "tinyllama-1.1b-q4": ModelInfo(
+                name="TinyLlama 1.1B Chat (Q4_K_M)",
+                path="tinyllama-1.1b-chat-v1.0.Q4_K_M.gguf",
+                description="Draft model for speculative decoding with Llama 2",
+                memory_usage="~0.7GB",
+                context_window=2048,
+                max_tokens=512,
+                quality_tier="draft"
+            ),
+            "llama32-1b-q8": ModelInfo(
+                name="Llama 3.2 1B (Q8_0)",
+                path="Llama-3.2-1B-Instruct-Q8_0.gguf",
+                description="Draft model for speculative decoding with Llama 3.1",
+                memory_usage="~1.3GB",
+                context_window=8192,
+                max_tokens=1024,
+                quality_tier="draft"
             )
         }
         
@@ -116,6 +139,13 @@ class ModelManager:
         model_path = self.models_dir / model_info.path
         return str(model_path) if model_path.exists() else None
     
+    def get_draft_model_path(self, model_key: str) -> Optional[str]:
+        """Get the path to a downloaded draft model for speculative decoding."""
+        model_info = self.get_model_info(model_key)
+        if not model_info or not model_info.draft_model:
+            return None
+        return self.get_model_path(model_info.draft_model)
+    
     def get_download_urls(self, model_key: str) -> List[str]:
         """Get download URLs for a model."""
         urls = {
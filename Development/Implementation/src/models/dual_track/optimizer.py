@@ -23,6 +23,8 @@ import statistics
 import json
 
 from .exceptions import DualTrackOptimizationError
+from .route_classifier import RouteOutcome, has_context, save_traces
+from .latency_model import context_queue_depth
 
 
 class OptimizationStrategy(Enum):
@@ -75,6 +77,7 @@ class OptimizationConfig:
     enable_preemption: bool = True
     enable_resource_monitoring: bool = True
     monitor_interval_seconds: float = 1.0
+    route_trace_size: int = 10000  # Routing outcomes kept for learning and offline evaluation
 
 
 class MetricsCollector:
@@ -502,6 +505,10 @@ class DualTrackOptimizer:
         self.active_requests = {}
         self.request_lock = threading.Lock()
         
+        # Routing outcomes, for the learned router and offline evaluation
+        self.route_outcomes: deque = deque(maxlen=config.route_trace_size)
+        self.outcome_listeners: List[Callable[[RouteOutcome], None]] = []
+        
         self._started = False
     
     def start(self) -> None:
@@ -577,6 +584,46 @@ class DualTrackOptimizer:
         )
         
         self.metrics_collector.record_metric(metric)
+        
+        # Log how the chosen path did for this query
+        outcome = RouteOutcome(
+            query=request_info["query"] or "",
+            path=processing_path,
+            success=success,
+            latency_ms=latency_ms,
+            quality_score=quality_score,
+            has_context=has_context(request_info["context"]),
+            prompt_tokens=len((request_info["query"] or "").split()),
+            queue_depth=context_queue_depth(request_info["context"]),
+            timestamp=end_time
+        )
+        self.route_outcomes.append(outcome)
+        for listener in list(self.outcome_listeners):
+            try:
+                listener(outcome)
+            except Exception as e:
+                self.logger.warning(f"Routing outcome listener failed: {e}")
+    
+    def add_outcome_listener(self, listener: Callable[[RouteOutcome], None]) -> None:
+        """
+        Call a function with each routing outcome, e.g. ProcessingRouter.learn.
+        
+        Args:
+            listener: Function taking a RouteOutcome
+        """
+        self.outcome_listeners.append(listener)
+    
+    def export_route_traces(self, path: str) -> int:
+        """
+        Write the recorded routing outcomes to a JSON-lines trace file.
+        
+        Args:
+            path: File to write
+            
+        Returns:
+            Number of outcomes written
+        """
+        return save_traces(list(self.route_outcomes), path)
     
     def get_optimization_recommendations(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
         """Get optimization recommendations for a query."""
@@ -656,6 +703,7 @@ class DualTrackOptimizer:
             "resource_usage": self.resource_monitor.get_current_usage(),
             "metrics_summary": self.metrics_collector.get_metrics_summary(),
             "active_requests": len(self.active_requests),
+            "route_outcomes": len(self.route_outcomes),
             "started": self._started
         }
 
@@ -0,0 +1,262 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+# DOC-REF: DOC-DEV-ARCH-COMP-2 - Dual-Track Processing Component Specification
+
+"""
+Session-aware prompt-prefix KV cache for the local model.
+
+llama.cpp keeps the KV state of the last evaluated tokens and only evaluates
+the part of a new prompt after the longest common token prefix. That reuse is
+lost whenever another session uses the model in between, and on every
+restart. This cache snapshots the KV state of the session being switched
+away from, restores it when that session returns, and can persist snapshots
+to disk so a session resumes warm after a reload.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Sequence
+
+from ..utils.kv_snapshot import SystemPromptSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+
+
+def common_prefix_length(a: Sequence[int], b: Sequence[int]) -> int:
+    """Return the length of the longest common prefix of two token sequences."""
+    limit = min(len(a), len(b))
+    for i in range(limit):
+        if a[i] != b[i]:
+            return i
+    return limit
+
+
+def _evaluated_tokens(model) -> List[int]:
+    """Tokens whose KV state is currently held by a llama_cpp.Llama instance."""
+    input_ids = getattr(model, "_input_ids", None)
+    if input_ids is None:
+        return []
+    return list(input_ids)
+
+
+class PromptPrefixCache:
+    """Keeps per-session llama.cpp KV state so each turn evaluates only the delta."""
+
+    def __init__(self,
+                 model_key: str,
+                 max_sessions: int = 4,
+                 persist_directory: Optional[str] = None):
+        """
+        Initialize the prefix cache.
+
+        Args:
+            model_key: Identity of the model the states belong to (e.g. model
+                path and context size). Snapshots saved under another key are
+                ignored.
+            max_sessions: Snapshots of inactive sessions kept in memory.
+            persist_directory: Directory for on-disk snapshots, or None to keep
+                snapshots in memory only.
+        """
+        self.model_key = model_key
+        self.max_sessions = max_sessions
+        self.persist_directory = persist_directory
+        
+        # New sessions start from this state instead of an empty context
+        self.base_snapshot: Optional[SystemPromptSnapshot] = None
+
+        self._states: "OrderedDict[str, Any]" = OrderedDict()
+        self._active_session: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "turns": 0,
+            "prompt_tokens": 0,
+            "reused_tokens": 0,
+            "session_switches": 0,
+            "restored_from_memory": 0,
+            "restored_from_disk": 0,
+            "snapshots": 0,
+        }
+
+        if persist_directory:
+            os.makedirs(persist_directory, exist_ok=True)
+
+    def prepare(self, model, prompt: str, session_id: Optional[str] = None) -> int:
+        """
+        Make the model's KV state match the session before evaluating a prompt.
+
+        Call this immediately before ``model(prompt, ...)``. llama.cpp then
+        evaluates only the tokens after the returned prefix.
+
+        Args:
+            model: Loaded llama_cpp.Llama instance.
+            prompt: Prompt about to be evaluated.
+            session_id: Conversation the prompt belongs to.
+
+        Returns:
+            Number of prompt tokens whose KV state is reused.
+        """
+        session_id = session_id or DEFAULT_SESSION
+
+        with self._lock:
+            if session_id != self._active_session:
+                self._switch_session(model, session_id)
+
+            tokens = model.tokenize(prompt.encode("utf-8"))
+            reused = common_prefix_length(_evaluated_tokens(model), tokens)
+            # llama.cpp always re-evaluates the final prompt token for logits
+            reused = min(reused, max(len(tokens) - 1, 0))
+
+            self._stats["turns"] += 1
+            self._stats["prompt_tokens"] += len(tokens)
+            self._stats["reused_tokens"] += reused
+
+        logger.debug(f"Prefix cache: reusing {reused}/{len(tokens)} prompt tokens for session {session_id}")
+        return reused
+
+    def detach(self, model) -> None:
+        """
+        Snapshot the active session before the model is unloaded.
+
+        Args:
+            model: The llama_cpp.Llama instance about to be released.
+        """
+        with self._lock:
+            if self._active_session is not None and model is not None:
+                self._snapshot(model, self._active_session)
+            self._active_session = None
+
+    def persist(self) -> int:
+        """
+        Write all in-memory snapshots to the persist directory.
+
+        Returns:
+            Number of snapshots written.
+        """
+        if not self.persist_directory:
+            return 0
+
+        with self._lock:
+            items = list(self._states.items())
+
+        written = 0
+        for session_id, state in items:
+            if self._write_state(session_id, state):
+                written += 1
+        return written
+
+    def drop_session(self, session_id: str) -> None:
+        """
+        Forget a session's snapshot in memory and on disk.
+
+        Args:
+            session_id: Session to drop.
+        """
+        with self._lock:
+            self._states.pop(session_id, None)
+            if self._active_session == session_id:
+                self._active_session = None
+
+        if self.persist_directory:
+            path = self._state_path(session_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get prefix cache statistics.
+
+        Returns:
+            Dictionary with turn and token counters and the reuse ratio.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_sessions"] = len(self._states)
+            stats["active_session"] = self._active_session
+        stats["reuse_ratio"] = (
+            stats["reused_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+        )
+        return stats
+
+    def _switch_session(self, model, session_id: str) -> None:
+        """Snapshot the outgoing session and restore the incoming one."""
+        if self._active_session is not None:
+            self._snapshot(model, self._active_session)
+            self._stats["session_switches"] += 1
+
+        state = self._states.pop(session_id, None)
+        if state is not None:
+            self._stats["restored_from_memory"] += 1
+        else:
+            state = self._read_state(session_id)
+            if state is not None:
+                self._stats["restored_from_disk"] += 1
+
+        if state is not None:
+            model.load_state(state)
+        elif self._active_session is not None:
+            # Another session's tokens must not leak into this one's prefix
+            if self.base_snapshot is None or not self.base_snapshot.restore(model):
+                model.reset()
+
+        self._active_session = session_id
+
+    def _snapshot(self, model, session_id: str) -> None:
+        """Store the model's current KV state for a session."""
+        if not _evaluated_tokens(model):
+            return
+
+        self._states[session_id] = model.save_state()
+        self._states.move_to_end(session_id)
+        self._stats["snapshots"] += 1
+
+        while len(self._states) > self.max_sessions:
+            evicted_id, evicted_state = self._states.popitem(last=False)
+            # Evicted sessions stay warm on disk when persistence is enabled
+            if self.persist_directory:
+                self._write_state(evicted_id, evicted_state)
+
+    def _state_path(self, session_id: str) -> str:
+        """Path of a session's on-disk snapshot."""
+        digest = hashlib.sha256(f"{self.model_key}\0{session_id}".encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.persist_directory, f"{digest}.kvstate")
+
+    def _write_state(self, session_id: str, state: Any) -> bool:
+        """Atomically write a snapshot to disk."""
+        path = self._state_path(session_id)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"model_key": self.model_key, "session_id": session_id, "state": state}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to persist KV state for session {session_id}: {e}")
+            return False
+
+    def _read_state(self, session_id: str) -> Optional[Any]:
+        """Read a snapshot from disk if it exists and matches the model."""
+        if not self.persist_directory:
+            return None
+
+        path = self._state_path(session_id)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable KV state for session {session_id}: {e}")
+            return None
+
+        if payload.get("model_key") != self.model_key or payload.get("session_id") != session_id:
+            logger.info(f"Ignoring KV state for session {session_id} saved for a different model")
+            return None
+        return payload["state"]
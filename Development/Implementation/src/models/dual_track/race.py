@@ -0,0 +1,441 @@
+# TASK-REF: DP-002 - Dual-Track Response Integration System
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+# DOC-REF: DOC-DEV-ARCH-COMP-2 - Dual-Track Processing Component Specification
+
+"""
+First-phrase race for the parallel processing path.
+
+Waiting for both tracks before speaking makes a parallel turn as slow as its
+slower track. ParallelRace streams the local track and awaits the API track
+at the same time, and hands each phrase to the speech consumer as soon as it
+is complete. Once the first phrase is out, the integration strategy decides
+how the answer continues:
+
+- FASTEST: the track with the first phrase speaks the whole answer and the
+  other track is cancelled.
+- INTERRUPT: the local answer is spoken as it is generated. When the API
+  response arrives, the answer hands off to it at the next phrase boundary.
+- PREFERENCE: the local track's first phrase is spoken while the API request
+  finishes. The answer then continues with whichever response the
+  integrator prefers.
+- COMBINE: the local answer is spoken in full. The API response follows it
+  if it says something different.
+
+If the API response is ready before the local track's first phrase, the API
+response is spoken instead. A cancelled local track stops decoding at its
+next token. A cancelled API request releases its connection. Cancelling the
+turn's token (a barge-in) stops both tracks and ends the race silently.
+"""
+
+import re
+import time
+import asyncio
+import logging
+from concurrent.futures import Executor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import IntegrationConfig, IntegrationStrategy, DEFAULT_CONFIG
+from .integrator import ResponseIntegrator, IntegrationResult
+from ..utils.cancellation import CancellationToken, REASON_BARGE_IN, REASON_NOT_SELECTED
+
+logger = logging.getLogger(__name__)
+
+# Punctuation followed by whitespace, or a line break
+PHRASE_BOUNDARY = re.compile(r'[.!?;:,](?=\s)|\n')
+SENTENCE_END = ".!?\n"
+
+
+class PhraseSplitter:
+    """Cuts streamed text into phrases that can be synthesized on their own."""
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 160):
+        """
+        Initialize the splitter.
+
+        Args:
+            min_chars: Shortest phrase cut at a comma, semicolon or colon.
+                Sentence ends are always cut.
+            max_chars: Longest phrase; longer runs are cut at a space.
+        """
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return the phrases it completed."""
+        self.buffer += text
+        phrases = []
+        while True:
+            cut = self._cut()
+            if cut is None:
+                return phrases
+            phrase, self.buffer = self.buffer[:cut].strip(), self.buffer[cut:]
+            if phrase:
+                phrases.append(phrase)
+
+    def flush(self) -> Optional[str]:
+        """Return the unfinished phrase at the end of the text, if any."""
+        phrase, self.buffer = self.buffer.strip(), ""
+        return phrase or None
+
+    def split(self, text: str) -> List[str]:
+        """Cut a complete text into phrases."""
+        phrases = self.feed(text)
+        tail = self.flush()
+        return phrases + [tail] if tail else phrases
+
+    def _cut(self) -> Optional[int]:
+        for match in PHRASE_BOUNDARY.finditer(self.buffer):
+            if match.group() in SENTENCE_END or len(self.buffer[:match.end()].strip()) >= self.min_chars:
+                return match.end()
+        if len(self.buffer) > self.max_chars:
+            space = self.buffer.rfind(" ", 0, self.max_chars)
+            return space if space > 0 else self.max_chars
+        return None
+
+
+@dataclass
+class SpokenPhrase:
+    """A phrase handed to speech synthesis during a race."""
+    text: str
+    source: str  # "local", "api", "transition" or "fallback"
+    elapsed: float  # Seconds since the race started
+
+
+@dataclass
+class RaceResult:
+    """Outcome of a parallel race."""
+    integration: IntegrationResult
+    phrases: List[SpokenPhrase]
+    first_source: Optional[str]  # Track that spoke first
+    time_to_first_phrase: Optional[float]
+    cancelled: List[str] = field(default_factory=list)
+    local_response: Optional[Dict[str, Any]] = None
+    api_response: Optional[Dict[str, Any]] = None
+    local_processing_time: float = 0.0
+    api_processing_time: float = 0.0
+    interrupted: bool = False  # The user barged in before the answer was complete
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Integration result as stored in the processing state."""
+        return asdict(self.integration)
+
+
+class ParallelRace:
+    """Races the local and API tracks for the first spoken phrase."""
+
+    def __init__(self, local_controller, api_controller,
+                 integrator: Optional[ResponseIntegrator] = None,
+                 config: Optional[IntegrationConfig] = None,
+                 executor: Optional[Executor] = None):
+        """
+        Initialize the race.
+
+        Args:
+            local_controller: LocalModelController streaming the local track
+            api_controller: APIModelController for the API track
+            integrator: Integrator supplying preference scores and transitions
+            config: Integration configuration (strategy, phrase length)
+            executor: Executor for the blocking local stream (default loop executor if None)
+        """
+        self.config = config or DEFAULT_CONFIG.integration
+        self.local_controller = local_controller
+        self.api_controller = api_controller
+        self.integrator = integrator or ResponseIntegrator(self.config)
+        self.executor = executor
+
+        self.stats = {
+            "races": 0,
+            "local_first": 0,
+            "api_first": 0,
+            "handoffs": 0,
+            "local_cancelled": 0,
+            "api_cancelled": 0,
+            "barge_ins": 0,
+            "total_time_to_first_phrase": 0.0
+        }
+
+    async def run(self,
+                  query: str,
+                  local_context: Dict[str, Any],
+                  api_messages: List[Dict[str, str]],
+                  api_context: Dict[str, Any],
+                  on_phrase: Optional[Callable[[SpokenPhrase], None]] = None,
+                  cancel: Optional[CancellationToken] = None) -> RaceResult:
+        """
+        Run both tracks and speak the answer as it becomes available.
+
+        Args:
+            query: User query for the local track
+            local_context: Local track context
+            api_messages: API track messages
+            api_context: API track context
+            on_phrase: Called with each phrase as soon as it should be spoken
+            cancel: The turn's token; cancelling it from any thread stops
+                both tracks and speaks nothing more
+
+        Returns:
+            RaceResult with the spoken answer and both tracks' responses
+        """
+        loop = asyncio.get_running_loop()
+        strategy = self.config.strategy
+        start = time.perf_counter()
+
+        splitter = PhraseSplitter(self.config.min_phrase_chars)
+        phrases: List[SpokenPhrase] = []
+        held: List[str] = []  # Local phrases waiting on the API decision (PREFERENCE)
+        cancelled: List[str] = []
+        first: Optional[str] = None
+        handed_off = False
+
+        def speak(text: str, source: str) -> None:
+            phrase = SpokenPhrase(text, source, time.perf_counter() - start)
+            phrases.append(phrase)
+            if on_phrase is not None:
+                try:
+                    on_phrase(phrase)
+                except Exception as e:
+                    # A slow or broken consumer must not cost the response
+                    logger.warning(f"Phrase callback failed: {e}")
+
+        # Each track has its own token, also cancelled along with the turn's
+        stop_local = CancellationToken(parent=cancel)
+        stop_api = CancellationToken(parent=cancel)
+        barged_in = loop.create_future()
+
+        def barge_in() -> None:
+            try:
+                loop.call_soon_threadsafe(lambda: barged_in.done() or barged_in.set_result(None))
+            except RuntimeError:
+                pass  # The race is over and its loop closed
+
+        if cancel is not None:
+            cancel.add_callback(barge_in)
+
+        # Local track: stream on a worker thread, hand tokens to the loop
+        local_items: asyncio.Queue = asyncio.Queue()
+
+        def post(item: tuple) -> None:
+            try:
+                loop.call_soon_threadsafe(local_items.put_nowait, item)
+            except RuntimeError:
+                pass  # The race is over and its loop closed
+
+        def run_local() -> None:
+            result = None
+            try:
+                result = self.local_controller.process_query_stream(
+                    query, local_context, on_token=lambda chunk: post(("token", chunk)), cancel=stop_local
+                )
+            finally:
+                post(("done", result))
+
+        loop.run_in_executor(self.executor, run_local)
+        api_task = asyncio.ensure_future(self.api_controller.aprocess_query(api_messages, api_context,
+                                                                            cancel=stop_api))
+        local_get = asyncio.ensure_future(local_items.get())
+
+        local_response = api_response = None
+        local_done = api_done = interrupted = False
+        local_time = api_time = 0.0
+
+        def cancel_local(reason: str = REASON_NOT_SELECTED) -> None:
+            nonlocal local_done, local_time
+            stop_local.cancel(reason)
+            local_get.cancel()
+            local_done = True
+            local_time = time.perf_counter() - start
+            cancelled.append("local")
+
+        def cancel_api(reason: str = REASON_NOT_SELECTED) -> None:
+            nonlocal api_done, api_time
+            stop_api.cancel(reason)
+            api_task.cancel()
+            api_done = True
+            api_time = time.perf_counter() - start
+            cancelled.append("api")
+
+        def local_phrase(text: str) -> None:
+            nonlocal first
+            if first is None:
+                first = "local"
+                speak(text, "local")
+                if strategy == IntegrationStrategy.FASTEST and not api_done:
+                    cancel_api()
+            elif first == "local" and not handed_off:
+                if strategy == IntegrationStrategy.PREFERENCE and not api_done:
+                    held.append(text)
+                else:
+                    speak(text, "local")
+
+        def hand_off(api_text: str) -> None:
+            nonlocal handed_off
+            handed_off = True
+            held.clear()
+            if not local_done:
+                cancel_local()
+            speak(self.integrator.transition_phrase(), "transition")
+            for text in splitter.split(api_text):
+                speak(text, "api")
+
+        while not (local_done and api_done):
+            pending = [task for task, done in ((local_get, local_done), (api_task, api_done)) if not done]
+            finished, _ = await asyncio.wait(pending + [barged_in], return_when=asyncio.FIRST_COMPLETED)
+
+            if barged_in in finished:
+                # The user spoke over the answer: nothing more of it is wanted
+                interrupted = True
+                held.clear()
+                if not local_done:
+                    cancel_local(REASON_BARGE_IN)
+                if not api_done:
+                    cancel_api(REASON_BARGE_IN)
+                break
+
+            if local_get in finished and not local_done:
+                kind, item = local_get.result()
+                if kind == "token":
+                    for text in splitter.feed(item["text"]):
+                        local_phrase(text)
+                    local_get = asyncio.ensure_future(local_items.get())
+                else:
+                    local_done = True
+                    local_response = item
+                    local_time = time.perf_counter() - start
+                    local_ok = bool(item and item.get("success"))
+                    tail = splitter.flush()
+                    if local_ok and tail:
+                        local_phrase(tail)
+                    # A complete local answer makes a pending API answer moot
+                    if (local_ok and first == "local" and not api_done
+                            and strategy in (IntegrationStrategy.FASTEST, IntegrationStrategy.INTERRUPT)):
+                        cancel_api()
+
+            if api_task in finished and not api_done:
+                api_done = True
+                api_time = time.perf_counter() - start
+                try:
+                    api_response = api_task.result()
+                except Exception as e:
+                    api_response = {"content": "", "source": "api_model", "error": str(e), "success": False}
+                api_text = self._text(api_response)
+                local_failed = local_done and not (local_response and local_response.get("success"))
+
+                if not (api_response.get("success") and api_text):
+                    # Nothing to hand off to: the local answer stands
+                    for text in held:
+                        speak(text, "local")
+                    held.clear()
+                elif first is None:
+                    first = "api"
+                    if not local_done:
+                        cancel_local()
+                    for text in splitter.split(api_text):
+                        speak(text, "api")
+                elif first == "local" and not handed_off:
+                    if local_failed or (strategy == IntegrationStrategy.INTERRUPT and not local_done):
+                        hand_off(api_text)
+                    elif strategy == IntegrationStrategy.PREFERENCE:
+                        local_text = " ".join([p.text for p in phrases if p.source == "local"] + held
+                                              + [splitter.buffer.strip()])
+                        choice = self.integrator.prefer(local_text, api_text)
+                        if choice["source"] == "api":
+                            hand_off(api_text)
+                        else:
+                            for text in held:
+                                speak(text, "local")
+                            held.clear()
+
+        if cancel is not None:
+            cancel.remove_callback(barge_in)
+        if not barged_in.done():
+            barged_in.cancel()
+
+        # COMBINE: append the API answer after the local one if it adds something
+        if (strategy == IntegrationStrategy.COMBINE and first == "local" and not handed_off and not interrupted
+                and api_response and api_response.get("success")):
+            local_text = " ".join(p.text for p in phrases if p.source == "local")
+            api_text = self._text(api_response)
+            if api_text and self.integrator.similarity(local_text, api_text) < self.config.similarity_threshold:
+                hand_off(api_text)
+
+        if not phrases and not interrupted:
+            speak(self.integrator.fallback_result(start, "No track produced a response").content, "fallback")
+
+        integration = self._integration_result(phrases, first, handed_off, cancelled, start)
+        integration.metadata["interrupted"] = interrupted
+        time_to_first_phrase = phrases[0].elapsed if first else None
+        self._track(first, handed_off, cancelled, time_to_first_phrase)
+        if interrupted:
+            self.stats["barge_ins"] += 1
+
+        logger.info(f"Parallel race: {first or 'no'} track first"
+                    f" after {time_to_first_phrase or 0.0:.2f}s, cancelled {cancelled or 'none'}")
+
+        return RaceResult(
+            integration=integration,
+            phrases=phrases,
+            first_source=first,
+            time_to_first_phrase=time_to_first_phrase,
+            cancelled=cancelled,
+            local_response=local_response,
+            api_response=api_response,
+            local_processing_time=local_time,
+            api_processing_time=api_time,
+            interrupted=interrupted
+        )
+
+    def _text(self, response: Optional[Dict[str, Any]]) -> str:
+        return self.integrator.extract_text(response) if response else ""
+
+    def _integration_result(self, phrases: List[SpokenPhrase], first: Optional[str], handed_off: bool,
+                            cancelled: List[str], start: float) -> IntegrationResult:
+        """Integration result for the spoken answer."""
+        sources = {phrase.source for phrase in phrases}
+        if "fallback" in sources:
+            source = "fallback"
+        elif handed_off:
+            source = "integrated"
+        else:
+            source = first
+
+        return IntegrationResult(
+            content=" ".join(phrase.text for phrase in phrases),
+            source=source,
+            integration_strategy=self.config.strategy.value,
+            similarity_score=None,
+            processing_time=time.perf_counter() - start,
+            metadata={
+                "race": True,
+                "first_source": first,
+                "handoff": handed_off,
+                "cancelled": list(cancelled),
+                "phrases": [asdict(phrase) for phrase in phrases],
+                "processing_path": "parallel"
+            }
+        )
+
+    def _track(self, first: Optional[str], handed_off: bool, cancelled: List[str],
+               time_to_first_phrase: Optional[float]) -> None:
+        self.stats["races"] += 1
+        if first is not None:
+            self.stats[f"{first}_first"] += 1
+            self.stats["total_time_to_first_phrase"] += time_to_first_phrase
+        if handed_off:
+            self.stats["handoffs"] += 1
+        for track in cancelled:
+            self.stats[f"{track}_cancelled"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get race statistics."""
+        spoken = self.stats["local_first"] + self.stats["api_first"]
+        return {
+            **self.stats,
+            "average_time_to_first_phrase": self.stats["total_time_to_first_phrase"] / spoken if spoken else 0.0
+        }
+
+    def reset_stats(self) -> None:
+        """Reset race statistics."""
+        for key in self.stats:
+            self.stats[key] = 0.0 if key == "total_time_to_first_phrase" else 0
@@ -0,0 +1,321 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+# DOC-REF: DOC-DEV-ARCH-COMP-2 - Dual-Track Processing Component Specification
+
+"""
+Response cache in front of the API track.
+
+Greetings, jokes and general-knowledge questions repeat across sessions, and
+each one costs a full API round-trip. The exact level keys responses on the
+normalized prompt, model and sampling parameters. The optional semantic
+level also answers prompts whose embedding is within a similarity threshold
+of a cached one, when the rest of the request (model, parameters, system
+context) is identical. Whether a query may be cached at all is decided from
+its ProcessingRouter features: context-dependent and time-sensitive queries
+always go to the API.
+"""
+
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .router import ProcessingRouter
+
+logger = logging.getLogger(__name__)
+
+# Answers to these change with the clock or the news
+TEMPORAL_PATTERN = re.compile(
+    r'\b(time|today|tonight|tomorrow|yesterday|now|current(ly)?|latest|recent(ly)?|this (week|month|year)|'
+    r'weather|forecast|news|score|price|stock|date|day is it)\b',
+    re.IGNORECASE
+)
+
+Embedder = Callable[[str], List[float]]
+
+
+def normalize_prompt(text: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a prompt."""
+    return re.sub(r'\s+', ' ', text).strip().lower().rstrip('?!.').strip()
+
+
+def _default_embedder(model_name: str) -> Optional[Embedder]:
+    """Sentence embedder from the memory system, if sentence-transformers is installed."""
+    try:
+        import sentence_transformers  # noqa: F401
+        from ...memory.utils.embeddings import get_embedding
+    except ImportError:
+        logger.warning("sentence-transformers not available, semantic response caching disabled")
+        return None
+    return lambda text: get_embedding(text, model_name=model_name)
+
+
+@dataclass
+class CachedResponse:
+    """A cached API response."""
+    content: str
+    usage: Dict[str, Any]
+    finish_reason: str
+    model: str
+    provider: str
+    scope: str
+    prompt: str
+    expires_at: float
+    embedding: Optional[np.ndarray] = None
+    hits: int = 0
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def generation_time(self) -> float:
+        return float(self.usage.get("completion_time", 0.0))
+
+
+class ResponseCache:
+    """Two-level (exact and semantic) cache of API responses."""
+
+    def __init__(self,
+                 max_entries: int = 1024,
+                 ttl_seconds: float = 3600.0,
+                 semantic: bool = False,
+                 similarity_threshold: float = 0.92,
+                 embedder: Optional[Embedder] = None,
+                 embedding_model: str = "all-MiniLM-L6-v2",
+                 router: Optional[ProcessingRouter] = None,
+                 max_context_dependency: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_entries: Responses kept; the least recently used go first.
+            ttl_seconds: Seconds a response stays valid.
+            semantic: Also match prompts by embedding similarity.
+            similarity_threshold: Minimum cosine similarity of a semantic hit.
+            embedder: Text to embedding function (defaults to the memory
+                system's sentence-transformers embedder).
+            embedding_model: Embedding model for the default embedder.
+            router: Router used for query features (defaults to a new one).
+            max_context_dependency: Queries whose router context dependency
+                exceeds this are not cached.
+            clock: Monotonic clock, replaceable in tests.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_context_dependency = max_context_dependency
+        self.router = router or ProcessingRouter()
+        self.clock = clock
+
+        self.embedder = None
+        if semantic:
+            self.embedder = embedder or _default_embedder(embedding_model)
+
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "uncacheable": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "latency_saved_seconds": 0.0,
+        }
+
+    @property
+    def semantic(self) -> bool:
+        return self.embedder is not None
+
+    def is_cacheable(self, messages: List[Dict[str, str]], context: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Whether a request's response may be cached and served to other sessions.
+
+        Args:
+            messages: Request messages.
+            context: Request context.
+
+        Returns:
+            False for multi-turn, memory-backed, context-dependent or
+            time-sensitive queries.
+        """
+        context = context or {}
+        turns = [message for message in messages if message.get("role") != "system"]
+        if len(turns) != 1 or turns[0].get("role") != "user":
+            return False
+        if context.get("conversation_history") or context.get("memory_context_used"):
+            return False
+
+        query = turns[0].get("content", "")
+        if not isinstance(query, str) or not query.strip():
+            return False
+        if TEMPORAL_PATTERN.search(query):
+            return False
+
+        features = self.router.calculate_query_features(query)
+        return features.context_dependency <= self.max_context_dependency and features.time_sensitivity == 0
+
+    def lookup(self, prepared_messages: List[Dict[str, str]], model: str,
+               params: Dict[str, Any]) -> Optional[Tuple[CachedResponse, str]]:
+        """
+        Find a cached response for a request.
+
+        Args:
+            prepared_messages: Messages as sent to the API, with the cacheable
+                query last.
+            model: Model name.
+            params: Sampling parameters affecting the response.
+
+        Returns:
+            (response, "exact" or "semantic"), or None on a miss
+        """
+        start = time.perf_counter()
+        scope, prompt = self._scope(prepared_messages, model, params)
+        key = self._key(scope, prompt)
+        now = self.clock()
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            entry = self._live(key, now)
+            level = "exact"
+
+        if entry is None and self.embedder is not None:
+            entry = self._semantic_match(scope, prompt, now)
+            level = "semantic"
+
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            entry.hits += 1
+            self._stats[f"{level}_hits"] += 1
+            self._stats["latency_saved_seconds"] += max(0.0, entry.generation_time - (time.perf_counter() - start))
+
+        logger.debug(f"Response cache {level} hit for '{prompt[:50]}'")
+        return entry, level
+
+    def store(self, prepared_messages: List[Dict[str, str]], model: str, params: Dict[str, Any],
+              content: str, usage: Dict[str, Any], finish_reason: str, provider: str) -> None:
+        """
+        Cache a response.
+
+        Args:
+            prepared_messages: Messages as sent to the API.
+            model: Model name.
+            params: Sampling parameters affecting the response.
+            content: Response text.
+            usage: Token usage and timing of the response.
+            finish_reason: Why generation stopped.
+            provider: Provider that generated the response.
+        """
+        scope, prompt = self._scope(prepared_messages, model, params)
+        embedding = None
+        if self.embedder is not None:
+            embedding = self._embed(prompt)
+
+        entry = CachedResponse(
+            content=content,
+            usage=dict(usage),
+            finish_reason=finish_reason,
+            model=model,
+            provider=provider,
+            scope=scope,
+            prompt=prompt,
+            expires_at=self.clock() + self.ttl_seconds,
+            embedding=embedding
+        )
+        with self._lock:
+            key = self._key(scope, prompt)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def record_uncacheable(self) -> None:
+        with self._lock:
+            self._stats["uncacheable"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache statistics.
+
+        Returns:
+            Dictionary with hit, miss and eviction counters, hit rate and the
+            API time saved by hits.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+        stats["semantic"] = self.semantic
+        return stats
+
+    def _scope(self, prepared_messages: List[Dict[str, str]], model: str,
+               params: Dict[str, Any]) -> Tuple[str, str]:
+        """Split a request into everything but the query (hashed) and the normalized query."""
+        *preamble, query = prepared_messages
+        scope = json.dumps({"model": model, "params": params, "preamble": preamble},
+                           sort_keys=True, default=str)
+        return hashlib.sha256(scope.encode("utf-8")).hexdigest(), normalize_prompt(query.get("content", ""))
+
+    @staticmethod
+    def _key(scope: str, prompt: str) -> str:
+        return hashlib.sha256(f"{scope}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _live(self, key: str, now: float) -> Optional[CachedResponse]:
+        """Unexpired entry for a key, refreshing its LRU position. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            self._stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of a prompt, or None if embedding fails."""
+        try:
+            vector = np.asarray(self.embedder(prompt), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Response cache embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_match(self, scope: str, prompt: str, now: float) -> Optional[CachedResponse]:
+        """Most similar unexpired response in the same scope above the threshold."""
+        with self._lock:
+            candidates = [(key, entry) for key, entry in self._entries.items()
+                          if entry.scope == scope and entry.embedding is not None]
+        if not candidates:
+            return None
+
+        query = self._embed(prompt)
+        if query is None:
+            return None
+        # Cosine similarity, as embeddings are stored unit length
+        similarities = np.stack([entry.embedding for _, entry in candidates]) @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+
+        with self._lock:
+            return self._live(candidates[best][0], now)
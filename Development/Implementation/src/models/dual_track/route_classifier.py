@@ -0,0 +1,360 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+# DOC-REF: DOC-DEV-ARCH-COMP-2 - Dual-Track Processing Component Specification
+
+"""
+Learned routing from logged outcomes.
+
+RouteClassifier is a logistic regression over hashed word unigrams and
+bigrams with one head per path. Each head predicts the probability that
+its path gives a good answer to the query: successful, within the latency
+target and, when quality is scored, good enough. A logged outcome only
+says how the path that was taken did, so it trains that path's head; an
+outcome with a known best path (e.g. from replaying a query on every path)
+trains all of them. Updates are single SGD steps, so the classifier learns
+online as outcomes arrive. Predicting touches a few dozen weights and
+takes microseconds.
+
+RouteOutcome is the trace record, and evaluate_router() replays recorded
+traces through a ProcessingRouter for offline comparison of routers.
+"""
+
+import re
+import json
+import math
+import time
+import zlib
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from .config import ProcessingPath
+
+logger = logging.getLogger(__name__)
+
+# Paths the classifier chooses between
+LEARNED_PATHS = (ProcessingPath.LOCAL, ProcessingPath.PARALLEL, ProcessingPath.API)
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+@dataclass
+class RouteOutcome:
+    """One routed query and how the chosen path did."""
+    query: str
+    path: str
+    success: bool = True
+    latency_ms: float = 0.0
+    quality_score: float = 0.0  # 0 when not scored
+    has_context: bool = False
+    best_path: Optional[str] = None  # Known best path, when every path was tried
+    prompt_tokens: int = 0  # Query length in words
+    queue_depth: int = 0  # Local requests queued or running when it was routed
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RouteOutcome":
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+
+def has_context(context: Optional[Any]) -> bool:
+    """Whether a routing context carries conversation history or retrieved memory."""
+    if not isinstance(context, dict):
+        return bool(context)
+    return bool(context.get("conversation_history") or context.get("retrieved_context"))
+
+
+def save_traces(outcomes: Iterable[RouteOutcome], path: str) -> int:
+    """
+    Write outcomes to a JSON-lines trace file.
+
+    Args:
+        outcomes: Outcomes to write
+        path: File to (over)write
+
+    Returns:
+        Number of outcomes written
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for outcome in outcomes:
+            f.write(json.dumps(outcome.to_dict()) + "\n")
+            count += 1
+    return count
+
+
+def load_traces(path: str) -> List[RouteOutcome]:
+    """Read outcomes from a JSON-lines trace file."""
+    with open(path, encoding="utf-8") as f:
+        return [RouteOutcome.from_dict(json.loads(line)) for line in f if line.strip()]
+
+
+class RouteClassifier:
+    """Online logistic regression predicting which path answers a query well."""
+
+    def __init__(self,
+                 n_features: int = 1 << 18,
+                 learning_rate: float = 0.2,
+                 l2: float = 1e-5,
+                 target_latency_ms: float = 2000.0,
+                 min_quality: float = 0.5):
+        """
+        Initialize an untrained classifier.
+
+        Args:
+            n_features: Size of the hashed feature space
+            learning_rate: SGD step size
+            l2: L2 regularization of the touched weights
+            target_latency_ms: Slower outcomes are bad ones
+            min_quality: Scored outcomes below this are bad ones
+        """
+        self.n_features = n_features
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.target_latency_ms = target_latency_ms
+        self.min_quality = min_quality
+
+        self.weights: Dict[str, Dict[int, float]] = {path.value: {} for path in LEARNED_PATHS}
+        self.bias: Dict[str, float] = {path.value: 0.0 for path in LEARNED_PATHS}
+        self.samples: Dict[str, int] = {path.value: 0 for path in LEARNED_PATHS}
+        self._lock = threading.Lock()
+
+    @property
+    def total_samples(self) -> int:
+        """Outcomes learned from."""
+        return sum(self.samples.values())
+
+    def featurize(self, query: str, context_flag: bool = False) -> List[int]:
+        """
+        Hashed features of a query.
+
+        Args:
+            query: Query text
+            context_flag: Whether the query comes with conversation context
+
+        Returns:
+            Feature indices (each feature has value 1)
+        """
+        words = WORD_PATTERN.findall(query.lower())
+        names = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        names.append(f"#len:{min(len(words).bit_length(), 7)}")
+        if words:
+            names.append(f"#first:{words[0]}")
+        if context_flag:
+            names.append("#context")
+        n = self.n_features
+        return list({zlib.crc32(name.encode("utf-8")) % n for name in names})
+
+    def predict_proba(self, query: str, context_flag: bool = False) -> Dict[str, float]:
+        """
+        Probability of a good outcome on each path.
+
+        Args:
+            query: Query text
+            context_flag: Whether the query comes with conversation context
+
+        Returns:
+            Dictionary from path name to probability
+        """
+        return self._proba(self.featurize(query, context_flag))
+
+    def predict(self, query: str, context_flag: bool = False) -> Tuple[ProcessingPath, float]:
+        """
+        Best path for a query.
+
+        Args:
+            query: Query text
+            context_flag: Whether the query comes with conversation context
+
+        Returns:
+            Tuple of the path and its probability of a good outcome. Ties go
+            to the cheaper path (local, then parallel, then API).
+        """
+        proba = self.predict_proba(query, context_flag)
+        best = max(LEARNED_PATHS, key=lambda path: proba[path.value])
+        return best, proba[best.value]
+
+    def is_good(self, outcome: RouteOutcome) -> bool:
+        """Whether an outcome counts as a good answer."""
+        return (outcome.success
+                and outcome.latency_ms <= self.target_latency_ms
+                and (outcome.quality_score <= 0 or outcome.quality_score >= self.min_quality))
+
+    def update(self, outcome: RouteOutcome) -> float:
+        """
+        Learn from one outcome with a single SGD step.
+
+        Args:
+            outcome: Logged outcome
+
+        Returns:
+            Log loss of the prediction before the update
+        """
+        if outcome.best_path is not None:
+            targets = {path.value: float(path.value == outcome.best_path) for path in LEARNED_PATHS}
+        elif outcome.path in self.weights:
+            targets = {outcome.path: float(self.is_good(outcome))}
+        else:
+            # Staged and fallback paths aren't chosen by the classifier
+            return 0.0
+
+        features = self.featurize(outcome.query, outcome.has_context)
+        # Binary features are scaled so long queries don't take larger steps
+        scale = 1.0 / math.sqrt(len(features))
+        loss = 0.0
+        with self._lock:
+            proba = self._proba(features)
+            for path, target in targets.items():
+                p = proba[path]
+                loss -= math.log(max(p if target else 1.0 - p, 1e-12))
+                gradient = p - target
+                weights = self.weights[path]
+                step = self.learning_rate
+                for index in features:
+                    weight = weights.get(index, 0.0)
+                    weights[index] = weight - step * (gradient * scale + self.l2 * weight)
+                self.bias[path] -= step * gradient
+                self.samples[path] += 1
+        return loss / len(targets)
+
+    def fit(self, outcomes: Iterable[RouteOutcome], epochs: int = 1) -> float:
+        """
+        Train on recorded outcomes.
+
+        Args:
+            outcomes: Outcomes to learn from
+            epochs: Passes over the outcomes
+
+        Returns:
+            Mean log loss over the last pass
+        """
+        outcomes = list(outcomes)
+        loss = 0.0
+        for _ in range(epochs):
+            loss = sum(self.update(outcome) for outcome in outcomes)
+        return loss / len(outcomes) if outcomes else 0.0
+
+    def save(self, path: str) -> None:
+        """Save the weights to a JSON file."""
+        with self._lock:
+            data = {
+                "n_features": self.n_features,
+                "learning_rate": self.learning_rate,
+                "l2": self.l2,
+                "target_latency_ms": self.target_latency_ms,
+                "min_quality": self.min_quality,
+                "weights": {name: {str(k): w for k, w in weights.items()} for name, weights in self.weights.items()},
+                "bias": dict(self.bias),
+                "samples": dict(self.samples)
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> "RouteClassifier":
+        """Load a classifier saved with save()."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        classifier = cls(data["n_features"], data["learning_rate"], data["l2"],
+                         data["target_latency_ms"], data["min_quality"])
+        for name, weights in data["weights"].items():
+            classifier.weights[name] = {int(k): w for k, w in weights.items()}
+        classifier.bias.update(data["bias"])
+        classifier.samples.update(data["samples"])
+        return classifier
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get classifier statistics.
+
+        Returns:
+            Dictionary with samples learned per path and non-zero weights
+        """
+        return {
+            "samples": dict(self.samples),
+            "total_samples": self.total_samples,
+            "weights": sum(len(weights) for weights in self.weights.values())
+        }
+
+    def _proba(self, features: List[int]) -> Dict[str, float]:
+        scale = 1.0 / math.sqrt(len(features)) if features else 0.0
+        proba = {}
+        for name, weights in self.weights.items():
+            z = self.bias[name] + scale * sum(weights.get(index, 0.0) for index in features)
+            proba[name] = 1.0 / (1.0 + math.exp(-max(min(z, 30.0), -30.0)))
+        return proba
+
+
+def evaluate_router(router: Any, traces: Iterable[RouteOutcome], online: bool = False) -> Dict[str, Any]:
+    """
+    Replay recorded traces through a router.
+
+    Traces with a best_path score accuracy. Traces without one come from
+    whichever path was live at the time, so only the ones where the router
+    picks the logged path say how its choice would have done (replay
+    estimation): good_rate is the share of those that were good answers,
+    against logged_good_rate for the policy that produced the traces.
+
+    Args:
+        router: ProcessingRouter to evaluate
+        traces: Recorded outcomes, in time order
+        online: Let the router learn from each trace after routing it,
+            as it would in production (prequential evaluation)
+
+    Returns:
+        Dictionary with decisions, accuracy, good_rate, logged_good_rate,
+        matched, path_distribution, learned share and routing latency
+        percentiles in milliseconds
+    """
+    judge = getattr(router, "classifier", None) or RouteClassifier(
+        target_latency_ms=getattr(getattr(router, "config", None), "target_latency_ms", 2000.0)
+    )
+    latencies: List[float] = []
+    distribution: Dict[str, int] = {}
+    labeled = correct = matched = matched_good = logged_good = learned = 0
+
+    for trace in traces:
+        context = {"conversation_history": [trace.query]} if trace.has_context else None
+        start = time.perf_counter()
+        decision = router.determine_path(trace.query, context)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        path = decision.path.value
+        distribution[path] = distribution.get(path, 0) + 1
+        learned += decision.reasoning.startswith("Learned")
+        good = judge.is_good(trace)
+        logged_good += good
+        if trace.best_path is not None:
+            labeled += 1
+            correct += path == trace.best_path
+        elif path == trace.path:
+            matched += 1
+            matched_good += good
+
+        if online:
+            router.learn(trace)
+
+    decisions = len(latencies)
+    if not decisions:
+        return {"decisions": 0}
+    latencies.sort()
+    return {
+        "decisions": decisions,
+        "accuracy": correct / labeled if labeled else None,
+        "matched": matched,
+        "good_rate": matched_good / matched if matched else None,
+        "logged_good_rate": logged_good / decisions,
+        "path_distribution": {path: count / decisions for path, count in distribution.items()},
+        "learned_share": learned / decisions,
+        "latency_ms": {
+            "mean": sum(latencies) / decisions,
+            "p50": latencies[decisions // 2],
+            "p99": latencies[min(decisions - 1, int(decisions * 0.99))],
+            "max": latencies[-1]
+        }
+    }
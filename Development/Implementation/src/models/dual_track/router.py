@@ -4,17 +4,86 @@
 
 """
 Processing router for dual-track system query classification and routing.
+
+Routing runs on every turn before either track starts, so it has to stay
+well under a millisecond: all patterns are compiled once per process, and
+the learned classifier (RouterConfig.learned_routing) only looks up a few
+dozen hashed weights. Until the classifier has seen enough outcomes, or
+when it isn't confident, the hand-written rules decide.
+
+With RouterConfig.latency_routing the chosen path is then checked against
+a live latency model: among the paths whose answer is at least as good,
+the one with the lowest predicted tail latency for this query length and
+the current local queue depth is taken.
 """
 
+import os
 import re
 import time
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from dataclasses import dataclass
 from .config import ProcessingPath, RouterConfig, DEFAULT_CONFIG
+from .route_classifier import RouteClassifier, RouteOutcome, has_context
+from .latency_model import LatencyModel, context_queue_depth
 
 logger = logging.getLogger(__name__)
 
+# Feature patterns, compiled once and shared by all routers
+QUESTION_PATTERN = re.compile(
+    r'\b(what|when|where|who|why|how|which|whom|whose)\b',
+    re.IGNORECASE
+)
+
+# Entity patterns (simplified)
+ENTITY_PATTERN = re.compile(
+    r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'  # Proper nouns
+)
+
+# Time sensitivity indicators
+URGENT_PATTERN = re.compile(
+    r'\b(urgent|quickly|fast|immediate|now|asap|hurry)\b',
+    re.IGNORECASE
+)
+
+# Creativity indicators
+CREATIVE_PATTERN = re.compile(
+    r'\b(create|write|compose|imagine|design|invent|brainstorm|story|poem)\b',
+    re.IGNORECASE
+)
+
+# Social chat indicators
+SOCIAL_PATTERN = re.compile(
+    r'\b(hello|hi|hey|thanks|thank you|goodbye|bye|how are you|nice|good)\b',
+    re.IGNORECASE
+)
+
+# Reasoning indicators
+REASONING_PATTERN = re.compile(
+    r'\b(because|therefore|since|given|if|then|analyze|compare|explain why|reason|implications|propose|solutions|evaluate|assess|examine|consider|determine)\b',
+    re.IGNORECASE
+)
+
+# Factual retrieval indicators
+FACTUAL_PATTERN = re.compile(
+    r'\b(what is|define|meaning|fact|information|data|statistics|when did|where is)\b',
+    re.IGNORECASE
+)
+
+# Context dependency indicators, matched against the lowercased query
+PRONOUN_PATTERN = re.compile(r'\b(it|this|that|they|them|he|she|his|her|their)\b')
+REFERENCE_PATTERN = re.compile(r'\b(the|such|said|mentioned|above|before|previous)\b')
+CONTEXT_PHRASE_PATTERN = re.compile(r'\b(we discussed|you mentioned|as we talked|that issue|the topic)\b')
+
+# Paths whose answer is at least as good as the chosen path's. The parallel
+# path may answer with the local track's response (the integrator prefers
+# the fastest or best-scoring one), so it never stands in for the API path.
+ACCEPTABLE_PATHS = {
+    ProcessingPath.LOCAL: (ProcessingPath.LOCAL, ProcessingPath.PARALLEL, ProcessingPath.API),
+    ProcessingPath.PARALLEL: (ProcessingPath.PARALLEL, ProcessingPath.API),
+    ProcessingPath.API: (ProcessingPath.API,),
+}
+
 
 @dataclass
 class RoutingDecision:
@@ -44,80 +113,102 @@ class QueryFeatures:
 class ProcessingRouter:
     """Routes queries to appropriate processing paths based on analysis."""
     
-    def __init__(self, config: Optional[RouterConfig] = None):
-        """Initialize the processing router."""
+    def __init__(self,
+                 config: Optional[RouterConfig] = None,
+                 classifier: Optional[RouteClassifier] = None,
+                 latency_model: Optional[LatencyModel] = None,
+                 queue_depth: Optional[Callable[[], int]] = None):
+        """
+        Initialize the processing router.
+        
+        Args:
+            config: Router configuration
+            classifier: Trained classifier to route with; by default one is
+                loaded from config.classifier_path (or starts untrained)
+                when config.learned_routing is set
+            latency_model: Latency estimates to route with; by default an
+                empty one when config.latency_routing is set
+            queue_depth: Function returning the local requests queued or
+                running (e.g. LocalModel.queue_depth); without it the depth
+                is read from the context's system_state
+        """
         self.config = config or DEFAULT_CONFIG.router
         self.logger = logging.getLogger(__name__)
         
-        # Compile regex patterns for efficiency
         self._compile_patterns()
         
+        # Learned routing
+        if classifier is None and self.config.learned_routing:
+            classifier = self._load_classifier()
+        self.classifier = classifier
+        
+        # Latency routing
+        if latency_model is None and self.config.latency_routing:
+            latency_model = LatencyModel(half_life=self.config.latency_half_life,
+                                         min_samples=self.config.latency_min_samples,
+                                         max_age=self.config.latency_max_age)
+        self.latency_model = latency_model
+        self.queue_depth = queue_depth
+        
         # Performance tracking
         self.routing_history: List[RoutingDecision] = []
         self.total_decisions = 0
+        self.learned_decisions = 0
+        self.latency_decisions = 0
+        self.outcomes_learned = 0
         
     def _compile_patterns(self):
-        """Compile regex patterns for feature extraction."""
-        # Question word patterns
-        self.question_pattern = re.compile(
-            r'\b(what|when|where|who|why|how|which|whom|whose)\b', 
-            re.IGNORECASE
-        )
-        
-        # Entity patterns (simplified)
-        self.entity_pattern = re.compile(
-            r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'  # Proper nouns
-        )
-        
-        # Time sensitivity indicators
-        self.urgent_pattern = re.compile(
-            r'\b(urgent|quickly|fast|immediate|now|asap|hurry)\b',
-            re.IGNORECASE
-        )
-        
-        # Creativity indicators
-        self.creative_pattern = re.compile(
-            r'\b(create|write|compose|imagine|design|invent|brainstorm|story|poem)\b',
-            re.IGNORECASE
-        )
-        
-        # Social chat indicators
-        self.social_pattern = re.compile(
-            r'\b(hello|hi|hey|thanks|thank you|goodbye|bye|how are you|nice|good)\b',
-            re.IGNORECASE
-        )
-        
-        # Reasoning indicators
-        self.reasoning_pattern = re.compile(
-            r'\b(because|therefore|since|given|if|then|analyze|compare|explain why|reason|implications|propose|solutions|evaluate|assess|examine|consider|determine)\b',
-            re.IGNORECASE
-        )
-        
-        # Factual retrieval indicators
-        self.factual_pattern = re.compile(
-            r'\b(what is|define|meaning|fact|information|data|statistics|when did|where is)\b',
-            re.IGNORECASE
-        )
+        """Attach the shared compiled patterns for feature extraction."""
+        self.question_pattern = QUESTION_PATTERN
+        self.entity_pattern = ENTITY_PATTERN
+        self.urgent_pattern = URGENT_PATTERN
+        self.creative_pattern = CREATIVE_PATTERN
+        self.social_pattern = SOCIAL_PATTERN
+        self.reasoning_pattern = REASONING_PATTERN
+        self.factual_pattern = FACTUAL_PATTERN
+    
+    def _load_classifier(self) -> RouteClassifier:
+        """Load the configured classifier, or start an untrained one."""
+        path = self.config.classifier_path
+        if path and os.path.exists(path):
+            try:
+                return RouteClassifier.load(path)
+            except Exception as e:
+                self.logger.warning(f"Failed to load route classifier from {path}: {e}")
+        return RouteClassifier(target_latency_ms=self.config.target_latency_ms)
     
     def determine_path(self, query: str, context: Optional[Dict[str, Any]] = None) -> RoutingDecision:
         """Determine the processing path for a given query."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Extract query features
             features = self.calculate_query_features(query, context)
             
-            # Apply routing logic
-            path, confidence, reasoning = self._apply_routing_logic(features)
+            # The classifier decides when it is trained and confident, else the rules
+            learned = self._apply_learned_routing(query, context, features)
+            path, confidence, reasoning = learned or self._apply_routing_logic(features)
+            decision_features = features.__dict__
+            
+            # Take a faster path of the same quality under the current load
+            if self.latency_model is not None and self.config.latency_routing and path in ACCEPTABLE_PATHS:
+                depth = self._current_queue_depth(context)
+                decision_features = {**decision_features, "local_queue_depth": depth}
+                faster = self._apply_latency_routing(path, features, depth)
+                if faster is not None:
+                    path, reasoning = faster
+                    self.latency_decisions += 1
             
             # Create routing decision
             decision = RoutingDecision(
                 path=path,
                 confidence=confidence,
                 reasoning=reasoning,
-                features=features.__dict__,
-                processing_time=time.time() - start_time
+                features=decision_features,
+                processing_time=time.perf_counter() - start_time
             )
+            if learned:
+                self.learned_decisions += 1
             
             # Track decision
             self._track_decision(decision)
@@ -133,13 +224,14 @@ class ProcessingRouter:
                 confidence=0.5,
                 reasoning=f"Fallback due to error: {str(e)}",
                 features={},
-                processing_time=time.time() - start_time
+                processing_time=time.perf_counter() - start_time
             )
     
     def calculate_query_features(self, query: str, context: Optional[Dict[str, Any]] = None) -> QueryFeatures:
         """Calculate features for query analysis."""
         # Basic text analysis
-        tokens = query.lower().split()
+        lowered = query.lower()
+        tokens = lowered.split()
         token_count = len(tokens)
         
         # Extract entities (simplified approach)
@@ -147,7 +239,7 @@ class ProcessingRouter:
         entity_count = len(entities)
         
         # Find question words
-        question_words = self.question_pattern.findall(query.lower())
+        question_words = self.question_pattern.findall(lowered)
         
         # Calculate reasoning steps (heuristic)
         reasoning_indicators = len(self.reasoning_pattern.findall(query))
@@ -158,7 +250,7 @@ class ProcessingRouter:
         time_sensitivity = min(urgent_matches * 0.5, 1.0)
         
         # Context dependency
-        context_dependency = self._calculate_context_dependency(query, context)
+        context_dependency = self._calculate_context_dependency(query, context, lowered)
         
         # Boolean features
         factual_retrieval = bool(self.factual_pattern.search(query))
@@ -183,14 +275,17 @@ class ProcessingRouter:
             complexity_score=complexity_score
         )
     
-    def _calculate_context_dependency(self, query: str, context: Optional[Dict[str, Any]]) -> float:
+    def _calculate_context_dependency(self, query: str, context: Optional[Dict[str, Any]],
+                                      lowered: Optional[str] = None) -> float:
         """Calculate how much the query depends on context."""
+        lowered = query.lower() if lowered is None else lowered
+        
         # Check for pronouns and references even without context
-        pronouns = re.findall(r'\b(it|this|that|they|them|he|she|his|her|their)\b', query.lower())
-        references = re.findall(r'\b(the|such|said|mentioned|above|before|previous)\b', query.lower())
+        pronouns = PRONOUN_PATTERN.findall(lowered)
+        references = REFERENCE_PATTERN.findall(lowered)
         
         # Context-dependent phrases
-        context_phrases = re.findall(r'\b(we discussed|you mentioned|as we talked|that issue|the topic)\b', query.lower())
+        context_phrases = CONTEXT_PHRASE_PATTERN.findall(lowered)
         
         # Calculate dependency score based on query content
         query_words = len(query.split())
@@ -275,6 +370,107 @@ class ProcessingRouter:
             f"Default path ({self.config.default_path.value})"
         )
     
+    def _apply_learned_routing(self, query: str, context: Optional[Dict[str, Any]],
+                               features: QueryFeatures) -> Optional[Tuple[ProcessingPath, float, str]]:
+        """Route with the classifier, or None to leave the decision to the rules."""
+        classifier = self.classifier
+        if (classifier is None or not self.config.learned_routing or features.token_count == 0
+                or classifier.total_samples < self.config.min_training_samples):
+            return None
+        
+        path, confidence = classifier.predict(query, has_context(context))
+        if confidence < self.config.min_classifier_confidence:
+            return None
+        return path, confidence, f"Learned routing: {path.value} answers well with p={confidence:.2f}"
+    
+    def _apply_latency_routing(self, path: ProcessingPath, features: QueryFeatures,
+                               depth: int) -> Optional[Tuple[ProcessingPath, str]]:
+        """A path of at least the chosen one's quality that is predicted to be faster, or None."""
+        model, config = self.latency_model, self.config
+        if model.samples(path.value) < config.latency_min_samples:
+            # Too little known about the chosen path to argue against it
+            return None
+        
+        predictions = {}
+        for candidate in ACCEPTABLE_PATHS[path]:
+            name = candidate.value
+            quality = model.quality(name)
+            if (model.samples(name) < config.latency_min_samples
+                    or model.success_rate(name) < config.min_path_success_rate
+                    or (quality is not None and quality < config.min_path_quality)):
+                continue
+            predicted = model.predict(name, features.token_count, depth, config.latency_quantile)
+            if predicted is not None:
+                predictions[candidate] = predicted
+        if not predictions:
+            return None
+        
+        best = min(predictions, key=predictions.get)
+        current = predictions.get(path)
+        if best == path or (current is not None and predictions[best] > current * (1 - config.latency_margin)):
+            return None
+        
+        label = f"p{config.latency_quantile * 100:g}"
+        if current is None:
+            return best, f"Latency routing: {path.value} is failing, {best.value} {label} {predictions[best]:.0f}ms"
+        return best, (f"Latency routing: {best.value} {label} {predictions[best]:.0f}ms vs "
+                      f"{path.value} {current:.0f}ms at local queue depth {depth}")
+    
+    def _current_queue_depth(self, context: Optional[Dict[str, Any]]) -> int:
+        """Local requests queued or running now."""
+        if self.queue_depth is not None:
+            try:
+                return int(self.queue_depth())
+            except Exception as e:
+                self.logger.debug(f"Failed to read local queue depth: {e}")
+        return context_queue_depth(context)
+    
+    def learn(self, outcome: RouteOutcome) -> None:
+        """
+        Update the latency model and the classifier with a logged outcome.
+        
+        Args:
+            outcome: How a routed query went
+        """
+        if self.latency_model is not None:
+            self.latency_model.observe(outcome.path, outcome.latency_ms, outcome.prompt_tokens,
+                                       outcome.queue_depth, outcome.success, outcome.quality_score)
+        if self.classifier is None or not self.config.online_learning:
+            return
+        try:
+            self.classifier.update(outcome)
+            self.outcomes_learned += 1
+        except Exception as e:
+            self.logger.warning(f"Failed to learn from routing outcome: {e}")
+    
+    def record_outcome(self,
+                       query: str,
+                       path: str,
+                       success: bool,
+                       latency_ms: float,
+                       quality_score: float = 0.0,
+                       context: Optional[Dict[str, Any]] = None,
+                       queue_depth: Optional[int] = None) -> None:
+        """
+        Record how a routed query went, for online learning.
+        
+        Args:
+            query: The query
+            path: Path it took
+            success: Whether the path produced an answer
+            latency_ms: Time until the answer used was complete
+            quality_score: Answer quality when scored, else 0
+            context: The routing context
+            queue_depth: Local queue depth when it was routed (by default
+                read from the context's system_state)
+        """
+        self.learn(RouteOutcome(
+            query=query, path=path, success=success, latency_ms=latency_ms,
+            quality_score=quality_score, has_context=has_context(context),
+            prompt_tokens=len(query.split()),
+            queue_depth=context_queue_depth(context) if queue_depth is None else queue_depth
+        ))
+    
     def _track_decision(self, decision: RoutingDecision):
         """Track routing decision for analysis."""
         self.routing_history.append(decision)
@@ -309,6 +505,11 @@ class ProcessingRouter:
         
         return {
             "total_decisions": self.total_decisions,
+            "learned_decisions": self.learned_decisions,
+            "latency_decisions": self.latency_decisions,
+            "outcomes_learned": self.outcomes_learned,
+            "classifier": self.classifier.get_stats() if self.classifier is not None else None,
+            "latency_model": self.latency_model.get_stats() if self.latency_model is not None else None,
             "recent_decisions": recent_count,
             "path_distribution": path_percentages,
             "average_processing_time": total_time / recent_count,
@@ -320,6 +521,9 @@ class ProcessingRouter:
         """Reset routing statistics."""
         self.routing_history.clear()
         self.total_decisions = 0
+        self.learned_decisions = 0
+        self.latency_decisions = 0
+        self.outcomes_learned = 0
 
 
 # Convenience functions for backward compatibility
@@ -10,4 +10,17 @@ Local model benchmarking subpackage.
 from .benchmark_suite import BenchmarkRunner
 from .latency_tests import run_latency_benchmark
 from .memory_tests import run_memory_benchmark
-from .throughput_tests import run_throughput_benchmark
+from .prefix_cache_tests import run_prefix_cache_benchmark
+from .speculative_tests import run_speculative_benchmark
+from .throughput_tests import run_throughput_benchmark, run_concurrent_throughput_benchmark
+from .fake_model import FakeLocalModel
+from .harness import (
+    BenchmarkHarness,
+    BenchmarkScenario,
+    DEFAULT_SCENARIOS,
+    compare_results,
+    load_results,
+    load_scenarios,
+    run_scenario,
+    save_results
+)
@@ -24,7 +24,9 @@ from ..optimization import (
 
 from .latency_tests import run_latency_benchmark
 from .memory_tests import run_memory_benchmark
-from .throughput_tests import run_throughput_benchmark
+from .speculative_tests import run_speculative_benchmark
+from .throughput_tests import run_throughput_benchmark, run_concurrent_throughput_benchmark
+from .harness import BenchmarkHarness, BenchmarkScenario, compare_results, load_results
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +123,73 @@ class BenchmarkRunner:
             performance_monitor=self.performance_monitor
         )
         
+    def run_concurrent_throughput_benchmark(self,
+                                            model_id: str,
+                                            session_counts: Optional[List[int]] = None,
+                                            max_tokens: int = 64) -> Dict[str, Any]:
+        """Run throughput benchmark with concurrent sessions.
+        
+        Args:
+            model_id: ID of the model to benchmark
+            session_counts: Numbers of concurrent sessions to test
+            max_tokens: Maximum tokens to generate per request
+            
+        Returns:
+            Benchmark results
+        """
+        return run_concurrent_throughput_benchmark(
+            model_manager=self.model_manager,
+            model_id=model_id,
+            session_counts=session_counts or [1, 2, 4, 8],
+            prompts=self.test_prompts,
+            max_tokens=max_tokens
+        )
+        
+    def run_speculative_benchmark(self,
+                                  model_id: str,
+                                  draft_model_path: str,
+                                  max_tokens: int = 128) -> Dict[str, Any]:
+        """Run speculative decoding benchmark against plain decoding.
+        
+        Args:
+            model_id: ID of the model to benchmark
+            draft_model_path: Path to a draft model sharing the model's tokenizer
+            max_tokens: Maximum tokens to generate per prompt
+            
+        Returns:
+            Benchmark results
+        """
+        return run_speculative_benchmark(
+            model_manager=self.model_manager,
+            model_id=model_id,
+            draft_model_path=draft_model_path,
+            prompts=self.test_prompts,
+            max_tokens=max_tokens
+        )
+        
+    def run_scenarios(self,
+                      model_id: str,
+                      scenarios: Optional[List[BenchmarkScenario]] = None,
+                      baseline_path: Optional[str] = None,
+                      tolerance: float = 0.10) -> Dict[str, Any]:
+        """Run declarative benchmark scenarios, optionally against a baseline.
+        
+        Args:
+            model_id: ID of the model to benchmark
+            scenarios: Workloads to run (defaults to DEFAULT_SCENARIOS)
+            baseline_path: Baseline results file to compare against
+            tolerance: Allowed relative change before a metric regresses
+            
+        Returns:
+            Harness results, with a "comparison" entry when a baseline is given
+        """
+        self.model_manager.load_model(model_id)
+        adapter = self.model_manager.active_models[model_id]["adapter"]
+        results = BenchmarkHarness(adapter, scenarios, model_name=model_id).run()
+        if baseline_path:
+            results["comparison"] = compare_results(results, load_results(baseline_path), tolerance=tolerance)
+        return results
+        
     def compare_configurations(self, 
                                model_id: str, 
                                configs: List[OptimizationConfig]) -> Dict[str, Any]:
@@ -297,6 +366,18 @@ class BenchmarkRunner:
         except Exception as e:
             logger.error(f"Error in throughput test: {e}")
             results["tests"]["throughput"] = {"error": str(e)}
+        
+        # 4b. Concurrent sessions through the inference scheduler
+        logger.info(f"Running concurrent throughput benchmark for {model_id}")
+        try:
+            self.model_manager.load_model(
+                model_id, config={**default_config.to_dict(), "scheduler": {"enabled": True, "contexts": 4}}
+            )
+            results["tests"]["concurrent_throughput"] = self.run_concurrent_throughput_benchmark(model_id)
+            self.model_manager.unload_model(model_id)
+        except Exception as e:
+            logger.error(f"Error in concurrent throughput test: {e}")
+            results["tests"]["concurrent_throughput"] = {"error": str(e)}
             
         # 5. Configuration comparison (limited configurations for efficiency)
         logger.info(f"Running configuration comparison for {model_id}")
@@ -0,0 +1,141 @@
+"""
+Deterministic stand-in for a local model, for benchmarking in CI.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import time
+import zlib
+import threading
+import contextlib
+from typing import Dict, Any, Optional, Generator, List
+
+from ..interface import LocalModelInterface
+
+
+def _sleep_until(deadline: float) -> None:
+    """Sleep until a perf_counter deadline, spinning for the last 200us."""
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        time.sleep(remaining - 0.0002 if remaining > 0.0002 else 0)
+
+
+class FakeLocalModel(LocalModelInterface):
+    """
+    LocalModelInterface with a fixed cost model instead of a network.
+
+    Tokens are whitespace-separated words. Prompt evaluation and decoding
+    sleep a fixed time per token, and the output is always the same for a
+    given request, so results only vary with scheduling noise. Like a single
+    llama.cpp context, requests are serialized unless ``parallel`` is set.
+    """
+
+    def __init__(self,
+                 prompt_seconds_per_token: float = 0.0001,
+                 decode_seconds_per_token: float = 0.001,
+                 cold_requests: int = 0,
+                 cold_penalty_seconds: float = 0.0,
+                 parallel: bool = False):
+        """
+        Initialize the fake model.
+
+        Args:
+            prompt_seconds_per_token: Prompt evaluation time per token
+            decode_seconds_per_token: Decode time per generated token
+            cold_requests: Number of initial requests that pay the cold penalty
+            cold_penalty_seconds: Extra time for cold requests (page faults, graph setup)
+            parallel: Serve concurrent requests in parallel instead of one at a time
+        """
+        self.prompt_seconds_per_token = prompt_seconds_per_token
+        self.decode_seconds_per_token = decode_seconds_per_token
+        self.cold_requests = cold_requests
+        self.cold_penalty_seconds = cold_penalty_seconds
+        self.parallel = parallel
+        self.model_path = "fake-model"
+        self.is_initialized = True
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._count_lock = threading.Lock()
+
+    def initialize(self, model_path: str, config: Optional[Dict[str, Any]] = None) -> bool:
+        self.model_path = model_path
+        self.is_initialized = True
+        return True
+
+    def tokenize(self, text: str) -> List[int]:
+        return [zlib.crc32(word.encode("utf-8")) % 32000 for word in text.split()]
+
+    def get_token_count(self, text: str) -> int:
+        return len(text.split())
+
+    def shutdown(self) -> bool:
+        self.is_initialized = False
+        return True
+
+    def _begin(self, prompt: str) -> int:
+        """Count the request and spend its prompt evaluation time."""
+        with self._count_lock:
+            self.requests += 1
+            cold = self.requests <= self.cold_requests
+        prompt_tokens = self.get_token_count(prompt)
+        _sleep_until(time.perf_counter() + prompt_tokens * self.prompt_seconds_per_token +
+                     (self.cold_penalty_seconds if cold else 0.0))
+        return prompt_tokens
+
+    def _tokens(self, prompt: str, max_tokens: int) -> List[str]:
+        seed = zlib.crc32(prompt.encode("utf-8"))
+        return [f" w{(seed + i) % 997}" for i in range(max_tokens)]
+
+    def _slot(self):
+        return contextlib.nullcontext() if self.parallel else self._lock
+
+    def generate(self, prompt: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        max_tokens = (params or {}).get("max_tokens", 16)
+        with self._slot():
+            start = time.perf_counter()
+            prompt_tokens = self._begin(prompt)
+            tokens = self._tokens(prompt, max_tokens)
+            _sleep_until(time.perf_counter() + len(tokens) * self.decode_seconds_per_token)
+            generation_time = time.perf_counter() - start
+        return {
+            "text": "".join(tokens),
+            "finish_reason": "length",
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens),
+            },
+            "generation_time": generation_time,
+            "model_path": self.model_path,
+            "tokens_per_second": len(tokens) / generation_time if generation_time > 0 else 0,
+        }
+
+    def generate_stream(self,
+                        prompt: str,
+                        params: Optional[Dict[str, Any]] = None) -> Generator[Dict[str, Any], None, None]:
+        max_tokens = (params or {}).get("max_tokens", 16)
+        with self._slot():
+            start = time.perf_counter()
+            self._begin(prompt)
+            tokens = self._tokens(prompt, max_tokens)
+            decode_start = time.perf_counter()
+            for index, token in enumerate(tokens):
+                # Sleep to a schedule so per-token sleep overshoot doesn't accumulate
+                _sleep_until(decode_start + (index + 1) * self.decode_seconds_per_token)
+                elapsed = time.perf_counter() - start
+                last = index == len(tokens) - 1
+                output = {
+                    "text": token,
+                    "finish_reason": "length" if last else None,
+                    "usage": {"completion_tokens": index + 1},
+                    "generation_time": elapsed,
+                }
+                if last:
+                    output["tokens_per_second"] = (index + 1) / elapsed if elapsed > 0 else 0
+                yield output
+
@@ -0,0 +1,455 @@
+"""
+Scenario-based benchmark harness with stored baselines.
+
+A scenario fixes prompt length, output length and concurrency. Each run
+discards warm-up requests, measures a steady-state phase, and reports
+latency, time-to-first-token and decode percentiles plus throughput.
+Results are JSON keyed by git commit and host, and a compare mode flags
+metrics that regressed against a baseline result.
+
+Runs against FakeLocalModel in CI and against a GGUF model through
+LlamaModelAdapter on performance hosts:
+
+    python -m src.models.local.benchmarks.harness --fake --baseline baseline.json
+    python -m src.models.local.benchmarks.harness --model models/llm/mistral.gguf
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import subprocess
+from dataclasses import dataclass, asdict, fields
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+
+from ..interface import LocalModelInterface
+from ..optimization import RingHistogram, get_memory_sampler
+from ..optimization.autotuner import host_fingerprint
+
+logger = logging.getLogger(__name__)
+
+RESULTS_SCHEMA_VERSION = 1
+
+FILLER_WORDS = (
+    "the assistant keeps track of the conversation and answers questions about schedules "
+    "weather music reminders and news while the user is driving walking or cooking dinner"
+).split()
+
+# Metric path -> whether larger values are better
+REGRESSION_METRICS = {
+    "latency.p50": False,
+    "latency.p95": False,
+    "first_token.p50": False,
+    "first_token.p95": False,
+    "decode_per_token.p50": False,
+    "throughput_tokens_per_second": True,
+}
+
+# Medians under concurrency depend on which request queued first, so
+# concurrent scenarios are judged on tail latency and throughput
+CONCURRENT_REGRESSION_METRICS = ("latency.p95", "first_token.p95", "throughput_tokens_per_second")
+
+
+@dataclass
+class BenchmarkScenario:
+    """One workload: prompt length x output length x concurrency."""
+
+    name: str
+    prompt_tokens: int = 64
+    max_tokens: int = 32
+    concurrency: int = 1
+    warmup: int = 2
+    iterations: int = 10
+    stream: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchmarkScenario":
+        known = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+DEFAULT_SCENARIOS = [
+    BenchmarkScenario("short_turn", prompt_tokens=32, max_tokens=16, iterations=20),
+    BenchmarkScenario("long_prompt", prompt_tokens=512, max_tokens=16, iterations=20),
+    BenchmarkScenario("long_answer", prompt_tokens=32, max_tokens=128, iterations=5),
+    BenchmarkScenario("concurrent", prompt_tokens=64, max_tokens=32, concurrency=4, iterations=12),
+]
+
+
+def load_scenarios(path: str) -> List[BenchmarkScenario]:
+    """
+    Load scenarios from a JSON file holding a list of scenario objects.
+
+    Args:
+        path: Scenario file
+
+    Returns:
+        Scenarios in file order
+    """
+    with open(path, "r") as f:
+        return [BenchmarkScenario.from_dict(item) for item in json.load(f)]
+
+
+def git_commit() -> Dict[str, Any]:
+    """
+    Identify the code being benchmarked.
+
+    Returns:
+        Commit hash (or VANTA_COMMIT when set, e.g. in CI) and whether the tree is dirty
+    """
+    if os.environ.get("VANTA_COMMIT"):
+        return {"commit": os.environ["VANTA_COMMIT"], "dirty": False}
+
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=cwd,
+                                         stderr=subprocess.DEVNULL).decode("utf-8").strip()
+        status = subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                                         stderr=subprocess.DEVNULL).decode("utf-8").strip()
+        return {"commit": commit, "dirty": bool(status)}
+    except Exception:
+        return {"commit": "unknown", "dirty": False}
+
+
+def host_info() -> Dict[str, Any]:
+    """Describe the benchmark host."""
+    return {
+        "fingerprint": host_fingerprint(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def build_prompt(model: LocalModelInterface, prompt_tokens: int, request_index: int = 0) -> str:
+    """
+    Build a prompt of about prompt_tokens tokens for a model's tokenizer.
+
+    The request index starts the prompt so consecutive requests do not share
+    a prefix that llama.cpp would reuse from the previous evaluation.
+
+    Args:
+        model: Model whose tokenizer sizes the prompt
+        prompt_tokens: Target prompt length in tokens
+        request_index: Distinguishes requests within a run
+
+    Returns:
+        Prompt text
+    """
+    words = max(prompt_tokens, 1)
+    text = ""
+    for _ in range(4):
+        body = " ".join(FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(words))
+        text = f"Request {request_index}: {body}"
+        count = model.get_token_count(text)
+        if count == prompt_tokens or count == 0:
+            break
+        words = max(int(words * prompt_tokens / count), 1)
+    return text
+
+
+def _run_request(model: LocalModelInterface, scenario: BenchmarkScenario, prompt: str) -> Dict[str, Any]:
+    """Run one request and time it."""
+    params = {"max_tokens": scenario.max_tokens}
+    start = time.perf_counter()
+    if not scenario.stream:
+        result = model.generate(prompt, params)
+        return {
+            "latency": time.perf_counter() - start,
+            "completion_tokens": result.get("usage", {}).get("completion_tokens", 0),
+        }
+
+    first_token = None
+    last_token = None
+    tokens = 0
+    for chunk in model.generate_stream(prompt, params):
+        now = time.perf_counter()
+        if chunk.get("text"):
+            if first_token is None:
+                first_token = now
+            last_token = now
+            tokens += 1
+    sample = {"latency": time.perf_counter() - start, "completion_tokens": tokens}
+    if first_token is not None:
+        sample["first_token"] = first_token - start
+        if tokens > 1:
+            sample["decode_per_token"] = (last_token - first_token) / (tokens - 1)
+    return sample
+
+
+def _run_phase(model: LocalModelInterface, scenario: BenchmarkScenario, count: int, offset: int) -> Dict[str, Any]:
+    """Run count requests at the scenario's concurrency."""
+    prompts = [build_prompt(model, scenario.prompt_tokens, offset + i) for i in range(count)]
+    samples: List[Dict[str, Any]] = []
+    errors: List[str] = []
+
+    def run(prompt: str) -> None:
+        try:
+            samples.append(_run_request(model, scenario, prompt))
+        except Exception as e:
+            errors.append(str(e))
+
+    start = time.perf_counter()
+    if scenario.concurrency <= 1:
+        for prompt in prompts:
+            run(prompt)
+    else:
+        with ThreadPoolExecutor(max_workers=scenario.concurrency) as executor:
+            list(executor.map(run, prompts))
+    return {"samples": samples, "errors": errors, "wall_seconds": time.perf_counter() - start}
+
+
+def run_scenario(model: LocalModelInterface, scenario: BenchmarkScenario) -> Dict[str, Any]:
+    """
+    Run a scenario: warm-up requests, then the measured steady state.
+
+    Args:
+        model: Initialized model to benchmark
+        scenario: Workload to run
+
+    Returns:
+        Scenario definition, percentile summaries, throughput and memory
+    """
+    sampler = get_memory_sampler()
+    memory_before = sampler.sample()
+
+    warmup = _run_phase(model, scenario, scenario.warmup, offset=0)
+    steady = _run_phase(model, scenario, scenario.iterations, offset=scenario.warmup)
+
+    histograms = {name: RingHistogram(max(scenario.iterations, 1))
+                  for name in ("latency", "first_token", "decode_per_token")}
+    completion_tokens = 0
+    for sample in steady["samples"]:
+        completion_tokens += sample["completion_tokens"]
+        for name, histogram in histograms.items():
+            if name in sample:
+                histogram.record(sample[name])
+
+    wall_seconds = steady["wall_seconds"]
+    warmup_latency = [sample["latency"] for sample in warmup["samples"]]
+    result = {
+        "scenario": asdict(scenario),
+        "requests": len(steady["samples"]),
+        "errors": len(steady["errors"]) + len(warmup["errors"]),
+        "wall_seconds": wall_seconds,
+        "throughput_tokens_per_second": completion_tokens / wall_seconds if wall_seconds > 0 else 0.0,
+        "requests_per_second": len(steady["samples"]) / wall_seconds if wall_seconds > 0 else 0.0,
+        "warmup": {
+            "requests": len(warmup["samples"]),
+            "mean_latency": sum(warmup_latency) / len(warmup_latency) if warmup_latency else 0.0,
+        },
+        "memory": {"before_gb": memory_before, "after_gb": sampler.sample(), "peak_gb": sampler.peak_gb},
+    }
+    for name, histogram in histograms.items():
+        result[name] = histogram.snapshot()
+    if steady["errors"]:
+        result["first_error"] = steady["errors"][0]
+    return result
+
+
+class BenchmarkHarness:
+    """Runs scenarios against a model and stores or compares the results."""
+
+    def __init__(self,
+                 model: LocalModelInterface,
+                 scenarios: Optional[List[BenchmarkScenario]] = None,
+                 model_name: Optional[str] = None):
+        """
+        Initialize the harness.
+
+        Args:
+            model: Initialized model to benchmark
+            scenarios: Workloads to run (defaults to DEFAULT_SCENARIOS)
+            model_name: Name recorded in results (defaults to the model file name)
+        """
+        self.model = model
+        self.scenarios = scenarios or DEFAULT_SCENARIOS
+        self.model_name = model_name or os.path.basename(getattr(model, "model_path", None) or "model")
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every scenario.
+
+        Returns:
+            Results document keyed by scenario name
+        """
+        results = {
+            "schema_version": RESULTS_SCHEMA_VERSION,
+            "timestamp": time.time(),
+            "model": self.model_name,
+            "host": host_info(),
+            **git_commit(),
+            "scenarios": {},
+        }
+        for scenario in self.scenarios:
+            logger.info(f"Running benchmark scenario {scenario.name}")
+            results["scenarios"][scenario.name] = run_scenario(self.model, scenario)
+        return results
+
+
+def save_results(results: Dict[str, Any], results_dir: str) -> str:
+    """
+    Store results as <results_dir>/<host fingerprint>/<model>/<commit>.json.
+
+    Args:
+        results: Results from BenchmarkHarness.run
+        results_dir: Root of the results history
+
+    Returns:
+        Path of the written file
+    """
+    directory = os.path.join(results_dir, results["host"]["fingerprint"], results["model"])
+    os.makedirs(directory, exist_ok=True)
+    name = results["commit"][:12] + ("-dirty" if results.get("dirty") else "")
+    path = os.path.join(directory, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load a results or baseline file."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _metric(scenario_result: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = scenario_result
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def compare_results(current: Dict[str, Any],
+                    baseline: Dict[str, Any],
+                    tolerance: float = 0.10,
+                    min_delta_seconds: float = 0.001) -> Dict[str, Any]:
+    """
+    Compare results against a baseline.
+
+    A metric regresses when it is more than tolerance worse than the
+    baseline. Latency metrics must also be worse by min_delta_seconds, so
+    sub-millisecond jitter on fast scenarios is not flagged.
+
+    Args:
+        current: Results being checked
+        baseline: Stored baseline results
+        tolerance: Allowed relative change
+        min_delta_seconds: Smallest latency change that counts
+
+    Returns:
+        Per-metric comparisons, regressions and improvements
+    """
+    if current.get("host", {}).get("fingerprint") != baseline.get("host", {}).get("fingerprint"):
+        logger.warning("Comparing results from different hosts")
+
+    comparisons = []
+    for name, scenario_result in current.get("scenarios", {}).items():
+        baseline_result = baseline.get("scenarios", {}).get(name)
+        if baseline_result is None:
+            continue
+        metrics = REGRESSION_METRICS
+        if scenario_result.get("scenario", {}).get("concurrency", 1) > 1:
+            metrics = {path: REGRESSION_METRICS[path] for path in CONCURRENT_REGRESSION_METRICS}
+        for path, higher_is_better in metrics.items():
+            value = _metric(scenario_result, path)
+            reference = _metric(baseline_result, path)
+            if value is None or reference is None or reference <= 0:
+                continue
+
+            change = (value - reference) / reference
+            worse = -change if higher_is_better else change
+            significant = higher_is_better or abs(value - reference) >= min_delta_seconds
+            status = "unchanged"
+            if significant and worse > tolerance:
+                status = "regression"
+            elif significant and worse < -tolerance:
+                status = "improvement"
+            comparisons.append({
+                "scenario": name,
+                "metric": path,
+                "baseline": reference,
+                "current": value,
+                "change": change,
+                "status": status,
+            })
+
+    return {
+        "commit": current.get("commit"),
+        "baseline_commit": baseline.get("commit"),
+        "tolerance": tolerance,
+        "comparisons": comparisons,
+        "regressions": [item for item in comparisons if item["status"] == "regression"],
+        "improvements": [item for item in comparisons if item["status"] == "improvement"],
+    }
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    """Render a comparison as a text table."""
+    lines = [f"Benchmark comparison: {comparison['commit']} vs baseline {comparison['baseline_commit']}"]
+    for item in comparison["comparisons"]:
+        marker = {"regression": "!!", "improvement": "++"}.get(item["status"], "  ")
+        lines.append(f"{marker} {item['scenario']:<16} {item['metric']:<30} "
+                     f"{item['baseline']:>10.4f} -> {item['current']:>10.4f} ({item['change']:+.1%})")
+    lines.append(f"{len(comparison['regressions'])} regressions, {len(comparison['improvements'])} improvements")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; exits non-zero when a regression is found."""
+    parser = argparse.ArgumentParser(description="Run local model benchmark scenarios")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--model", help="GGUF model to benchmark through LlamaModelAdapter")
+    source.add_argument("--fake", action="store_true", help="Benchmark the deterministic fake model")
+    parser.add_argument("--scenarios", help="JSON file of scenarios (defaults to the built-in set)")
+    parser.add_argument("--results-dir", default=os.path.join("data", "benchmarks"),
+                        help="Directory for results keyed by host and commit")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write these results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative change")
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        from .fake_model import FakeLocalModel
+        model = FakeLocalModel()
+    else:
+        from ..llama_adapter import LlamaModelAdapter
+        model = LlamaModelAdapter(args.model, {"system_prompt_snapshot": False})
+
+    scenarios = load_scenarios(args.scenarios) if args.scenarios else None
+    # Read the baseline first: it may be an earlier result for this commit and host
+    baseline = load_results(args.baseline) if args.baseline and not args.update_baseline else None
+    try:
+        results = BenchmarkHarness(model, scenarios).run()
+    finally:
+        model.shutdown()
+
+    print(f"Results written to {save_results(results, args.results_dir)}")
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+    elif baseline is not None:
+        comparison = compare_results(results, baseline, tolerance=args.tolerance)
+        print(format_comparison(comparison))
+        if comparison["regressions"]:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
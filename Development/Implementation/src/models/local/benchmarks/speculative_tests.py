@@ -0,0 +1,133 @@
+"""
+Speculative decoding benchmark for local model optimization.
+
+Compares decode speed with and without a draft model on the same prompts.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import time
+import logging
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+def _run_prompts(model_manager, model_id: str, prompts: List[str], max_tokens: int) -> List[Dict[str, Any]]:
+    """Generate greedily for each prompt and record speed."""
+    cases = []
+    for i, prompt in enumerate(prompts):
+        try:
+            start_time = time.time()
+            response = model_manager.generate(
+                prompt,
+                model_id=model_id,
+                params={"max_tokens": max_tokens, "temperature": 0.0}
+            )
+            latency = time.time() - start_time
+            completion_tokens = response.get("usage", {}).get("completion_tokens", 0)
+            cases.append({
+                "prompt": prompt,
+                "text": response.get("text", ""),
+                "latency": latency,
+                "tokens": completion_tokens,
+                "tokens_per_second": completion_tokens / latency if latency > 0 else 0,
+                "speculative": response.get("speculative"),
+            })
+        except Exception as e:
+            logger.error(f"Error testing prompt {i+1}: {e}")
+            cases.append({"prompt": prompt, "error": str(e)})
+    return cases
+
+
+def run_speculative_benchmark(model_manager,
+                              model_id: str,
+                              draft_model_path: str,
+                              prompts: Optional[List[str]] = None,
+                              max_tokens: int = 128,
+                              draft_tokens: int = 8) -> Dict[str, Any]:
+    """Run speculative decoding benchmark.
+
+    The model is loaded twice, first without and then with the draft model,
+    and generates greedily so both runs should produce the same text.
+
+    Args:
+        model_manager: Reference to LocalModelManager
+        model_id: ID of the model to benchmark
+        draft_model_path: Path to a draft model sharing the target's tokenizer
+        prompts: List of test prompts
+        max_tokens: Maximum tokens to generate per prompt
+        draft_tokens: Tokens proposed per verification step
+
+    Returns:
+        Benchmark results with per-prompt speedup and acceptance rate
+    """
+    if not prompts:
+        prompts = [
+            "Explain quantum computing in simple terms.",
+            "What are three ways to improve productivity?",
+            "Write a short poem about artificial intelligence."
+        ]
+
+    results = {
+        "model_id": model_id,
+        "benchmark_type": "speculative",
+        "draft_model_path": draft_model_path,
+        "draft_tokens": draft_tokens,
+        "max_tokens": max_tokens,
+        "test_cases": []
+    }
+
+    runs = {}
+    for mode, speculative in (("baseline", False), ("speculative", True)):
+        if model_id in model_manager.active_models:
+            model_manager.unload_model(model_id)
+
+        try:
+            model_manager.load_model(model_id, config={
+                "speculative_decoding": speculative,
+                "draft_model_path": draft_model_path,
+                "draft_tokens": draft_tokens,
+            })
+        except Exception as e:
+            logger.error(f"Failed to load model {model_id} ({mode}): {e}")
+            return {**results, "error": f"Failed to load model ({mode}): {e}"}
+
+        logger.info(f"Running {mode} decoding")
+        runs[mode] = _run_prompts(model_manager, model_id, prompts, max_tokens)
+
+        if speculative:
+            model_data = model_manager.active_models.get(model_id, {})
+            decoder = getattr(model_data.get("adapter"), "draft_decoder", None)
+            if decoder is not None:
+                results["speculative_stats"] = decoder.get_stats()
+        model_manager.unload_model(model_id)
+
+    for baseline, speculative in zip(runs["baseline"], runs["speculative"]):
+        if "error" in baseline or "error" in speculative:
+            results["test_cases"].append({
+                "prompt": baseline["prompt"],
+                "error": baseline.get("error") or speculative.get("error")
+            })
+            continue
+
+        stats = speculative.get("speculative") or {}
+        results["test_cases"].append({
+            "prompt": baseline["prompt"],
+            "baseline_tokens_per_second": baseline["tokens_per_second"],
+            "speculative_tokens_per_second": speculative["tokens_per_second"],
+            "speedup": (speculative["tokens_per_second"] / baseline["tokens_per_second"]
+                        if baseline["tokens_per_second"] > 0 else 0),
+            "acceptance_rate": stats.get("acceptance_rate", 0.0),
+            "outputs_match": baseline["text"] == speculative["text"],
+        })
+
+    valid_cases = [case for case in results["test_cases"] if "error" not in case]
+    if valid_cases:
+        results["avg_speedup"] = sum(case["speedup"] for case in valid_cases) / len(valid_cases)
+        results["avg_acceptance_rate"] = sum(case["acceptance_rate"] for case in valid_cases) / len(valid_cases)
+
+    return results
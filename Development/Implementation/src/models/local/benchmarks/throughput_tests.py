@@ -9,10 +9,13 @@ Throughput benchmark tests for local model optimization.
 
 import time
 import logging
+import threading
+import contextlib
 from typing import Dict, Any, Optional, List
 import copy
 
 from ..optimization import PerformanceMonitor
+from ...utils.inference_scheduler import percentile
 
 logger = logging.getLogger(__name__)
 
@@ -146,4 +149,109 @@ def run_throughput_benchmark(model_manager,
         results["optimal_batch_size"] = best_case["batch_size"]
         results["optimal_tokens_per_second"] = best_case["tokens_per_second"]
     
-    return results
\ No newline at end of file
+    return results
+
+
+def run_concurrent_throughput_benchmark(model_manager,
+                                        model_id: str,
+                                        session_counts: Optional[List[int]] = None,
+                                        prompts: Optional[List[str]] = None,
+                                        max_tokens: int = 64) -> Dict[str, Any]:
+    """Run throughput benchmark with N concurrent sessions.
+    
+    Each session sends one request at the same time. With the model's
+    scheduler enabled the requests share the model token by token; without
+    it they are served one after another (a llama.cpp context cannot be used
+    from two threads at once).
+    
+    Args:
+        model_manager: Reference to LocalModelManager
+        model_id: ID of the model to benchmark
+        session_counts: Numbers of concurrent sessions to test
+        prompts: Prompts assigned round-robin to the sessions
+        max_tokens: Maximum tokens to generate per request
+        
+    Returns:
+        Benchmark results with aggregate tokens/sec, p95 latency and p95
+        time-to-first-token per case
+    """
+    if not session_counts:
+        session_counts = [1, 2, 4, 8]
+    if not prompts:
+        prompts = ["Explain the concept of recursion in programming. Be comprehensive but concise."]
+    
+    results = {
+        "model_id": model_id,
+        "benchmark_type": "concurrent_throughput",
+        "test_cases": []
+    }
+    
+    try:
+        model_manager.load_model(model_id)
+    except Exception as e:
+        logger.error(f"Failed to load model {model_id}: {e}")
+        return {
+            "model_id": model_id,
+            "benchmark_type": "concurrent_throughput",
+            "error": f"Failed to load model: {e}"
+        }
+    
+    adapter = model_manager.active_models[model_id]["adapter"]
+    scheduled = getattr(adapter, "scheduler", None) is not None
+    results["scheduler"] = scheduled
+    serial_lock = threading.Lock()
+    
+    for sessions in session_counts:
+        logger.info(f"Testing {sessions} concurrent sessions")
+        latencies = []
+        first_token_times = []
+        completion_tokens = []
+        errors = []
+        results_lock = threading.Lock()
+        
+        def session(index: int) -> None:
+            prompt = prompts[index % len(prompts)]
+            start_time = time.perf_counter()
+            first_token = None
+            tokens = 0
+            try:
+                with contextlib.nullcontext() if scheduled else serial_lock:
+                    for _ in model_manager.generate_stream(prompt, model_id=model_id, format_prompt=False,
+                                                           params={"max_tokens": max_tokens}):
+                        if first_token is None:
+                            first_token = time.perf_counter() - start_time
+                        tokens += 1
+                latency = time.perf_counter() - start_time
+                with results_lock:
+                    latencies.append(latency)
+                    first_token_times.append(first_token or latency)
+                    completion_tokens.append(tokens)
+            except Exception as e:
+                with results_lock:
+                    errors.append(str(e))
+        
+        threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+        wall_start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_time = time.perf_counter() - wall_start
+        
+        total_tokens = sum(completion_tokens)
+        results["test_cases"].append({
+            "sessions": sessions,
+            "completed": len(latencies),
+            "errors": errors,
+            "wall_time": wall_time,
+            "total_tokens": total_tokens,
+            "aggregate_tokens_per_second": total_tokens / wall_time if wall_time > 0 else 0,
+            "latency_p50": percentile(latencies, 0.50),
+            "latency_p95": percentile(latencies, 0.95),
+            "time_to_first_token_p95": percentile(first_token_times, 0.95),
+        })
+    
+    if scheduled:
+        results["scheduler_stats"] = adapter.scheduler.get_stats()
+    
+    return results
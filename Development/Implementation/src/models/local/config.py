@@ -48,6 +48,33 @@ def get_default_config() -> Dict[str, Any]:
             "stop_sequences": ["\n\nHuman:", "\n\nUser:"],
         },
         "registry_path": os.path.join(os.path.dirname(base_model_dir), "registry", "registry.json"),
+        # System-prompt KV snapshots, keyed by model path, context size and prompt text
+        "system_prompt_snapshot": True,
+        "snapshot_dir": os.path.join(os.path.dirname(base_model_dir), "kv_snapshots"),
+        # Concurrent requests share the model through a pool of contexts
+        "scheduler": {
+            "enabled": False,
+            "contexts": 2,
+            "max_queue_size": 32,
+            "queue_timeout": None,
+        },
+        # Model lifecycle: startup preloading, pinning and eviction
+        "lifecycle": {
+            "background_preload": False,
+            "preload": [],  # Defaults to default_model when preloading
+            "pinned": [],  # Never evicted; voice-path models belong here
+            "mmap": True,
+            "mlock": "pinned",  # "pinned", "all" or "none"
+            "use_half_life_seconds": 600.0,
+        },
+        # Measured thread/batch/context settings per host and model
+        "autotune": {
+            "apply_profiles": True,
+            "profile_path": None,  # Defaults to ~/.vanta/autotune_profiles.json
+            "thread_counts": [],  # Defaults to candidates around the core counts
+            "batch_sizes": [512, 256, 1024],  # The first is the baseline
+            "context_sizes": [],  # Defaults to the configured context size only
+        },
     }
 
 
@@ -85,6 +112,12 @@ def validate_config(config: Dict[str, Any]) -> Dict[str, Any]:
     if validated["context_size"] < 512:
         raise ValueError("context_size must be at least 512")
     
+    if validated["scheduler"].get("contexts", 1) < 1:
+        raise ValueError("scheduler contexts must be at least 1")
+    
+    if validated["lifecycle"].get("mlock", "pinned") not in ("pinned", "all", "none", True, False):
+        raise ValueError("lifecycle mlock must be 'pinned', 'all' or 'none'")
+    
     if validated["max_tokens"] < 1:
         raise ValueError("max_tokens must be at least 1")
     
@@ -6,6 +6,7 @@ Base interface for local model operations.
 # DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
 """
 
+import threading
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, Generator, List, Union
 
@@ -44,13 +45,15 @@ class LocalModelInterface(ABC):
     @abstractmethod
     def generate_stream(self, 
                         prompt: str, 
-                        params: Optional[Dict[str, Any]] = None) -> Generator[Dict[str, Any], None, None]:
+                        params: Optional[Dict[str, Any]] = None,
+                        cancel: Optional[threading.Event] = None) -> Generator[Dict[str, Any], None, None]:
         """
         Stream a response for the given prompt.
         
         Args:
             prompt: The prompt text to generate from
             params: Optional generation parameters (temperature, top_p, etc.)
+            cancel: Cancellation token checked between tokens
             
         Returns:
             Generator yielding chunks of the generated text with metadata
@@ -20,16 +20,23 @@ from .exceptions import (
     ModelInitializationError,
     ModelGenerationError,
     ModelNotInitializedError,
+    ModelResourceError,
     TokenizationError
 )
 from .optimization import (
     OptimizationConfig,
-    PerformanceMonitor,
+    InferenceInstrumentation,
+    get_memory_sampler,
+    read_prompt_eval_ms,
     QuantizationManager,
     MetalAccelerationManager,
     MemoryManager,
     ThreadOptimizer
 )
+from ..utils.kv_snapshot import SystemPromptSnapshot
+from ..utils.inference_scheduler import InferenceScheduler, SchedulerOverloadedError
+from ..utils.cancellation import CancellationToken, CancellationStats, REASON_CANCELLED
+from .speculative import DraftModelDecoder
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +56,13 @@ class LlamaModelAdapter(LocalModelInterface):
         self.config = config or {}
         self.model = None
         self.is_initialized = False
-        self.performance_monitor = None
+        self.instrumentation = InferenceInstrumentation()
+        self.cancellation = CancellationStats(self.config.get("max_tokens", 256))
         self.optimization_config = None
+        self.system_snapshot: Optional[SystemPromptSnapshot] = None
+        self.context_params: Optional[Dict[str, Any]] = None
+        self.scheduler: Optional[InferenceScheduler] = None
+        self.draft_decoder: Optional[DraftModelDecoder] = None
         
         # Initialize if model_path is provided
         if model_path:
@@ -105,7 +117,10 @@ class LlamaModelAdapter(LocalModelInterface):
                     use_metal=self.config.get("metal_enabled"),
                     thread_count=self.config.get("thread_count"),
                     batch_size=self.config.get("batch_size"),
-                    context_size=self.config.get("context_size", 4096)
+                    context_size=self.config.get("context_size", 4096),
+                    speculative_decoding=self.config.get("speculative_decoding", False),
+                    draft_model_path=self.config.get("draft_model_path"),
+                    draft_tokens=self.config.get("draft_tokens", 8)
                 )
                 
                 # Apply automatic optimizations
@@ -125,8 +140,30 @@ class LlamaModelAdapter(LocalModelInterface):
                     thread_count=self.config.get("thread_count", os.cpu_count() or 4),
                     batch_size=self.config.get("batch_size", 512),
                     context_size=self.config.get("context_size", 4096),
+                    speculative_decoding=self.config.get("speculative_decoding", False),
+                    draft_model_path=self.config.get("draft_model_path"),
+                    draft_tokens=self.config.get("draft_tokens", 8),
+                )
+            
+            # Thread and batch sizes measured on this host, if tuned, unless configured
+            autotune = self.config.get("autotune", {})
+            if autotune.get("apply_profiles", True):
+                explicit = set(self.config.get("optimization") or {})
+                explicit.update(field for field in ("thread_count", "batch_size")
+                                if self.config.get(field) is not None)
+                opt_config = opt_config.optimize_for_device(
+                    detect_hardware=False,
+                    model_path=model_path,
+                    profile_path=autotune.get("profile_path"),
+                    keep=explicit
                 )
             
+            # Memory-mapping policy chosen by the model lifecycle manager
+            if "use_mmap" in self.config:
+                opt_config.mmap = self.config["use_mmap"]
+            if "use_mlock" in self.config:
+                opt_config.mlock = self.config["use_mlock"]
+            
             # Validate configuration
             opt_config.validate()
             
@@ -155,29 +192,35 @@ class LlamaModelAdapter(LocalModelInterface):
             logger.info(f"  Threads: {opt_config.thread_count}")
             logger.info(f"  Metal enabled: {opt_config.use_metal}")
             logger.info(f"  GPU layers: {opt_config.n_gpu_layers if opt_config.use_metal else 0}")
+            if opt_config.speculative_decoding:
+                logger.info(f"  Draft model: {opt_config.draft_model_path} ({opt_config.draft_tokens} tokens/step)")
+            
+            self.instrumentation.model_id = os.path.basename(model_path)
             
-            # Initialize performance monitor
-            self.performance_monitor = PerformanceMonitor()
-            self.performance_monitor.start_monitoring()
+            # Store optimization config for reference
+            self.optimization_config = opt_config
+            self.context_params = {"model_path": model_path, **llama_params}
             
-            # Initialize the model
+            # Initialize the model, with a draft model proposing tokens if configured
             start_time = time.time()
-            self.model = Llama(
-                model_path=model_path,
-                **llama_params
-            )
+            if opt_config.speculative_decoding:
+                self.draft_decoder = self._create_draft_decoder(Llama)
+                self.model = Llama(draft_model=self.draft_decoder, **self.context_params)
+            else:
+                self.model = Llama(**self.context_params)
             load_time = time.time() - start_time
             
-            # Stop performance monitor
-            self.performance_monitor.stop_monitoring()
-            memory_usage = self.performance_monitor.get_metrics()["peak_memory_gb"]
+            memory_usage = get_memory_sampler().sample()
             
             logger.info(f"Model loaded in {load_time:.2f} seconds, memory usage: {memory_usage:.2f} GB")
             
-            # Store optimization config for reference
-            self.optimization_config = opt_config
-            
             self.is_initialized = True
+            
+            # Start from the precomputed system-prompt state
+            system_prompt = self.config.get("system_prompt")
+            if system_prompt and self.config.get("system_prompt_snapshot", True):
+                self.warm_system_prompt(system_prompt)
+            
             return True
             
         except ImportError as e:
@@ -187,6 +230,119 @@ class LlamaModelAdapter(LocalModelInterface):
             logger.error(f"Failed to initialize model: {e}")
             raise ModelInitializationError(f"Model initialization failed: {e}")
     
+    def warm_system_prompt(self, system_prompt: str) -> bool:
+        """
+        Load the KV state for a fixed system prompt into the model.
+        
+        The state is evaluated once and saved under ``snapshot_dir``; later
+        loads of the same model file, context size and prompt text restore it
+        from disk. Prompts that start with ``system_prompt`` then skip
+        re-evaluating it.
+        
+        Args:
+            system_prompt: System block exactly as it starts every prompt
+            
+        Returns:
+            True if the model holds the system-prompt state, False otherwise
+        """
+        if not self.is_initialized or self.model is None:
+            raise ModelNotInitializedError("Model not initialized. Call initialize() first.")
+        
+        try:
+            context_size = self.optimization_config.context_size if self.optimization_config else 0
+            if self.system_snapshot is None or self.system_snapshot.prompt != system_prompt:
+                self.system_snapshot = SystemPromptSnapshot(
+                    model_path=self.model_path,
+                    context_size=context_size,
+                    prompt=system_prompt,
+                    snapshot_dir=self.config.get("snapshot_dir")
+                )
+            restored = self.system_snapshot.warm(self.model)
+            logger.info(f"System prompt {'restored from snapshot' if restored else 'evaluated and snapshotted'}")
+            return True
+        except Exception as e:
+            # A missing snapshot only costs latency, never correctness
+            logger.warning(f"Failed to warm system prompt state: {e}")
+            self.system_snapshot = None
+            return False
+    
+    def create_context(self):
+        """
+        Open another inference context on the loaded model.
+        
+        The context is a separate llama_cpp.Llama instance with its own KV
+        cache. Weights are memory-mapped, so the operating system shares them
+        with the primary context instead of loading them again.
+        
+        Returns:
+            A llama_cpp.Llama instance starting from the system-prompt state
+            
+        Raises:
+            ModelNotInitializedError: If model is not initialized
+            ModelInitializationError: If the context cannot be created
+        """
+        if not self.is_initialized or self.context_params is None:
+            raise ModelNotInitializedError("Model not initialized. Call initialize() first.")
+        
+        try:
+            from llama_cpp import Llama
+            context_params = {**self.context_params, "use_mmap": True}
+            if self.draft_decoder is not None:
+                # Draft KV state is per sequence, so each context gets its own
+                context_params["draft_model"] = self._create_draft_decoder(Llama)
+            context = Llama(**context_params)
+        except Exception as e:
+            logger.error(f"Failed to create inference context: {e}")
+            raise ModelInitializationError(f"Failed to create inference context: {e}")
+        
+        if self.system_snapshot is not None:
+            self.system_snapshot.restore(context)
+        return context
+    
+    def _create_draft_decoder(self, llama_class) -> DraftModelDecoder:
+        """Load the draft model with the target's runtime settings."""
+        opt_config = self.optimization_config
+        if not os.path.exists(opt_config.draft_model_path):
+            raise ModelNotFoundError(f"Draft model file not found: {opt_config.draft_model_path}")
+        
+        draft_params = {
+            **self.context_params,
+            "model_path": opt_config.draft_model_path,
+            "use_mmap": True,
+        }
+        logger.info(f"Loading draft model for speculative decoding: {opt_config.draft_model_path}")
+        return DraftModelDecoder(llama_class(**draft_params), num_pred_tokens=opt_config.draft_tokens)
+    
+    def start_scheduler(self, scheduler_config: Optional[Dict[str, Any]] = None) -> InferenceScheduler:
+        """
+        Serve requests through an InferenceScheduler instead of one at a time.
+        
+        Args:
+            scheduler_config: Scheduler configuration; "contexts" sets the
+                number of concurrent sequences (default 2), the remaining
+                keys are passed to InferenceScheduler
+                
+        Returns:
+            The running scheduler
+        """
+        if self.scheduler is not None:
+            return self.scheduler
+        
+        scheduler_config = scheduler_config or {}
+        contexts = [self.model]
+        for _ in range(max(scheduler_config.get("contexts", 2), 1) - 1):
+            contexts.append(self.create_context())
+        
+        self.scheduler = InferenceScheduler(contexts, scheduler_config)
+        self.scheduler.start()
+        return self.scheduler
+    
+    def stop_scheduler(self) -> None:
+        """Stop the scheduler and release its extra contexts."""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+    
     def generate(self, prompt: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Generate a response for the given prompt.
@@ -206,70 +362,73 @@ class LlamaModelAdapter(LocalModelInterface):
             raise ModelNotInitializedError("Model not initialized. Call initialize() first.")
         
         generation_params = self._prepare_generation_params(params)
+        priority = generation_params.pop("priority", None)
         
+        if self.scheduler is not None:
+            return self._generate_scheduled(prompt, generation_params, priority)
+        
+        timer = self.instrumentation.start_request()
         try:
-            # Set up performance monitoring
-            monitor = self.performance_monitor or PerformanceMonitor()
-            monitor.start_monitoring()
-            
-            # Count prompt tokens
-            if hasattr(self, 'tokenize'):
-                prompt_tokens = len(self.tokenize(prompt))
-            else:
-                prompt_tokens = len(prompt.split()) # Rough approximation
+            if self.draft_decoder is not None:
+                self.draft_decoder.begin_request()
             
             # Generate response
-            start_time = time.time()
+            prompt_eval_before = read_prompt_eval_ms(self.model)
             result = self.model.create_completion(
                 prompt=prompt,
                 **generation_params
             )
-            generation_time = time.time() - start_time
-            
-            # Record performance metrics
-            completion_tokens = result.get("usage", {}).get("completion_tokens", 0)
-            monitor.record_inference(
-                prompt_tokens=prompt_tokens,
-                completion_tokens=completion_tokens,
-                latency=generation_time
-            )
             
-            # Stop monitoring and get metrics
-            monitor.stop_monitoring()
-            perf_metrics = monitor.get_metrics()
+            # Token counts come from llama.cpp rather than re-tokenizing the prompt
+            usage = result.get("usage", {})
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+            prompt_eval_seconds = None
+            prompt_eval_after = read_prompt_eval_ms(self.model)
+            if prompt_eval_before is not None and prompt_eval_after is not None:
+                prompt_eval_seconds = max(prompt_eval_after - prompt_eval_before, 0.0) / 1000
+            generation_time = timer.finish(prompt_tokens, completion_tokens, prompt_eval_seconds)
+            tokens_per_second = completion_tokens / generation_time if generation_time > 0 else 0
             
             # Extract and return the result
             output = {
                 "text": result["choices"][0]["text"],
                 "finish_reason": result["choices"][0].get("finish_reason", "length"),
                 "usage": {
-                    "prompt_tokens": result.get("usage", {}).get("prompt_tokens", prompt_tokens),
+                    "prompt_tokens": prompt_tokens,
                     "completion_tokens": completion_tokens,
-                    "total_tokens": result.get("usage", {}).get("total_tokens", prompt_tokens + completion_tokens),
+                    "total_tokens": usage.get("total_tokens", prompt_tokens + completion_tokens),
                 },
                 "generation_time": generation_time,
                 "model_path": self.model_path,
-                "tokens_per_second": perf_metrics.get("avg_tokens_per_second", 0),
-                "peak_memory_gb": perf_metrics.get("peak_memory_gb", 0),
+                "tokens_per_second": tokens_per_second,
+                "peak_memory_gb": get_memory_sampler().peak_gb,
             }
+            if prompt_eval_seconds is not None:
+                output["prompt_eval_time"] = prompt_eval_seconds
+            if self.draft_decoder is not None:
+                output["speculative"] = self.draft_decoder.get_stats(request_only=True)
             
-            tokens_per_second = completion_tokens / generation_time if generation_time > 0 else 0
             logger.debug(f"Generated {completion_tokens} tokens in {generation_time:.2f}s ({tokens_per_second:.2f} tokens/sec)")
             return output
             
         except Exception as e:
+            self.instrumentation.record_error()
             logger.error(f"Generation failed: {e}")
             raise ModelGenerationError(f"Model generation failed: {e}")
     
     def generate_stream(self, 
                         prompt: str, 
-                        params: Optional[Dict[str, Any]] = None) -> Generator[Dict[str, Any], None, None]:
+                        params: Optional[Dict[str, Any]] = None,
+                        cancel: Optional[CancellationToken] = None) -> Generator[Dict[str, Any], None, None]:
         """
         Stream a response for the given prompt.
         
         Args:
             prompt: The prompt text to generate from
             params: Optional generation parameters (temperature, top_p, etc.)
+            cancel: When cancelled, decoding stops before the next token and
+                a last chunk with finish_reason "cancelled" is yielded
             
         Yields:
             Chunks of the generated text with metadata
@@ -282,33 +441,157 @@ class LlamaModelAdapter(LocalModelInterface):
             raise ModelNotInitializedError("Model not initialized. Call initialize() first.")
         
         generation_params = self._prepare_generation_params(params)
+        priority = generation_params.pop("priority", None)
+        
+        if self.scheduler is not None:
+            yield from self._generate_stream_scheduled(prompt, generation_params, priority, cancel)
+            return
         
+        timer = self.instrumentation.start_request()
+        finished = False
         try:
-            start_time = time.time()
-            completion_tokens = 0
+            if self.draft_decoder is not None:
+                self.draft_decoder.begin_request()
             
             # Create streaming completion
-            for chunk in self.model.create_completion(
+            completion = self.model.create_completion(
                 prompt=prompt,
                 stream=True,
                 **generation_params
-            ):
-                chunk_text = chunk["choices"][0]["text"]
-                completion_tokens += 1
-                current_time = time.time()
+            )
+            for chunk in completion:
+                if cancel is not None and cancel.is_set():
+                    # Closing the completion frees the context for the next request
+                    completion.close()
+                    yield self._cancelled_chunk(timer.tokens, time.perf_counter() - timer.start, cancel)
+                    return
+                elapsed = timer.token()
+                completion_tokens = timer.tokens
                 
-                yield {
-                    "text": chunk_text,
+                output = {
+                    "text": chunk["choices"][0]["text"],
                     "finish_reason": chunk["choices"][0].get("finish_reason"),
                     "usage": {
                         "completion_tokens": completion_tokens,
                     },
-                    "generation_time": current_time - start_time,
+                    "generation_time": elapsed,
                 }
+                if output["finish_reason"] is not None:
+                    # Stream chunks carry no usage, so the prompt is only counted here
+                    usage = chunk.get("usage") or {}
+                    timer.finish(usage.get("prompt_tokens", 0), usage.get("completion_tokens"))
+                    finished = True
+                    self.cancellation.record_completed(completion_tokens, elapsed)
+                    output["tokens_per_second"] = completion_tokens / elapsed if elapsed > 0 else 0
+                    if self.draft_decoder is not None:
+                        output["speculative"] = self.draft_decoder.get_stats(request_only=True)
+                
+                yield output
                 
         except Exception as e:
+            self.instrumentation.record_error()
             logger.error(f"Streaming generation failed: {e}")
             raise ModelGenerationError(f"Model streaming generation failed: {e}")
+        finally:
+            # Cancelled, abandoned and failed streams still take time to serve
+            if not finished:
+                timer.finish(0)
+    
+    def _generate_scheduled(self,
+                            prompt: str,
+                            generation_params: Dict[str, Any],
+                            priority: Union[int, str, None]) -> Dict[str, Any]:
+        """Generate through the scheduler, sharing the model with concurrent requests."""
+        try:
+            output = self.scheduler.submit(prompt, generation_params, priority).result()
+        except SchedulerOverloadedError as e:
+            logger.warning(f"Generation rejected: {e}")
+            raise ModelResourceError(str(e))
+        except Exception as e:
+            self.instrumentation.record_error()
+            logger.error(f"Generation failed: {e}")
+            raise ModelGenerationError(f"Model generation failed: {e}")
+        
+        self._record_scheduled(output)
+        output["model_path"] = self.model_path
+        return output
+    
+    def _generate_stream_scheduled(self,
+                                   prompt: str,
+                                   generation_params: Dict[str, Any],
+                                   priority: Union[int, str, None],
+                                   cancel: Optional[CancellationToken] = None) -> Generator[Dict[str, Any], None, None]:
+        """Stream through the scheduler; closing the generator or `cancel` cancels the request."""
+        try:
+            request = self.scheduler.submit(prompt, generation_params, priority)
+        except SchedulerOverloadedError as e:
+            logger.warning(f"Streaming generation rejected: {e}")
+            raise ModelResourceError(str(e))
+        
+        if cancel is not None:
+            # The scheduler drops the request, or stops it at its next decode step
+            cancel.add_callback(request.cancel)
+        start = time.perf_counter()
+        recorded = False
+        try:
+            yield from request.stream()
+            output = request.result(timeout=0)
+            self._record_scheduled(output)
+            recorded = True
+            if request.cancelled and request.finish_reason is None:
+                yield self._cancelled_chunk(request.completion_tokens, output["generation_time"], cancel)
+            else:
+                self.cancellation.record_completed(output["usage"]["completion_tokens"], output["generation_time"])
+        except Exception as e:
+            self.instrumentation.record_error()
+            logger.error(f"Streaming generation failed: {e}")
+            raise ModelGenerationError(f"Model streaming generation failed: {e}")
+        finally:
+            if not recorded:
+                # Abandoned or failed before the scheduler reported its timings
+                self.instrumentation.record(0, request.completion_tokens, time.perf_counter() - start)
+            request.cancel()
+            if cancel is not None:
+                cancel.remove_callback(request.cancel)
+    
+    def _cancelled_chunk(self,
+                         completion_tokens: int,
+                         elapsed: float,
+                         cancel: Optional[CancellationToken]) -> Dict[str, Any]:
+        """Record an abandoned stream and build its last chunk."""
+        reason = (cancel.reason if cancel is not None else None) or REASON_CANCELLED
+        logger.debug(f"Streaming generation cancelled ({reason}) after {completion_tokens} tokens")
+        return {
+            "text": "",
+            "finish_reason": "cancelled",
+            "usage": {
+                "completion_tokens": completion_tokens,
+            },
+            "generation_time": elapsed,
+            "cancellation": self.cancellation.record_cancelled(completion_tokens, elapsed, reason),
+        }
+    
+    def _record_scheduled(self, output: Dict[str, Any]) -> None:
+        """Record a finished scheduler request using the scheduler's own timings."""
+        usage = output.get("usage", {})
+        self.instrumentation.record(
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            latency=output.get("generation_time", 0.0),
+            first_token=output.get("time_to_first_token")
+        )
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get inference metrics recorded since the model was loaded.
+        
+        Returns:
+            Request counters, latency/prompt-eval/first-token/decode histograms,
+            memory readings and cancelled-work estimates
+        """
+        metrics = self.instrumentation.get_metrics()
+        metrics["cancellation"] = self.cancellation.get_stats()
+        return metrics
     
     def tokenize(self, text: str) -> List[int]:
         """
@@ -368,16 +651,16 @@ class LlamaModelAdapter(LocalModelInterface):
             logger.warning("Model not initialized, nothing to shut down")
             return True
         
+        self.stop_scheduler()
+        
         try:
             # Get memory usage before shutdown
-            memory_before = 0
-            if self.performance_monitor:
-                metrics = self.performance_monitor.get_metrics()
-                memory_before = metrics.get("current_memory_gb", 0)
+            memory_before = get_memory_sampler().sample()
             
             # Delete the model to free resources
             # The Python garbage collector should handle actual resource cleanup
             self.model = None
+            self.draft_decoder = None
             self.is_initialized = False
             
             # Force garbage collection to clean up memory
@@ -0,0 +1,334 @@
+"""
+Model lifecycle management for local models.
+
+Tracks what each loaded model would cost to bring back, so that when the
+model limit is reached the cheapest model to lose is evicted instead of the
+oldest one. Models can be pinned (never evicted, optionally mlocked) and
+preloaded in the background at startup, with readiness probes so callers
+can tell a loading model from a missing one.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, List, Iterable
+
+from .optimization import RingHistogram
+
+logger = logging.getLogger(__name__)
+
+# Readiness states
+STATE_UNLOADED = "unloaded"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+# Reload time assumed for a model that has never been loaded, per GB
+DEFAULT_LOAD_SECONDS_PER_GB = 2.0
+
+
+class _ModelRecord:
+    """Lifecycle state of one model."""
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self.state = STATE_UNLOADED
+        self.ready = threading.Event()
+        self.load_lock = threading.Lock()
+        self.size_gb = 0.0
+        self.last_load_seconds: Optional[float] = None
+        self.loads = 0
+        self.evictions = 0
+        self.uses = 0.0  # Exponentially decayed use count
+        self.last_used = 0.0
+        self.error: Optional[str] = None
+
+
+class ModelLifecycleManager:
+    """Preloading, pinning, readiness and cost-aware eviction for LocalModelManager."""
+
+    def __init__(self, model_manager, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the lifecycle manager.
+
+        Args:
+            model_manager: LocalModelManager whose models are managed
+            config: Lifecycle configuration ("preload", "pinned", "mmap",
+                "mlock", "use_half_life_seconds", "background_preload")
+        """
+        self.model_manager = model_manager
+        self.config = config or {}
+        self.pinned = set(self.config.get("pinned", []))
+        self.half_life = self.config.get("use_half_life_seconds", 600.0)
+
+        self._records: Dict[str, _ModelRecord] = {}
+        self._lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
+        self._load_times = RingHistogram(256)
+        self._stats = {"loads": 0, "load_failures": 0, "evictions": 0, "preloads": 0, "freed_gb": 0.0}
+
+    def _record(self, model_id: str) -> _ModelRecord:
+        with self._lock:
+            record = self._records.get(model_id)
+            if record is None:
+                record = self._records[model_id] = _ModelRecord(model_id)
+            return record
+
+    def load_lock(self, model_id: str) -> threading.Lock:
+        """Lock serializing loads of one model between foreground and preload threads."""
+        return self._record(model_id).load_lock
+
+    def pin(self, model_id: str) -> None:
+        """Never evict a model (e.g. the one on the voice path)."""
+        self.pinned.add(model_id)
+
+    def unpin(self, model_id: str) -> None:
+        """Allow a model to be evicted again."""
+        self.pinned.discard(model_id)
+
+    def load_params(self, model_id: str) -> Dict[str, Any]:
+        """
+        llama.cpp memory parameters for a model.
+
+        Weights are memory-mapped so loads are lazy and shared between
+        contexts. mlock keeps pages resident; by default only pinned models
+        are locked so unpinned models can be paged out under pressure.
+
+        Args:
+            model_id: ID of the model being loaded
+
+        Returns:
+            "use_mmap" and "use_mlock" settings
+        """
+        mlock = self.config.get("mlock", "pinned")
+        if mlock == "pinned":
+            use_mlock = model_id in self.pinned
+        else:
+            use_mlock = mlock in (True, "all")
+        return {"use_mmap": self.config.get("mmap", True), "use_mlock": use_mlock}
+
+    def on_loading(self, model_id: str) -> None:
+        """Mark a model as loading."""
+        record = self._record(model_id)
+        record.state = STATE_LOADING
+        record.error = None
+        record.ready.clear()
+
+    def on_loaded(self, model_id: str, load_seconds: float, model_path: Optional[str] = None) -> None:
+        """
+        Record a finished load.
+
+        Args:
+            model_id: ID of the loaded model
+            load_seconds: Wall time the load took
+            model_path: Path of the model file, used for its size
+        """
+        record = self._record(model_id)
+        if model_path and os.path.exists(model_path):
+            record.size_gb = os.path.getsize(model_path) / (1024 * 1024 * 1024)
+        record.last_load_seconds = load_seconds
+        record.loads += 1
+        record.state = STATE_READY
+        record.ready.set()
+        self._load_times.record(load_seconds)
+        with self._lock:
+            self._stats["loads"] += 1
+        logger.info(f"Model {model_id} ready after {load_seconds:.2f}s")
+
+    def on_load_failed(self, model_id: str, error: Exception) -> None:
+        """Record a failed load and wake up anyone waiting for it."""
+        record = self._record(model_id)
+        record.state = STATE_FAILED
+        record.error = str(error)
+        record.ready.set()
+        with self._lock:
+            self._stats["load_failures"] += 1
+
+    def on_unloaded(self, model_id: str) -> None:
+        """Mark a model as unloaded."""
+        record = self._record(model_id)
+        record.state = STATE_UNLOADED
+        record.ready.clear()
+
+    def record_use(self, model_id: str) -> None:
+        """Count a request against a model's recent-use weight."""
+        record = self._record(model_id)
+        now = time.monotonic()
+        record.uses = self._decayed_uses(record, now) + 1.0
+        record.last_used = now
+
+    def _decayed_uses(self, record: _ModelRecord, now: float) -> float:
+        if not record.last_used or self.half_life <= 0:
+            return record.uses
+        return record.uses * math.pow(0.5, (now - record.last_used) / self.half_life)
+
+    def eviction_cost(self, model_id: str) -> float:
+        """
+        Expected cost of evicting a model.
+
+        Size, reload time (measured, or estimated from size before the first
+        load) and recent use all make a model dearer to lose: with a limit
+        on the number of loaded models, a small model that reloads quickly
+        and has been idle for a while is the cheapest to evict.
+
+        Args:
+            model_id: ID of a loaded model
+
+        Returns:
+            Size in GB x reload seconds x recent use (infinite when pinned)
+        """
+        if model_id in self.pinned:
+            return math.inf
+        record = self._record(model_id)
+        size_gb = max(record.size_gb, 0.1)
+        reload_seconds = record.last_load_seconds
+        if reload_seconds is None:
+            reload_seconds = size_gb * DEFAULT_LOAD_SECONDS_PER_GB
+        recent_use = 1.0 + self._decayed_uses(record, time.monotonic())
+        return size_gb * reload_seconds * recent_use
+
+    def select_evictions(self, loaded: Iterable[str], max_models: int, incoming: Optional[str] = None) -> List[str]:
+        """
+        Choose which models to unload to make room for another.
+
+        Args:
+            loaded: IDs of the currently loaded models
+            max_models: Maximum number of loaded models (<= 0 means unlimited)
+            incoming: ID of the model about to be loaded
+
+        Returns:
+            Model IDs to unload, cheapest first
+        """
+        loaded = [model_id for model_id in loaded if model_id != incoming]
+        if max_models <= 0:
+            return []
+        excess = len(loaded) + 1 - max_models
+        if excess <= 0:
+            return []
+
+        candidates = sorted((model_id for model_id in loaded if model_id not in self.pinned),
+                            key=self.eviction_cost)
+        if len(candidates) < excess:
+            logger.warning(f"Only {len(candidates)} unpinned models can be evicted, {excess} needed")
+        return candidates[:excess]
+
+    def on_evicted(self, model_id: str) -> None:
+        """Record an eviction."""
+        record = self._record(model_id)
+        record.evictions += 1
+        with self._lock:
+            self._stats["evictions"] += 1
+            self._stats["freed_gb"] += record.size_gb
+        logger.info(f"Evicted model {model_id} (cost {self.eviction_cost(model_id):.2f})")
+
+    def preload(self, model_ids: Optional[List[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load models ahead of the first request.
+
+        Args:
+            model_ids: Models to load (defaults to the configured preload list,
+                then the manager's default model)
+            background: Load on a daemon thread instead of blocking
+
+        Returns:
+            The preload thread, or None if loading synchronously
+        """
+        if model_ids is None:
+            model_ids = list(self.config.get("preload", []))
+            default_model = self.model_manager.config.get("default_model")
+            if not model_ids and default_model:
+                model_ids = [default_model]
+
+        for model_id in model_ids:
+            if model_id not in self.model_manager.active_models:
+                self.on_loading(model_id)
+
+        if not background:
+            self._preload(model_ids)
+            return None
+
+        self._preload_thread = threading.Thread(target=self._preload, args=(model_ids,),
+                                                name="model-preload", daemon=True)
+        self._preload_thread.start()
+        return self._preload_thread
+
+    def _preload(self, model_ids: List[str]) -> None:
+        """Load each model, logging rather than raising failures."""
+        for model_id in model_ids:
+            try:
+                self.model_manager.load_model(model_id)
+                with self._lock:
+                    self._stats["preloads"] += 1
+            except Exception as e:
+                logger.warning(f"Preloading model {model_id} failed: {e}")
+                self.on_load_failed(model_id, e)
+
+    def is_ready(self, model_id: str) -> bool:
+        """Readiness probe: True when the model can serve requests without loading."""
+        return self._record(model_id).state == STATE_READY
+
+    def is_loading(self, model_id: str) -> bool:
+        """True while a model is being loaded."""
+        return self._record(model_id).state == STATE_LOADING
+
+    def wait_until_ready(self, model_id: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a loading model.
+
+        Args:
+            model_id: ID of the model
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if the model is ready, False if it failed or timed out
+        """
+        record = self._record(model_id)
+        record.ready.wait(timeout)
+        return record.state == STATE_READY
+
+    def get_readiness(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Readiness of every known model.
+
+        Returns:
+            Map of model ID to state, pinning, last load time and error
+        """
+        with self._lock:
+            records = list(self._records.values())
+        return {
+            record.model_id: {
+                "state": record.state,
+                "pinned": record.model_id in self.pinned,
+                "last_load_seconds": record.last_load_seconds,
+                "size_gb": record.size_gb,
+                "error": record.error,
+            }
+            for record in records
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Load and eviction metrics.
+
+        Returns:
+            Counters, the load-time histogram and per-model load/eviction counts
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            records = list(self._records.values())
+        stats["load_seconds"] = self._load_times.snapshot()
+        stats["models"] = {
+            record.model_id: {
+                "loads": record.loads,
+                "evictions": record.evictions,
+                "recent_uses": self._decayed_uses(record, time.monotonic()),
+            }
+            for record in records
+        }
+        return stats
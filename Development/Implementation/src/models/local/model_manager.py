@@ -11,7 +11,8 @@ import os
 import json
 import logging
 import time
-from typing import Dict, List, Any, Optional, Generator, Union
+import threading
+from typing import Dict, List, Any, Optional, Generator, Union, Callable
 
 from .config import get_default_config, validate_config, load_config
 from .llama_adapter import LlamaModelAdapter
@@ -28,9 +29,15 @@ from .optimization import (
     QuantizationManager,
     MetalAccelerationManager,
     MemoryManager,
-    ThreadOptimizer
+    ThreadOptimizer,
+    ThreadAutotuner,
+    TuningProfileStore,
+    default_thread_candidates,
+    llama_measure
 )
 from .benchmarks import BenchmarkRunner
+from .model_lifecycle import ModelLifecycleManager
+from ..utils.cancellation import CancellationToken
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +55,7 @@ class LocalModelManager:
         self.config = config or get_default_config()
         self.model_registry = self._load_registry()
         self.active_models = {}  # Map of model_id to model adapter
+        self._models_lock = threading.RLock()  # Guards active_models across concurrent loads
         self.prompt_formatter = PromptFormatter()
         
         # Initialize optimization components
@@ -63,7 +71,14 @@ class LocalModelManager:
         # Set up benchmark runner
         self.benchmark_runner = None  # Initialize lazily when needed
         
+        # Preloading, pinning and cost-aware eviction
+        self.lifecycle = ModelLifecycleManager(self, self.config.get("lifecycle", {}))
+        
         logger.info(f"LocalModelManager initialized with {len(self.model_registry.get('models', []))} models in registry")
+        
+        # Load startup models before the first request needs them
+        if self.config.get("lifecycle", {}).get("background_preload", False):
+            self.lifecycle.preload()
     
     def _load_registry(self) -> Dict[str, Any]:
         """
@@ -149,13 +164,31 @@ class LocalModelManager:
         if not model_info:
             raise ModelNotFoundError(f"Model {model_id} not found in registry")
         
-        # Check if we need to unload any models due to max_models constraint
-        max_models = self.config.get("max_models_loaded", 1)
-        if len(self.active_models) >= max_models and max_models > 0:
-            # Unload the oldest model
-            oldest_model_id = next(iter(self.active_models))
-            logger.info(f"Max models reached, unloading {oldest_model_id}")
-            self.unload_model(oldest_model_id)
+        # A preload of the same model may already be in progress; wait for it
+        with self.lifecycle.load_lock(model_id):
+            if model_id in self.active_models:
+                return model_id
+            
+            self.lifecycle.on_loading(model_id)
+            start_time = time.time()
+            try:
+                model_path = self._load_model(model_id, model_info, config)
+            except Exception as e:
+                self.lifecycle.on_load_failed(model_id, e)
+                raise
+            self.lifecycle.on_loaded(model_id, time.time() - start_time, model_path)
+            return model_id
+    
+    def _load_model(self, model_id: str, model_info: Dict[str, Any], config: Optional[Dict[str, Any]]) -> str:
+        """
+        Load a model that is not loaded yet (load lock held).
+        
+        Returns:
+            Path of the loaded model file
+        """
+        # Make room before loading so the weights fit in memory
+        with self._models_lock:
+            self._make_room(model_id)
         
         # Construct full model path
         model_path = model_info.get("path")
@@ -165,6 +198,7 @@ class LocalModelManager:
         
         # Prepare model configuration
         model_config = self.config.copy()
+        model_config.update(self.lifecycle.load_params(model_id))
         if config:
             model_config.update(config)
         
@@ -179,7 +213,11 @@ class LocalModelManager:
             model_size_billions = self.quantization_manager.get_model_size_from_name(model_name) / 1_000_000_000
             
             # Create optimized configuration
-            opt_config = OptimizationConfig()
+            opt_config = OptimizationConfig(
+                speculative_decoding=model_config.get("speculative_decoding", False),
+                draft_model_path=model_config.get("draft_model_path"),
+                draft_tokens=model_config.get("draft_tokens", 8)
+            )
             opt_config = self.thread_optimizer.optimize_thread_config(
                 config=opt_config,
                 model_size_billions=model_size_billions
@@ -189,8 +227,8 @@ class LocalModelManager:
                 model_size_billions=model_size_billions
             )
             
-            # Add optimization config to model configuration
-            model_config["optimization"] = opt_config.to_dict()
+            # The adapter derives the same settings itself; passing them as an
+            # explicit "optimization" dict would stop tuned profiles applying
             
             # Check if memory is sufficient
             memory_check = self.memory_manager.check_memory_sufficient(
@@ -214,22 +252,35 @@ class LocalModelManager:
             if model_format in ["gguf", "ggml"]:
                 logger.info(f"Loading {model_format} model {model_id} from {model_path}")
                 
+                # The template's system block starts every formatted prompt
+                model_config.setdefault(
+                    "system_prompt",
+                    self.prompt_formatter.format_system_prefix(self._get_model_architecture(model_info))
+                )
+                
                 # Create and initialize adapter
                 adapter = LlamaModelAdapter()
                 adapter.initialize(model_path, model_config)
                 
-                # Store in active models
-                self.active_models[model_id] = {
-                    "adapter": adapter,
-                    "info": model_info,
-                    "loaded_at": time.time(),
-                    "model_type": self._get_model_architecture(model_info),
-                    "performance": adapter.performance_monitor.get_metrics() if hasattr(adapter, "performance_monitor") else None,
-                    "optimization": adapter.optimization_config.to_dict() if hasattr(adapter, "optimization_config") else None
-                }
+                # Multiplex concurrent requests onto the model
+                if model_config.get("scheduler", {}).get("enabled", False):
+                    adapter.start_scheduler(model_config["scheduler"])
+                
+                # Store in active models. Another model may have been registered
+                # while this one loaded, so the limit is checked again.
+                with self._models_lock:
+                    self._make_room(model_id)
+                    self.active_models[model_id] = {
+                        "adapter": adapter,
+                        "info": model_info,
+                        "loaded_at": time.time(),
+                        "model_type": self._get_model_architecture(model_info),
+                        "performance": adapter.get_metrics(),
+                        "optimization": adapter.optimization_config.to_dict() if hasattr(adapter, "optimization_config") else None
+                    }
                 
                 logger.info(f"Successfully loaded model {model_id}")
-                return model_id
+                return model_path
             else:
                 raise UnsupportedModelTypeError(f"Model format {model_format} not supported")
                 
@@ -237,6 +288,14 @@ class LocalModelManager:
             logger.error(f"Failed to load model {model_id}: {e}")
             raise ModelLoadError(f"Failed to load model {model_id}: {e}")
     
+    def _make_room(self, model_id: str) -> None:
+        """Unload the models that are cheapest to bring back until model_id fits (models lock held)."""
+        max_models = self.config.get("max_models_loaded", 1)
+        for evicted_id in self.lifecycle.select_evictions(list(self.active_models), max_models, incoming=model_id):
+            logger.info(f"Max models reached, unloading {evicted_id}")
+            if self.unload_model(evicted_id):
+                self.lifecycle.on_evicted(evicted_id)
+    
     def unload_model(self, model_id: str) -> bool:
         """
         Unload a model to free resources.
@@ -247,22 +306,39 @@ class LocalModelManager:
         Returns:
             True if successful, False otherwise
         """
-        if model_id not in self.active_models:
-            logger.warning(f"Model {model_id} not loaded, nothing to unload")
-            return False
+        with self._models_lock:
+            if model_id not in self.active_models:
+                logger.warning(f"Model {model_id} not loaded, nothing to unload")
+                return False
+            
+            try:
+                # Get adapter and shut it down
+                adapter = self.active_models[model_id]["adapter"]
+                adapter.shutdown()
+                
+                # Remove from active models
+                del self.active_models[model_id]
+                self.lifecycle.on_unloaded(model_id)
+                logger.info(f"Successfully unloaded model {model_id}")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to unload model {model_id}: {e}")
+                return False
+    
+    def get_readiness(self) -> Dict[str, Any]:
+        """
+        Readiness probe for health checks.
         
-        try:
-            # Get adapter and shut it down
-            adapter = self.active_models[model_id]["adapter"]
-            adapter.shutdown()
-            
-            # Remove from active models
-            del self.active_models[model_id]
-            logger.info(f"Successfully unloaded model {model_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to unload model {model_id}: {e}")
-            return False
+        Returns:
+            Whether the default model can serve requests without loading,
+            plus the lifecycle state of every known model
+        """
+        default_model = self.config.get("default_model")
+        return {
+            "ready": bool(default_model) and self.lifecycle.is_ready(default_model),
+            "default_model": default_model,
+            "models": self.lifecycle.get_readiness(),
+        }
     
     def get_model_stats(self, model_id: str) -> Dict[str, Any]:
         """
@@ -299,10 +375,18 @@ class LocalModelManager:
             stats["optimization"] = model_data["optimization"]
             
         # Add performance metrics if available
-        if hasattr(adapter, "performance_monitor") and adapter.performance_monitor:
-            stats["performance"] = adapter.performance_monitor.get_metrics()
+        if hasattr(adapter, "get_metrics"):
+            stats["performance"] = adapter.get_metrics()
         elif "performance" in model_data:
             stats["performance"] = model_data["performance"]
+        
+        if getattr(adapter, "scheduler", None) is not None:
+            stats["scheduler"] = adapter.scheduler.get_stats()
+        
+        if getattr(adapter, "draft_decoder", None) is not None:
+            stats["speculative"] = adapter.draft_decoder.get_stats()
+        
+        stats["lifecycle"] = self.lifecycle.get_readiness().get(model_id)
             
         # Add memory usage if available
         try:
@@ -321,7 +405,8 @@ class LocalModelManager:
                  params: Optional[Dict[str, Any]] = None,
                  format_prompt: bool = True,
                  system_prompt: Optional[str] = None,
-                 messages: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+                 messages: Optional[List[Dict[str, str]]] = None,
+                 priority: Union[int, str, None] = None) -> Dict[str, Any]:
         """
         Generate a response from the specified model.
         
@@ -332,6 +417,8 @@ class LocalModelManager:
             format_prompt: Whether to format the prompt using templates
             system_prompt: Optional system prompt to use if formatting
             messages: Optional message list to format instead of raw prompt
+            priority: Scheduling priority ("voice", "interactive", "background")
+                when the model serves concurrent requests
             
         Returns:
             Dictionary containing the generated text and metadata
@@ -349,9 +436,6 @@ class LocalModelManager:
         adapter = model_data["adapter"]
         model_type = model_data["model_type"]
         
-        # Record start of processing in performance monitor
-        self.performance_monitor.start_monitoring()
-        
         # Format prompt if requested
         input_prompt = prompt
         if format_prompt:
@@ -365,6 +449,9 @@ class LocalModelManager:
                     {"role": "user", "content": prompt}
                 ], model_type)
         
+        if priority is not None:
+            params = {**(params or {}), "priority": priority}
+        
         # Generate response
         result = adapter.generate(input_prompt, params)
         
@@ -375,13 +462,6 @@ class LocalModelManager:
         # Add model information
         result["model_id"] = model_id
         
-        # Update performance monitoring
-        self.performance_monitor.stop_monitoring()
-        
-        # Update model_data with latest performance metrics if adapter has them
-        if hasattr(adapter, "performance_monitor") and adapter.performance_monitor:
-            model_data["performance"] = adapter.performance_monitor.get_metrics()
-        
         return result
     
     def generate_stream(self, 
@@ -390,7 +470,9 @@ class LocalModelManager:
                         params: Optional[Dict[str, Any]] = None,
                         format_prompt: bool = True,
                         system_prompt: Optional[str] = None,
-                        messages: Optional[List[Dict[str, str]]] = None) -> Generator[Dict[str, Any], None, None]:
+                        messages: Optional[List[Dict[str, str]]] = None,
+                        priority: Union[int, str, None] = None,
+                        cancel: Optional[CancellationToken] = None) -> Generator[Dict[str, Any], None, None]:
         """
         Stream a response from the specified model.
         
@@ -401,6 +483,10 @@ class LocalModelManager:
             format_prompt: Whether to format the prompt using templates
             system_prompt: Optional system prompt to use if formatting
             messages: Optional message list to format instead of raw prompt
+            priority: Scheduling priority ("voice", "interactive", "background")
+                when the model serves concurrent requests
+            cancel: Cancellation token; decoding stops before the next token
+                once it is cancelled
             
         Yields:
             Chunks of the generated text with metadata
@@ -431,9 +517,12 @@ class LocalModelManager:
                     {"role": "user", "content": prompt}
                 ], model_type)
         
+        if priority is not None:
+            params = {**(params or {}), "priority": priority}
+        
         # Generate response stream
         full_text = ""
-        for chunk in adapter.generate_stream(input_prompt, params):
+        for chunk in adapter.generate_stream(input_prompt, params, cancel=cancel):
             chunk_text = chunk["text"]
             full_text += chunk_text
             
@@ -618,6 +707,66 @@ class LocalModelManager:
             )
         }
     
+    def autotune_model(self,
+                       model_id: str,
+                       thread_counts: Optional[List[int]] = None,
+                       batch_sizes: Optional[List[int]] = None,
+                       context_sizes: Optional[List[int]] = None,
+                       measure: Optional[Callable[[int, int, int], Dict[str, float]]] = None) -> Dict[str, Any]:
+        """
+        Measure thread, batch and context sizes for a model on this host.
+        
+        The best configuration is stored in the tuning profile file and used
+        by every later load of the model on this host.
+        
+        Args:
+            model_id: ID of the model to tune
+            thread_counts: Candidate thread counts (defaults from the CPU)
+            batch_sizes: Candidate batch sizes, the first being the baseline
+            context_sizes: Candidate context sizes (defaults to the configured one)
+            measure: Calibration function (defaults to loading the model with llama.cpp)
+            
+        Returns:
+            Best configuration with its measurements and all trials
+            
+        Raises:
+            ModelNotFoundError: If the model is not found in the registry
+        """
+        model_info = self.get_model_info(model_id)
+        if not model_info:
+            raise ModelNotFoundError(f"Model {model_id} not found in registry")
+        
+        model_path = model_info.get("path")
+        if not os.path.isabs(model_path):
+            model_path = os.path.join(self.config.get("model_dir"), model_path)
+        if not os.path.exists(model_path):
+            raise ModelNotFoundError(f"Model file not found: {model_path}")
+        
+        autotune = self.config.get("autotune", {})
+        thread_counts = thread_counts or autotune.get("thread_counts") or \
+            default_thread_candidates(self.thread_optimizer.cpu_info)
+        batch_sizes = batch_sizes or autotune.get("batch_sizes") or [512, 256, 1024]
+        context_sizes = context_sizes or autotune.get("context_sizes") or [self.config.get("context_size", 4096)]
+        
+        if measure is None:
+            # Keep GPU offload and memory settings of the loaded model, if any
+            base_params = {}
+            adapter = self.active_models.get(model_id, {}).get("adapter")
+            if adapter is not None and getattr(adapter, "context_params", None):
+                base_params = {key: value for key, value in adapter.context_params.items()
+                               if key not in ("model_path", "n_threads", "n_threads_batch", "n_batch", "n_ctx")}
+            measure = llama_measure(model_path, base_params)
+        
+        logger.info(f"Autotuning {model_id}: threads {thread_counts}, batch sizes {batch_sizes}, "
+                    f"context sizes {context_sizes}")
+        result = ThreadAutotuner(measure).tune(thread_counts, batch_sizes, context_sizes)
+        
+        profile = {key: value for key, value in result.items() if key != "trials"}
+        TuningProfileStore(autotune.get("profile_path")).put(model_path, profile)
+        logger.info(f"Tuned {model_id}: {result['n_threads']} threads, {result['n_batch']} batch size, "
+                    f"{result['n_ctx']} context ({result['score_seconds']:.3f}s per turn)")
+        return result
+    
     def _ensure_model_loaded(self, model_id: Optional[str] = None) -> str:
         """
         Ensure a model is loaded, loading it if necessary.
@@ -637,8 +786,9 @@ class LocalModelManager:
         # Load the model if not already loaded
         if model_id not in self.active_models:
             logger.info(f"Model {model_id} not loaded, loading now")
-            return self.load_model(model_id)
+            self.load_model(model_id)
         
+        self.lifecycle.record_use(model_id)
         return model_id
     
     def _get_model_architecture(self, model_info: Dict[str, Any]) -> str:
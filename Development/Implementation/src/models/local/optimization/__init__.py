@@ -9,7 +9,11 @@ Local model optimization subpackage.
 
 from .optimization_config import OptimizationConfig
 from .performance_monitor import PerformanceMonitor
+from .instrumentation import InferenceInstrumentation, RingHistogram, get_memory_sampler, read_prompt_eval_ms
 from .quantization import QuantizationManager
 from .metal_config import MetalAccelerationManager
 from .memory_manager import MemoryManager
 from .thread_optimizer import ThreadOptimizer
+from .autotuner import (
+    ThreadAutotuner, TuningProfileStore, default_thread_candidates, llama_measure, stub_measure
+)
@@ -0,0 +1,344 @@
+"""
+Calibration-based tuning of threads, batch size and context size.
+
+A short sweep measures prompt evaluation and decode speed on the actual
+model and host, and the best configuration is stored per (host, model)
+fingerprint so later starts reuse it instead of the heuristics in
+ThreadOptimizer. Measurement is a plain function, so the search can run
+against the analytic stub model offline.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import platform
+import threading
+from typing import Dict, Any, Optional, List, Callable
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".vanta", "autotune_profiles.json")
+
+# Bytes of the model file hashed for its fingerprint (GGUF header and metadata)
+MODEL_FINGERPRINT_BYTES = 4 * 1024 * 1024
+
+CALIBRATION_PROMPT = (
+    "The quick brown fox jumps over the lazy dog. A journey of a thousand miles begins with "
+    "a single step. Summarize the following conversation in one sentence: the user asked about "
+    "the weather tomorrow and the assistant said it would be sunny with light wind."
+)
+
+# measure(n_threads, n_batch, n_ctx) -> {"prompt_seconds", "decode_tokens_per_second"}
+MeasureFunction = Callable[[int, int, int], Dict[str, float]]
+
+
+def host_fingerprint() -> str:
+    """
+    Identify the host's hardware and inference runtime.
+
+    Returns:
+        Short hash of CPU, core counts, memory and llama.cpp version
+    """
+    parts = [platform.system(), platform.machine(), platform.processor(), str(os.cpu_count())]
+    if PSUTIL_AVAILABLE:
+        parts.append(str(psutil.cpu_count(logical=False)))
+        parts.append(str(psutil.virtual_memory().total // (1024 * 1024 * 1024)))
+    try:
+        import llama_cpp
+        version = getattr(llama_cpp, "__version__", None)
+        if version:
+            parts.append(version)
+    except ImportError:
+        pass
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def model_fingerprint(model_path: str) -> str:
+    """
+    Identify a model file without hashing all of it.
+
+    The GGUF header, tensor metadata and the file size change whenever the
+    weights or quantization do, so the first few MB plus the size suffice.
+
+    Args:
+        model_path: Path to the model file
+
+    Returns:
+        Short hash of the file head and size
+    """
+    digest = hashlib.sha256(str(os.path.getsize(model_path)).encode("utf-8"))
+    with open(model_path, "rb") as f:
+        digest.update(f.read(MODEL_FINGERPRINT_BYTES))
+    return digest.hexdigest()[:16]
+
+
+class TuningProfileStore:
+    """JSON file of tuned configurations keyed by host and model fingerprint."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            path: Profile file (defaults to ~/.vanta/autotune_profiles.json)
+        """
+        self.path = path or DEFAULT_PROFILE_PATH
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(host: str, model: str) -> str:
+        return f"{host}:{model}"
+
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {"version": 1, "profiles": {}}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read tuning profiles from {self.path}: {e}")
+            return {"version": 1, "profiles": {}}
+
+    def get(self, model_path: str, host: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the tuned configuration for a model on this host.
+
+        Args:
+            model_path: Path to the model file
+            host: Host fingerprint (defaults to this host)
+
+        Returns:
+            Profile dictionary, or None if the model was never tuned here
+        """
+        if not os.path.exists(model_path):
+            return None
+        key = self.key(host or host_fingerprint(), model_fingerprint(model_path))
+        return self._read().get("profiles", {}).get(key)
+
+    def put(self, model_path: str, profile: Dict[str, Any], host: Optional[str] = None) -> None:
+        """
+        Store the tuned configuration for a model on this host.
+
+        Args:
+            model_path: Path to the model file
+            profile: Tuned settings and their measurements
+            host: Host fingerprint (defaults to this host)
+        """
+        host = host or host_fingerprint()
+        model = model_fingerprint(model_path)
+        with self._lock:
+            data = self._read()
+            data.setdefault("profiles", {})[self.key(host, model)] = {
+                **profile,
+                "host": host,
+                "model": model,
+                "model_name": os.path.basename(model_path),
+                "tuned_at": time.time(),
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+
+
+class ThreadAutotuner:
+    """Coordinate search over n_threads, then n_batch, then n_ctx."""
+
+    def __init__(self,
+                 measure: MeasureFunction,
+                 completion_tokens: int = 32,
+                 context_tolerance: float = 0.05):
+        """
+        Initialize the autotuner.
+
+        Args:
+            measure: Runs one calibration request for a configuration
+            completion_tokens: Tokens per response in the cost of a turn
+            context_tolerance: Fraction slower than the best that a larger
+                context may be and still be chosen
+        """
+        self.measure = measure
+        self.completion_tokens = completion_tokens
+        self.context_tolerance = context_tolerance
+
+    def score(self, metrics: Dict[str, float]) -> float:
+        """Seconds for a typical turn: prompt evaluation plus decoding the response."""
+        decode_tps = metrics.get("decode_tokens_per_second", 0.0)
+        if decode_tps <= 0:
+            return float("inf")
+        return metrics.get("prompt_seconds", 0.0) + self.completion_tokens / decode_tps
+
+    def _trial(self, trials: List[Dict[str, Any]], n_threads: int, n_batch: int, n_ctx: int) -> Dict[str, Any]:
+        for trial in trials:
+            if (trial["n_threads"], trial["n_batch"], trial["n_ctx"]) == (n_threads, n_batch, n_ctx):
+                return trial
+        try:
+            metrics = self.measure(n_threads, n_batch, n_ctx)
+            trial = {"n_threads": n_threads, "n_batch": n_batch, "n_ctx": n_ctx, **metrics,
+                     "score_seconds": self.score(metrics)}
+        except Exception as e:
+            logger.warning(f"Calibration failed for threads={n_threads} batch={n_batch} ctx={n_ctx}: {e}")
+            trial = {"n_threads": n_threads, "n_batch": n_batch, "n_ctx": n_ctx,
+                     "error": str(e), "score_seconds": float("inf")}
+        trials.append(trial)
+        logger.debug(f"Calibration threads={n_threads} batch={n_batch} ctx={n_ctx}: "
+                     f"{trial['score_seconds']:.3f}s per turn")
+        return trial
+
+    def tune(self,
+             thread_counts: List[int],
+             batch_sizes: List[int],
+             context_sizes: List[int]) -> Dict[str, Any]:
+        """
+        Run the calibration sweep.
+
+        Threads are swept at the first batch and context size, batch sizes
+        at the best thread count, then context sizes at both; the largest
+        context within context_tolerance of the fastest is kept.
+
+        Args:
+            thread_counts: Candidate n_threads values
+            batch_sizes: Candidate n_batch values (the first is the baseline)
+            context_sizes: Candidate n_ctx values (the first is the baseline)
+
+        Returns:
+            Best n_threads, n_batch and n_ctx with their measurements and all trials
+        """
+        trials: List[Dict[str, Any]] = []
+        n_batch, n_ctx = batch_sizes[0], context_sizes[0]
+
+        best = min((self._trial(trials, t, n_batch, n_ctx) for t in thread_counts),
+                   key=lambda trial: trial["score_seconds"])
+        best = min((self._trial(trials, best["n_threads"], b, n_ctx) for b in batch_sizes),
+                   key=lambda trial: trial["score_seconds"])
+
+        context_trials = [self._trial(trials, best["n_threads"], best["n_batch"], c) for c in context_sizes]
+        fastest = min(trial["score_seconds"] for trial in context_trials)
+        best = max((trial for trial in context_trials
+                    if trial["score_seconds"] <= fastest * (1 + self.context_tolerance)),
+                   key=lambda trial: trial["n_ctx"])
+
+        if best["score_seconds"] == float("inf"):
+            raise RuntimeError("Every calibration run failed")
+
+        result = {key: value for key, value in best.items() if key != "error"}
+        result["trials"] = trials
+        return result
+
+
+def llama_measure(model_path: str,
+                  base_params: Optional[Dict[str, Any]] = None,
+                  llama_class=None,
+                  prompt: str = CALIBRATION_PROMPT,
+                  max_tokens: int = 32) -> MeasureFunction:
+    """
+    Measure configurations by loading the model with each of them.
+
+    Weights are memory-mapped, so after the first load each configuration
+    only pays for creating a context.
+
+    Args:
+        model_path: Path to the GGUF model
+        base_params: Other llama.cpp parameters (GPU layers etc.)
+        llama_class: llama_cpp.Llama or a stand-in
+        prompt: Calibration prompt
+        max_tokens: Tokens decoded per run
+
+    Returns:
+        Measure function for ThreadAutotuner
+    """
+    if llama_class is None:
+        from llama_cpp import Llama as llama_class
+
+    def measure(n_threads: int, n_batch: int, n_ctx: int) -> Dict[str, float]:
+        params = {**(base_params or {}), "model_path": model_path, "n_threads": n_threads,
+                  "n_threads_batch": n_threads, "n_batch": n_batch, "n_ctx": n_ctx,
+                  "use_mmap": True, "verbose": False}
+        model = llama_class(**params)
+        try:
+            # Warm-up, so page faults and graph allocation aren't measured
+            model.create_completion(prompt="Hello", max_tokens=1, temperature=0.0)
+
+            start = time.perf_counter()
+            first_token = None
+            tokens = 0
+            for _ in model.create_completion(prompt=prompt, max_tokens=max_tokens, temperature=0.0,
+                                             stream=True):
+                if first_token is None:
+                    first_token = time.perf_counter()
+                tokens += 1
+            end = time.perf_counter()
+        finally:
+            del model
+
+        if first_token is None:
+            raise RuntimeError("Calibration run generated no tokens")
+        decode_seconds = end - first_token
+        return {
+            "prompt_seconds": first_token - start,
+            "decode_tokens_per_second": (tokens - 1) / decode_seconds if decode_seconds > 0 else 0.0,
+        }
+
+    return measure
+
+
+def stub_measure(physical_cores: int = 8,
+                 optimal_batch: int = 512,
+                 prompt_tokens: int = 64) -> MeasureFunction:
+    """
+    Analytic stand-in for a model, for exercising the search offline.
+
+    Decode speed scales with threads up to the physical core count and
+    drops when oversubscribed; prompt evaluation is fastest at
+    optimal_batch; larger contexts cost a little decode speed.
+
+    Args:
+        physical_cores: Cores the simulated host has
+        optimal_batch: Batch size with the fastest prompt evaluation
+        prompt_tokens: Prompt length of the simulated calibration run
+
+    Returns:
+        Deterministic measure function for ThreadAutotuner
+    """
+    def measure(n_threads: int, n_batch: int, n_ctx: int) -> Dict[str, float]:
+        effective = min(n_threads, physical_cores) - 0.5 * max(n_threads - physical_cores, 0)
+        effective = max(effective, 0.5)
+        batch_penalty = 1.0 + 0.2 * abs(n_batch - optimal_batch) / optimal_batch
+        context_penalty = 1.0 + 0.01 * (n_ctx / 2048)
+        return {
+            "prompt_seconds": prompt_tokens * 0.002 * batch_penalty / effective,
+            "decode_tokens_per_second": 5.0 * effective / context_penalty,
+        }
+
+    return measure
+
+
+def default_thread_candidates(cpu_info: Dict[str, Any]) -> List[int]:
+    """
+    Thread counts worth measuring on a host.
+
+    Args:
+        cpu_info: CPU information from ThreadOptimizer
+
+    Returns:
+        Sorted candidates around the performance and physical core counts
+    """
+    physical = cpu_info.get("physical_cores") or 4
+    performance = cpu_info.get("performance_cores") or physical
+    logical = cpu_info.get("logical_cores") or physical
+    candidates = {max(1, physical // 2), performance, max(1, physical - 1), physical, logical}
+    return sorted(candidates)
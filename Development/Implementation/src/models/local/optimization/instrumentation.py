@@ -0,0 +1,354 @@
+"""
+Always-on, low-overhead instrumentation for local model inference.
+
+Recording a request costs a few monotonic clock reads and ring-buffer
+writes. Memory is sampled by one process-wide background thread shared by
+every model, instead of a thread started and stopped around each call.
+Percentiles are computed only when metrics are queried.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import math
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+class RingHistogram:
+    """Fixed-size ring buffer of recent samples with on-demand percentiles."""
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize the histogram.
+
+        Args:
+            capacity: Number of most recent samples kept
+        """
+        self.capacity = capacity
+        self._samples = [0.0] * capacity
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        """Record a sample.
+
+        Args:
+            value: Sample value
+        """
+        with self._lock:
+            self._samples[self._count % self.capacity] = value
+            self._count += 1
+            self._total += value
+            if value > self._max:
+                self._max = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize the recorded samples.
+
+        Returns:
+            Lifetime count, mean and max, plus percentiles over the window
+        """
+        with self._lock:
+            count = self._count
+            total = self._total
+            maximum = self._max
+            window = sorted(self._samples[:min(count, self.capacity)])
+
+        def percentile(fraction: float) -> float:
+            if not window:
+                return 0.0
+            rank = max(math.ceil(fraction * len(window)) - 1, 0)
+            return window[rank]
+
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "max": maximum,
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        }
+
+    def reset(self) -> None:
+        """Clear all samples."""
+        with self._lock:
+            self._count = 0
+            self._total = 0.0
+            self._max = 0.0
+
+
+class MemorySampler:
+    """Single background thread sampling process memory for all consumers."""
+
+    def __init__(self, interval: float = 1.0):
+        """Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.current_gb = 0.0
+        self.peak_gb = 0.0
+        self._users = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def acquire(self) -> None:
+        """Register a consumer, starting the thread for the first one."""
+        if not PSUTIL_AVAILABLE:
+            return
+
+        with self._lock:
+            self._users += 1
+            if self._thread is None or not self._thread.is_alive():
+                self.sample()
+                # A fresh event, so a thread still winding down stays stopped
+                self._stop_event = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop_event,),
+                                                name="memory-sampler", daemon=True)
+                self._thread.start()
+
+    def release(self) -> None:
+        """Unregister a consumer, stopping the thread after the last one."""
+        with self._lock:
+            self._users = max(self._users - 1, 0)
+            if self._users == 0 and self._thread is not None:
+                self._stop_event.set()
+                self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the latest memory readings."""
+        return {"current_memory_gb": self.current_gb, "peak_memory_gb": self.peak_gb}
+
+    def sample(self) -> float:
+        """Read the process RSS now.
+
+        Returns:
+            Current memory usage in GB (0.0 if unavailable)
+        """
+        if not PSUTIL_AVAILABLE:
+            return 0.0
+        try:
+            current = psutil.Process().memory_info().rss / (1024 * 1024 * 1024)  # GB
+        except Exception as e:
+            logger.debug(f"Memory sample failed: {e}")
+            return 0.0
+        self.current_gb = current
+        self.peak_gb = max(self.peak_gb, current)
+        return current
+
+    def _run(self, stop_event: threading.Event) -> None:
+        """Sampling loop."""
+        while not stop_event.wait(self.interval):
+            self.sample()
+
+
+_memory_sampler = MemorySampler()
+
+
+def get_memory_sampler() -> MemorySampler:
+    """Get the process-wide memory sampler."""
+    return _memory_sampler
+
+
+def read_prompt_eval_ms(model) -> Optional[float]:
+    """Cumulative prompt-evaluation time reported by llama.cpp.
+
+    Args:
+        model: llama_cpp.Llama instance
+
+    Returns:
+        Milliseconds spent evaluating prompts since the context was created,
+        or None if this llama.cpp build does not expose timings
+    """
+    try:
+        import llama_cpp
+        ctx = model.ctx
+        if hasattr(llama_cpp, "llama_perf_context"):
+            return float(llama_cpp.llama_perf_context(ctx).t_p_eval_ms)
+        return float(llama_cpp.llama_get_timings(ctx).t_p_eval_ms)
+    except Exception:
+        return None
+
+
+class RequestTimer:
+    """Monotonic timestamps for one generation request."""
+
+    __slots__ = ("instrumentation", "start", "first_token", "last_token", "tokens")
+
+    def __init__(self, instrumentation: "InferenceInstrumentation"):
+        self.instrumentation = instrumentation
+        self.start = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.last_token: Optional[float] = None
+        self.tokens = 0
+
+    def token(self) -> float:
+        """Mark a generated token.
+
+        Returns:
+            Seconds since the request started
+        """
+        now = time.perf_counter()
+        if self.first_token is None:
+            self.first_token = now
+        self.last_token = now
+        self.tokens += 1
+        return now - self.start
+
+    def finish(self,
+               prompt_tokens: int,
+               completion_tokens: Optional[int] = None,
+               prompt_eval_seconds: Optional[float] = None) -> float:
+        """Record the request.
+
+        Args:
+            prompt_tokens: Prompt tokens reported by llama.cpp
+            completion_tokens: Completion tokens reported by llama.cpp
+                (defaults to the number of marked tokens)
+            prompt_eval_seconds: Prompt evaluation time when known from
+                llama.cpp timings (defaults to time to first token)
+
+        Returns:
+            Request latency in seconds
+        """
+        end = time.perf_counter()
+        latency = end - self.start
+        completion_tokens = self.tokens if completion_tokens is None else completion_tokens
+
+        first_token = None
+        decode_per_token = None
+        if self.first_token is not None:
+            first_token = self.first_token - self.start
+            if prompt_eval_seconds is None:
+                prompt_eval_seconds = first_token
+            if self.tokens > 1:
+                decode_per_token = (self.last_token - self.first_token) / (self.tokens - 1)
+        elif prompt_eval_seconds is not None and completion_tokens > 0:
+            decode_per_token = max(latency - prompt_eval_seconds, 0.0) / completion_tokens
+
+        self.instrumentation.record(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency=latency,
+            prompt_eval=prompt_eval_seconds,
+            first_token=first_token,
+            decode_per_token=decode_per_token
+        )
+        return latency
+
+
+class InferenceInstrumentation:
+    """Counters and latency histograms for a model's generation calls."""
+
+    HISTOGRAMS = ("latency", "prompt_eval", "first_token", "decode_per_token", "tokens_per_second")
+
+    def __init__(self, model_id: Optional[str] = None, capacity: int = 1024):
+        """Initialize instrumentation.
+
+        Args:
+            model_id: Optional ID of the model being instrumented
+            capacity: Samples kept per histogram
+        """
+        self.model_id = model_id
+        self.histograms = {name: RingHistogram(capacity) for name in self.HISTOGRAMS}
+        self._counters = {"requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+        self._sampler = get_memory_sampler()
+        self._sampler.acquire()
+
+    def start_request(self) -> RequestTimer:
+        """Start timing a request."""
+        return RequestTimer(self)
+
+    def record(self,
+               prompt_tokens: int,
+               completion_tokens: int,
+               latency: float,
+               prompt_eval: Optional[float] = None,
+               first_token: Optional[float] = None,
+               decode_per_token: Optional[float] = None) -> None:
+        """Record a finished request.
+
+        Args:
+            prompt_tokens: Number of prompt tokens
+            completion_tokens: Number of generated tokens
+            latency: Total request time in seconds
+            prompt_eval: Prompt evaluation time in seconds, if known
+            first_token: Time to first token in seconds, if streamed
+            decode_per_token: Average seconds per generated token, if known
+        """
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["prompt_tokens"] += prompt_tokens
+            self._counters["completion_tokens"] += completion_tokens
+
+        self.histograms["latency"].record(latency)
+        if latency > 0:
+            self.histograms["tokens_per_second"].record(completion_tokens / latency)
+        if prompt_eval is not None:
+            self.histograms["prompt_eval"].record(prompt_eval)
+        if first_token is not None:
+            self.histograms["first_token"].record(first_token)
+        if decode_per_token is not None:
+            self.histograms["decode_per_token"].record(decode_per_token)
+
+    def record_error(self) -> None:
+        """Count a failed request."""
+        with self._lock:
+            self._counters["errors"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get counters, histogram summaries and memory readings.
+
+        Returns:
+            Dictionary of metrics
+        """
+        with self._lock:
+            metrics = dict(self._counters)
+        metrics["model_id"] = self.model_id
+        metrics["histograms"] = {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+        metrics.update(get_memory_sampler().get_stats())
+
+        latency = metrics["histograms"]["latency"]
+        total_latency = latency["mean"] * latency["count"]
+        metrics["avg_tokens_per_second"] = (
+            metrics["completion_tokens"] / total_latency if total_latency > 0 else 0.0
+        )
+        return metrics
+
+    def reset(self) -> None:
+        """Clear counters and histograms."""
+        with self._lock:
+            for key in self._counters:
+                self._counters[key] = 0
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def close(self) -> None:
+        """Release the shared memory sampler."""
+        if self._sampler is not None:
+            self._sampler.release()
+            self._sampler = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
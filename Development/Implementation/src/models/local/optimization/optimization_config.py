@@ -11,7 +11,7 @@ Optimization configuration for local model inference.
 import os
 import platform
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +35,10 @@ class OptimizationConfig:
                  verbose: bool = False,
                  use_parallel: bool = False,
                  n_parallel: int = 2,
-                 low_vram: bool = False):
+                 low_vram: bool = False,
+                 speculative_decoding: bool = False,
+                 draft_model_path: Optional[str] = None,
+                 draft_tokens: int = 8):
         """Initialize optimization configuration.
         
         Args:
@@ -53,6 +56,9 @@ class OptimizationConfig:
             use_parallel: Whether to use parallel computation
             n_parallel: Number of parallel workers if use_parallel is True
             low_vram: Whether to optimize for low VRAM systems
+            speculative_decoding: Whether to verify tokens proposed by a draft model
+            draft_model_path: Path to the draft model (must share the tokenizer)
+            draft_tokens: Tokens the draft model proposes per verification step
         """
         self.quantization = quantization
         
@@ -82,6 +88,9 @@ class OptimizationConfig:
         self.use_parallel = use_parallel
         self.n_parallel = n_parallel
         self.low_vram = low_vram
+        self.speculative_decoding = speculative_decoding
+        self.draft_model_path = draft_model_path
+        self.draft_tokens = draft_tokens
         
         # Log the configuration
         logger.debug(f"Created OptimizationConfig: {self.to_dict()}")
@@ -113,6 +122,12 @@ class OptimizationConfig:
         if self.use_parallel and (self.n_parallel < 1 or self.n_parallel > 16):
             raise ValueError(f"Number of parallel workers must be between 1-16, got {self.n_parallel}")
         
+        if self.speculative_decoding:
+            if not self.draft_model_path:
+                raise ValueError("Speculative decoding requires draft_model_path")
+            if self.draft_tokens < 1 or self.draft_tokens > 32:
+                raise ValueError(f"Draft tokens must be between 1-32, got {self.draft_tokens}")
+        
         # If using Metal, check for GPU layers
         if self.use_metal and self.n_gpu_layers <= 0:
             logger.warning("Metal acceleration enabled but n_gpu_layers set to 0, increasing to 32")
@@ -140,7 +155,10 @@ class OptimizationConfig:
             "verbose": self.verbose,
             "use_parallel": self.use_parallel,
             "n_parallel": self.n_parallel,
-            "low_vram": self.low_vram
+            "low_vram": self.low_vram,
+            "speculative_decoding": self.speculative_decoding,
+            "draft_model_path": self.draft_model_path,
+            "draft_tokens": self.draft_tokens
         }
         
     @classmethod
@@ -167,7 +185,10 @@ class OptimizationConfig:
             verbose=config_dict.get("verbose", False),
             use_parallel=config_dict.get("use_parallel", False),
             n_parallel=config_dict.get("n_parallel", 2),
-            low_vram=config_dict.get("low_vram", False)
+            low_vram=config_dict.get("low_vram", False),
+            speculative_decoding=config_dict.get("speculative_decoding", False),
+            draft_model_path=config_dict.get("draft_model_path"),
+            draft_tokens=config_dict.get("draft_tokens", 8)
         )
         
     def get_llama_params(self) -> Dict[str, Any]:
@@ -200,18 +221,70 @@ class OptimizationConfig:
             
         return params
         
-    def optimize_for_device(self, detect_hardware: bool = True) -> 'OptimizationConfig':
+    def optimize_for_device(self,
+                            detect_hardware: bool = True,
+                            model_path: Optional[str] = None,
+                            profile_path: Optional[str] = None,
+                            keep: Iterable[str] = ()) -> 'OptimizationConfig':
         """Optimize configuration for the current device.
         
+        Hardware heuristics are applied first; a profile measured by the
+        autotuner for this host and model then overrides them.
+        
         Args:
             detect_hardware: Whether to auto-detect hardware capabilities
+            model_path: Model file to look up a tuned profile for
+            profile_path: Tuning profile file (defaults to ~/.vanta/autotune_profiles.json)
+            keep: Explicitly configured fields the profile must not override
             
         Returns:
             Self with optimized settings
         """
-        if not detect_hardware:
-            return self
+        if detect_hardware:
+            self._optimize_for_platform()
+        if model_path:
+            self.apply_tuned_profile(model_path, profile_path, keep)
+        return self
+    
+    def apply_tuned_profile(self,
+                            model_path: str,
+                            profile_path: Optional[str] = None,
+                            keep: Iterable[str] = ()) -> bool:
+        """Apply the thread and batch sizes tuned for this host and model.
+        
+        The context size is never taken from the profile: it is what the
+        caller needs, not a speed setting, so the tuned n_ctx is only a
+        measurement.
+        
+        Args:
+            model_path: Model file the profile was tuned for
+            profile_path: Tuning profile file (defaults to ~/.vanta/autotune_profiles.json)
+            keep: Explicitly configured fields ("thread_count", "batch_size")
+                that the profile must not override
             
+        Returns:
+            True if a tuned profile was found and applied
+        """
+        from .autotuner import TuningProfileStore
+        
+        try:
+            profile = TuningProfileStore(profile_path).get(model_path)
+        except Exception as e:
+            logger.warning(f"Failed to look up tuned profile for {model_path}: {e}")
+            return False
+        if not profile:
+            return False
+            
+        if "thread_count" not in keep:
+            self.thread_count = profile.get("n_threads", self.thread_count)
+        if "batch_size" not in keep:
+            self.batch_size = profile.get("n_batch", self.batch_size)
+        logger.info(f"Applied tuned profile for {os.path.basename(model_path)}: "
+                    f"{self.thread_count} threads, {self.batch_size} batch size")
+        return True
+    
+    def _optimize_for_platform(self) -> None:
+        """Apply platform heuristics for threads, Metal and quantization."""
         system = platform.system()
         
         # Optimize for macOS with Metal
@@ -279,8 +352,6 @@ class OptimizationConfig:
         elif system == "Windows":
             self.use_metal = False  # Metal not available on Windows
             self.thread_count = max(4, (os.cpu_count() or 8) - 2)  # Leave a couple cores free
-            
-        return self
     
     def __str__(self) -> str:
         """Get string representation of configuration.
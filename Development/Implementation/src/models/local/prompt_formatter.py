@@ -125,6 +125,27 @@ class PromptFormatter:
         
         return formatted
     
+    def format_system_prefix(self, model_type: str = DEFAULT_TEMPLATE, system_prompt: Optional[str] = None) -> str:
+        """
+        Format the fixed system block that starts every prompt for a model type.
+        
+        This is exactly the text format_prompt emits before the first
+        conversation message, so its KV state can be computed ahead of time.
+        
+        Args:
+            model_type: Model type to format for
+            system_prompt: System prompt text, or None for the template default
+            
+        Returns:
+            Formatted system block
+        """
+        if model_type not in self.templates:
+            model_type = DEFAULT_TEMPLATE
+        
+        template = self.templates[model_type]
+        content = system_prompt if system_prompt is not None else template["default_system_prompt"]
+        return template["system_prefix"] + content + template["system_suffix"]
+    
     def format_system_prompt(self, template_name: str = "default", **kwargs) -> str:
         """
         Format a system prompt using a predefined template.
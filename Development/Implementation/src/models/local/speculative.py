@@ -0,0 +1,134 @@
+"""
+Speculative decoding with a small draft model.
+
+A draft model that shares the target model's tokenizer (e.g. TinyLlama for
+Llama 2, Llama 3.2 1B for Llama 3.1) greedily proposes the next few tokens.
+llama.cpp evaluates them with the target model in one batch and keeps the
+prefix that matches what the target would have sampled, so several tokens
+can be accepted for the cost of one target forward pass.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def _common_prefix_length(a: Sequence[int], b: Sequence[int]) -> int:
+    """Length of the longest common prefix of two token sequences."""
+    limit = min(len(a), len(b))
+    for i in range(limit):
+        if a[i] != b[i]:
+            return i
+    return limit
+
+
+class DraftModelDecoder:
+    """
+    Draft model for llama_cpp.Llama(draft_model=...).
+
+    llama.cpp calls the decoder with the tokens evaluated so far and expects
+    an array of proposed continuation tokens. The next call shows how many
+    of the previous proposals the target model accepted, which is how the
+    acceptance rate is measured.
+    """
+
+    def __init__(self, draft_model, num_pred_tokens: int = 8):
+        """
+        Initialize the decoder.
+
+        Args:
+            draft_model: Loaded llama_cpp.Llama instance of the draft model
+            num_pred_tokens: Tokens proposed per verification step
+        """
+        self.draft_model = draft_model
+        self.num_pred_tokens = num_pred_tokens
+
+        self._lock = threading.Lock()
+        self._pending: List[int] = []
+        self._pending_offset = 0
+        self._totals = self._empty_stats()
+        self._request = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {"proposals": 0, "drafted_tokens": 0, "accepted_tokens": 0, "draft_seconds": 0.0}
+
+    def begin_request(self) -> None:
+        """Start counting a new completion; an unresolved proposal is dropped."""
+        with self._lock:
+            self._pending = []
+            self._request = self._empty_stats()
+
+    def __call__(self, input_ids, /, **kwargs):
+        """
+        Propose continuation tokens.
+
+        Args:
+            input_ids: Tokens evaluated by the target model so far
+
+        Returns:
+            numpy array of proposed token ids
+        """
+        import numpy as np
+
+        tokens = [int(token) for token in input_ids]
+        start_time = time.perf_counter()
+
+        with self._lock:
+            self._resolve_pending(tokens)
+
+            proposal = []
+            generator = self.draft_model.generate(tokens, top_k=1, temp=0.0, reset=True)
+            try:
+                for token in generator:
+                    proposal.append(int(token))
+                    if len(proposal) >= self.num_pred_tokens:
+                        break
+            finally:
+                generator.close()
+
+            self._pending = proposal
+            self._pending_offset = len(tokens)
+
+            elapsed = time.perf_counter() - start_time
+            for stats in (self._totals, self._request):
+                stats["proposals"] += 1
+                stats["draft_seconds"] += elapsed
+
+        return np.array(proposal, dtype=np.intc)
+
+    def get_stats(self, request_only: bool = False) -> Dict[str, Any]:
+        """
+        Get acceptance statistics.
+
+        Args:
+            request_only: Only count proposals since begin_request()
+
+        Returns:
+            Proposal and token counters with the acceptance rate
+        """
+        with self._lock:
+            stats = dict(self._request if request_only else self._totals)
+        stats["acceptance_rate"] = (
+            stats["accepted_tokens"] / stats["drafted_tokens"] if stats["drafted_tokens"] else 0.0
+        )
+        return stats
+
+    def _resolve_pending(self, tokens: List[int]) -> None:
+        """Count how much of the previous proposal the target accepted (lock held)."""
+        if not self._pending:
+            return
+
+        accepted = _common_prefix_length(tokens[self._pending_offset:], self._pending)
+        for stats in (self._totals, self._request):
+            stats["drafted_tokens"] += len(self._pending)
+            stats["accepted_tokens"] += accepted
+        self._pending = []
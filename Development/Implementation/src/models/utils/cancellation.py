@@ -0,0 +1,302 @@
+"""
+Cooperative cancellation for abandoned generation work.
+
+When the integrator settles on one track, or the user barges in, the other
+track's generation is no longer wanted. A CancellationToken is handed down
+from the graph to whatever does the work (the local model's generation
+thread, the scheduler, an API stream), which checks it between tokens and
+stops. Waiting requests are dropped before they start; running ones close
+their completion iterator, which frees the model (or the HTTP connection)
+for the next turn. TurnCancellation keeps a token per session's turn, with
+a child token per track.
+
+CancellationStats records what cancelling saved. How long the abandoned
+generation would have run is unknown, so it is estimated from the requests
+that did finish: the average completion length and duration, or, before
+any has finished, the max_tokens budget at the rate seen so far.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Reasons recorded for cancelled work
+REASON_CANCELLED = "cancelled"
+REASON_BARGE_IN = "barge_in"
+REASON_NOT_SELECTED = "not_selected"
+
+
+class CancellationToken(threading.Event):
+    """
+    A threading.Event that records why it was set and notifies callbacks.
+
+    Anything that accepts a cancel Event accepts a token. Setting it is
+    final: the first cancel() wins and later calls are ignored.
+    """
+
+    def __init__(self, parent: Optional["CancellationToken"] = None):
+        """
+        Initialize the token.
+
+        Args:
+            parent: Token whose cancellation also cancels this one
+        """
+        super().__init__()
+        self.reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        if parent is not None:
+            parent.add_callback(lambda: self.cancel(parent.reason or REASON_CANCELLED))
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token was cancelled."""
+        return self.is_set()
+
+    def cancel(self, reason: str = REASON_CANCELLED) -> bool:
+        """
+        Cancel the work holding this token.
+
+        Args:
+            reason: Why the work was abandoned (see the REASON_* constants)
+
+        Returns:
+            True if this call cancelled the token, False if it already was
+        """
+        with self._lock:
+            if self.is_set():
+                return False
+            self.reason = reason
+            super().set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+        return True
+
+    def set(self) -> None:
+        """Cancel with the default reason (threading.Event compatibility)."""
+        self.cancel()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Call a function when the token is cancelled.
+
+        Runs it right away if the token already is. Callbacks run on the
+        cancelling thread, so they should only signal (cancel a future,
+        close a request), not block.
+
+        Args:
+            callback: Function taking no arguments
+        """
+        with self._lock:
+            if not self.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """Stop notifying a callback, e.g. once its work has finished."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def child(self) -> "CancellationToken":
+        """A token cancelled along with this one, but cancellable on its own."""
+        return CancellationToken(parent=self)
+
+
+class TurnCancellation:
+    """
+    Cancellation tokens for the turns in flight, one per session.
+
+    Each track of a turn gets a child of the turn's token, so the turn can
+    be cancelled as a whole (a barge-in) or a track on its own.
+    """
+
+    def __init__(self):
+        """Initialize with no turns in flight."""
+        self._turns: Dict[Optional[str], CancellationToken] = {}
+        self._tracks: Dict[Tuple[Optional[str], str], CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def turn(self, session_id: Optional[str]) -> CancellationToken:
+        """
+        Get the token of a session's current turn, starting one if needed.
+
+        Args:
+            session_id: Conversation session
+
+        Returns:
+            The turn's token
+        """
+        with self._lock:
+            token = self._turns.get(session_id)
+            if token is None or token.cancelled:
+                token = self._turns[session_id] = CancellationToken()
+                self._forget_tracks(session_id)
+            return token
+
+    def track(self, session_id: Optional[str], track: str) -> CancellationToken:
+        """
+        Get the token of one track of a session's current turn.
+
+        Args:
+            session_id: Conversation session
+            track: Track name, e.g. "local" or "api"
+
+        Returns:
+            A token cancelled with the turn or on its own
+        """
+        turn = self.turn(session_id)
+        with self._lock:
+            token = self._tracks.get((session_id, track))
+            if token is None:
+                token = self._tracks[(session_id, track)] = turn.child()
+            return token
+
+    def cancel(self, session_id: Optional[str], reason: str = REASON_BARGE_IN) -> bool:
+        """
+        Cancel a session's current turn and all its tracks.
+
+        Safe to call from any thread, e.g. when voice activity detection
+        hears the user start speaking.
+
+        Args:
+            session_id: Conversation session
+            reason: Why the turn was abandoned
+
+        Returns:
+            True if a turn in flight was cancelled
+        """
+        with self._lock:
+            token = self._turns.pop(session_id, None)
+            self._forget_tracks(session_id)
+        return token is not None and token.cancel(reason)
+
+    def end(self, session_id: Optional[str]) -> None:
+        """
+        End a session's turn once its answer is settled.
+
+        Tracks still running are no longer needed and are cancelled; tracks
+        that already finished are unaffected.
+
+        Args:
+            session_id: Conversation session
+        """
+        with self._lock:
+            self._turns.pop(session_id, None)
+            tracks = [token for key, token in self._tracks.items() if key[0] == session_id]
+            self._forget_tracks(session_id)
+        for token in tracks:
+            token.cancel(REASON_NOT_SELECTED)
+
+    def _forget_tracks(self, session_id: Optional[str]) -> None:
+        """Drop a session's track tokens. Caller holds the lock."""
+        for key in [key for key in self._tracks if key[0] == session_id]:
+            del self._tracks[key]
+
+
+class CancellationStats:
+    """Counts cancelled requests and estimates the work they didn't do."""
+
+    def __init__(self, max_tokens: Optional[int] = None):
+        """
+        Initialize the statistics.
+
+        Args:
+            max_tokens: Completion limit, the estimate before any request finished
+        """
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record_completed(self, completion_tokens: int, seconds: float) -> None:
+        """
+        Record a request that ran to completion.
+
+        Args:
+            completion_tokens: Tokens it generated
+            seconds: How long it took
+        """
+        with self._lock:
+            self._completed += 1
+            self._completed_tokens += completion_tokens
+            self._completed_seconds += seconds
+
+    def record_cancelled(self,
+                         completion_tokens: int,
+                         seconds: float,
+                         reason: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record a cancelled request and estimate what cancelling it saved.
+
+        Args:
+            completion_tokens: Tokens generated before it stopped
+            seconds: How long it ran
+            reason: Why it was cancelled
+
+        Returns:
+            Dictionary with tokens_not_generated and seconds_reclaimed
+        """
+        with self._lock:
+            if self._completed:
+                expected_tokens = self._completed_tokens / self._completed
+                expected_seconds = self._completed_seconds / self._completed
+                tokens_not_generated = max(expected_tokens - completion_tokens, 0.0)
+                seconds_reclaimed = max(expected_seconds - seconds, 0.0)
+            else:
+                tokens_not_generated = max((self.max_tokens or 0) - completion_tokens, 0)
+                rate = completion_tokens / seconds if seconds > 0 else 0.0
+                seconds_reclaimed = tokens_not_generated / rate if rate > 0 else 0.0
+
+            reason = reason or REASON_CANCELLED
+            self._stats["cancelled"] += 1
+            self._stats["by_reason"][reason] = self._stats["by_reason"].get(reason, 0) + 1
+            self._stats["tokens_generated_before_cancel"] += completion_tokens
+            self._stats["tokens_not_generated"] += int(tokens_not_generated + 0.5)
+            self._stats["seconds_reclaimed"] += seconds_reclaimed
+
+        return {
+            "tokens_not_generated": int(tokens_not_generated + 0.5),
+            "seconds_reclaimed": seconds_reclaimed
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cancellation statistics.
+
+        Returns:
+            Dictionary with cancelled and completed request counts, tokens
+            generated before cancelling, and the estimated tokens not
+            generated and seconds reclaimed
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                "by_reason": dict(self._stats["by_reason"]),
+                "completed": self._completed
+            }
+
+    def reset(self) -> None:
+        """Reset all statistics."""
+        with self._lock:
+            self._completed = 0
+            self._completed_tokens = 0
+            self._completed_seconds = 0.0
+            self._stats = {
+                "cancelled": 0,
+                "by_reason": {},
+                "tokens_generated_before_cancel": 0,
+                "tokens_not_generated": 0,
+                "seconds_reclaimed": 0.0
+            }
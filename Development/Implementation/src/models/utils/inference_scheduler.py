@@ -0,0 +1,573 @@
+"""
+Token-level inference scheduler for llama.cpp models.
+
+Several requests share one loaded model through a small pool of contexts.
+Each context is a separate llama_cpp.Llama instance opened from the same
+file with mmap enabled, so the weights are mapped once and each context only
+adds its own KV cache. A single scheduler thread advances the active
+sequences one token at a time. llama.cpp already spreads each decode step
+across all of its threads, so one stepping thread keeps the cores busy while
+new requests can start between tokens instead of waiting for a whole
+generation to finish.
+
+Requests carry a priority. Voice turns are admitted to a free context first
+and get a larger share of the decode steps (stride scheduling), so a
+background summary never holds up the live conversation. The queue is
+bounded: once it is full, new requests are rejected with
+SchedulerOverloadedError instead of piling up behind each other.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import heapq
+import itertools
+import logging
+import math
+import queue
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_VOICE = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {
+    "voice": PRIORITY_VOICE,
+    "interactive": PRIORITY_INTERACTIVE,
+    "background": PRIORITY_BACKGROUND,
+}
+
+# Relative share of decode steps per priority while sequences compete
+PRIORITY_WEIGHTS = {
+    PRIORITY_VOICE: 4,
+    PRIORITY_INTERACTIVE: 2,
+    PRIORITY_BACKGROUND: 1,
+}
+
+_STREAM_END = object()
+
+
+class SchedulerOverloadedError(Exception):
+    """Raised when a request is rejected by admission control."""
+    pass
+
+
+def resolve_priority(priority: Union[int, str, None]) -> int:
+    """
+    Normalize a priority given by name or number.
+
+    Args:
+        priority: "voice", "interactive", "background", an integer, or None
+
+    Returns:
+        Integer priority (lower runs first)
+    """
+    if priority is None:
+        return PRIORITY_INTERACTIVE
+    if isinstance(priority, str):
+        if priority not in PRIORITY_NAMES:
+            raise ValueError(f"Unknown priority: {priority}")
+        return PRIORITY_NAMES[priority]
+    return max(PRIORITY_VOICE, min(int(priority), PRIORITY_BACKGROUND))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class InferenceRequest:
+    """A generation request submitted to the InferenceScheduler."""
+
+    def __init__(self,
+                 prompt: str,
+                 params: Dict[str, Any],
+                 priority: int,
+                 affinity: Optional[str] = None,
+                 prepare: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize the request.
+
+        Args:
+            prompt: Prompt text
+            params: Completion parameters (max_tokens, temperature, stop, ...)
+            priority: Integer priority (lower runs first)
+            affinity: Key of the conversation, used to prefer the context
+                that served it last
+            prepare: Called with the context right before the prompt is
+                evaluated; its return value is stored in ``prepare_result``
+        """
+        self.prompt = prompt
+        self.params = params
+        self.priority = priority
+        self.affinity = affinity
+        self.prepare = prepare
+        self.prepare_result = None
+
+        self.text = ""
+        self.finish_reason = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.error: Optional[BaseException] = None
+
+        self.submitted_at = time.perf_counter()
+        self.started_at: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._chunks: "queue.Queue" = queue.Queue()
+        self._done = threading.Event()
+        self._cancelled = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        """Whether the request finished, failed or was cancelled."""
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the request was cancelled."""
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Stop the request; its context is released at the next step."""
+        self._cancelled.set()
+
+    def result(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for the request to finish.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            Dictionary with the generated text, usage and timings
+
+        Raises:
+            TimeoutError: If the request did not finish in time
+            Exception: The error the request failed with
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Inference request not finished after {timeout}s")
+        if self.error is not None:
+            raise self.error
+
+        generation_time = self.finished_at - self.submitted_at
+        decode_time = self.finished_at - (self.started_at or self.submitted_at)
+        return {
+            "text": self.text,
+            "finish_reason": self.finish_reason or "length",
+            "usage": {
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+            },
+            "generation_time": generation_time,
+            "queue_time": (self.started_at or self.finished_at) - self.submitted_at,
+            "time_to_first_token": (self.first_token_at - self.submitted_at) if self.first_token_at else None,
+            "tokens_per_second": self.completion_tokens / decode_time if decode_time > 0 else 0,
+        }
+
+    def stream(self, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield completion chunks as the scheduler produces them.
+
+        Args:
+            timeout: Maximum seconds to wait for each chunk
+
+        Yields:
+            Chunks with the new text and running usage
+
+        Raises:
+            TimeoutError: If no chunk arrives in time
+            Exception: The error the request failed with
+        """
+        while True:
+            try:
+                chunk = self._chunks.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No token received within {timeout}s")
+            if chunk is _STREAM_END:
+                break
+            yield chunk
+
+        if self.error is not None:
+            raise self.error
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        """Mark the request as finished and wake up any waiter."""
+        self.error = error
+        self.finished_at = time.perf_counter()
+        self._chunks.put(_STREAM_END)
+        self._done.set()
+
+
+class _Sequence:
+    """A request bound to a context while it is being decoded."""
+
+    def __init__(self, request: InferenceRequest, context_index: int, iterator: Iterator, pass_value: float):
+        self.request = request
+        self.context_index = context_index
+        self.iterator = iterator
+        self.pass_value = pass_value
+        self.stride = 1.0 / PRIORITY_WEIGHTS[request.priority]
+
+
+class InferenceScheduler:
+    """Multiplexes concurrent generation requests onto a pool of model contexts."""
+
+    def __init__(self, contexts: List[Any], config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            contexts: llama_cpp.Llama instances (or compatible objects) that
+                share one model's weights; each holds one sequence at a time
+            config: Optional configuration with keys:
+                max_queue_size: Requests allowed to wait for a context before
+                    new ones are rejected (default 32)
+                queue_timeout: Seconds a request may wait for a context
+                    before it is rejected, or None (default)
+                latency_window: Completed requests kept for latency
+                    percentiles (default 256)
+        """
+        if not contexts:
+            raise ValueError("InferenceScheduler needs at least one context")
+
+        self.config = config or {}
+        self.contexts = list(contexts)
+        self.max_queue_size = self.config.get("max_queue_size", 32)
+        self.queue_timeout = self.config.get("queue_timeout")
+
+        self._pending: List[Any] = []
+        self._counter = itertools.count()
+        self._free = list(range(len(self.contexts)))
+        self._context_affinity: List[Optional[str]] = [None] * len(self.contexts)
+        self._active: List[_Sequence] = []
+        self._virtual_time = 0.0
+
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._latencies = deque(maxlen=self.config.get("latency_window", 256))
+        self._queue_times = deque(maxlen=self.config.get("latency_window", 256))
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "failed": 0,
+            "completion_tokens": 0,
+            "decode_steps": 0,
+            "busy_seconds": 0.0,
+            "max_concurrent": 0,
+        }
+
+    def start(self) -> None:
+        """Start the scheduler thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Inference scheduler started with {len(self.contexts)} contexts")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the scheduler thread and fail anything still queued or running.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        with self._condition:
+            stranded = [entry[-1] for entry in self._pending] + [seq.request for seq in self._active]
+            self._pending = []
+            self._active = []
+            self._free = list(range(len(self.contexts)))
+
+        for request in stranded:
+            request._finish(SchedulerOverloadedError("Inference scheduler stopped"))
+
+    def submit(self,
+               prompt: str,
+               params: Optional[Dict[str, Any]] = None,
+               priority: Union[int, str, None] = None,
+               affinity: Optional[str] = None,
+               prepare: Optional[Callable[[Any], Any]] = None) -> InferenceRequest:
+        """
+        Queue a generation request.
+
+        Args:
+            prompt: Prompt text
+            params: Completion parameters passed to the context
+            priority: "voice", "interactive" (default), "background" or an int
+            affinity: Conversation key; the request prefers the context that
+                last served the same key so its KV prefix can be reused
+            prepare: Called with the chosen context before evaluation
+
+        Returns:
+            The queued InferenceRequest
+
+        Raises:
+            SchedulerOverloadedError: If the queue is full
+        """
+        request = InferenceRequest(prompt, dict(params or {}), resolve_priority(priority), affinity, prepare)
+
+        with self._condition:
+            if self._stop_event.is_set():
+                raise SchedulerOverloadedError("Inference scheduler is stopped")
+            if len(self._pending) >= self.max_queue_size:
+                self._stats["rejected"] += 1
+                raise SchedulerOverloadedError(
+                    f"Inference queue full ({self.max_queue_size} requests waiting)"
+                )
+
+            heapq.heappush(self._pending, (request.priority, next(self._counter), request))
+            self._stats["submitted"] += 1
+            self._condition.notify()
+
+        return request
+
+    def generate(self,
+                 prompt: str,
+                 params: Optional[Dict[str, Any]] = None,
+                 priority: Union[int, str, None] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Submit a request and wait for its result.
+
+        Args:
+            prompt: Prompt text
+            params: Completion parameters
+            priority: Request priority
+            timeout: Seconds to wait; the request is cancelled on timeout
+
+        Returns:
+            Result dictionary (see InferenceRequest.result)
+        """
+        request = self.submit(prompt, params, priority)
+        try:
+            return request.result(timeout)
+        except TimeoutError:
+            request.cancel()
+            raise
+
+    def queue_depth(self) -> int:
+        """Requests waiting for a context."""
+        with self._condition:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Counters, queue depth, aggregate tokens/sec and latency percentiles
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats["queued"] = len(self._pending)
+            stats["active"] = len(self._active)
+            latencies = list(self._latencies)
+            queue_times = list(self._queue_times)
+
+        stats["contexts"] = len(self.contexts)
+        stats["tokens_per_second"] = (
+            stats["completion_tokens"] / stats["busy_seconds"] if stats["busy_seconds"] > 0 else 0.0
+        )
+        stats["latency_p50"] = percentile(latencies, 0.50)
+        stats["latency_p95"] = percentile(latencies, 0.95)
+        stats["queue_time_p95"] = percentile(queue_times, 0.95)
+        return stats
+
+    def _run(self) -> None:
+        """Scheduler loop: admit waiting requests, then advance one sequence by one token."""
+        while not self._stop_event.is_set():
+            with self._condition:
+                self._expire_waiting()
+                while not self._active and not self._pending and not self._stop_event.is_set():
+                    self._condition.wait()
+                if self._stop_event.is_set():
+                    break
+                admitted = self._take_admissible()
+
+            for request, context_index in admitted:
+                self._start_sequence(request, context_index)
+
+            sequence = self._next_sequence()
+            if sequence is not None:
+                step_start = time.perf_counter()
+                self._step(sequence)
+                with self._condition:
+                    self._stats["busy_seconds"] += time.perf_counter() - step_start
+
+    def _expire_waiting(self) -> None:
+        """Reject requests that waited longer than queue_timeout (lock held)."""
+        if not self.queue_timeout or not self._pending:
+            return
+
+        now = time.perf_counter()
+        kept = []
+        for entry in self._pending:
+            request = entry[-1]
+            if request.cancelled:
+                self._stats["cancelled"] += 1
+                request._finish()
+            elif now - request.submitted_at > self.queue_timeout:
+                self._stats["rejected"] += 1
+                request._finish(SchedulerOverloadedError(
+                    f"Request waited more than {self.queue_timeout}s for a model context"
+                ))
+            else:
+                kept.append(entry)
+
+        if len(kept) != len(self._pending):
+            heapq.heapify(kept)
+            self._pending = kept
+
+    def _take_admissible(self) -> List[Any]:
+        """Pop the highest-priority waiting requests that fit in free contexts (lock held)."""
+        admitted = []
+        while self._free and self._pending:
+            request = heapq.heappop(self._pending)[-1]
+            if request.cancelled:
+                self._stats["cancelled"] += 1
+                request._finish()
+                continue
+
+            # Prefer the context that still holds this conversation's prefix
+            context_index = self._free[0]
+            if request.affinity is not None:
+                for index in self._free:
+                    if self._context_affinity[index] == request.affinity:
+                        context_index = index
+                        break
+            self._free.remove(context_index)
+            self._context_affinity[context_index] = request.affinity
+            admitted.append((request, context_index))
+        return admitted
+
+    def _start_sequence(self, request: InferenceRequest, context_index: int) -> None:
+        """Evaluate a request's prompt on its context and make it steppable."""
+        context = self.contexts[context_index]
+        request.started_at = time.perf_counter()
+
+        try:
+            if request.prepare is not None:
+                request.prepare_result = request.prepare(context)
+            request.prompt_tokens = len(context.tokenize(request.prompt.encode("utf-8")))
+            iterator = iter(context(prompt=request.prompt, stream=True, **request.params))
+        except Exception as e:
+            logger.error(f"Failed to start inference request: {e}")
+            self._release(context_index, request, e)
+            return
+
+        with self._condition:
+            # New sequences join at the current virtual time so they neither
+            # starve nor pre-empt sequences that are already running
+            sequence = _Sequence(request, context_index, iterator, self._virtual_time)
+            self._active.append(sequence)
+            self._stats["max_concurrent"] = max(self._stats["max_concurrent"], len(self._active))
+            self._stats["busy_seconds"] += time.perf_counter() - request.started_at
+
+    def _next_sequence(self) -> Optional[_Sequence]:
+        """Pick the sequence with the lowest pass value (stride scheduling)."""
+        with self._condition:
+            if not self._active:
+                return None
+            sequence = min(self._active, key=lambda seq: (seq.pass_value, seq.request.priority))
+            self._virtual_time = sequence.pass_value
+            sequence.pass_value += sequence.stride
+            return sequence
+
+    def _step(self, sequence: _Sequence) -> None:
+        """Advance a sequence by one token."""
+        request = sequence.request
+
+        if request.cancelled:
+            self._close(sequence)
+            with self._condition:
+                self._stats["cancelled"] += 1
+            self._release(sequence.context_index, request, None, sequence)
+            return
+
+        try:
+            chunk = next(sequence.iterator)
+        except StopIteration:
+            self._release(sequence.context_index, request, None, sequence)
+            return
+        except Exception as e:
+            logger.error(f"Inference request failed: {e}")
+            self._release(sequence.context_index, request, e, sequence)
+            return
+
+        choice = chunk["choices"][0]
+        text = choice.get("text", "")
+        now = time.perf_counter()
+        if request.first_token_at is None:
+            request.first_token_at = now
+
+        request.text += text
+        request.completion_tokens += 1
+        if choice.get("finish_reason"):
+            request.finish_reason = choice["finish_reason"]
+
+        with self._condition:
+            self._stats["completion_tokens"] += 1
+            self._stats["decode_steps"] += 1
+
+        request._chunks.put({
+            "text": text,
+            "finish_reason": choice.get("finish_reason"),
+            "usage": {"completion_tokens": request.completion_tokens},
+            "generation_time": now - request.submitted_at,
+        })
+
+    def _close(self, sequence: _Sequence) -> None:
+        """Close a sequence's completion generator."""
+        close = getattr(sequence.iterator, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def _release(self,
+                 context_index: int,
+                 request: InferenceRequest,
+                 error: Optional[BaseException],
+                 sequence: Optional[_Sequence] = None) -> None:
+        """Finish a request and return its context to the free pool."""
+        request._finish(error)
+
+        with self._condition:
+            if sequence is not None and sequence in self._active:
+                self._active.remove(sequence)
+            self._free.append(context_index)
+
+            if error is not None:
+                self._stats["failed"] += 1
+            elif not request.cancelled:
+                self._stats["completed"] += 1
+                self._latencies.append(request.finished_at - request.submitted_at)
+                self._queue_times.append(request.started_at - request.submitted_at)
@@ -0,0 +1,172 @@
+"""
+System-prompt KV-state snapshots for llama.cpp models.
+
+Every session starts by evaluating the same fixed system prompt. A snapshot
+of the KV state right after that prompt is computed once per model, context
+size and prompt text, saved to disk, and restored into new sessions and
+after a reload instead of re-evaluating the prompt.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_key(model_path: str, context_size: int, prompt: str) -> str:
+    """
+    Compute the key that invalidates a snapshot.
+
+    Args:
+        model_path: Path of the model file
+        context_size: Context window the model was loaded with
+        prompt: Exact system prompt text (after template formatting)
+
+    Returns:
+        Hex digest identifying the snapshot
+    """
+    digest = hashlib.sha256()
+    for part in (os.path.abspath(model_path), str(context_size), prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SystemPromptSnapshot:
+    """KV state of a model after evaluating a fixed system prompt."""
+
+    def __init__(self,
+                 model_path: str,
+                 context_size: int,
+                 prompt: str,
+                 snapshot_dir: Optional[str] = None):
+        """
+        Initialize the snapshot.
+
+        Args:
+            model_path: Path of the model file
+            context_size: Context window the model was loaded with
+            prompt: System prompt text exactly as it starts every prompt
+            snapshot_dir: Directory for the on-disk snapshot, or None to keep
+                it in memory only
+        """
+        self.prompt = prompt
+        self.key = snapshot_key(model_path, context_size, prompt)
+        self.snapshot_dir = snapshot_dir
+        self.state = None
+        self.token_count = 0
+        self.stats = {
+            "evaluations": 0,
+            "disk_loads": 0,
+            "restores": 0,
+            "last_warm_seconds": 0.0,
+        }
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the on-disk snapshot, if persistence is enabled."""
+        if not self.snapshot_dir:
+            return None
+        return os.path.join(self.snapshot_dir, f"system-{self.key[:32]}.kvstate")
+
+    def warm(self, model) -> bool:
+        """
+        Put the model in the post-system-prompt state.
+
+        Uses, in order, the in-memory snapshot, the on-disk snapshot, or a
+        fresh evaluation of the prompt (which is then saved).
+
+        Args:
+            model: Loaded llama_cpp.Llama instance
+
+        Returns:
+            True if the prompt did not have to be evaluated
+        """
+        start_time = time.time()
+
+        if self.state is None:
+            self.state = self._read()
+            if self.state is not None:
+                self.stats["disk_loads"] += 1
+
+        if self.state is not None:
+            model.load_state(self.state)
+            self.stats["restores"] += 1
+            self.stats["last_warm_seconds"] = time.time() - start_time
+            return True
+
+        tokens = model.tokenize(self.prompt.encode("utf-8"))
+        model.reset()
+        model.eval(tokens)
+        self.state = model.save_state()
+        self.token_count = len(tokens)
+        self.stats["evaluations"] += 1
+        self._write()
+
+        self.stats["last_warm_seconds"] = time.time() - start_time
+        logger.info(f"Evaluated {len(tokens)}-token system prompt in {self.stats['last_warm_seconds']:.2f}s")
+        return False
+
+    def restore(self, model) -> bool:
+        """
+        Restore the snapshot into the model if one is available.
+
+        Args:
+            model: Loaded llama_cpp.Llama instance
+
+        Returns:
+            True if the model now holds the system-prompt state
+        """
+        if self.state is None:
+            return False
+        model.load_state(self.state)
+        self.stats["restores"] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot statistics."""
+        return {**self.stats, "key": self.key, "token_count": self.token_count, "available": self.state is not None}
+
+    def _read(self):
+        """Read the on-disk snapshot if it exists and matches the key."""
+        path = self.path
+        if not path or not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable system-prompt snapshot {path}: {e}")
+            return None
+
+        if payload.get("key") != self.key:
+            logger.info(f"Ignoring stale system-prompt snapshot {path}")
+            return None
+
+        self.token_count = payload.get("token_count", 0)
+        return payload["state"]
+
+    def _write(self) -> None:
+        """Atomically write the snapshot to disk."""
+        path = self.path
+        if not path:
+            return
+
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"key": self.key, "token_count": self.token_count, "state": self.state}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to save system-prompt snapshot: {e}")
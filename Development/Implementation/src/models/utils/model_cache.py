@@ -1,6 +1,15 @@
 """
 Model caching utilities.
 
+Models are stored once per content hash under ``blobs/``, linked in from
+their source with a hardlink or reflink where the filesystem allows and
+copied (hashing while copying) only where it does not. Metadata lives in a
+SQLite database so several processes can share one cache directory.
+
+Lookups are served from an in-memory index and never write: access times
+are kept in memory and appended to ``access.log`` only when the cache is
+modified or closed, and folded into the database when it is cleaned up.
+
 # TASK-REF: LM_001 - Local Model Integration
 # CONCEPT-REF: CON-VANTA-002 - Local Model Integration
 # DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
@@ -8,260 +17,468 @@ Model caching utilities.
 
 import os
 import json
-import logging
 import time
+import errno
 import shutil
-from typing import Dict, List, Any, Optional, Set
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Bytes read per step when hashing or copying
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    added REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS models (
+    model_id TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES blobs(hash),
+    original_path TEXT,
+    added REAL NOT NULL,
+    last_accessed REAL NOT NULL,
+    info TEXT
+);
+CREATE INDEX IF NOT EXISTS models_hash ON models(hash);
+"""
+
+
+def file_sha256(path: str) -> str:
+    """
+    Hash a file without reading it into memory.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(source_path: str, target_path: str) -> bool:
+    """Clone a file copy-on-write; False where the filesystem can't."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    try:
+        with open(source_path, "rb") as source, open(target_path, "wb") as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        return True
+    except OSError:
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        return False
+
+
+def _copy_hashed(source_path: str, target_path: str) -> str:
+    """Copy a file, hashing the bytes actually written."""
+    digest = hashlib.sha256()
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            target.write(chunk)
+    shutil.copystat(source_path, target_path)
+    return digest.hexdigest()
+
 
 class ModelCache:
     """
-    Cache for efficient model management.
-    
+    Content-addressed cache for efficient model management.
+
     This class helps manage models on disk, tracking usage stats
     and providing cache-based optimizations.
     """
-    
+
     def __init__(self, cache_dir: str, max_size_gb: float = 20.0):
         """
         Initialize the model cache.
-        
+
         Args:
             cache_dir: Directory to use for cache
             max_size_gb: Maximum cache size in gigabytes
         """
         self.cache_dir = cache_dir
         self.max_size_bytes = int(max_size_gb * 1024 * 1024 * 1024)
-        self.metadata_file = os.path.join(cache_dir, "cache_metadata.json")
-        self.metadata = self._load_metadata()
-        
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.db_path = os.path.join(cache_dir, "cache.db")
+        self.access_log = os.path.join(cache_dir, "access.log")
+
         # Create cache directory if it doesn't exist
-        os.makedirs(cache_dir, exist_ok=True)
-    
-    def _load_metadata(self) -> Dict[str, Any]:
-        """
-        Load cache metadata from disk.
-        
-        Returns:
-            Cache metadata dictionary
-        """
-        if not os.path.exists(self.metadata_file):
-            return {
-                "models": {},
-                "last_cleanup": time.time(),
-                "total_size_bytes": 0
-            }
-        
-        try:
-            with open(self.metadata_file, 'r') as f:
-                metadata = json.load(f)
-                logger.info(f"Loaded cache metadata with {len(metadata.get('models', {}))} models")
-                return metadata
-        except Exception as e:
-            logger.error(f"Failed to load cache metadata: {e}")
-            return {
-                "models": {},
-                "last_cleanup": time.time(),
-                "total_size_bytes": 0
-            }
-    
-    def _save_metadata(self) -> None:
-        """Save cache metadata to disk."""
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, str] = {}  # model_id -> blob path
+        self._pending_access: Dict[str, float] = {}
+        self._stats = {"hits": 0, "misses": 0, "hardlinked": 0, "reflinked": 0, "copied": 0, "deduplicated": 0}
+
+        with self._connect() as db:
+            # WAL lets readers run alongside a writer in another process
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+        self._import_legacy_metadata()
+        self._refresh_index()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open the metadata database for one transaction."""
+        db = sqlite3.connect(self.db_path, timeout=30.0)
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
-                logger.debug("Saved cache metadata")
-        except Exception as e:
-            logger.error(f"Failed to save cache metadata: {e}")
-    
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _refresh_index(self) -> None:
+        """Reload the model index from the database."""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT models.model_id, blobs.path FROM models JOIN blobs ON models.hash = blobs.hash"
+            ).fetchall()
+        with self._lock:
+            self._index = dict(rows)
+
     def get_model_path(self, model_id: str) -> Optional[str]:
         """
         Get the path to a cached model.
-        
+
+        Served from memory; the database is only read when another process
+        may have added the model since the index was loaded.
+
         Args:
             model_id: ID of the model to retrieve
-            
+
         Returns:
             Path to the cached model, or None if not in cache
         """
-        models = self.metadata.get("models", {})
-        
-        if model_id in models:
-            model_info = models[model_id]
-            cache_path = model_info.get("cache_path")
-            
-            # Verify the file exists
-            if cache_path and os.path.exists(cache_path):
-                # Update last access time
-                model_info["last_accessed"] = time.time()
-                self._save_metadata()
-                return cache_path
-            
-            # File doesn't exist, remove from metadata
-            logger.warning(f"Cached model {model_id} not found on disk, removing from metadata")
-            del models[model_id]
-            self._save_metadata()
-        
-        return None
-    
+        path = self._index.get(model_id)
+        if path is None:
+            self._refresh_index()
+            path = self._index.get(model_id)
+
+        if path is None or not os.path.exists(path):
+            if path is not None:
+                logger.warning(f"Cached model {model_id} not found on disk")
+                with self._lock:
+                    self._index.pop(model_id, None)
+            self._stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self._pending_access[model_id] = time.time()
+        self._stats["hits"] += 1
+        return path
+
     def add_model(self, model_id: str, source_path: str, model_info: Dict[str, Any]) -> str:
         """
         Add a model to the cache.
-        
+
+        The source is hashed in a streaming pass (and checked against
+        model_info["sha256"] when given), then stored under its hash. Adding
+        the same content under another ID reuses the existing blob.
+
         Args:
             model_id: ID of the model to add
             source_path: Path to the model file to cache
             model_info: Additional model information
-            
+
         Returns:
             Path to the cached model
+
+        Raises:
+            FileNotFoundError: If the source file does not exist
+            ValueError: If the source does not match the expected hash
         """
         if not os.path.exists(source_path):
             raise FileNotFoundError(f"Source model not found: {source_path}")
-        
-        # Check if we need to clean up the cache
-        self._cleanup_if_needed()
-        
-        # Determine cache path
-        model_filename = os.path.basename(source_path)
-        cache_path = os.path.join(self.cache_dir, f"{model_id}_{model_filename}")
-        
-        # Check if model already exists in cache
-        if model_id in self.metadata.get("models", {}):
-            existing_path = self.metadata["models"][model_id].get("cache_path")
-            if existing_path and os.path.exists(existing_path):
-                logger.info(f"Model {model_id} already exists in cache at {existing_path}")
-                return existing_path
-        
-        # Copy model to cache
-        logger.info(f"Adding model {model_id} to cache at {cache_path}")
+
+        existing_path = self.get_model_path(model_id)
+        if existing_path:
+            logger.info(f"Model {model_id} already exists in cache at {existing_path}")
+            return existing_path
+
+        file_size = os.path.getsize(source_path)
+        if file_size > self.max_size_bytes:
+            logger.error(f"Model {model_id} is too large for cache ({file_size} bytes)")
+            return source_path
+
+        logger.info(f"Adding model {model_id} to cache")
+        content_hash = file_sha256(source_path)
+        expected_hash = model_info.get("sha256")
+        if expected_hash and expected_hash.lower() != content_hash:
+            raise ValueError(f"Model {model_id} hash mismatch: expected {expected_hash}, got {content_hash}")
+
         try:
-            # Get file size
-            file_size = os.path.getsize(source_path)
-            
-            # Check if there's enough space in the cache
-            if file_size > self.max_size_bytes:
-                logger.error(f"Model {model_id} is too large for cache ({file_size} bytes)")
-                return source_path
-            
-            # Copy file
-            shutil.copy2(source_path, cache_path)
-            
-            # Update metadata
-            if "models" not in self.metadata:
-                self.metadata["models"] = {}
-                
-            self.metadata["models"][model_id] = {
-                "model_id": model_id,
-                "cache_path": cache_path,
-                "original_path": source_path,
-                "size_bytes": file_size,
-                "added": time.time(),
-                "last_accessed": time.time(),
-                "info": model_info
-            }
-            
-            # Update total size
-            self.metadata["total_size_bytes"] = self.metadata.get("total_size_bytes", 0) + file_size
-            
-            # Save metadata
-            self._save_metadata()
-            
-            return cache_path
-            
+            blob_path, created = self._store_blob(source_path, content_hash)
         except Exception as e:
             logger.error(f"Failed to add model {model_id} to cache: {e}")
             return source_path
-    
+
+        # Check if we need to clean up the cache
+        if created:
+            self._cleanup_if_needed(incoming_bytes=file_size)
+
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT OR IGNORE INTO blobs (hash, path, size_bytes, added) VALUES (?, ?, ?, ?)",
+                       (content_hash, blob_path, file_size, now))
+            db.execute(
+                "INSERT OR REPLACE INTO models (model_id, hash, original_path, added, last_accessed, info) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (model_id, content_hash, source_path, now, now, json.dumps(model_info, default=str))
+            )
+        with self._lock:
+            self._index[model_id] = blob_path
+        self.flush_access_log()
+        return blob_path
+
+    def _store_blob(self, source_path: str, content_hash: str) -> Tuple[str, bool]:
+        """
+        Put a file's content in the blob store.
+
+        Returns:
+            Blob path and whether a new blob was created
+        """
+        extension = os.path.splitext(source_path)[1]
+        blob_path = os.path.join(self.blob_dir, content_hash[:2], content_hash + extension)
+        if os.path.exists(blob_path):
+            self._stats["deduplicated"] += 1
+            return blob_path, False
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                os.link(source_path, temp_path)
+                self._stats["hardlinked"] += 1
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+                    raise
+                if _reflink(source_path, temp_path):
+                    self._stats["reflinked"] += 1
+                else:
+                    # A source that changes while being copied must not be cached
+                    if _copy_hashed(source_path, temp_path) != content_hash:
+                        raise ValueError(f"{source_path} changed while being cached")
+                    self._stats["copied"] += 1
+            # Atomic, so a concurrent writer of the same content is harmless
+            os.replace(temp_path, blob_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return blob_path, True
+
+    def verify_model(self, model_id: str) -> bool:
+        """
+        Re-hash a cached model.
+
+        Hardlinked blobs share storage with their source, so this detects the
+        source having been modified in place.
+
+        Args:
+            model_id: ID of the model to verify
+
+        Returns:
+            True if the content still matches its hash
+        """
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT blobs.hash, blobs.path FROM models JOIN blobs ON models.hash = blobs.hash "
+                "WHERE models.model_id = ?", (model_id,)
+            ).fetchone()
+        if row is None or not os.path.exists(row[1]):
+            return False
+        return file_sha256(row[1]) == row[0]
+
     def remove_model(self, model_id: str) -> bool:
         """
         Remove a model from the cache.
-        
+
         Args:
             model_id: ID of the model to remove
-            
+
         Returns:
             True if successful, False otherwise
         """
-        models = self.metadata.get("models", {})
-        
-        if model_id in models:
-            model_info = models[model_id]
-            cache_path = model_info.get("cache_path")
-            
-            # Delete the file if it exists
-            if cache_path and os.path.exists(cache_path):
+        with self._connect() as db:
+            row = db.execute("SELECT hash FROM models WHERE model_id = ?", (model_id,)).fetchone()
+            if row is None:
+                return False
+            db.execute("DELETE FROM models WHERE model_id = ?", (model_id,))
+            self._release_blob(db, row[0])
+
+        with self._lock:
+            self._index.pop(model_id, None)
+            self._pending_access.pop(model_id, None)
+        return True
+
+    def _release_blob(self, db: sqlite3.Connection, content_hash: str) -> int:
+        """Delete a blob no model refers to any more; returns the bytes freed."""
+        if db.execute("SELECT 1 FROM models WHERE hash = ? LIMIT 1", (content_hash,)).fetchone():
+            return 0
+        row = db.execute("SELECT path, size_bytes FROM blobs WHERE hash = ?", (content_hash,)).fetchone()
+        if row is None:
+            return 0
+        path, size_bytes = row
+        db.execute("DELETE FROM blobs WHERE hash = ?", (content_hash,))
+        try:
+            os.remove(path)
+            logger.info(f"Removed model file {path} from cache")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to remove model file {path}: {e}")
+        return size_bytes
+
+    def flush_access_log(self) -> None:
+        """Append access times recorded by lookups to the shared access log."""
+        with self._lock:
+            pending, self._pending_access = self._pending_access, {}
+        if not pending:
+            return
+
+        lines = "".join(f"{accessed:.3f} {model_id}\n" for model_id, accessed in pending.items())
+        try:
+            # One O_APPEND write per flush, so concurrent processes don't interleave lines
+            fd = os.open(self.access_log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, lines.encode("utf-8"))
+            finally:
+                os.close(fd)
+        except Exception as e:
+            logger.error(f"Failed to write cache access log: {e}")
+
+    def _compact_access_log(self, db: sqlite3.Connection) -> None:
+        """Fold the access log into the database."""
+        self.flush_access_log()
+        compacting = f"{self.access_log}.{os.getpid()}.compact"
+        try:
+            os.rename(self.access_log, compacting)
+        except FileNotFoundError:
+            return
+
+        latest: Dict[str, float] = {}
+        with open(compacting, "r", encoding="utf-8") as f:
+            for line in f:
+                accessed, _, model_id = line.rstrip("\n").partition(" ")
                 try:
-                    os.remove(cache_path)
-                    logger.info(f"Removed model file {cache_path} from cache")
-                except Exception as e:
-                    logger.error(f"Failed to remove model file {cache_path}: {e}")
-                    return False
-            
-            # Update total size
-            self.metadata["total_size_bytes"] = self.metadata.get("total_size_bytes", 0) - model_info.get("size_bytes", 0)
-            
-            # Remove from metadata
-            del models[model_id]
-            self._save_metadata()
-            
-            return True
-            
-        return False
-    
-    def _cleanup_if_needed(self) -> None:
+                    latest[model_id] = max(latest.get(model_id, 0.0), float(accessed))
+                except ValueError:
+                    continue
+        db.executemany("UPDATE models SET last_accessed = MAX(last_accessed, ?) WHERE model_id = ?",
+                       [(accessed, model_id) for model_id, accessed in latest.items()])
+        os.remove(compacting)
+
+    def _cleanup_if_needed(self, incoming_bytes: int = 0) -> None:
         """
         Clean up the cache if it exceeds the maximum size.
-        
+
         This method removes the least recently used models until
         the cache size is below the maximum.
+
+        Args:
+            incoming_bytes: Size of a blob about to be added
         """
-        # Check if cleanup is needed
-        total_size = self.metadata.get("total_size_bytes", 0)
-        if total_size <= self.max_size_bytes * 0.9:  # Only clean up if we're at 90% capacity
+        with self._connect() as db:
+            total_size = db.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM blobs").fetchone()[0]
+            total_size += incoming_bytes
+            if total_size <= self.max_size_bytes * 0.9:  # Only clean up if we're at 90% capacity
+                return
+
+            logger.info(f"Cache cleanup needed: {total_size / (1024*1024*1024):.2f}GB / "
+                        f"{self.max_size_bytes / (1024*1024*1024):.2f}GB")
+            self._compact_access_log(db)
+
+            # Blobs ordered by the most recent access of any model using them (oldest first)
+            blobs = db.execute(
+                "SELECT blobs.hash, MAX(COALESCE(models.last_accessed, 0)) AS accessed FROM blobs "
+                "LEFT JOIN models ON models.hash = blobs.hash GROUP BY blobs.hash ORDER BY accessed"
+            ).fetchall()
+
+            # Remove models until we're under the limit
+            target_size = self.max_size_bytes * 0.7  # Target 70% usage after cleanup
+            evicted = []
+            for content_hash, _ in blobs:
+                if total_size <= target_size:
+                    break
+                model_ids = [row[0] for row in db.execute("SELECT model_id FROM models WHERE hash = ?",
+                                                          (content_hash,))]
+                db.execute("DELETE FROM models WHERE hash = ?", (content_hash,))
+                total_size -= self._release_blob(db, content_hash)
+                evicted.extend(model_ids)
+
+        with self._lock:
+            for model_id in evicted:
+                self._index.pop(model_id, None)
+                self._pending_access.pop(model_id, None)
+        if evicted:
+            logger.info(f"Removed models {', '.join(evicted)} from cache")
+
+    def _import_legacy_metadata(self) -> None:
+        """Move models cached by the JSON-metadata version into the blob store."""
+        legacy_file = os.path.join(self.cache_dir, "cache_metadata.json")
+        if not os.path.exists(legacy_file):
             return
-        
-        logger.info(f"Cache cleanup needed: {total_size / (1024*1024*1024):.2f}GB / {self.max_size_bytes / (1024*1024*1024):.2f}GB")
-        
-        # Get models sorted by last access time (oldest first)
-        models = self.metadata.get("models", {})
-        sorted_models = sorted(
-            models.items(),
-            key=lambda x: x[1].get("last_accessed", 0)
-        )
-        
-        # Remove models until we're under the limit
-        target_size = self.max_size_bytes * 0.7  # Target 70% usage after cleanup
-        for model_id, model_info in sorted_models:
-            if total_size <= target_size:
-                break
-                
-            # Remove the model
-            if self.remove_model(model_id):
-                total_size -= model_info.get("size_bytes", 0)
-                logger.info(f"Removed model {model_id} from cache")
-        
-        # Update last cleanup time
-        self.metadata["last_cleanup"] = time.time()
-        self._save_metadata()
-    
+
+        try:
+            with open(legacy_file, "r") as f:
+                legacy = json.load(f)
+            for model_id, entry in legacy.get("models", {}).items():
+                cache_path = entry.get("cache_path")
+                if cache_path and os.path.exists(cache_path):
+                    if self.add_model(model_id, cache_path, entry.get("info", {})) != cache_path:
+                        os.remove(cache_path)
+            os.replace(legacy_file, legacy_file + ".migrated")
+            logger.info(f"Imported {len(legacy.get('models', {}))} models from legacy cache metadata")
+        except Exception as e:
+            logger.error(f"Failed to import legacy cache metadata: {e}")
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the cache.
-        
+
         Returns:
             Dictionary with cache statistics
         """
-        models = self.metadata.get("models", {})
-        total_size = self.metadata.get("total_size_bytes", 0)
-        
+        with self._connect() as db:
+            model_count = db.execute("SELECT COUNT(*) FROM models").fetchone()[0]
+            blob_count, total_size = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM blobs"
+            ).fetchone()
+
         return {
-            "model_count": len(models),
+            "model_count": model_count,
+            "blob_count": blob_count,
             "total_size_bytes": total_size,
             "total_size_gb": total_size / (1024 * 1024 * 1024),
             "max_size_gb": self.max_size_bytes / (1024 * 1024 * 1024),
             "usage_percent": (total_size / self.max_size_bytes) * 100 if self.max_size_bytes > 0 else 0,
-            "last_cleanup": self.metadata.get("last_cleanup", 0)
-        }
\ No newline at end of file
+            **self._stats
+        }
+
+    def close(self) -> None:
+        """Write out pending access times."""
+        self.flush_access_log()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -9,13 +9,16 @@ Token counting utilities for model management.
 import logging
 from typing import Dict, List, Any, Optional, Union
 
+from ...memory.utils.tokenizers import get_tokenizer_registry
+
 logger = logging.getLogger(__name__)
 
 
 def estimate_token_count(text: str, model_type: str = "llama2") -> int:
     """
     Estimate the number of tokens in text for a given model type.
-    This is an approximate method when the model isn't loaded yet.
+    This is an approximate method when the model isn't loaded yet; OpenAI
+    ("tiktoken") counts are exact when tiktoken is installed.
     
     Args:
         text: The text to count tokens for
@@ -27,22 +30,12 @@ def estimate_token_count(text: str, model_type: str = "llama2") -> int:
     if not text:
         return 0
     
-    # Simple estimator based on average token lengths for different model types
-    # These are rough estimates and should be replaced with actual tokenization when possible
-    avg_chars_per_token = {
-        "llama2": 4.0,
-        "mistral": 4.0,
-        "vicuna": 4.0,
-        "chatml": 4.0,
-        "gpt2": 4.0,  # GPT-2 tokenizer (used by many models)
-        "tiktoken": 3.75,  # OpenAI models
-    }
-    
-    # Use the right average value based on model type
-    chars_per_token = avg_chars_per_token.get(model_type, 4.0)
+    registry = get_tokenizer_registry()
+    if model_type == "tiktoken":
+        return max(1, registry.count(text))
     
-    # Estimate token count
-    return max(1, int(len(text) / chars_per_token))
+    # Local model vocabularies run about 4 characters per token
+    return registry.estimate(text, chars_per_token=4.0)
 
 
 def count_message_tokens(messages: List[Dict[str, str]], model_type: str = "llama2") -> Dict[str, int]:
@@ -72,6 +72,7 @@ from .nodes import (
     router_node,
     local_model_node,
     api_model_node,
+    parallel_race_node,
     integration_node,
     synthesize_speech,
     update_memory,
@@ -162,6 +163,7 @@ def create_vanta_workflow() -> StateGraph:
         workflow.add_node("local_model_node", local_model_node)
         workflow.add_node("api_model_node", api_model_node)
         workflow.add_node("parallel_branch", create_parallel_branch_node)
+        workflow.add_node("parallel_race_node", parallel_race_node)
         workflow.add_node("integration_check", create_integration_check_node)
         workflow.add_node("integration_node", integration_node)
         workflow.add_node("synthesize_speech", synthesize_speech)
@@ -197,17 +199,19 @@ def create_vanta_workflow() -> StateGraph:
             {
                 "local": "local_model_node",
                 "api": "api_model_node", 
-                "parallel": "parallel_branch"
+                "parallel": "parallel_branch",
+                "race": "parallel_race_node"
             }
         )
         
-        # 4. Parallel processing branch
+        # 4. Parallel processing branch (a racing parallel path runs both tracks in parallel_race_node)
         workflow.add_edge("parallel_branch", "local_model_node")
         workflow.add_edge("parallel_branch", "api_model_node")
         
         # 5. Both model paths converge at integration check
         workflow.add_edge("local_model_node", "integration_check")
         workflow.add_edge("api_model_node", "integration_check")
+        workflow.add_edge("parallel_race_node", "integration_check")
         
         # 6. Wait for processing completion before integration
         workflow.add_conditional_edges(
@@ -24,6 +24,9 @@ from .processing_nodes import (
     router_node,
     local_model_node,
     api_model_node,
+    api_model_node_async,
+    parallel_race_node,
+    parallel_race_node_async,
     integration_node,
 )
 
@@ -43,5 +46,8 @@ __all__ = [
     "router_node",
     "local_model_node",
     "api_model_node",
+    "api_model_node_async",
+    "parallel_race_node",
+    "parallel_race_node_async",
     "integration_node",
 ]
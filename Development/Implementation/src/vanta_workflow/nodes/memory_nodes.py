@@ -20,6 +20,7 @@ from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 
 from ..state.vanta_state import VANTAState, ActivationStatus
 from ...memory.core import MemorySystem
+from ...memory.utils.tokenizers import get_tokenizer_registry
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +40,9 @@ def get_memory_system() -> MemorySystem:
     return _memory_system
 
 def estimate_token_count(text: Any) -> int:
-    """Estimate token count for text (simple approximation)."""
+    """Count tokens in text with the shared tokenizer registry."""
     if isinstance(text, str):
-        return len(text.split()) * 1.3  # Rough approximation
+        return get_tokenizer_registry().count(text)
     elif isinstance(text, dict):
         return estimate_token_count(str(text))
     return 0
@@ -306,10 +307,14 @@ def store_conversation_node(state: VANTAState) -> Dict[str, Any]:
 
 def summarize_conversation_node(state: VANTAState) -> Dict[str, Any]:
     """
-    Generate conversation summary when history exceeds limits.
+    Fold older conversation history into the rolling summary.
     
-    This node generates a summary of the conversation history when it becomes
-    too long, helping to maintain context while managing memory usage.
+    When the history exceeds the threshold, everything but the most recent
+    entries is handed to the session's hierarchical summarizer, which
+    summarizes it in the background. The node does not wait for it: entries
+    not summarized yet appear verbatim in the summary. The returned summary
+    stays bounded in tokens however long the session runs, and history is
+    never re-summarized.
     
     Args:
         state: Current VANTA state with conversation history
@@ -336,8 +341,9 @@ def summarize_conversation_node(state: VANTAState) -> Dict[str, Any]:
         # Get memory system
         memory_system = get_memory_system()
         
-        # Generate summary of older conversations
-        messages_to_summarize = conversation_history[:-5]  # Keep last 5 messages
+        # Older entries leave the verbatim history exactly once
+        keep_recent = state.get("config", {}).get("summarization_keep_recent", 5)
+        messages_to_summarize = conversation_history[:-keep_recent] if keep_recent else list(conversation_history)
         
         if not messages_to_summarize:
             return {
@@ -348,11 +354,14 @@ def summarize_conversation_node(state: VANTAState) -> Dict[str, Any]:
                 }
             }
         
-        # Create summary text
-        summary_text = memory_system.working_memory.generate_summary(messages_to_summarize)
+        # Schedule chunk summaries on the worker without waiting for them;
+        # chunks it hasn't finished are rendered verbatim, so nothing is lost
+        summarizer = memory_system.get_summarizer(state.get("config", {}).get("session_id"))
+        summarizer.add_entries(messages_to_summarize)
+        summary_text = summarizer.get_summary()
         
         # Keep recent messages and summary
-        trimmed_history = conversation_history[-5:]  # Keep recent messages
+        trimmed_history = conversation_history[-keep_recent:] if keep_recent else []
         
         summarization_time = time.time() - start_time
         
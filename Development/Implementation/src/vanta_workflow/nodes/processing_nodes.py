@@ -14,15 +14,20 @@ Updated to use the enhanced dual-track integration system from TASK-DP-002.
 # DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
 
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from ..state.vanta_state import VANTAState
 from ...models.dual_track.graph_nodes import (
     enhanced_router_node,
     enhanced_local_processing_node, 
     enhanced_api_processing_node,
+    aenhanced_api_processing_node,
+    enhanced_parallel_race_node,
+    aenhanced_parallel_race_node,
     enhanced_integration_node,
-    get_dual_track_stats
+    get_dual_track_stats,
+    cancel_dual_track_turn,
+    shutdown_dual_track
 )
 
 logger = logging.getLogger(__name__)
@@ -76,6 +81,52 @@ def api_model_node(state: VANTAState) -> Dict[str, Any]:
     return enhanced_api_processing_node(state)
 
 
+async def api_model_node_async(state: VANTAState) -> Dict[str, Any]:
+    """
+    API model processing for graphs executed on an event loop.
+    
+    Same results as api_model_node, but awaits the pooled asyncio transport
+    instead of blocking a worker thread for the duration of the request.
+    
+    Args:
+        state: Current VANTA state containing messages, context, and processing metadata
+        
+    Returns:
+        Dict: Updates with API model response and processing metadata
+    """
+    return await aenhanced_api_processing_node(state)
+
+
+def parallel_race_node(state: VANTAState) -> Dict[str, Any]:
+    """
+    Parallel processing that speaks the first phrase of whichever track is ready first.
+    
+    Runs both tracks at once and hands phrases to speech as they complete,
+    continuing with the local answer or handing off to the API response
+    according to the integration strategy. The losing track is cancelled.
+    
+    Args:
+        state: Current VANTA state containing messages, context, and processing metadata
+        
+    Returns:
+        Dict: Updates with both tracks' responses and the spoken answer
+    """
+    return enhanced_parallel_race_node(state)
+
+
+async def parallel_race_node_async(state: VANTAState) -> Dict[str, Any]:
+    """
+    Parallel race processing for graphs executed on an event loop.
+    
+    Args:
+        state: Current VANTA state containing messages, context, and processing metadata
+        
+    Returns:
+        Dict: Updates with both tracks' responses and the spoken answer
+    """
+    return await aenhanced_parallel_race_node(state)
+
+
 def integration_node(state: VANTAState) -> Dict[str, Any]:
     """
     Enhanced response integration using sophisticated combination strategies.
@@ -103,6 +154,26 @@ def get_processing_stats() -> Dict[str, Any]:
     return get_dual_track_stats()
 
 
+def cancel_turn(session_id: Optional[str] = None) -> bool:
+    """
+    Stop the dual-track work of a turn the user barged in on.
+    
+    Args:
+        session_id: Session of the turn (None for the default session)
+        
+    Returns:
+        bool: True if a turn in flight was cancelled
+    """
+    return cancel_dual_track_turn(session_id)
+
+
+def shutdown_processing() -> None:
+    """
+    Close the API connections kept alive for synchronous parallel races.
+    """
+    shutdown_dual_track()
+
+
 # Legacy compatibility functions (backwards compatibility)
 def _format_context_for_api(context: Dict[str, Any]) -> str:
     """Legacy compatibility function for context formatting."""
@@ -56,13 +56,14 @@ def determine_processing_path(state: VANTAState) -> str:
     
     This function examines the routing decision made by the router_node
     and directs the workflow to the appropriate processing path (local,
-    API, or parallel).
+    API, or parallel). A parallel path with racing enabled goes to the
+    race node, which speaks whichever track has a phrase ready first.
     
     Args:
         state: Current VANTA state
         
     Returns:
-        str: "local", "api", or "parallel" based on processing path
+        str: "local", "api", "race", or "parallel" based on processing path
     """
     try:
         path = state["processing"]["path"]
@@ -73,6 +74,9 @@ def determine_processing_path(state: VANTAState) -> str:
         elif path == "api":
             logger.debug("Routing to API model processing")
             return "api"
+        elif path == "parallel" and state["processing"].get("race"):
+            logger.debug("Routing to parallel race processing")
+            return "race"
         else:  # "parallel" or any other value
             logger.debug(f"Routing to parallel processing (path was: {path})")
             return "parallel"
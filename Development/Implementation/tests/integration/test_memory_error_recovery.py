@@ -107,7 +107,7 @@ class TestMemoryErrorRecovery:
         sample_state["config"]["summarization_threshold"] = 10
         
         mock_memory_system = Mock(spec=MemorySystem)
-        mock_memory_system.working_memory.generate_summary.side_effect = Exception("Summarization model unavailable")
+        mock_memory_system.get_summarizer.return_value.add_entries.side_effect = Exception("Summarization model unavailable")
         
         with patch('langgraph.nodes.memory_nodes.get_memory_system', return_value=mock_memory_system):
             result = await summarize_conversation_node(sample_state)
@@ -243,7 +243,7 @@ class TestMemoryErrorRecovery:
         # All operations fail
         mock_memory_system.working_memory.retrieve_context.side_effect = Exception("Retrieval failed")
         mock_memory_system.working_memory.store_conversation.side_effect = Exception("Storage failed")
-        mock_memory_system.working_memory.generate_summary.side_effect = Exception("Summarization failed")
+        mock_memory_system.get_summarizer.return_value.add_entries.side_effect = Exception("Summarization failed")
         
         with patch('langgraph.nodes.memory_nodes.get_memory_system', return_value=mock_memory_system):
             # Test all operations fail gracefully
@@ -43,6 +43,7 @@ class TestMemoryLangGraphIntegration:
         mock_system = Mock(spec=MemorySystem)
         mock_working_memory = Mock()
         mock_system.working_memory = mock_working_memory
+        mock_system.get_summarizer.return_value = Mock()
         return mock_system
     
     @pytest.fixture
@@ -173,7 +174,7 @@ class TestMemoryLangGraphIntegration:
         conversation_state["config"]["summarization_threshold"] = 10
         
         # Setup mock
-        mock_memory_system.working_memory.generate_summary.return_value = "Conversation about various topics including greetings and AI systems."
+        mock_memory_system.get_summarizer.return_value.get_summary.return_value = "Conversation about various topics including greetings and AI systems."
         
         with patch('langgraph.nodes.memory_nodes.get_memory_system', return_value=mock_memory_system):
             # Test summarization
@@ -188,8 +189,8 @@ class TestMemoryLangGraphIntegration:
             assert "conversation_history" in memory_data
             assert len(memory_data["conversation_history"]) == 5  # Keep last 5 messages
             
-            # Verify summarization was called
-            mock_memory_system.working_memory.generate_summary.assert_called_once()
+            # Verify the older entries were handed to the summarizer
+            mock_memory_system.get_summarizer.return_value.add_entries.assert_called_once_with(long_history[:-5])
     
     @pytest.mark.asyncio
     async def test_summarize_conversation_not_needed(self, mock_memory_system, conversation_state):
@@ -202,7 +203,7 @@ class TestMemoryLangGraphIntegration:
             
             assert "memory" in result
             assert result["memory"]["summarization_status"] == "not_needed"
-            mock_memory_system.working_memory.generate_summary.assert_not_called()
+            mock_memory_system.get_summarizer.return_value.add_entries.assert_not_called()
     
     def test_should_summarize_conversation_routing(self):
         """Test the routing function for conversation summarization."""
@@ -276,7 +277,7 @@ class TestMemoryLangGraphIntegration:
             "results": [{"memory_id": "mem_001", "content": "Previous context"}]
         }
         mock_memory_system.working_memory.store_conversation.return_value = "mem_002"
-        mock_memory_system.working_memory.generate_summary.return_value = "Summary of conversation"
+        mock_memory_system.get_summarizer.return_value.get_summary.return_value = "Summary of conversation"
         
         # Create state for complete workflow
         state = create_empty_state()
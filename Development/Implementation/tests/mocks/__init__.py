@@ -4,7 +4,7 @@
 
 from tests.mocks.mock_audio import MockAudioCapture
 from tests.mocks.mock_tts import MockTTS
-from tests.mocks.mock_llm import MockLLM, MockStreamingLLM
+from tests.mocks.mock_llm import MockLLM, MockStreamingLLM, MockLlamaCpp, mock_local_config
 from tests.mocks.mock_vad import MockVAD
 from tests.mocks.mock_stt import (
     MockWhisperAdapter, 
@@ -18,6 +18,8 @@ __all__ = [
     'MockTTS',
     'MockLLM',
     'MockStreamingLLM',
+    'MockLlamaCpp',
+    'mock_local_config',
     'MockVAD',
     'MockWhisperAdapter',
     'MockTranscriber',
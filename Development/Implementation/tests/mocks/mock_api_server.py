@@ -0,0 +1,193 @@
+# TASK-REF: AM_001 - API Model Client
+# TASK-REF: AM_002 - Streaming Response Handling
+# CONCEPT-REF: CON-AM-001 - API Model Client
+# DOC-REF: DOC-DEV-TEST-1 - Testing Strategy
+
+"""
+Local HTTP/1.1 server speaking the Anthropic and OpenAI chat APIs.
+
+Serves /v1/messages and /v1/chat/completions with JSON or SSE (chunked)
+responses and keeps connections alive, so the async clients can be tested
+without network access. The request's model name selects behaviours:
+"slow" delays the response by ``delay`` seconds and "rate-limited" answers
+429 with a retry-after of ``retry_after`` seconds. ``latencies`` injects a
+delay per request, in arrival order, for any model.
+
+Anthropic prompt caching is simulated: the request up to each
+``cache_control`` breakpoint is remembered, and a later request whose
+prefix is byte-identical reports it as ``cache_read_input_tokens`` (a
+token being four bytes of the serialized blocks).
+"""
+
+import json
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class MockAPIServer:
+    """Mock Anthropic/OpenAI endpoint on 127.0.0.1."""
+
+    def __init__(self, text: str = "Hello from the mock API", delay: float = 0.2, retry_after: int = 30,
+                 latencies: Sequence[float] = ()):
+        self.text = text
+        self.delay = delay
+        self.retry_after = retry_after
+        self.latencies = list(latencies)
+        self.cached_prefixes: Dict[str, int] = {}
+        self.connections = 0
+        self.requests: List[Dict[str, Any]] = []
+        self.active = 0
+        self.max_active = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def __aenter__(self) -> "MockAPIServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                path = request_line.decode("latin-1").split()[1]
+                await self._respond(writer, path, headers, json.loads(body or b"{}"))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, path: str, headers: Dict[str, str], payload: Dict[str, Any]) -> None:
+        self.requests.append({"path": path, "headers": headers, "payload": payload})
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            model = payload.get("model", "")
+            index = len(self.requests) - 1
+            if index < len(self.latencies):
+                await asyncio.sleep(self.latencies[index])
+            if model == "slow":
+                await asyncio.sleep(self.delay)
+            if model == "rate-limited":
+                error = {"error": {"type": "rate_limit_error", "message": "Too many requests"}}
+                await self._send(writer, 429, json.dumps(error).encode("utf-8"),
+                                 f"Retry-After: {self.retry_after}\r\n")
+                return
+
+            anthropic = path.endswith("/v1/messages")
+            if payload.get("stream"):
+                events = self._anthropic_events(model, payload) if anthropic else self._openai_events(model)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                             b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n")
+                for event in events:
+                    data = event.encode("utf-8")
+                    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    await writer.drain()
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            else:
+                body = self._anthropic_body(model, payload) if anthropic else self._openai_body(model)
+                await self._send(writer, 200, json.dumps(body).encode("utf-8"))
+        finally:
+            self.active -= 1
+
+    async def _send(self, writer, status: int, body: bytes, extra_headers: str = "") -> None:
+        reason = {200: "OK", 429: "Too Many Requests"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n{extra_headers}"
+                     f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+    def _words(self) -> List[str]:
+        words = self.text.split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    def _prompt_cache_usage(self, payload: Dict[str, Any]) -> Dict[str, int]:
+        """Input token usage with cache reads and writes, as Anthropic reports it."""
+        system = payload.get("system") or []
+        blocks = [("system", block) for block in ([{"type": "text", "text": system}]
+                                                   if isinstance(system, str) else system)]
+        for message in payload.get("messages", []):
+            content = message["content"]
+            content = [{"type": "text", "text": content}] if isinstance(content, str) else content
+            blocks += [(message["role"], block) for block in content]
+
+        prefix, breakpoints = b"", []
+        for role, block in blocks:
+            text = {key: value for key, value in block.items() if key != "cache_control"}
+            prefix += json.dumps([role, text], sort_keys=True).encode("utf-8")
+            if "cache_control" in block:
+                breakpoints.append(prefix)
+        total = max(len(prefix) // 4, 1)
+
+        read = max((len(bp) // 4 for bp in breakpoints if bp.decode("utf-8") in self.cached_prefixes), default=0)
+        written = max((len(bp) // 4 for bp in breakpoints), default=0)
+        write = written - read if written > read else 0
+        for bp in breakpoints:
+            self.cached_prefixes[bp.decode("utf-8")] = len(bp) // 4
+        return {"input_tokens": total - read - write, "cache_read_input_tokens": read,
+                "cache_creation_input_tokens": write}
+
+    def _anthropic_body(self, model: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": "msg_mock", "type": "message", "role": "assistant", "model": model,
+            "content": [{"type": "text", "text": self.text}],
+            "stop_reason": "end_turn",
+            "usage": {**self._prompt_cache_usage(payload), "output_tokens": len(self._words())},
+        }
+
+    def _openai_body(self, model: str) -> Dict[str, Any]:
+        return {
+            "id": "chatcmpl-mock", "object": "chat.completion", "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": self.text},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": len(self._words()),
+                      "total_tokens": 10 + len(self._words())},
+        }
+
+    def _anthropic_events(self, model: str, payload: Dict[str, Any]) -> List[str]:
+        def event(name: str, data: Dict[str, Any]) -> str:
+            return f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n"
+
+        events = [
+            event("message_start", {"message": {"id": "msg_mock", "model": model, "content": [],
+                                                 "usage": self._prompt_cache_usage(payload)}}),
+            event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}}),
+            "event: ping\ndata: {\"type\": \"ping\"}\n\n",
+        ]
+        events += [event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": word}})
+                   for word in self._words()]
+        events += [
+            event("content_block_stop", {"index": 0}),
+            event("message_delta", {"delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 5}}),
+            event("message_stop", {}),
+        ]
+        return events
+
+    def _openai_events(self, model: str) -> List[str]:
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            data = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            return f"data: {json.dumps(data)}\n\n"
+
+        events = [chunk({"role": "assistant", "content": ""})]
+        events += [chunk({"content": word}) for word in self._words()]
+        events += [chunk({}, "stop"), "data: [DONE]\n\n"]
+        return events
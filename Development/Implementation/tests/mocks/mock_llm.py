@@ -2,6 +2,7 @@
 # CONCEPT-REF: CON-IMP-013 - Test Framework
 # DOC-REF: DOC-DEV-TEST-1 - Testing Strategy
 
+import time
 from typing import Dict, Any, List, Optional
 
 class MockLLM:
@@ -68,4 +69,118 @@ class MockStreamingLLM:
         # Yield response in chunks of ~5 characters
         chunk_size = min(5, len(response))
         for i in range(0, len(response), chunk_size):
-            yield response[i:i+chunk_size]
\ No newline at end of file
+            yield response[i:i+chunk_size]
+
+
+def mock_local_config(**overrides):
+    """
+    LocalModelConfig for a LocalModel serving MockLlamaCpp.
+    
+    Nothing is preloaded, and the prompt cache and system-prompt snapshots
+    are off so tests don't keep KV snapshots around unless they opt in.
+    
+    Args:
+        **overrides: LocalModelConfig fields to set
+        
+    Returns:
+        LocalModelConfig instance
+    """
+    from src.models.dual_track.config import LocalModelConfig
+    
+    return LocalModelConfig(**{"preload": False, "system_prompt_snapshot": False,
+                               "prompt_cache": False, **overrides})
+
+
+class MockLlamaCpp:
+    """
+    Mock llama_cpp.Llama with KV-state bookkeeping.
+    
+    Like llama.cpp, a call evaluates only the prompt tokens after the longest
+    common prefix with the tokens already evaluated. Evaluation cost can be
+    simulated per token. Completions are " ok" repeated, or the words of
+    ``text`` when given.
+    """
+    
+    def __init__(self, seconds_per_token: float = 0.0, completion_tokens: int = 1,
+                 text: Optional[str] = None):
+        self.seconds_per_token = seconds_per_token
+        self.completion_tokens = len(text.split()) if text else completion_tokens
+        self.words = text.split() if text else None
+        self.vocab: Dict[str, int] = {}
+        self.input_ids: List[int] = []
+        self.evaluated_tokens = 0
+        self.last_evaluated = 0
+    
+    @property
+    def n_tokens(self) -> int:
+        return len(self.input_ids)
+    
+    @property
+    def _input_ids(self) -> List[int]:
+        return list(self.input_ids)
+    
+    def tokenize(self, text: bytes, add_bos: bool = True, special: bool = False) -> List[int]:
+        """Tokenize on whitespace with a growing vocabulary."""
+        tokens = [1] if add_bos else []
+        for word in text.decode("utf-8").split():
+            tokens.append(self.vocab.setdefault(word, len(self.vocab) + 2))
+        return tokens
+    
+    def reset(self):
+        self.input_ids = []
+    
+    def save_state(self) -> Dict[str, Any]:
+        return {"input_ids": list(self.input_ids)}
+    
+    def load_state(self, state: Dict[str, Any]):
+        self.input_ids = list(state["input_ids"])
+    
+    def eval(self, tokens: List[int]):
+        """Append tokens to the KV state."""
+        self.last_evaluated = len(tokens)
+        self.evaluated_tokens += len(tokens)
+        if self.seconds_per_token:
+            time.sleep(len(tokens) * self.seconds_per_token)
+        self.input_ids.extend(tokens)
+    
+    def _evaluate(self, prompt: str):
+        tokens = self.tokenize(prompt.encode("utf-8"))
+        prefix = 0
+        while (prefix < min(len(tokens) - 1, len(self.input_ids))
+               and tokens[prefix] == self.input_ids[prefix]):
+            prefix += 1
+        self.last_evaluated = len(tokens) - prefix
+        self.evaluated_tokens += self.last_evaluated
+        if self.seconds_per_token:
+            time.sleep(self.last_evaluated * self.seconds_per_token)
+        self.input_ids = tokens
+        return tokens
+    
+    def __call__(self, prompt: str, max_tokens: int = 16, stream: bool = False, **kwargs):
+        """Evaluate the prompt and 'generate' up to completion_tokens tokens."""
+        tokens = self._evaluate(prompt)
+        count = max(1, min(max_tokens, self.completion_tokens))
+        if stream:
+            return self._stream(count)
+        for _ in range(count):
+            self._decode()
+        choice = {"text": "".join(self._piece(i) for i in range(count)), "index": 0, "logprobs": None, "finish_reason": "stop"}
+        usage = {"prompt_tokens": len(tokens), "completion_tokens": count, "total_tokens": len(tokens) + count}
+        return {"choices": [choice], "usage": usage}
+    
+    def create_completion(self, prompt: str, **kwargs):
+        return self(prompt, **kwargs)
+    
+    def _decode(self):
+        if self.seconds_per_token:
+            time.sleep(self.seconds_per_token)
+        self.input_ids.append(0)
+    
+    def _piece(self, i: int) -> str:
+        return f" {self.words[i]}" if self.words else " ok"
+    
+    def _stream(self, count: int):
+        for i in range(count):
+            self._decode()
+            finish_reason = "stop" if i == count - 1 else None
+            yield {"choices": [{"text": self._piece(i), "index": 0, "logprobs": None, "finish_reason": finish_reason}]}
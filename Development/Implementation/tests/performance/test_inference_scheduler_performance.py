@@ -0,0 +1,56 @@
+"""
+Concurrent-session throughput tests for the inference scheduler.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import pytest
+
+from src.models.local.benchmarks import run_concurrent_throughput_benchmark
+from src.models.local.llama_adapter import LlamaModelAdapter
+from src.models.local.model_manager import LocalModelManager
+from src.models.utils.inference_scheduler import InferenceScheduler
+from tests.mocks import MockLlamaCpp
+
+# Short prompts keep the comparison about decoding rather than prompt evaluation
+PROMPTS = ["Hello there", "What time is it", "Tell me a joke", "Good morning"]
+
+
+def _manager(contexts: int) -> LocalModelManager:
+    """LocalModelManager serving a mock model, with a scheduler when contexts > 1."""
+    manager = LocalModelManager({"registry_path": None, "monitor_memory": False})
+    adapter = LlamaModelAdapter(config={"generation": {}})
+    adapter.model = MockLlamaCpp(seconds_per_token=0.001, completion_tokens=20)
+    adapter.is_initialized = True
+    if contexts > 1:
+        models = [adapter.model] + [MockLlamaCpp(seconds_per_token=0.001, completion_tokens=20)
+                                    for _ in range(contexts - 1)]
+        adapter.scheduler = InferenceScheduler(models)
+        adapter.scheduler.start()
+    manager.active_models["mock"] = {"adapter": adapter, "info": {"id": "mock"}, "loaded_at": 0, "model_type": "llama2"}
+    return manager
+
+
+@pytest.mark.performance
+class TestInferenceSchedulerPerformance:
+    """Performance tests for concurrent sessions on one model."""
+
+    def test_first_token_latency_with_concurrent_sessions(self):
+        """Scheduled sessions should all start promptly without losing aggregate throughput."""
+        serial = run_concurrent_throughput_benchmark(_manager(1), "mock", session_counts=[4], prompts=PROMPTS,
+                                                     max_tokens=20)
+        scheduled_manager = _manager(4)
+        try:
+            scheduled = run_concurrent_throughput_benchmark(scheduled_manager, "mock", session_counts=[4],
+                                                            prompts=PROMPTS, max_tokens=20)
+        finally:
+            scheduled_manager.active_models["mock"]["adapter"].stop_scheduler()
+
+        serial_case, scheduled_case = serial["test_cases"][0], scheduled["test_cases"][0]
+        assert scheduled["scheduler"] and not serial["scheduler"]
+        assert scheduled_case["completed"] == serial_case["completed"] == 4
+        assert scheduled_case["time_to_first_token_p95"] < serial_case["time_to_first_token_p95"] / 2
+        assert scheduled_case["aggregate_tokens_per_second"] > serial_case["aggregate_tokens_per_second"] * 0.7
+        assert scheduled["scheduler_stats"]["max_concurrent"] == 4
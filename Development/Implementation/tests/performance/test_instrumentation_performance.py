@@ -0,0 +1,46 @@
+"""
+Overhead tests for always-on inference instrumentation.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import time
+
+import pytest
+
+from src.models.local.optimization import InferenceInstrumentation, PerformanceMonitor
+
+ITERATIONS = 2000
+MONITOR_ITERATIONS = 20
+
+
+@pytest.mark.performance
+class TestInstrumentationPerformance:
+    """Per-request cost of recording metrics."""
+
+    def test_per_request_overhead_near_zero(self):
+        """Recording a streamed request should cost microseconds, well under a monitor start/stop."""
+        instrumentation = InferenceInstrumentation("overhead")
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            timer = instrumentation.start_request()
+            for _ in range(8):
+                timer.token()
+            timer.finish(prompt_tokens=32)
+        instrumented = (time.perf_counter() - start) / ITERATIONS
+        instrumentation.close()
+
+        monitor = PerformanceMonitor()
+        start = time.perf_counter()
+        for _ in range(MONITOR_ITERATIONS):
+            monitor.start_monitoring(sample_interval=0.01)
+            monitor.record_inference(prompt_tokens=32, completion_tokens=8, latency=0.0)
+            monitor.stop_monitoring()
+            monitor.get_metrics()
+        per_call_monitor = (time.perf_counter() - start) / MONITOR_ITERATIONS
+
+        assert instrumented < 100e-6
+        assert instrumented < per_call_monitor
+        assert instrumentation.get_metrics()["requests"] == ITERATIONS
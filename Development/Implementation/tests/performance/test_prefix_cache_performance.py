@@ -0,0 +1,26 @@
+"""
+Prompt-prefix cache performance tests.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import pytest
+
+from src.models.local.benchmarks import run_prefix_cache_benchmark
+from tests.mocks import MockLlamaCpp
+
+
+@pytest.mark.performance
+class TestPrefixCachePerformance:
+    """Performance tests for prompt-prefix KV reuse."""
+    
+    def test_time_to_first_token_flat_with_turns(self):
+        """Cached TTFT should not grow with the conversation like cold TTFT does."""
+        results = run_prefix_cache_benchmark(MockLlamaCpp(seconds_per_token=0.0002), turns=12)
+        
+        first, last = results["test_cases"][0], results["test_cases"][-1]
+        assert last["cold_ttft_ms"] > first["cold_ttft_ms"] * 2, "Cold prompt cost should grow with history"
+        assert last["cached_ttft_ms"] < last["cold_ttft_ms"] / 3, "Prefix cache should skip the stable prefix"
+        assert results["prefix_cache_stats"]["reuse_ratio"] > 0.5
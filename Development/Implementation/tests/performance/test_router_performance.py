@@ -0,0 +1,60 @@
+"""
+Routing latency performance tests.
+
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-012 - Dual-Track Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import time
+
+import pytest
+
+from src.models.dual_track.config import RouterConfig
+from src.models.dual_track.latency_simulation import simulate, synthetic_load
+from src.models.dual_track.route_classifier import RouteOutcome, evaluate_router
+from src.models.dual_track.router import ProcessingRouter
+from tests.unit.models.dual_track.test_route_classifier import make_traces
+
+LONG_QUERY = ("Given everything we discussed about the move, compare the costs of renting in Lisbon "
+              "and Porto, and explain why the commute matters more than the rent. ") * 4
+
+
+@pytest.mark.performance
+class TestRouterPerformance:
+    """Performance tests for the processing router."""
+
+    def test_routing_stays_under_a_millisecond(self):
+        """Rules and learned routing should both decide well under 1 ms, long queries included."""
+        traces = make_traces(2000, seed=2)
+        traces += [RouteOutcome(LONG_QUERY, "api", latency_ms=1500, has_context=True)] * 100
+
+        rules = evaluate_router(ProcessingRouter(RouterConfig()), traces)
+        router = ProcessingRouter(RouterConfig(learned_routing=True, min_training_samples=100))
+        for trace in traces[:1000]:
+            router.learn(trace)
+        learned = evaluate_router(router, traces, online=True)
+
+        assert learned["learned_share"] > 0.9
+        for result in (rules, learned):
+            assert result["latency_ms"]["p50"] < 0.25
+            assert result["latency_ms"]["p99"] < 1.0
+
+    @pytest.mark.parametrize("seed", [0, 1])
+    def test_latency_routing_cuts_tail_latency_under_load(self, seed):
+        """Latency-model routing should cut p95 latency on a bursty load against the rules."""
+        queries = synthetic_load(seed=seed)
+        rules = simulate(ProcessingRouter(RouterConfig()), queries)
+
+        router = ProcessingRouter(RouterConfig(latency_routing=True))
+        start = time.perf_counter()
+        latency = simulate(router, queries)
+        per_query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        assert latency["queries"] == rules["queries"] > 300
+        assert latency["p95_ms"] < 0.8 * rules["p95_ms"]
+        assert latency["p99_ms"] < rules["p99_ms"]
+        assert latency["max_queue_depth"] < rules["max_queue_depth"]
+        assert router.get_routing_stats()["latency_decisions"] > 0
+        # Routing plus simulation bookkeeping per query
+        assert per_query_ms < 1.0
@@ -0,0 +1,34 @@
+"""
+Token accounting performance tests.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import re
+
+import pytest
+
+from src.memory.benchmarks import run_token_accounting_benchmark
+
+PIECES = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def word_piece_counter(text):
+    """Stand-in tokenizer with real tokenization cost."""
+    return len(PIECES.findall(text))
+
+
+@pytest.mark.performance
+class TestTokenAccountingPerformance:
+    """Performance tests for the tokenizer registry."""
+    
+    def test_history_recount_is_memoized(self):
+        """Re-counting the history each turn should only tokenize the new message."""
+        results = run_token_accounting_benchmark(num_turns=150, counter=word_piece_counter)
+        
+        uncached, registry = results["test_cases"]
+        assert registry["token_count"] == uncached["token_count"]
+        assert registry["hit_rate"] > 0.95
+        assert registry["mean_ms"] < uncached["mean_ms"]
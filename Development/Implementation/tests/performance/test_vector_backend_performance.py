@@ -0,0 +1,34 @@
+"""
+Vector storage backend performance tests.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import pytest
+
+from src.memory.benchmarks import run_ann_recall_benchmark, run_vector_backend_benchmark
+
+
+@pytest.mark.performance
+class TestVectorBackendPerformance:
+    """Performance tests for vector storage backends."""
+    
+    def test_numpy_backend_query_latency(self):
+        """Exact search over 10k vectors should stay well within a turn budget."""
+        results = run_vector_backend_benchmark(sizes=(10_000,), num_queries=20, backends=("numpy",))
+        
+        case = results["test_cases"][0]
+        assert "error" not in case
+        assert case["query"]["p95_ms"] < 50.0, "NumPy index query took too long"
+        assert case["filtered_query"]["p95_ms"] < 50.0, "Filtered query took too long"
+    
+    @pytest.mark.slow
+    def test_ivf_recall_latency_tradeoff(self):
+        """IVF should reach high recall while scanning a fraction of the corpus."""
+        results = run_ann_recall_benchmark(size=20_000, num_queries=20, nprobes=(4, 32))
+        
+        cases = {case["nprobe"]: case for case in results["test_cases"]}
+        assert cases[32]["recall"] >= 0.9, "IVF recall too low at nprobe=32"
+        assert cases[4]["mean_ms"] <= cases[32]["mean_ms"], "Lower nprobe should not be slower"
@@ -0,0 +1,23 @@
+"""
+Working memory performance tests.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import pytest
+
+from src.memory.benchmarks import run_working_memory_benchmark
+
+
+@pytest.mark.performance
+class TestWorkingMemoryPerformance:
+    """Performance tests for WorkingMemoryManager."""
+    
+    def test_add_message_cost_flat_with_history(self):
+        """add_message should not re-tokenize the history on every call."""
+        results = run_working_memory_benchmark(history_lengths=(100, 2_000), num_adds=100)
+        
+        short, long = results["test_cases"]
+        assert long["p50_ms"] < short["p50_ms"] * 5 + 0.5, "add_message cost grows with history"
@@ -21,6 +21,7 @@ from src.models.api.streaming.stream_handler import (
 from src.models.api.streaming.stream_manager import StreamManager
 from src.models.api.streaming.stream_processor import StreamProcessor
 from src.models.api.streaming.stream_config import StreamConfig
+from src.models.utils.cancellation import CancellationToken, REASON_NOT_SELECTED
 from src.models.api.streaming.exceptions import (
     StreamingError,
     StreamHandlerError,
@@ -305,6 +306,36 @@ class TestStreamManager(unittest.TestCase):
         # Verify handler received some but not all tokens
         self.assertLess(len(handler.tokens), len(tokens))
     
+    def test_cancel_token_closes_source(self):
+        """Test that a cancellation token stops the stream and closes its source."""
+        manager = StreamManager({"use_threads": True})
+        
+        # Create a slow, closable stream source
+        tokens = ["word"] * 20
+        stream = MockStreamSource(tokens, delay=0.05)
+        stream.close = MagicMock()
+        
+        handler = BufferedStreamHandler()
+        manager.register_handler(handler)
+        
+        cancel = CancellationToken()
+        manager.start_stream(stream, {"max_tokens": 20}, cancel=cancel)
+        time.sleep(0.2)
+        cancel.cancel(REASON_NOT_SELECTED)
+        
+        # Wait for thread to finish
+        if manager.stream_thread:
+            manager.stream_thread.join(timeout=1.0)
+        
+        # Verify the source was closed and the saved work recorded
+        self.assertEqual(manager.get_stream_status()["state"], StreamManager.STATE_CANCELLED)
+        stream.close.assert_called_once()
+        self.assertLess(len(handler.tokens), len(tokens))
+        cancellation = manager.get_stream_status()["cancellation"]
+        self.assertEqual(cancellation["by_reason"], {REASON_NOT_SELECTED: 1})
+        self.assertEqual(cancellation["tokens_not_generated"],
+                         len(tokens) - cancellation["tokens_generated_before_cancel"])
+    
     def test_pause_resume_stream(self):
         """Test pausing and resuming a stream."""
         manager = StreamManager({"use_threads": True})
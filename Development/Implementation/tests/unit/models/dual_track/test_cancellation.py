@@ -0,0 +1,237 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+
+"""
+Unit tests for cancelling abandoned work on both tracks.
+"""
+
+import sys
+import time
+import types
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from src.models.dual_track.api_client import APIModelController
+from src.models.dual_track.config import APIModelConfig
+from src.models.dual_track.local_model import LocalModel, LocalModelController
+from src.models.utils.cancellation import (
+    CancellationToken, CancellationStats, TurnCancellation,
+    REASON_BARGE_IN, REASON_CANCELLED, REASON_NOT_SELECTED
+)
+from tests.mocks import MockLlamaCpp, mock_local_config
+
+
+def _local_model(seconds_per_token=0.0, completion_tokens=1) -> LocalModel:
+    """LocalModel serving a mock llama.cpp model that is slow to decode only."""
+    local_model = LocalModel(mock_local_config())
+    local_model.model = MockLlamaCpp(completion_tokens=completion_tokens)
+    local_model.model._decode = lambda: (time.sleep(seconds_per_token), local_model.model.input_ids.append(0))
+    local_model.is_loaded = True
+    return local_model
+
+
+def cancel_after(token, seconds, reason=REASON_CANCELLED):
+    timer = threading.Timer(seconds, token.cancel, args=(reason,))
+    timer.start()
+    return timer
+
+
+class FakeAnthropicStream:
+    """Anthropic event stream producing one text delta per token."""
+
+    def __init__(self, words, seconds_per_token=0.0):
+        self.words = words
+        self.seconds_per_token = seconds_per_token
+        self.closed = False
+
+    def __iter__(self):
+        usage = SimpleNamespace(input_tokens=12, cache_read_input_tokens=0, cache_creation_input_tokens=0)
+        yield SimpleNamespace(type="message_start", message=SimpleNamespace(usage=usage))
+        for word in self.words:
+            time.sleep(self.seconds_per_token)
+            yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text=f"{word} "))
+        yield SimpleNamespace(type="message_delta", usage=SimpleNamespace(output_tokens=len(self.words)),
+                              delta=SimpleNamespace(stop_reason="end_turn"))
+
+    def close(self):
+        self.closed = True
+
+
+class TestCancellationToken:
+    """Test cases for CancellationToken and TurnCancellation."""
+
+    def test_first_cancel_wins_and_notifies(self):
+        """Test that callbacks run once with the first reason."""
+        token = CancellationToken()
+        calls = []
+        token.add_callback(lambda: calls.append("a"))
+        removed = lambda: calls.append("removed")
+        token.add_callback(removed)
+        token.remove_callback(removed)
+
+        assert token.cancel(REASON_BARGE_IN)
+        assert not token.cancel(REASON_NOT_SELECTED)
+        assert token.cancelled and token.reason == REASON_BARGE_IN
+        assert calls == ["a"]
+
+        # Callbacks added afterwards run right away
+        token.add_callback(lambda: calls.append("late"))
+        assert calls == ["a", "late"]
+
+    def test_child_follows_parent(self):
+        """Test that a child is cancelled with its parent but not the other way round."""
+        parent = CancellationToken()
+        first, second = parent.child(), parent.child()
+        first.cancel(REASON_NOT_SELECTED)
+        assert not parent.cancelled
+
+        parent.set()
+        assert second.cancelled and second.reason == REASON_CANCELLED
+        assert first.reason == REASON_NOT_SELECTED
+
+    def test_turns(self):
+        """Test barge-in on a turn and ending a settled turn."""
+        turns = TurnCancellation()
+        local, api = turns.track("s", "local"), turns.track("s", "api")
+        assert turns.track("s", "local") is local
+        assert turns.cancel("s")
+        assert local.reason == api.reason == REASON_BARGE_IN
+        assert not turns.cancel("s")
+
+        # The next turn gets fresh tokens
+        turn = turns.turn("s")
+        api = turns.track("s", "api")
+        assert not turn.cancelled and not api.cancelled
+        turns.end("s")
+        assert api.reason == REASON_NOT_SELECTED
+        assert not turn.cancelled
+        assert turns.turn("s") is not turn
+
+
+class TestCancellationStats:
+    """Test cases for CancellationStats estimates."""
+
+    def test_estimate_from_budget_then_history(self):
+        """Test the max_tokens estimate before any completion and averages after."""
+        stats = CancellationStats(max_tokens=100)
+        estimate = stats.record_cancelled(20, 0.5, REASON_NOT_SELECTED)
+        assert estimate["tokens_not_generated"] == 80
+        assert abs(estimate["seconds_reclaimed"] - 2.0) < 1e-9
+
+        stats.record_completed(40, 2.0)
+        stats.record_completed(60, 4.0)
+        estimate = stats.record_cancelled(10, 1.0, REASON_BARGE_IN)
+        assert estimate["tokens_not_generated"] == 40
+        assert abs(estimate["seconds_reclaimed"] - 2.0) < 1e-9
+
+        summary = stats.get_stats()
+        assert summary["cancelled"] == 2 and summary["completed"] == 2
+        assert summary["by_reason"] == {REASON_NOT_SELECTED: 1, REASON_BARGE_IN: 1}
+        assert summary["tokens_generated_before_cancel"] == 30
+        assert summary["tokens_not_generated"] == 120
+
+
+class TestLocalCancellation:
+    """Test cases for cancelling local generation."""
+
+    def test_cancel_mid_generation(self):
+        """Test that cancelling stops decoding and frees the generation thread."""
+        local_model = _local_model(seconds_per_token=0.005, completion_tokens=200)
+        cancel = CancellationToken()
+        cancel_after(cancel, 0.1, REASON_NOT_SELECTED)
+
+        start = time.perf_counter()
+        response = local_model.generate("Hello", cancel=cancel)
+
+        # The full answer would take a second
+        assert time.perf_counter() - start < 0.6
+        assert response.finish_reason == "cancelled"
+        assert 0 < response.tokens_used < 100
+        assert response.model_info["cancellation"]["tokens_not_generated"] > 100
+        stats = local_model.get_model_stats()["cancellation"]
+        assert stats["by_reason"] == {REASON_NOT_SELECTED: 1}
+        local_model.executor.submit(lambda: None).result(timeout=0.1)
+
+    def test_tokens_used_counts_generated_tokens(self):
+        """Test that finished and cancelled responses both report completion tokens."""
+        local_model = _local_model(completion_tokens=20)
+        assert local_model.generate("Hello").tokens_used == 20
+        assert local_model.generate("Hello", cancel=CancellationToken()).tokens_used == 20
+
+        cancel = CancellationToken()
+        cancel.cancel()
+        assert local_model.generate("Hello", cancel=cancel).tokens_used == 0
+        assert local_model.get_model_stats()["total_tokens"] == 40
+
+    def test_queued_request_is_dropped(self):
+        """Test that a request cancelled while waiting never runs."""
+        local_model = _local_model(seconds_per_token=0.005, completion_tokens=40)
+        busy = local_model.executor.submit(time.sleep, 0.2)
+        cancel = CancellationToken()
+        cancel_after(cancel, 0.05)
+
+        response = local_model.generate("Hello", cancel=cancel)
+        assert response.finish_reason == "cancelled"
+        assert response.tokens_used == 0
+        assert not busy.done()
+        assert local_model.model.n_tokens == 0
+
+    def test_stream_stops_on_cancel(self):
+        """Test that process_query_stream reports a cancelled turn."""
+        controller = LocalModelController(mock_local_config())
+        controller.model.model = MockLlamaCpp(seconds_per_token=0.002, completion_tokens=200)
+        controller.model.is_loaded = True
+        cancel = CancellationToken()
+        received = []
+
+        def on_token(token):
+            received.append(token)
+            if len(received) == 5:
+                cancel.cancel(REASON_BARGE_IN)
+
+        result = controller.process_query_stream("Hi", {}, on_token=on_token, cancel=cancel)
+        assert result["metadata"]["finish_reason"] == "cancelled"
+        assert len(received) <= 6
+        assert controller.model.get_model_stats()["cancellation"]["by_reason"] == {REASON_BARGE_IN: 1}
+
+
+class TestAPICancellation:
+    """Test cases for cancelling API requests."""
+
+    def make_controller(self, stream):
+        module = types.ModuleType("anthropic")
+        module.Anthropic = lambda api_key: object()
+        config = APIModelConfig(model="claude-test", max_tokens=100, response_cache=False)
+        config.api_key = "mock-api-key"
+        with mock.patch.dict(sys.modules, {"anthropic": module}):
+            controller = APIModelController(config)
+        controller.client.client = SimpleNamespace(messages=SimpleNamespace(create=mock.Mock(return_value=stream)))
+        return controller
+
+    def test_cancel_closes_stream(self):
+        """Test that a cancelled request stops reading and closes the connection."""
+        stream = FakeAnthropicStream(["word"] * 50, seconds_per_token=0.01)
+        controller = self.make_controller(stream)
+        cancel = CancellationToken()
+        cancel_after(cancel, 0.1, REASON_NOT_SELECTED)
+
+        response = controller.client.generate([{"role": "user", "content": "Hi"}], cancel=cancel)
+        assert response.finish_reason == "cancelled"
+        assert stream.closed
+        assert 0 < response.usage["output_tokens"] < 50
+        assert controller.client.client.messages.create.call_args.kwargs["stream"] is True
+        stats = controller.client.get_client_stats()["cancellation"]
+        assert stats["cancelled"] == 1
+        assert stats["tokens_not_generated"] == 100 - response.usage["output_tokens"]
+
+    def test_uncancelled_stream_completes(self):
+        """Test that a streamed request that isn't cancelled returns the full answer."""
+        stream = FakeAnthropicStream(["Paris", "is", "lovely."])
+        controller = self.make_controller(stream)
+
+        result = controller.process_query([{"role": "user", "content": "Hi"}], cancel=CancellationToken())
+        assert result["success"]
+        assert result["content"].strip() == "Paris is lovely."
+        assert result["metadata"]["usage"]["output_tokens"] == 3
+        assert controller.client.get_client_stats()["cancellation"]["completed"] == 1
@@ -11,6 +11,7 @@ routing logic, processing coordination, and response integration.
 
 import pytest
 import time
+import asyncio
 from unittest.mock import Mock, patch, MagicMock
 from typing import Dict, Any
 
@@ -348,6 +349,25 @@ class TestDualTrackGraphNodes:
         assert graph_nodes.executor is not None
         assert graph_nodes.executor._max_workers == 2
         assert "dual_track" in graph_nodes.executor._thread_name_prefix
+    
+    def test_sync_race_node_reuses_one_event_loop(self, graph_nodes):
+        """Test that synchronous race turns share one long-lived event loop."""
+        loops = []
+        
+        async def race_node(state):
+            loops.append(asyncio.get_running_loop())
+            return {}
+        
+        with patch.object(graph_nodes, "aenhanced_parallel_race_node", race_node):
+            graph_nodes.enhanced_parallel_race_node({})
+            graph_nodes.enhanced_parallel_race_node({})
+        
+        assert len(loops) == 2
+        assert loops[0] is loops[1]
+        assert loops[0].is_running()
+        
+        graph_nodes.shutdown()
+        assert loops[0].is_closed()
 
 
 class TestModuleFunctions:
@@ -189,6 +189,17 @@ class TestResponseIntegrator:
         assert self.integrator._extract_text(resp3) == "response text"
         assert self.integrator._extract_text(resp4) != ""  # Should fallback to string conversion
     
+    def test_public_helpers(self):
+        """Test the helpers other components (the parallel race) build on."""
+        assert self.integrator.extract_text({"content": " response text "}) == "response text"
+        assert self.integrator.similarity("Paris is the capital", "Paris is the capital") == pytest.approx(1.0)
+        assert self.integrator.prefer("ok", "A complete and informative answer about the topic.")["source"] in ("local", "api")
+        transitions = self.integrator.smooth_transitions + self.integrator.abrupt_transitions
+        assert self.integrator.transition_phrase() in transitions
+        fallback = self.integrator.fallback_result(0.0, "No responses available")
+        assert fallback.source == "fallback"
+        assert fallback.metadata["reason"] == "No responses available"
+    
     def test_completion_time_extraction(self):
         """Test completion time extraction from metadata."""
         resp1 = {"metadata": {"completion_time": 1.5}}
@@ -0,0 +1,203 @@
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-012 - Dual-Track Optimization
+
+"""
+Unit tests for latency-model routing.
+"""
+
+import random
+import threading
+
+from src.models.dual_track.config import LocalModelConfig, ProcessingPath, RouterConfig
+from src.models.dual_track.latency_model import LatencyModel, LatencySketch
+from src.models.dual_track.latency_simulation import SimulatedQuery, simulate
+from src.models.dual_track.local_model import LocalModel
+from src.models.dual_track.router import ProcessingRouter
+
+SHORT_QUERY = "what is the capital of France"
+LONG_QUERY = "write a short poem about autumn in Lisbon"
+
+
+def trained_model(local_ms_per_queued=400.0, api_ms=900.0, parallel_ms=None, samples=40):
+    """Latency model of a local track that slows with its queue and a steady API."""
+    rng = random.Random(0)
+    model = LatencyModel(min_samples=10)
+    for depth in range(3):
+        for _ in range(samples):
+            model.observe("local", (300 + depth * local_ms_per_queued) * rng.uniform(0.9, 1.1), 6, depth)
+    for _ in range(samples):
+        model.observe("api", api_ms * rng.uniform(0.9, 1.1), 6)
+        if parallel_ms is not None:
+            model.observe("parallel", parallel_ms * rng.uniform(0.9, 1.1), 6)
+    return model
+
+
+def latency_router(model, **config):
+    return ProcessingRouter(RouterConfig(latency_routing=True, latency_min_samples=10, **config),
+                            latency_model=model)
+
+
+def depth_context(depth):
+    return {"system_state": {"local_queue_depth": depth}}
+
+
+class TestLatencyModel:
+    """Test cases for LatencySketch and LatencyModel."""
+
+    def test_sketch_quantiles_follow_recent_observations(self):
+        """Test quantiles within a bin's width and forgetting of old observations."""
+        sketch = LatencySketch(half_life=50)
+        values = [float(value) for value in range(1, 1001)]
+        random.Random(0).shuffle(values)
+        for value in values:
+            sketch.add(value)
+        assert 850 < sketch.quantile(0.95) < 1150
+        assert 400 < sketch.quantile(0.5) < 650
+
+        for _ in range(500):
+            sketch.add(5000.0)
+        assert 4000 < sketch.quantile(0.5) < 6000
+
+    def test_conditioned_on_queue_depth(self):
+        """Test per-depth estimates and the queueing estimate for unseen depths."""
+        model = trained_model()
+        idle, busy = model.predict("local", 6, 0), model.predict("local", 6, 2)
+        assert 250 < idle < 450
+        assert 950 < busy < 1300
+        # Depth 4 was never seen: the depth-2 p95 plus two mean generation times
+        assert busy + 500 < model.predict("local", 6, 4) < busy + 700
+        # The API doesn't wait for the local queue
+        assert model.predict("api", 6, 0) == model.predict("api", 6, 4)
+        assert model.predict("parallel", 6, 0) is None
+
+    def test_failures_count_only_towards_success_rate(self):
+        """Test that failed requests lower the success rate but not the latency estimate."""
+        model = trained_model()
+        p95 = model.predict("api", 6)
+        for _ in range(30):
+            model.observe("api", 30000.0, 6, success=False)
+        assert model.predict("api", 6) == p95
+        assert model.success_rate("api") < 0.85
+        assert model.get_stats()["api"]["samples"] == 70
+
+    def test_unobserved_path_is_forgotten(self):
+        """Test that a path no longer observed expires, so it is routed to and measured again."""
+        model = trained_model()
+        model.max_age = 100
+        for _ in range(100):
+            model.observe("local", 300.0, 6, 0)
+        assert model.samples("api") == 40
+        model.observe("local", 300.0, 6, 0)
+
+        assert model.samples("api") == 0
+        assert model.predict("api", 6) is None
+        assert model.success_rate("api") is None
+        assert "api" not in model.get_stats()
+        assert model.expired == 1
+
+
+class TestLatencyRouting:
+    """Test cases for ProcessingRouter with a latency model."""
+
+    def test_local_queue_diverts_to_faster_path(self):
+        """Test that a deep local queue sends a simple query to the API."""
+        router = latency_router(trained_model())
+
+        assert router.determine_path(SHORT_QUERY, depth_context(0)).path == ProcessingPath.LOCAL
+        decision = router.determine_path(SHORT_QUERY, depth_context(3))
+        assert decision.path == ProcessingPath.API
+        assert decision.reasoning.startswith("Latency routing: api p95")
+        assert decision.features["local_queue_depth"] == 3
+        assert router.get_routing_stats()["latency_decisions"] == 1
+
+    def test_quality_constraint(self):
+        """Test that a query needing the API is never sent to a path that may answer locally."""
+        router = latency_router(trained_model(api_ms=3000.0))
+        decision = router.determine_path(LONG_QUERY, depth_context(0))
+        assert decision.path == ProcessingPath.API
+
+        # The parallel path can answer with the local track's response, so
+        # it doesn't replace the API path however much sooner it answers
+        router = latency_router(trained_model(api_ms=3000.0, parallel_ms=1000.0))
+        assert router.determine_path(LONG_QUERY, depth_context(0)).path == ProcessingPath.API
+        assert router.get_routing_stats()["latency_decisions"] == 0
+
+    def test_margin_and_unknown_paths(self):
+        """Test that small predicted gains and unobserved paths keep the chosen path."""
+        router = latency_router(trained_model(api_ms=1100.0), latency_margin=0.2)
+        # API p95 is about 1.2 s against about 1.3 s for local at depth 2
+        assert router.determine_path(SHORT_QUERY, depth_context(2)).path == ProcessingPath.LOCAL
+
+        empty = latency_router(LatencyModel(min_samples=10))
+        assert empty.determine_path(SHORT_QUERY, depth_context(3)).path == ProcessingPath.LOCAL
+
+    def test_failing_path_is_avoided(self):
+        """Test that a path whose requests are failing is routed around."""
+        model = trained_model()
+        for _ in range(40):
+            model.observe("local", 100.0, 6, success=False)
+        decision = latency_router(model).determine_path(SHORT_QUERY, depth_context(0))
+        assert decision.path == ProcessingPath.API
+        assert "failing" in decision.reasoning
+
+    def test_avoided_path_is_tried_again(self):
+        """Test that traffic returns to a path avoided for failing once its estimates expire."""
+        model = trained_model()
+        model.max_age = 100
+        for _ in range(40):
+            model.observe("local", 100.0, 6, success=False)
+        router = latency_router(model)
+        assert router.determine_path(SHORT_QUERY, depth_context(0)).path == ProcessingPath.API
+
+        # Only the API is observed while the local track is avoided
+        for _ in range(101):
+            model.observe("api", 900.0, 6)
+        decision = router.determine_path(SHORT_QUERY, depth_context(0))
+        assert decision.path == ProcessingPath.LOCAL
+        assert not decision.reasoning.startswith("Latency routing")
+
+    def test_outcomes_update_the_model(self):
+        """Test that recorded outcomes reach the latency model with their queue depth."""
+        depths = iter([0, 2])
+        router = ProcessingRouter(RouterConfig(latency_routing=True), queue_depth=lambda: next(depths))
+        decision = router.determine_path(SHORT_QUERY)
+        assert decision.features["local_queue_depth"] == 0
+        assert router.determine_path(SHORT_QUERY).features["local_queue_depth"] == 2
+
+        router.record_outcome(SHORT_QUERY, "local", True, 420.0, queue_depth=2)
+        router.record_outcome(SHORT_QUERY, "api", True, 800.0, context=depth_context(1))
+        stats = router.get_routing_stats()["latency_model"]
+        assert stats["local"]["p95_ms_by_queue_depth"].keys() == {2}
+        assert stats["api"]["samples"] == 1
+
+    def test_simulation_replays_outcomes_after_they_finish(self):
+        """Test the simulated local queue and outcome timing on a tiny load."""
+        queries = [SimulatedQuery(0.0, SHORT_QUERY, 500.0, 900.0),
+                   SimulatedQuery(100.0, SHORT_QUERY, 500.0, 900.0),
+                   SimulatedQuery(1200.0, SHORT_QUERY, 500.0, 900.0)]
+        router = ProcessingRouter(RouterConfig(latency_routing=True))
+        result = simulate(router, queries)
+
+        # The second query waits 400 ms behind the first
+        assert result["max_queue_depth"] == 1
+        assert result["p95_ms"] == 900.0
+        assert result["path_distribution"] == {"local": 1.0}
+        # The third query was routed after the first two finished
+        assert router.latency_model.samples("local") == 2
+
+
+class TestLocalQueueDepth:
+    """Test cases for LocalModel.queue_depth."""
+
+    def test_counts_queued_and_running_work(self):
+        """Test that the queue depth counts generation work until it finishes."""
+        local_model = LocalModel(LocalModelConfig(preload=False, system_prompt_snapshot=False))
+        release = threading.Event()
+        futures = [local_model._submit(release.wait) for _ in range(3)]
+        assert local_model.queue_depth() == 3
+
+        release.set()
+        for future in futures:
+            future.result(timeout=1.0)
+        assert local_model.queue_depth() == 0
+        assert local_model.get_model_stats()["queue_depth"] == 0
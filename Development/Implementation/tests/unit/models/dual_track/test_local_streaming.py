@@ -0,0 +1,76 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+
+"""
+Unit tests for token streaming on the local track.
+"""
+
+from src.models.dual_track.local_model import LocalModel, LocalModelController
+from src.models.utils.inference_scheduler import InferenceScheduler
+from tests.mocks import MockLlamaCpp, mock_local_config
+
+
+def _local_model(**mock_kwargs) -> LocalModel:
+    """LocalModel serving a mock llama.cpp model."""
+    local_model = LocalModel(mock_local_config())
+    local_model.model = MockLlamaCpp(**mock_kwargs)
+    local_model.is_loaded = True
+    return local_model
+
+
+class TestLocalStreaming:
+    """Test cases for LocalModel.generate_stream and process_query_stream."""
+
+    def test_stream_reports_first_token_separately(self):
+        """Test that tokens arrive incrementally with their own timings."""
+        local_model = _local_model(seconds_per_token=0.002, completion_tokens=10)
+        chunks = list(local_model.generate_stream("Hello there", {"session_id": "a"}))
+
+        assert len(chunks) == 10
+        assert [chunk["usage"]["completion_tokens"] for chunk in chunks] == list(range(1, 11))
+        assert "time_to_first_token" in chunks[0]
+        assert chunks[0]["time_to_first_token"] < chunks[-1]["generation_time"]
+        assert chunks[-1]["finish_reason"] == "stop"
+        assert "cached_prompt_tokens" in chunks[-1]["model_info"]
+        assert local_model.get_model_stats()["total_tokens"] == 10
+
+    def test_closing_stream_stops_generation(self):
+        """Test that abandoning the stream frees the generation thread."""
+        local_model = _local_model(seconds_per_token=0.005, completion_tokens=200)
+        stream = local_model.generate_stream("Hello")
+        next(stream)
+        stream.close()
+
+        # The remaining ~1s of decoding is skipped
+        local_model.executor.submit(lambda: None).result(timeout=0.5)
+        prompt_tokens = len(local_model.model.tokenize(local_model._build_prompt("Hello", None).encode("utf-8")))
+        assert local_model.model.n_tokens < prompt_tokens + 20
+
+    def test_controller_invokes_token_callback(self):
+        """Test that process_query_stream forwards tokens and reports both timings."""
+        controller = LocalModelController(mock_local_config())
+        controller.model.model = MockLlamaCpp(seconds_per_token=0.001, completion_tokens=5)
+        controller.model.is_loaded = True
+
+        received = []
+        result = controller.process_query_stream("Hi", {"priority": "voice"}, on_token=received.append)
+
+        assert result["success"]
+        assert result["text"] == " ".join(["ok"] * 5)
+        assert len(received) == 5
+        metadata = result["metadata"]
+        assert metadata["tokens_used"] == 5
+        assert 0 < metadata["time_to_first_token"] < metadata["generation_time"]
+
+    def test_scheduled_stream(self):
+        """Test streaming through the token-level scheduler."""
+        local_model = _local_model(completion_tokens=4)
+        local_model.scheduler = InferenceScheduler([local_model.model, MockLlamaCpp(completion_tokens=4)])
+        local_model.scheduler.start()
+        try:
+            chunks = list(local_model.generate_stream("Hello", {"session_id": "a", "priority": "voice"}))
+        finally:
+            local_model.scheduler.stop()
+
+        assert "".join(chunk["text"] for chunk in chunks) == " ok" * 4
+        assert chunks[-1]["finish_reason"] == "stop"
@@ -0,0 +1,188 @@
+# TASK-REF: DP-002 - Dual-Track Response Integration System
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+
+"""
+End-to-end timing tests for the parallel path's first-phrase race.
+"""
+
+import time
+import asyncio
+import threading
+from unittest import mock
+
+from src.models.dual_track.exceptions import GenerationError
+from src.models.dual_track.config import IntegrationConfig, IntegrationStrategy
+from src.models.dual_track.local_model import LocalModelController
+from src.models.dual_track.race import ParallelRace, PhraseSplitter
+from src.models.utils.cancellation import CancellationToken, REASON_BARGE_IN
+from tests.mocks import MockLlamaCpp, mock_local_config
+
+LOCAL_TEXT = ("Paris is the capital of France. It sits on the Seine, in the north of the country, "
+              "and has been the capital for most of its history.")
+API_TEXT = ("The capital of France is Paris, home to about two million people. "
+            "It is also the country's largest city and its economic centre.")
+
+
+class StubAPIController:
+    """API track that answers after a fixed delay and records cancellation."""
+
+    def __init__(self, content=API_TEXT, delay=0.5, success=True):
+        self.content = content
+        self.delay = delay
+        self.success = success
+        self.cancelled = False
+
+    async def aprocess_query(self, messages, context=None, fallback=None, cancel=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"content": self.content, "source": "api_model",
+                "metadata": {"usage": {"total_tokens": 40, "completion_time": self.delay}},
+                "error": None if self.success else "overloaded", "success": self.success}
+
+
+def local_controller(seconds_per_token, text=LOCAL_TEXT):
+    """Local track decoding the words of text at a fixed rate."""
+    controller = LocalModelController(mock_local_config())
+    controller.model.model = MockLlamaCpp(text=text)
+    controller.model.is_loaded = True
+    # Only decoding is slow, so timings don't depend on the prompt length
+    controller.model.model._decode = lambda: (time.sleep(seconds_per_token),
+                                              controller.model.model.input_ids.append(0))
+    return controller
+
+
+def race(strategy, local, api, cancel=None, **config):
+    """Run a race and return the result and the phrases in arrival order."""
+    race = ParallelRace(local, api, config=IntegrationConfig(strategy=strategy, **config))
+    spoken = []
+
+    async def scenario():
+        return await race.run("What is the capital of France?", {}, [{"role": "user", "content": "?"}], {},
+                              on_phrase=spoken.append, cancel=cancel)
+
+    start = time.perf_counter()
+    result = asyncio.run(scenario())
+    return result, spoken, time.perf_counter() - start, race
+
+
+class TestPhraseSplitter:
+    """Test cases for PhraseSplitter."""
+
+    def test_cuts_sentences_and_long_clauses(self):
+        """Test that sentence ends always cut and commas only after min_chars."""
+        splitter = PhraseSplitter(min_chars=20)
+        assert splitter.feed("Yes, of course. The") == ["Yes, of course."]
+        assert splitter.feed(" museum opens at nine, closes at six") == ["The museum opens at nine,"]
+        assert splitter.flush() == "closes at six"
+        assert splitter.split("No. Not today") == ["No.", "Not today"]
+
+    def test_waits_for_the_next_token(self):
+        """Test that a period is only a boundary once whitespace follows it."""
+        splitter = PhraseSplitter()
+        assert splitter.feed("It costs 3.") == []
+        assert splitter.feed("50 euros. And") == ["It costs 3.50 euros."]
+
+
+class TestParallelRace:
+    """End-to-end timing tests with stubbed models."""
+
+    def test_fastest_local_speaks_before_api_returns(self):
+        """Test that the first local phrase is spoken long before the API answers."""
+        api = StubAPIController(delay=1.0)
+        result, spoken, elapsed, _ = race(IntegrationStrategy.FASTEST, local_controller(0.01), api)
+
+        # Waiting for both tracks would take at least the API's second
+        assert result.time_to_first_phrase < 0.3
+        assert elapsed < 0.8
+        assert spoken[0].text == "Paris is the capital of France."
+        assert {phrase.source for phrase in spoken} == {"local"}
+        assert result.integration.content == LOCAL_TEXT
+        assert result.cancelled == ["api"]
+        assert api.cancelled
+
+    def test_fastest_api_wins_and_local_stops(self):
+        """Test that an API answer ready first is spoken and local decoding stops."""
+        local = local_controller(0.2)
+        result, spoken, elapsed, _ = race(IntegrationStrategy.FASTEST, local, StubAPIController(delay=0.1))
+
+        assert result.first_source == "api"
+        assert result.time_to_first_phrase < 0.5
+        assert spoken[0].text.startswith("The capital of France is Paris")
+        assert result.cancelled == ["local"]
+        # The local generation thread is released at its next token
+        local.model.executor.submit(lambda: None).result(timeout=1.0)
+        assert local.model.model.n_tokens - local.model.model.last_evaluated < 8
+
+    def test_interrupt_hands_off_mid_stream(self):
+        """Test that the API answer takes over at a phrase boundary with a transition."""
+        api = StubAPIController(delay=0.4)
+        result, spoken, _, race_ = race(IntegrationStrategy.INTERRUPT, local_controller(0.04), api)
+
+        sources = [phrase.source for phrase in spoken]
+        assert sources[0] == "local"
+        assert "transition" in sources
+        assert sources[-1] == "api"
+        assert sources.index("transition") == sources.count("local")
+        assert result.time_to_first_phrase < 0.4
+        assert result.integration.source == "integrated"
+        assert result.cancelled == ["local"]
+        assert race_.get_stats()["handoffs"] == 1
+
+    def test_preference_opener_then_preferred_api(self):
+        """Test that only the local opener is spoken before the preferred API answer."""
+        result, spoken, _, _ = race(IntegrationStrategy.PREFERENCE, local_controller(0.02),
+                                    StubAPIController(delay=0.5))
+
+        assert [phrase.source for phrase in spoken][:2] == ["local", "transition"]
+        assert spoken[0].elapsed < 0.3
+        assert result.integration.content.endswith(API_TEXT.split(". ")[-1])
+
+    def test_preference_keeps_local_when_api_fails(self):
+        """Test that held local phrases are spoken when the API track fails."""
+        result, spoken, _, _ = race(IntegrationStrategy.PREFERENCE, local_controller(0.01),
+                                    StubAPIController(delay=0.3, success=False))
+
+        assert {phrase.source for phrase in spoken} == {"local"}
+        assert result.integration.content == LOCAL_TEXT
+
+    def test_combine_appends_different_api_answer(self):
+        """Test that COMBINE speaks the full local answer, then the API answer if it differs."""
+        result, spoken, _, _ = race(IntegrationStrategy.COMBINE, local_controller(0.005),
+                                    StubAPIController(delay=0.4))
+        sources = [phrase.source for phrase in spoken]
+        assert sources.index("transition") == len([s for s in sources if s == "local"])
+        assert result.integration.content.startswith(LOCAL_TEXT)
+
+        result, spoken, _, _ = race(IntegrationStrategy.COMBINE, local_controller(0.005),
+                                    StubAPIController(content=LOCAL_TEXT, delay=0.2))
+        assert result.integration.content == LOCAL_TEXT
+        assert result.cancelled == []
+
+    def test_both_tracks_fail(self):
+        """Test that a turn where both tracks fail still says something."""
+        local = local_controller(0.01)
+        local.model.generate_stream = mock.Mock(side_effect=GenerationError("out of memory"))
+        result, spoken, _, _ = race(IntegrationStrategy.FASTEST, local,
+                                    StubAPIController(delay=0.05, success=False))
+        assert [phrase.source for phrase in spoken] == ["fallback"]
+        assert result.first_source is None
+        assert result.integration.source == "fallback"
+
+    def test_barge_in_stops_both_tracks(self):
+        """Test that a barge-in ends the turn without a fallback and frees both tracks."""
+        local, api = local_controller(0.03), StubAPIController(delay=1.0)
+        cancel = CancellationToken()
+        threading.Timer(0.2, cancel.cancel, args=(REASON_BARGE_IN,)).start()
+        result, spoken, elapsed, race_ = race(IntegrationStrategy.PREFERENCE, local, api, cancel=cancel)
+
+        assert result.interrupted
+        assert elapsed < 0.6
+        assert "fallback" not in {phrase.source for phrase in spoken}
+        assert result.integration.metadata["interrupted"]
+        assert api.cancelled
+        assert race_.get_stats()["barge_ins"] == 1
+        local.model.executor.submit(lambda: None).result(timeout=0.5)
+        assert local.model.get_model_stats()["cancellation"]["by_reason"] == {REASON_BARGE_IN: 1}
@@ -0,0 +1,98 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+
+"""
+Unit tests for the session-aware prompt-prefix KV cache.
+"""
+
+import shutil
+import tempfile
+
+from src.models.dual_track.config import LocalModelConfig
+from src.models.dual_track.local_model import LocalModel
+from src.models.dual_track.prompt_cache import PromptPrefixCache, common_prefix_length
+from tests.mocks import MockLlamaCpp
+
+
+class TestPromptPrefixCache:
+    """Test cases for PromptPrefixCache class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.model = MockLlamaCpp()
+        self.cache = PromptPrefixCache(model_key="mock:2048")
+
+    def test_common_prefix_length(self):
+        """Test longest common prefix computation."""
+        assert common_prefix_length([1, 2, 3], [1, 2, 4]) == 2
+        assert common_prefix_length([1, 2], [1, 2, 3]) == 2
+        assert common_prefix_length([], [1]) == 0
+
+    def test_session_state_restored_after_interleaving(self):
+        """Test that returning to a session only evaluates the new suffix."""
+        first = "system prompt USER: hello ASSISTANT:"
+        self.cache.prepare(self.model, first, "alice")
+        self.model(first)
+
+        other = "system prompt USER: something else ASSISTANT:"
+        self.cache.prepare(self.model, other, "bob")
+        self.model(other)
+
+        second = first + " hi there USER: how are you ASSISTANT:"
+        reused = self.cache.prepare(self.model, second, "alice")
+        self.model(second)
+
+        assert reused == len(self.model.tokenize(first.encode("utf-8")))
+        assert self.model.last_evaluated == len(self.model.tokenize(second.encode("utf-8"))) - reused
+        stats = self.cache.get_stats()
+        assert stats["session_switches"] == 2
+        assert stats["restored_from_memory"] == 1
+
+    def test_new_session_does_not_inherit_other_prefix(self):
+        """Test that a new session starts from an empty KV state."""
+        prompt = "shared words here"
+        self.cache.prepare(self.model, prompt, "alice")
+        self.model(prompt)
+
+        assert self.cache.prepare(self.model, prompt, "bob") == 0
+
+    def test_persisted_state_survives_reload(self):
+        """Test disk persistence and model-key invalidation."""
+        persist_dir = tempfile.mkdtemp()
+        try:
+            cache = PromptPrefixCache(model_key="mock:2048", persist_directory=persist_dir)
+            prompt = "system prompt USER: remember me ASSISTANT:"
+            cache.prepare(self.model, prompt, "alice")
+            self.model(prompt)
+            cache.detach(self.model)
+            assert cache.persist() == 1
+
+            reloaded_model = MockLlamaCpp()
+            reloaded_model.vocab = self.model.vocab
+            reloaded = PromptPrefixCache(model_key="mock:2048", persist_directory=persist_dir)
+            assert reloaded.prepare(reloaded_model, prompt + " ok", "alice") > 0
+            assert reloaded.get_stats()["restored_from_disk"] == 1
+
+            other_model = PromptPrefixCache(model_key="other:4096", persist_directory=persist_dir)
+            assert other_model.prepare(MockLlamaCpp(), prompt, "alice") == 0
+        finally:
+            shutil.rmtree(persist_dir)
+
+    def test_local_model_reuses_prefix_across_turns(self):
+        """Test LocalModel evaluating only the new turn."""
+        local_model = LocalModel(LocalModelConfig(preload=False))
+        local_model.model = MockLlamaCpp()
+        local_model.is_loaded = True
+
+        local_model.generate("My name is Sam", {"session_id": "sam"})
+        first_cost = local_model.model.last_evaluated
+
+        history = [{"user_message": "My name is Sam", "assistant_message": "Nice to meet you, Sam"}]
+        response = local_model.generate("What is my name?", {"conversation_history": history, "session_id": "sam"})
+        assert response.model_info["cached_prompt_tokens"] > 0
+
+        history.append({"user_message": "What is my name?", "assistant_message": "Your name is Sam"})
+        response = local_model.generate("And my job?", {"conversation_history": history, "session_id": "sam"})
+        assert response.model_info["cached_prompt_tokens"] > first_cost
+        assert local_model.model.last_evaluated < first_cost
+        assert local_model.get_model_stats()["prefix_cache"]["turns"] == 3
@@ -0,0 +1,149 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+
+"""
+Unit tests for the API track's response cache.
+"""
+
+import sys
+import types
+from unittest import mock
+
+from src.models.dual_track.api_client import APIModelController, APIModelResponse
+from src.models.dual_track.config import APIModelConfig
+from src.models.dual_track.response_cache import ResponseCache, normalize_prompt
+
+
+def user(text):
+    return [{"role": "user", "content": text}]
+
+
+def bag_of_words(text):
+    """Toy embedder: word counts over a tiny vocabulary."""
+    vocabulary = ["joke", "tell", "me", "a", "funny", "capital", "france", "hello"]
+    words = text.split()
+    return [float(words.count(word)) for word in vocabulary]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.cache = ResponseCache(max_entries=2, ttl_seconds=60, clock=self.clock)
+        self.params = {"temperature": 0.7}
+
+    def store(self, cache, text, content="answer"):
+        cache.store(user(text), "model", self.params, content, {"total_tokens": 20, "completion_time": 1.5},
+                    "stop", "anthropic")
+
+    def test_normalize_prompt(self):
+        """Test that case, spacing and trailing punctuation don't matter."""
+        assert normalize_prompt("  Tell me   a JOKE?! ") == "tell me a joke"
+
+    def test_exact_hit_and_metrics(self):
+        """Test exact hits, misses and the latency saved."""
+        self.store(self.cache, "Tell me a joke")
+        entry, level = self.cache.lookup(user("tell me a joke."), "model", self.params)
+        assert (entry.content, level) == ("answer", "exact")
+        assert self.cache.lookup(user("tell me a joke"), "other-model", self.params) is None
+        assert self.cache.lookup(user("tell me a joke"), "model", {"temperature": 0.0}) is None
+
+        stats = self.cache.get_stats()
+        assert stats["exact_hits"] == 1
+        assert stats["misses"] == 2
+        assert abs(stats["hit_rate"] - 1 / 3) < 1e-9
+        assert 1.0 < stats["latency_saved_seconds"] <= 1.5
+
+    def test_ttl_and_size_limit(self):
+        """Test that entries expire and the least recently used is evicted."""
+        self.store(self.cache, "hello")
+        self.store(self.cache, "tell me a joke")
+        self.cache.lookup(user("hello"), "model", self.params)
+        self.store(self.cache, "what is the capital of france")
+        assert self.cache.lookup(user("tell me a joke"), "model", self.params) is None
+        assert self.cache.lookup(user("hello"), "model", self.params) is not None
+
+        self.clock.now = 61
+        assert self.cache.lookup(user("hello"), "model", self.params) is None
+        stats = self.cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["expirations"] == 1
+
+    def test_semantic_hit(self):
+        """Test that a similar prompt hits the semantic level and a different one doesn't."""
+        cache = ResponseCache(semantic=True, similarity_threshold=0.85, embedder=bag_of_words, clock=self.clock)
+        self.store(cache, "tell me a joke")
+        entry, level = cache.lookup(user("tell me a funny joke"), "model", self.params)
+        assert (entry.content, level) == ("answer", "semantic")
+        assert cache.lookup(user("what is the capital of france"), "model", self.params) is None
+        # Same prompt under a different system context is another scope
+        system = [{"role": "system", "content": "user_name: Ada"}]
+        assert cache.lookup(system + user("tell me a funny joke"), "model", self.params) is None
+
+    def test_cacheability_rules(self):
+        """Test that context-dependent and time-sensitive queries aren't cached."""
+        assert self.cache.is_cacheable(user("Tell me a joke"))
+        assert self.cache.is_cacheable(user("What is the capital of France?"))
+        assert not self.cache.is_cacheable(user("What time is it in Tokyo?"))
+        assert not self.cache.is_cacheable(user("What's the weather today"))
+        assert not self.cache.is_cacheable(user("Can you explain that to them again"))
+        assert not self.cache.is_cacheable(user("Tell me a joke"), {"conversation_history": [{"user_message": "hi"}]})
+        assert not self.cache.is_cacheable(user("Tell me a joke"), {"memory_context_used": True})
+        history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+        assert not self.cache.is_cacheable(history + user("Tell me a joke"))
+
+
+class TestControllerResponseCache:
+    """Test the response cache in front of APIModelController."""
+
+    def make_controller(self, **config):
+        module = types.ModuleType("anthropic")
+        module.Anthropic = lambda api_key: object()
+        config = APIModelConfig(model="claude-test", **config)
+        config.api_key = "mock-api-key"
+        with mock.patch.dict(sys.modules, {"anthropic": module}):
+            controller = APIModelController(config)
+        controller.client.generate = mock.Mock(return_value=APIModelResponse(
+            content="Why did the chicken cross the road?",
+            usage={"total_tokens": 30, "completion_time": 0.8},
+            finish_reason="stop", model="claude-test", provider="anthropic"
+        ))
+        return controller
+
+    def test_repeat_query_served_from_cache(self):
+        """Test that a repeated query skips the API and reports the hit."""
+        controller = self.make_controller()
+        first = controller.process_query(user("Tell me a joke"))
+        second = controller.process_query(user("tell me a joke!"))
+
+        assert controller.client.generate.call_count == 1
+        assert second["content"] == first["content"]
+        assert second["metadata"]["cached"] == "exact"
+        assert second["metadata"]["usage"]["total_tokens"] == 0
+        assert "cached" not in first["metadata"]
+        assert controller.get_status()["response_cache"]["exact_hits"] == 1
+
+    def test_uncacheable_and_disabled(self):
+        """Test that time-sensitive queries and a disabled cache always call the API."""
+        controller = self.make_controller()
+        controller.process_query(user("What time is it?"))
+        controller.process_query(user("What time is it?"))
+        assert controller.client.generate.call_count == 2
+        assert controller.response_cache.get_stats()["uncacheable"] == 2
+
+        disabled = self.make_controller(response_cache=False)
+        disabled.process_query(user("Tell me a joke"))
+        disabled.process_query(user("Tell me a joke"))
+        assert disabled.client.generate.call_count == 2
+        assert disabled.get_status()["response_cache"] is None
@@ -0,0 +1,178 @@
+# TASK-REF: DP-001 - Processing Router Implementation
+# TASK-REF: DP-003 - Dual-Track Optimization
+# CONCEPT-REF: CON-VANTA-010 - Dual-Track Processing Architecture
+
+"""
+Unit tests for learned routing and its offline evaluation.
+"""
+
+import random
+
+from src.models.dual_track.config import ProcessingPath, RouterConfig
+from src.models.dual_track.optimizer import DualTrackOptimizer, OptimizationConfig
+from src.models.dual_track.route_classifier import (
+    RouteClassifier, RouteOutcome, evaluate_router, load_traces, save_traces
+)
+from src.models.dual_track.router import ProcessingRouter
+
+LOCAL_QUERIES = ["hi there", "thanks a lot", "what is the capital of {}", "how tall is {}",
+                 "set a timer for {} minutes"]
+API_QUERIES = ["write a poem about {}", "compare the economies of {} and Spain",
+               "draft an email to my landlord about {}", "summarize the history of {}"]
+PLACES = ["Paris", "Lisbon", "Tokyo", "Berlin", "Lima", "Oslo"]
+
+
+def make_traces(count, seed=0):
+    """Outcomes where the local track answers small talk well and only the API answers writing tasks."""
+    rng = random.Random(seed)
+    traces = []
+    for _ in range(count):
+        local = rng.random() < 0.5
+        query = rng.choice(LOCAL_QUERIES if local else API_QUERIES).format(rng.choice(PLACES))
+        path = rng.choice(["local", "api"])
+        if path == "local":
+            traces.append(RouteOutcome(query, path, success=True, latency_ms=400,
+                                       quality_score=0.9 if local else 0.2))
+        else:
+            traces.append(RouteOutcome(query, path, success=True, latency_ms=2600 if local else 1500))
+    return traces
+
+
+def learned_router(**config):
+    return ProcessingRouter(RouterConfig(learned_routing=True, **config))
+
+
+class TestRouteClassifier:
+    """Test cases for RouteClassifier."""
+
+    def test_learns_from_taken_paths(self):
+        """Test that each head learns how its own path does."""
+        classifier = RouteClassifier()
+        classifier.fit(make_traces(600), epochs=2)
+
+        assert classifier.predict("hi there")[0] == ProcessingPath.LOCAL
+        assert classifier.predict("write a poem about Rome")[0] == ProcessingPath.API
+        proba = classifier.predict_proba("write a poem about Rome")
+        assert proba["local"] < 0.5 < proba["api"]
+        # Parallel was never taken, so its head is untrained
+        assert classifier.samples["parallel"] == 0
+        assert abs(proba["parallel"] - 0.5) < 1e-9
+
+    def test_best_path_trains_all_heads(self):
+        """Test that an outcome with a known best path updates every head."""
+        classifier = RouteClassifier()
+        for _ in range(30):
+            classifier.update(RouteOutcome("tell me a joke", "local", best_path="parallel"))
+        assert classifier.samples == {"local": 30, "parallel": 30, "api": 30}
+        assert classifier.predict("tell me a joke")[0] == ProcessingPath.PARALLEL
+
+    def test_bad_outcomes(self):
+        """Test that slow, failed and low-quality outcomes are bad ones."""
+        classifier = RouteClassifier(target_latency_ms=1000)
+        assert classifier.is_good(RouteOutcome("q", "api", latency_ms=900))
+        assert not classifier.is_good(RouteOutcome("q", "api", latency_ms=1100))
+        assert not classifier.is_good(RouteOutcome("q", "local", success=False))
+        assert not classifier.is_good(RouteOutcome("q", "local", quality_score=0.3))
+        assert classifier.update(RouteOutcome("q", "staged")) == 0.0
+
+    def test_save_and_load(self, tmp_path):
+        """Test that a saved classifier predicts the same after loading."""
+        classifier = RouteClassifier()
+        classifier.fit(make_traces(200))
+        path = str(tmp_path / "router.json")
+        classifier.save(path)
+
+        loaded = RouteClassifier.load(path)
+        assert loaded.samples == classifier.samples
+        assert loaded.predict_proba("how tall is Oslo") == classifier.predict_proba("how tall is Oslo")
+
+
+class TestLearnedRouting:
+    """Test cases for ProcessingRouter with a classifier."""
+
+    def test_rules_until_trained(self):
+        """Test that the rules decide until the classifier has seen enough outcomes."""
+        router = learned_router(min_training_samples=100)
+        assert router.determine_path("write a poem about Rome").reasoning.startswith("Complex")
+
+        for trace in make_traces(300):
+            router.learn(trace)
+        decision = router.determine_path("thanks a lot")
+        assert decision.path == ProcessingPath.LOCAL
+        assert decision.reasoning.startswith("Learned routing")
+        stats = router.get_routing_stats()
+        assert stats["learned_decisions"] == 1
+        assert stats["outcomes_learned"] == 300
+
+    def test_low_confidence_falls_back_to_rules(self):
+        """Test that an unconfident classifier leaves the decision to the rules."""
+        router = learned_router(min_training_samples=0, min_classifier_confidence=0.9)
+        decision = router.determine_path("Hello, how are you?")
+        assert decision.reasoning == "Short social interaction"
+
+    def test_classifier_loaded_from_config(self, tmp_path):
+        """Test that config.classifier_path loads saved weights."""
+        classifier = RouteClassifier()
+        classifier.fit(make_traces(300))
+        path = str(tmp_path / "router.json")
+        classifier.save(path)
+
+        router = learned_router(classifier_path=path, min_training_samples=100)
+        assert router.classifier.total_samples == 300
+        assert router.determine_path("draft an email to my landlord about Lima").path == ProcessingPath.API
+
+        # Without learned routing there is no classifier and outcomes are ignored
+        rules = ProcessingRouter(RouterConfig(classifier_path=path))
+        rules.record_outcome("hi", "local", True, 100.0)
+        assert rules.classifier is None and rules.outcomes_learned == 0
+
+    def test_optimizer_outcomes_train_router(self, tmp_path):
+        """Test that completions recorded by the optimizer reach the router and the trace log."""
+        optimizer = DualTrackOptimizer(OptimizationConfig(enable_resource_monitoring=False))
+        router = learned_router(min_training_samples=1)
+        optimizer.add_outcome_listener(router.learn)
+
+        optimizer.record_request_start("r1", "write a poem about Oslo", {"conversation_history": ["hi"]})
+        optimizer.record_request_completion("r1", "api", {"tokens_used": 40, "quality_score": 0.8})
+
+        assert router.outcomes_learned == 1
+        outcome = optimizer.route_outcomes[0]
+        assert (outcome.path, outcome.has_context, outcome.quality_score) == ("api", True, 0.8)
+
+        path = str(tmp_path / "traces.jsonl")
+        assert optimizer.export_route_traces(path) == 1
+        assert load_traces(path)[0].query == "write a poem about Oslo"
+
+
+class TestRouterEvaluation:
+    """Test cases for offline evaluation over recorded traces."""
+
+    def test_learned_router_beats_rules_on_replay(self, tmp_path):
+        """Test replaying recorded traces through the rules and a trained router."""
+        path = str(tmp_path / "traces.jsonl")
+        save_traces(make_traces(800, seed=1), path)
+        train, test = load_traces(path)[:600], load_traces(path)[600:]
+
+        rules = evaluate_router(ProcessingRouter(RouterConfig()), test)
+        router = learned_router(min_training_samples=100)
+        for trace in train:
+            router.learn(trace)
+        learned = evaluate_router(router, test)
+
+        assert rules["decisions"] == learned["decisions"] == 200
+        assert learned["learned_share"] == 1.0
+        assert learned["good_rate"] > rules["good_rate"]
+        assert learned["good_rate"] > 0.9
+        assert learned["latency_ms"]["p99"] < 1.0
+
+    def test_online_and_labeled_evaluation(self):
+        """Test prequential evaluation and accuracy against known best paths."""
+        traces = [RouteOutcome(query, "local", best_path="api" if "poem" in query else "local")
+                  for query in ["write a poem about Lima", "hi there"] * 100]
+        router = learned_router(min_training_samples=20)
+        result = evaluate_router(router, traces, online=True)
+
+        assert router.outcomes_learned == 200
+        assert result["matched"] == 0
+        assert result["accuracy"] > 0.8
+        assert evaluate_router(router, []) == {"decisions": 0}
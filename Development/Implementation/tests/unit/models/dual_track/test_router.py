@@ -265,10 +265,10 @@ class TestRouterErrorHandling:
         assert decision.path is not None
         assert decision.confidence > 0
     
-    @patch('src.models.dual_track.router.re.findall')
-    def test_regex_error_handling(self, mock_findall):
+    @patch('src.models.dual_track.router.PRONOUN_PATTERN')
+    def test_regex_error_handling(self, mock_pattern):
         """Test handling of regex errors."""
-        mock_findall.side_effect = Exception("Regex error")
+        mock_pattern.findall.side_effect = Exception("Regex error")
         
         router = ProcessingRouter()
         decision = router.determine_path("test query")
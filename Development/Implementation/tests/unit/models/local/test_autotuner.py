@@ -0,0 +1,168 @@
+"""
+Unit tests for the thread/batch autotuner and tuning profiles.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import sys
+import types
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.models.local.model_manager import LocalModelManager
+from src.models.local.optimization import (
+    OptimizationConfig,
+    ThreadAutotuner,
+    TuningProfileStore,
+    llama_measure,
+    stub_measure
+)
+from tests.mocks.mock_llm import MockLlamaCpp
+
+
+@pytest.fixture
+def model_file():
+    """A model file and a profile path next to it."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tiny.gguf")
+        with open(path, "wb") as f:
+            f.write(b"GGUF" + b"\0" * 4096)
+        yield path, os.path.join(directory, "profiles.json")
+
+
+class TestThreadAutotuner:
+    """Test cases for the calibration search."""
+
+    def test_finds_stub_optimum(self):
+        """Test that the sweep finds the stub model's best threads and batch size."""
+        tuner = ThreadAutotuner(stub_measure(physical_cores=8, optimal_batch=512))
+        result = tuner.tune([2, 4, 8, 12, 16], [256, 512, 1024], [2048])
+
+        assert result["n_threads"] == 8
+        assert result["n_batch"] == 512
+        assert result["n_ctx"] == 2048
+        # Threads at the baseline batch, then the remaining batch sizes
+        assert len(result["trials"]) == 7
+
+    def test_keeps_largest_affordable_context(self):
+        """Test that a larger context is chosen only while it stays within tolerance."""
+        tuner = ThreadAutotuner(stub_measure(), context_tolerance=0.05)
+        result = tuner.tune([8], [512], [2048, 4096, 65536])
+
+        assert result["n_ctx"] == 4096
+
+    def test_failed_trials_are_skipped(self):
+        """Test that configurations that fail to run are never chosen."""
+        stub = stub_measure(physical_cores=8)
+
+        def measure(n_threads, n_batch, n_ctx):
+            if n_threads == 8:
+                raise RuntimeError("out of memory")
+            return stub(n_threads, n_batch, n_ctx)
+
+        result = ThreadAutotuner(measure).tune([4, 8], [512], [2048])
+        assert result["n_threads"] == 4
+        assert "error" in result["trials"][1]
+
+        def failing(n_threads, n_batch, n_ctx):
+            raise RuntimeError("no model")
+
+        with pytest.raises(RuntimeError):
+            ThreadAutotuner(failing).tune([4], [512], [2048])
+
+    def test_llama_measure(self, model_file):
+        """Test timing a configuration through a llama.cpp-like model."""
+        model_path, _ = model_file
+        created = []
+
+        def llama_class(**params):
+            created.append(params)
+            return MockLlamaCpp(seconds_per_token=0.001, completion_tokens=8)
+
+        metrics = llama_measure(model_path, {"n_gpu_layers": 0}, llama_class=llama_class)(4, 256, 1024)
+
+        assert created[0]["n_threads"] == 4
+        assert created[0]["n_batch"] == 256
+        assert created[0]["n_ctx"] == 1024
+        assert created[0]["n_gpu_layers"] == 0
+        assert metrics["prompt_seconds"] >= 0
+        assert metrics["decode_tokens_per_second"] > 0
+
+
+class TestTuningProfiles:
+    """Test cases for persisted profiles."""
+
+    def test_profile_applied_for_same_host_and_model(self, model_file):
+        """Test that optimize_for_device uses a stored profile only where it was tuned."""
+        model_path, profile_path = model_file
+        TuningProfileStore(profile_path).put(model_path, {"n_threads": 6, "n_batch": 256, "n_ctx": 2048})
+
+        config = OptimizationConfig(thread_count=2, batch_size=512, context_size=4096)
+        config.optimize_for_device(detect_hardware=False, model_path=model_path, profile_path=profile_path)
+        # The configured context size is kept
+        assert (config.thread_count, config.batch_size, config.context_size) == (6, 256, 4096)
+
+        # Explicitly configured fields are kept too
+        config = OptimizationConfig(thread_count=2, batch_size=512)
+        config.apply_tuned_profile(model_path, profile_path, keep={"thread_count"})
+        assert (config.thread_count, config.batch_size) == (2, 256)
+
+        other_host = TuningProfileStore(profile_path).get(model_path, host="another-host")
+        assert other_host is None
+
+        # A different model file does not match
+        with open(model_path, "ab") as f:
+            f.write(b"\1")
+        config = OptimizationConfig(thread_count=2)
+        assert not config.apply_tuned_profile(model_path, profile_path)
+        assert config.thread_count == 2
+
+    def test_manager_autotune_feeds_later_loads(self, model_file):
+        """Test that a model tuned through the manager loads with the tuned settings."""
+        model_path, profile_path = model_file
+        loaded = []
+
+        class StubLlama:
+            def __init__(self, **kwargs):
+                loaded.append(kwargs)
+
+        module = types.ModuleType("llama_cpp")
+        module.Llama = StubLlama
+
+        manager = LocalModelManager({
+            "registry_path": None,
+            "model_dir": os.path.dirname(model_path),
+            "default_model": "tiny",
+            "use_optimization": False,
+            "system_prompt_snapshot": False,
+            "monitor_memory": False,
+            "generation": {},
+            "autotune": {"profile_path": profile_path},
+        })
+        manager.model_registry = {"models": [
+            {"id": "tiny", "name": "tiny", "type": "llm", "format": "gguf", "path": "tiny.gguf"}
+        ]}
+
+        result = manager.autotune_model("tiny", thread_counts=[3, 7], batch_sizes=[128, 512],
+                                        measure=stub_measure(physical_cores=7))
+        assert (result["n_threads"], result["n_batch"]) == (7, 512)
+
+        with patch.dict(sys.modules, {"llama_cpp": module}):
+            manager.load_model("tiny")
+
+        assert loaded[0]["n_threads"] == 7
+        assert loaded[0]["n_batch"] == 512
+
+        # Explicit settings win over the profile, and the context size is never tuned away
+        manager.unload_model("tiny")
+        with patch.dict(sys.modules, {"llama_cpp": module}):
+            manager.load_model("tiny", {"thread_count": 2, "context_size": 8192})
+
+        assert loaded[1]["n_threads"] == 2
+        assert loaded[1]["n_batch"] == 512
+        assert loaded[1]["n_ctx"] == 8192
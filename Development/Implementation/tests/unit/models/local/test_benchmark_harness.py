@@ -0,0 +1,109 @@
+"""
+Unit tests for the scenario benchmark harness.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import json
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.models.local.benchmarks import (
+    BenchmarkHarness,
+    BenchmarkScenario,
+    FakeLocalModel,
+    compare_results,
+    load_results,
+    run_scenario,
+    save_results
+)
+from src.models.local.benchmarks.harness import build_prompt, main
+
+
+@pytest.fixture
+def results_dir():
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory
+
+
+class TestBenchmarkHarness:
+    """Test cases for scenario runs."""
+
+    def test_warmup_is_excluded_from_steady_state(self):
+        """Test that slow cold requests only show up in the warm-up summary."""
+        model = FakeLocalModel(cold_requests=2, cold_penalty_seconds=0.05)
+        scenario = BenchmarkScenario("cold", prompt_tokens=16, max_tokens=4, warmup=2, iterations=5)
+
+        result = run_scenario(model, scenario)
+
+        assert model.requests == 7
+        assert result["requests"] == 5
+        assert result["errors"] == 0
+        assert result["warmup"]["mean_latency"] >= 0.05
+        assert result["latency"]["max"] < 0.05
+        assert result["latency"]["count"] == 5
+        assert result["first_token"]["p50"] > 0
+        assert result["decode_per_token"]["p50"] >= 0.9 * model.decode_seconds_per_token
+
+    def test_prompt_length_matches_tokenizer(self):
+        """Test that prompts are sized with the model's tokenizer and differ per request."""
+        model = FakeLocalModel()
+        first = build_prompt(model, 100, request_index=0)
+        second = build_prompt(model, 100, request_index=1)
+
+        assert model.get_token_count(first) == 100
+        assert first != second
+
+    def test_concurrency_measures_throughput(self):
+        """Test that a model serving requests in parallel shows higher throughput."""
+        scenario = BenchmarkScenario("concurrent", prompt_tokens=8, max_tokens=20, concurrency=4,
+                                     warmup=0, iterations=8)
+        serial = run_scenario(FakeLocalModel(decode_seconds_per_token=0.002), scenario)
+        parallel = run_scenario(FakeLocalModel(decode_seconds_per_token=0.002, parallel=True), scenario)
+
+        assert serial["requests"] == parallel["requests"] == 8
+        assert parallel["throughput_tokens_per_second"] > 2 * serial["throughput_tokens_per_second"]
+
+
+class TestBenchmarkResults:
+    """Test cases for stored results and baseline comparison."""
+
+    def test_results_keyed_by_host_and_commit(self, results_dir):
+        """Test that results land under the host fingerprint and commit."""
+        scenario = BenchmarkScenario("tiny", prompt_tokens=8, max_tokens=2, warmup=0, iterations=2)
+        with patch.dict(os.environ, {"VANTA_COMMIT": "abc123def4567890"}):
+            results = BenchmarkHarness(FakeLocalModel(), [scenario], model_name="fake").run()
+        path = save_results(results, results_dir)
+
+        assert path == os.path.join(results_dir, results["host"]["fingerprint"], "fake", "abc123def456.json")
+        assert load_results(path)["scenarios"]["tiny"]["requests"] == 2
+
+    def test_compare_flags_regressions(self):
+        """Test that a slower model is flagged against the baseline and an equal one is not."""
+        scenarios = [BenchmarkScenario("turn", prompt_tokens=16, max_tokens=16, warmup=1, iterations=5)]
+        baseline = BenchmarkHarness(FakeLocalModel(decode_seconds_per_token=0.001), scenarios).run()
+        slower = BenchmarkHarness(FakeLocalModel(decode_seconds_per_token=0.004), scenarios).run()
+
+        comparison = compare_results(slower, baseline, tolerance=0.25)
+        regressed = {item["metric"] for item in comparison["regressions"]}
+        assert {"latency.p50", "decode_per_token.p50", "throughput_tokens_per_second"} <= regressed
+
+        assert compare_results(baseline, baseline)["regressions"] == []
+        assert compare_results(baseline, slower, tolerance=0.25)["improvements"]
+
+    def test_command_line_baseline_round_trip(self, results_dir):
+        """Test writing a baseline and comparing against it from the command line."""
+        scenario_path = os.path.join(results_dir, "scenarios.json")
+        baseline_path = os.path.join(results_dir, "baseline.json")
+        with open(scenario_path, "w") as f:
+            json.dump([{"name": "tiny", "prompt_tokens": 8, "max_tokens": 4, "warmup": 1, "iterations": 3}], f)
+
+        common = ["--fake", "--scenarios", scenario_path, "--results-dir", results_dir, "--baseline", baseline_path]
+        assert main(common + ["--update-baseline"]) == 0
+        assert load_results(baseline_path)["scenarios"]["tiny"]["requests"] == 3
+        assert main(common + ["--tolerance", "100"]) == 0
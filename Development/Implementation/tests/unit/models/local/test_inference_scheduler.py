@@ -0,0 +1,190 @@
+"""
+Unit tests for the token-level inference scheduler.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import sys
+import threading
+import time
+import types
+from unittest.mock import patch
+
+import pytest
+
+from src.models.dual_track.local_model import LocalModel
+from src.models.local.exceptions import ModelResourceError
+from src.models.local.llama_adapter import LlamaModelAdapter
+from src.models.utils.inference_scheduler import (
+    InferenceScheduler,
+    SchedulerOverloadedError,
+    percentile,
+    resolve_priority,
+)
+from tests.mocks import MockLlamaCpp, mock_local_config
+
+
+class RecordingLlama(MockLlamaCpp):
+    """MockLlamaCpp that logs which prompt produced each token."""
+
+    def __init__(self, log, gate=None, **kwargs):
+        super().__init__(**kwargs)
+        self.log = log
+        self.gate = gate
+
+    def __call__(self, prompt, max_tokens=16, stream=False, **kwargs):
+        stream_iter = super().__call__(prompt, max_tokens=max_tokens, stream=stream, **kwargs)
+        if not stream:
+            return stream_iter
+
+        def tokens():
+            for chunk in stream_iter:
+                if self.gate is not None:
+                    self.gate.wait(5)
+                self.log.append(prompt)
+                yield chunk
+        return tokens()
+
+
+class TestInferenceScheduler:
+    """Test cases for InferenceScheduler."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.log = []
+        self.scheduler = None
+
+    def teardown_method(self):
+        """Stop the scheduler thread."""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+    def _scheduler(self, contexts, **config):
+        self.scheduler = InferenceScheduler(contexts, config)
+        self.scheduler.start()
+        return self.scheduler
+
+    def test_priority_and_percentile_helpers(self):
+        """Test priority names and nearest-rank percentiles."""
+        assert resolve_priority("voice") < resolve_priority("interactive") < resolve_priority("background")
+        assert resolve_priority(None) == resolve_priority("interactive")
+        with pytest.raises(ValueError):
+            resolve_priority("urgent")
+        assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 0.95) == 10
+        assert percentile([], 0.95) == 0.0
+
+    def test_sequences_interleave_token_by_token(self):
+        """Test that a request arriving mid-generation starts before the first one ends."""
+        scheduler = self._scheduler([
+            RecordingLlama(self.log, completion_tokens=20, seconds_per_token=0.002),
+            RecordingLlama(self.log, completion_tokens=20, seconds_per_token=0.002),
+        ])
+        long_request = scheduler.submit("long prompt", {"max_tokens": 20})
+        stream = long_request.stream(timeout=5)
+        next(stream)
+        short_request = scheduler.submit("short prompt", {"max_tokens": 3})
+
+        assert short_request.result(timeout=5)["usage"]["completion_tokens"] == 3
+        assert long_request.result(timeout=5)["usage"]["completion_tokens"] == 20
+        assert self.log.index("short prompt") < len(self.log) - 1 - self.log[::-1].index("long prompt")
+        assert scheduler.get_stats()["max_concurrent"] == 2
+
+    def test_voice_admitted_before_queued_background(self):
+        """Test that voice requests take the next free context."""
+        gate = threading.Event()
+        scheduler = self._scheduler([RecordingLlama(self.log, gate=gate, completion_tokens=2)])
+        blocker = scheduler.submit("blocker", {"max_tokens": 2})
+        background = scheduler.submit("background", {"max_tokens": 2}, priority="background")
+        voice = scheduler.submit("voice", {"max_tokens": 2}, priority="voice")
+        gate.set()
+
+        for request in (blocker, background, voice):
+            request.result(timeout=5)
+        assert self.log.index("voice") < self.log.index("background")
+
+    def test_admission_control_rejects_when_queue_full(self):
+        """Test bounded queue and queue timeout."""
+        gate = threading.Event()
+        scheduler = self._scheduler([RecordingLlama(self.log, gate=gate)], max_queue_size=1, queue_timeout=0.05)
+        running = scheduler.submit("running", {"max_tokens": 1})
+        # Wait until the first request holds the only context
+        while scheduler.get_stats()["active"] == 0:
+            time.sleep(0.001)
+        waiting = scheduler.submit("waiting", {"max_tokens": 1})
+
+        with pytest.raises(SchedulerOverloadedError):
+            scheduler.submit("rejected", {"max_tokens": 1})
+
+        # The waiting request outlives queue_timeout while the context is busy
+        time.sleep(0.1)
+        gate.set()
+        running.result(timeout=5)
+        with pytest.raises(SchedulerOverloadedError):
+            waiting.result(timeout=5)
+        assert scheduler.get_stats()["rejected"] == 2
+
+    def test_cancelled_request_frees_context(self):
+        """Test that cancelling a stream releases its context for the next request."""
+        scheduler = self._scheduler([MockLlamaCpp(completion_tokens=1000, seconds_per_token=0.001)])
+        endless = scheduler.submit("endless", {"max_tokens": 1000})
+        endless.cancel()
+        result = scheduler.submit("next", {"max_tokens": 1}).result(timeout=5)
+
+        assert result["usage"]["completion_tokens"] == 1
+        stats = scheduler.get_stats()
+        assert stats["cancelled"] == 1
+        assert stats["completed"] == 1
+        assert stats["latency_p95"] > 0
+
+    def test_adapter_routes_through_scheduler(self):
+        """Test LlamaModelAdapter generate and generate_stream with a scheduler."""
+        adapter = LlamaModelAdapter(config={"generation": {}})
+        adapter.model = MockLlamaCpp(completion_tokens=4)
+        adapter.is_initialized = True
+        adapter.scheduler = InferenceScheduler([adapter.model], {"max_queue_size": 0})
+        adapter.scheduler.start()
+        self.scheduler = adapter.scheduler
+
+        with pytest.raises(ModelResourceError):
+            adapter.generate("hello", {"priority": "voice"})
+
+        adapter.scheduler.max_queue_size = 4
+        result = adapter.generate("hello", {"max_tokens": 4, "priority": "voice"})
+        assert result["usage"]["completion_tokens"] == 4
+        chunks = list(adapter.generate_stream("hello again", {"max_tokens": 4}))
+        assert len(chunks) == 4
+
+    def test_local_model_serves_sessions_concurrently(self):
+        """Test LocalModel with several contexts keeping session affinity."""
+        llama_cpp = types.ModuleType("llama_cpp")
+        llama_cpp.Llama = lambda **kwargs: MockLlamaCpp(completion_tokens=3)
+        config = mock_local_config(inference_contexts=2, prompt_cache=True)
+
+        with patch.dict(sys.modules, {"llama_cpp": llama_cpp}):
+            local_model = LocalModel(config)
+            local_model.load_model()
+        self.scheduler = local_model.scheduler
+        assert local_model.model_info["inference_contexts"] == 2
+
+        responses = {}
+
+        def turn(session_id):
+            responses[session_id] = local_model.generate("Hello", {"session_id": session_id, "priority": "voice"})
+
+        threads = [threading.Thread(target=turn, args=(session,)) for session in ("alice", "bob")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(response.error is None for response in responses.values())
+
+        history = [{"user_message": "Hello", "assistant_message": "ok ok ok"}]
+        response = local_model.generate("Again", {"session_id": "alice", "conversation_history": history})
+        assert response.model_info["cached_prompt_tokens"] > 0
+        assert local_model.get_model_stats()["scheduler"]["completed"] == 3
+
+        local_model.unload_model()
+        assert local_model.scheduler is None
+        self.scheduler = None
@@ -0,0 +1,146 @@
+"""
+Unit tests for always-on inference instrumentation.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.models.local.exceptions import ModelGenerationError
+from src.models.local.llama_adapter import LlamaModelAdapter
+from src.models.local.optimization import InferenceInstrumentation, RingHistogram, get_memory_sampler
+from src.models.utils.cancellation import CancellationToken, REASON_BARGE_IN
+from tests.mocks import MockLlamaCpp
+
+
+def _adapter(**mock_kwargs) -> LlamaModelAdapter:
+    """Adapter serving a mock llama.cpp model."""
+    adapter = LlamaModelAdapter(config={"generation": {}})
+    adapter.model = MockLlamaCpp(**mock_kwargs)
+    adapter.is_initialized = True
+    return adapter
+
+
+class TestRingHistogram:
+    """Test cases for RingHistogram."""
+
+    def test_percentiles_over_window(self):
+        """Test that percentiles cover the most recent samples and totals cover all of them."""
+        histogram = RingHistogram(capacity=100)
+        for value in range(1, 201):
+            histogram.record(float(value))
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 200
+        assert snapshot["max"] == 200.0
+        assert snapshot["mean"] == 100.5
+        assert snapshot["p50"] == 150.0
+        assert snapshot["p99"] == 199.0
+
+        histogram.reset()
+        assert histogram.snapshot()["count"] == 0
+        assert histogram.snapshot()["p95"] == 0.0
+
+
+class TestInferenceInstrumentation:
+    """Test cases for InferenceInstrumentation."""
+
+    def test_streamed_request_timings(self):
+        """Test first-token and per-token decode timings from marked tokens."""
+        instrumentation = InferenceInstrumentation("test")
+        timer = instrumentation.start_request()
+        with patch("src.models.local.optimization.instrumentation.time.perf_counter",
+                   side_effect=[0.5, 0.6, 0.7, 0.8]):
+            timer.start = 0.0
+            for _ in range(3):
+                timer.token()
+            latency = timer.finish(prompt_tokens=10)
+
+        metrics = instrumentation.get_metrics()
+        histograms = metrics["histograms"]
+        assert latency == 0.8
+        assert metrics["requests"] == 1
+        assert metrics["prompt_tokens"] == 10 and metrics["completion_tokens"] == 3
+        assert histograms["first_token"]["p50"] == 0.5
+        assert histograms["prompt_eval"]["p50"] == 0.5
+        assert abs(histograms["decode_per_token"]["p50"] - 0.1) < 1e-9
+        instrumentation.close()
+
+    def test_shared_memory_sampler(self):
+        """Test that every instrumented model shares one sampler thread."""
+        sampler = get_memory_sampler()
+        first, second = InferenceInstrumentation("a"), InferenceInstrumentation("b")
+        thread = sampler._thread
+        assert first._sampler is second._sampler is sampler
+        if thread is not None:
+            assert thread.is_alive()
+        first.close()
+        assert sampler._thread is thread
+        second.close()
+
+
+class TestAdapterInstrumentation:
+    """Test instrumentation through LlamaModelAdapter."""
+
+    def test_generate_uses_llama_usage_counts(self):
+        """Test that token counts come from llama.cpp usage without re-tokenizing."""
+        adapter = _adapter(completion_tokens=4)
+        with patch.object(adapter, "tokenize", side_effect=AssertionError("re-tokenized")):
+            result = adapter.generate("one two three", {"max_tokens": 8})
+
+        assert result["usage"]["completion_tokens"] == 4
+        metrics = adapter.get_metrics()
+        assert metrics["requests"] == 1
+        assert metrics["prompt_tokens"] == result["usage"]["prompt_tokens"] > 0
+        assert metrics["histograms"]["latency"]["count"] == 1
+
+    def test_stream_records_first_token_and_errors(self):
+        """Test streamed requests record first-token latency and failures are counted."""
+        adapter = _adapter(completion_tokens=5)
+        chunks = list(adapter.generate_stream("hello", {"max_tokens": 5}))
+        assert chunks[-1]["tokens_per_second"] > 0
+
+        metrics = adapter.get_metrics()
+        assert metrics["completion_tokens"] == 5
+        assert metrics["histograms"]["first_token"]["count"] == 1
+        assert metrics["histograms"]["decode_per_token"]["count"] == 1
+
+        with patch.object(adapter.model, "create_completion", side_effect=RuntimeError("boom")):
+            with pytest.raises(ModelGenerationError):
+                adapter.generate("hello")
+        assert adapter.get_metrics()["errors"] == 1
+
+    def test_cancelled_stream_stops_decoding(self):
+        """Test that a cancelled stream ends with a "cancelled" chunk and reports the work saved."""
+        adapter = _adapter(completion_tokens=50)
+        cancel = CancellationToken()
+        chunks = []
+        for chunk in adapter.generate_stream("hello", {"max_tokens": 50}, cancel=cancel):
+            chunks.append(chunk)
+            if len(chunks) == 3:
+                cancel.cancel(REASON_BARGE_IN)
+
+        assert len(chunks) == 4
+        assert chunks[-1]["finish_reason"] == "cancelled"
+        assert chunks[-1]["usage"]["completion_tokens"] == 3
+        assert chunks[-1]["cancellation"]["tokens_not_generated"] > 0
+        # Only the token already being decoded is wasted
+        assert adapter.model.n_tokens - adapter.model.last_evaluated == 4
+        assert adapter.get_metrics()["cancellation"]["by_reason"] == {REASON_BARGE_IN: 1}
+        assert adapter.get_metrics()["histograms"]["latency"]["count"] == 1
+
+    def test_abandoned_stream_is_timed(self):
+        """Test that a stream closed by its consumer still records a latency sample."""
+        adapter = _adapter(completion_tokens=50)
+        stream = adapter.generate_stream("hello", {"max_tokens": 50})
+        next(stream)
+        next(stream)
+        stream.close()
+
+        metrics = adapter.get_metrics()
+        assert metrics["histograms"]["latency"]["count"] == 1
+        assert metrics["completion_tokens"] == 2
@@ -0,0 +1,93 @@
+"""
+Unit tests for system-prompt KV-state snapshots.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+from unittest.mock import patch
+
+from src.models.dual_track.config import LocalModelConfig
+from src.models.dual_track.local_model import LocalModel
+from src.models.local.llama_adapter import LlamaModelAdapter
+from src.models.local.prompt_formatter import PromptFormatter
+from src.models.utils.kv_snapshot import SystemPromptSnapshot, snapshot_key
+from tests.mocks import MockLlamaCpp
+
+SYSTEM_PROMPT = "You are a helpful assistant. Answer briefly."
+
+
+class TestSystemPromptSnapshot:
+    """Test the SystemPromptSnapshot class."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.snapshot_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.snapshot_dir)
+
+    def test_key_depends_on_model_context_and_prompt(self):
+        """Test snapshot invalidation inputs."""
+        base = snapshot_key("model.gguf", 2048, SYSTEM_PROMPT)
+        assert base == snapshot_key("model.gguf", 2048, SYSTEM_PROMPT)
+        assert base != snapshot_key("other.gguf", 2048, SYSTEM_PROMPT)
+        assert base != snapshot_key("model.gguf", 4096, SYSTEM_PROMPT)
+        assert base != snapshot_key("model.gguf", 2048, SYSTEM_PROMPT + " ")
+
+    def test_evaluated_once_then_restored_from_disk(self):
+        """Test that a new process restores the prompt state without evaluating it."""
+        model = MockLlamaCpp()
+        snapshot = SystemPromptSnapshot("model.gguf", 2048, SYSTEM_PROMPT, self.snapshot_dir)
+        assert snapshot.warm(model) is False
+        assert os.path.exists(snapshot.path)
+        prompt_state = list(model.input_ids)
+
+        fresh_model = MockLlamaCpp()
+        restored = SystemPromptSnapshot("model.gguf", 2048, SYSTEM_PROMPT, self.snapshot_dir)
+        assert restored.warm(fresh_model) is True
+        assert fresh_model.evaluated_tokens == 0
+        assert fresh_model.input_ids == prompt_state
+
+        changed = SystemPromptSnapshot("model.gguf", 2048, SYSTEM_PROMPT + " Be kind.", self.snapshot_dir)
+        assert changed.warm(MockLlamaCpp()) is False
+
+    def test_adapter_warms_formatted_system_block(self):
+        """Test LlamaModelAdapter reusing the template's system block."""
+        system_block = PromptFormatter().format_system_prefix("llama2")
+        adapter = LlamaModelAdapter(config={"snapshot_dir": self.snapshot_dir})
+        adapter.model_path = "model.gguf"
+        adapter.model = MockLlamaCpp()
+        adapter.is_initialized = True
+
+        assert adapter.warm_system_prompt(system_block) is True
+        assert adapter.system_snapshot.get_stats()["evaluations"] == 1
+        assert adapter.model.n_tokens == adapter.system_snapshot.token_count
+
+    def test_local_model_reload_skips_system_prompt(self):
+        """Test that unload_model and reload restore the snapshot."""
+        llama_cpp = types.ModuleType("llama_cpp")
+        llama_cpp.Llama = lambda **kwargs: MockLlamaCpp()
+        config = LocalModelConfig(preload=False, model_path="model.gguf", snapshot_dir=self.snapshot_dir)
+
+        with patch.dict(sys.modules, {"llama_cpp": llama_cpp}):
+            local_model = LocalModel(config)
+            local_model.load_model()
+            assert local_model.model_info["system_prompt_restored"] is False
+            prompt_tokens = local_model.model.n_tokens
+
+            local_model.unload_model()
+            local_model.load_model()
+            assert local_model.model_info["system_prompt_restored"] is True
+            assert local_model.model.evaluated_tokens == 0
+            assert local_model.model.n_tokens == prompt_tokens
+
+            response = local_model.generate("Hello there")
+            assert response.model_info["cached_prompt_tokens"] > 0
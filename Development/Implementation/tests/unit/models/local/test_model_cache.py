@@ -0,0 +1,109 @@
+"""
+Unit tests for the content-addressed model cache.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from src.models.utils.model_cache import ModelCache, file_sha256
+
+
+class TestModelCache:
+    """Test cases for ModelCache."""
+
+    def setup_method(self):
+        """Create a cache directory and source models."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.sources = {}
+        for name, size in (("a", 400 * 1024), ("b", 300 * 1024), ("c", 300 * 1024)):
+            path = os.path.join(self.temp_dir, f"{name}.gguf")
+            with open(path, "wb") as f:
+                f.write(name.encode() * size)
+            self.sources[name] = path
+
+    def teardown_method(self):
+        """Remove the cache directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_add_links_instead_of_copying(self):
+        """Test that models are stored by hash without copying the data."""
+        cache = ModelCache(self.cache_dir)
+        path = cache.add_model("a", self.sources["a"], {})
+
+        assert os.path.basename(path) == file_sha256(self.sources["a"]) + ".gguf"
+        assert os.path.samefile(path, self.sources["a"])
+        assert cache.get_cache_stats()["hardlinked"] == 1
+
+        # Same content under a second ID shares the blob
+        assert cache.add_model("a-alias", self.sources["a"], {}) == path
+        stats = cache.get_cache_stats()
+        assert stats["model_count"] == 2 and stats["blob_count"] == 1
+
+    def test_copy_fallback_and_hash_verification(self):
+        """Test the copy path across filesystems and rejection of a wrong hash."""
+        cache = ModelCache(self.cache_dir)
+        with patch("src.models.utils.model_cache.os.link", side_effect=OSError(18, "cross-device")), \
+                patch("src.models.utils.model_cache._reflink", return_value=False):
+            path = cache.add_model("b", self.sources["b"], {})
+        assert not os.path.samefile(path, self.sources["b"])
+        assert cache.get_cache_stats()["copied"] == 1
+        assert cache.verify_model("b")
+
+        with pytest.raises(ValueError):
+            cache.add_model("c", self.sources["c"], {"sha256": "0" * 64})
+
+    def test_lookup_does_not_write(self):
+        """Test that lookups leave the metadata untouched until flushed."""
+        cache = ModelCache(self.cache_dir)
+        cache.add_model("a", self.sources["a"], {})
+        db_mtime = os.stat(cache.db_path).st_mtime_ns
+
+        with patch("src.models.utils.model_cache.sqlite3.connect") as connect:
+            for _ in range(100):
+                assert cache.get_model_path("a")
+        connect.assert_not_called()
+        assert os.stat(cache.db_path).st_mtime_ns == db_mtime
+        assert not os.path.exists(cache.access_log)
+
+        cache.close()
+        with open(cache.access_log) as f:
+            assert f.read().split()[1] == "a"
+
+        # Another process sees the model through the shared database
+        assert ModelCache(self.cache_dir).get_model_path("a") == cache.get_model_path("a")
+
+    def test_lru_eviction_uses_access_log(self):
+        """Test that the least recently looked-up model is evicted."""
+        cache = ModelCache(self.cache_dir, max_size_gb=1.0 / 1024)  # 1 MB
+        cache.add_model("a", self.sources["a"], {})
+        cache.add_model("b", self.sources["b"], {})
+        cache.get_model_path("a")
+        cache.flush_access_log()
+
+        cache.add_model("c", self.sources["c"], {})
+        assert cache.get_model_path("a") is not None
+        assert cache.get_model_path("b") is None
+        assert os.path.exists(self.sources["b"])  # Evicting a link leaves the source alone
+
+    def test_legacy_metadata_imported(self):
+        """Test migration from the JSON metadata format."""
+        os.makedirs(self.cache_dir)
+        legacy_path = os.path.join(self.cache_dir, "a_a.gguf")
+        shutil.copy(self.sources["a"], legacy_path)
+        with open(os.path.join(self.cache_dir, "cache_metadata.json"), "w") as f:
+            json.dump({"models": {"a": {"cache_path": legacy_path, "info": {"name": "A"}}}}, f)
+
+        cache = ModelCache(self.cache_dir)
+        assert cache.verify_model("a")
+        assert not os.path.exists(legacy_path)
+        assert os.path.exists(os.path.join(self.cache_dir, "cache_metadata.json.migrated"))
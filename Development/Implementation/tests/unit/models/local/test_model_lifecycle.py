@@ -0,0 +1,173 @@
+"""
+Unit tests for model lifecycle management.
+
+# TASK-REF: LM_001 - Local Model Integration
+# CONCEPT-REF: CON-VANTA-002 - Local Model Integration
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import sys
+import time
+import types
+import tempfile
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.models.local.model_manager import LocalModelManager
+from src.models.local.model_lifecycle import STATE_READY, STATE_FAILED
+
+
+class StubLlama:
+    """Stands in for llama_cpp.Llama; loading takes LOAD_SECONDS[model file]."""
+
+    LOAD_SECONDS = {}
+    instances = []
+
+    def __init__(self, model_path, **kwargs):
+        time.sleep(self.LOAD_SECONDS.get(os.path.basename(model_path), 0.0))
+        self.model_path = model_path
+        self.kwargs = kwargs
+        StubLlama.instances.append(self)
+
+
+@pytest.fixture
+def stub_llama_cpp():
+    """Install the stub as llama_cpp."""
+    module = types.ModuleType("llama_cpp")
+    module.Llama = StubLlama
+    StubLlama.LOAD_SECONDS = {}
+    StubLlama.instances = []
+    with patch.dict(sys.modules, {"llama_cpp": module}):
+        yield StubLlama
+
+
+@pytest.fixture
+def model_dir():
+    """Model files of different sizes."""
+    with tempfile.TemporaryDirectory() as directory:
+        for name, size in (("voice", 1000), ("small", 1000), ("large", 8000)):
+            with open(os.path.join(directory, f"{name}.gguf"), "wb") as f:
+                f.write(b"\0" * size)
+        yield directory
+
+
+def _manager(model_dir, **lifecycle) -> LocalModelManager:
+    manager = LocalModelManager({
+        "registry_path": None,
+        "model_dir": model_dir,
+        "default_model": "voice",
+        "max_models_loaded": 2,
+        "use_optimization": False,
+        "system_prompt_snapshot": False,
+        "monitor_memory": False,
+        "generation": {},
+        "lifecycle": lifecycle,
+    })
+    manager.model_registry = {"models": [
+        {"id": name, "name": name, "type": "llm", "format": "gguf", "path": f"{name}.gguf"}
+        for name in ("voice", "small", "large")
+    ]}
+    return manager
+
+
+class TestModelLifecycle:
+    """Test cases for ModelLifecycleManager through LocalModelManager."""
+
+    def test_background_preload_and_readiness(self, stub_llama_cpp, model_dir):
+        """Test that preloading runs off-thread and readiness reflects it."""
+        stub_llama_cpp.LOAD_SECONDS = {"voice.gguf": 0.2}
+        manager = _manager(model_dir)
+        thread = manager.lifecycle.preload()
+
+        assert manager.lifecycle.is_loading("voice")
+        assert not manager.get_readiness()["ready"]
+
+        # A foreground load during the preload waits instead of loading twice
+        start = time.monotonic()
+        assert manager.load_model("voice") == "voice"
+        assert time.monotonic() - start > 0.1
+        assert "voice" in manager.active_models
+        assert len(stub_llama_cpp.instances) == 1
+        assert manager.lifecycle.wait_until_ready("voice", timeout=5)
+        thread.join()
+
+        readiness = manager.get_readiness()
+        assert readiness["ready"]
+        assert readiness["models"]["voice"]["state"] == STATE_READY
+        stats = manager.lifecycle.get_stats()
+        assert stats["preloads"] == 1 and stats["load_seconds"]["count"] == 1
+
+    def test_cost_aware_eviction_keeps_pinned(self, stub_llama_cpp, model_dir):
+        """Test that the pinned model survives and the cheapest model is evicted."""
+        manager = _manager(model_dir, pinned=["voice"])
+        manager.load_model("voice")
+        manager.load_model("large")
+        manager.load_model("small")
+
+        assert set(manager.active_models) == {"voice", "small"}
+        assert manager.lifecycle.get_stats()["evictions"] == 1
+
+        assert manager.lifecycle.eviction_cost("voice") == float("inf")
+
+    def test_concurrent_loads_respect_limit(self, stub_llama_cpp, model_dir):
+        """Test that two models loading at once don't both stay loaded past the limit."""
+        stub_llama_cpp.LOAD_SECONDS = {"small.gguf": 0.1, "large.gguf": 0.1}
+        manager = _manager(model_dir)
+        manager.config["max_models_loaded"] = 1
+        threads = [threading.Thread(target=manager.load_model, args=(model_id,)) for model_id in ("small", "large")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(manager.active_models) == 1
+        assert manager.lifecycle.get_stats()["evictions"] == 1
+
+    def test_recently_used_model_is_kept(self, stub_llama_cpp, model_dir):
+        """Test that the idle model is evicted rather than the first one loaded."""
+        manager = _manager(model_dir)
+        manager.load_model("small")
+        manager.load_model("large")
+        for _ in range(3):
+            manager.lifecycle.record_use("small")
+
+        manager.load_model("voice")
+        assert set(manager.active_models) == {"small", "voice"}
+
+    def test_eviction_cost_grows_with_size_reload_time_and_use(self, stub_llama_cpp, model_dir):
+        """Test that the cost is size x reload time x recent use."""
+        manager = _manager(model_dir)
+        lifecycle = manager.lifecycle
+        sizes = {"small.gguf": 1 << 30, "large.gguf": 4 << 30}
+        with patch("src.models.local.model_lifecycle.os.path.getsize",
+                   side_effect=lambda path: sizes[os.path.basename(path)]):
+            lifecycle.on_loaded("small", 3.0, os.path.join(model_dir, "small.gguf"))
+            lifecycle.on_loaded("large", 3.0, os.path.join(model_dir, "large.gguf"))
+
+        assert lifecycle.eviction_cost("small") == pytest.approx(3.0)
+        assert lifecycle.eviction_cost("large") == pytest.approx(12.0)
+        assert lifecycle.select_evictions(["small", "large"], 2, incoming="voice") == ["small"]
+
+        lifecycle.record_use("small")
+        assert lifecycle.eviction_cost("small") > 3.0
+
+    def test_mlock_only_pinned_models(self, stub_llama_cpp, model_dir):
+        """Test the default mmap/mlock policy."""
+        manager = _manager(model_dir, pinned=["voice"])
+        manager.load_model("voice")
+        manager.load_model("small")
+
+        voice, small = stub_llama_cpp.instances
+        assert voice.kwargs["use_mmap"] and voice.kwargs["use_mlock"]
+        assert small.kwargs["use_mmap"] and not small.kwargs["use_mlock"]
+
+    def test_failed_preload_is_reported(self, stub_llama_cpp, model_dir):
+        """Test that a failed preload wakes waiters and shows up in readiness."""
+        manager = _manager(model_dir)
+        manager.lifecycle.preload(["missing"], background=False)
+
+        assert not manager.lifecycle.wait_until_ready("missing", timeout=1)
+        assert manager.get_readiness()["models"]["missing"]["state"] == STATE_FAILED
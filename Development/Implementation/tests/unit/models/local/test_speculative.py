@@ -0,0 +1,138 @@
+"""
+Unit tests for speculative decoding with a draft model.
+
+# TASK-REF: LM_002 - Local Model Optimization
+# CONCEPT-REF: CON-LM-002 - Local Model Optimization
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import sys
+import tempfile
+import types
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.models.local.llama_adapter import LlamaModelAdapter
+from src.models.local.optimization import OptimizationConfig
+from src.models.local.speculative import DraftModelDecoder
+
+
+class FakeDraftLlama:
+    """Draft model that always continues with ascending token ids."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def generate(self, tokens, top_k=40, temp=0.8, reset=True, **kwargs):
+        next_token = tokens[-1] + 1
+        while True:
+            yield next_token
+            next_token += 1
+
+
+class FakeTargetLlama:
+    """Target model that accepts the first two drafted tokens of every proposal."""
+
+    def __init__(self, draft_model=None, **kwargs):
+        self.draft_model = draft_model
+        self.kwargs = kwargs
+
+    def tokenize(self, text, add_bos=True, special=False):
+        return list(range(1, len(text.split()) + 2))
+
+    def create_completion(self, prompt, max_tokens=16, stream=False, **kwargs):
+        tokens = self.tokenize(prompt.encode("utf-8"))
+        prompt_tokens = len(tokens)
+        while len(tokens) - prompt_tokens < max_tokens:
+            proposal = list(self.draft_model(np.array(tokens, dtype=np.intc)))
+            # Two drafts accepted, then the target's own (different) token
+            tokens += proposal[:2] + [0]
+        completion_tokens = len(tokens) - prompt_tokens
+        return {
+            "choices": [{"text": " ok" * completion_tokens, "finish_reason": "length"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": len(tokens)},
+        }
+
+
+class TestDraftModelDecoder:
+    """Test cases for DraftModelDecoder."""
+
+    def test_acceptance_measured_from_next_call(self):
+        """Test that accepted drafts are counted when the target calls back."""
+        decoder = DraftModelDecoder(FakeDraftLlama(), num_pred_tokens=4)
+        proposal = decoder(np.array([1, 2, 3], dtype=np.intc))
+        assert list(proposal) == [4, 5, 6, 7]
+        assert decoder.get_stats()["drafted_tokens"] == 0
+
+        decoder(np.array([1, 2, 3, 4, 5, 9], dtype=np.intc))
+        stats = decoder.get_stats()
+        assert stats["drafted_tokens"] == 4
+        assert stats["accepted_tokens"] == 2
+        assert stats["acceptance_rate"] == 0.5
+
+        decoder.begin_request()
+        assert decoder.get_stats(request_only=True)["proposals"] == 0
+        assert decoder.get_stats()["proposals"] == 2
+
+
+class TestSpeculativeAdapter:
+    """Test speculative decoding through LlamaModelAdapter."""
+
+    def setup_method(self):
+        """Create placeholder model files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.temp_dir, "llama-2-7b.Q4_0.gguf")
+        self.draft_path = os.path.join(self.temp_dir, "tinyllama-1.1b.Q4_0.gguf")
+        for path in (self.model_path, self.draft_path):
+            with open(path, "wb") as f:
+                f.write(b"GGUF")
+
+    def teardown_method(self):
+        """Remove placeholder model files."""
+        for path in (self.model_path, self.draft_path):
+            os.remove(path)
+        os.rmdir(self.temp_dir)
+
+    def test_config_round_trip_and_validation(self):
+        """Test the speculative settings in OptimizationConfig."""
+        config = OptimizationConfig(speculative_decoding=True, draft_model_path=self.draft_path, draft_tokens=6)
+        restored = OptimizationConfig.from_dict(config.to_dict())
+        assert restored.speculative_decoding and restored.draft_tokens == 6
+        assert "draft_model" not in restored.get_llama_params()
+
+        with pytest.raises(ValueError):
+            OptimizationConfig(speculative_decoding=True).validate()
+
+    def test_generate_reports_acceptance_rate(self):
+        """Test that the target model is built with the draft and stats are reported."""
+        llama_cpp = types.ModuleType("llama_cpp")
+        llama_cpp.Llama = lambda draft_model=None, **kwargs: (
+            FakeTargetLlama(draft_model, **kwargs) if kwargs["model_path"] == self.model_path
+            else FakeDraftLlama(**kwargs)
+        )
+        adapter = LlamaModelAdapter()
+        config = {
+            "use_optimization": False,
+            "speculative_decoding": True,
+            "draft_model_path": self.draft_path,
+            "draft_tokens": 4,
+            "generation": {},
+        }
+
+        with patch.dict(sys.modules, {"llama_cpp": llama_cpp}):
+            adapter.initialize(self.model_path, config)
+
+        assert isinstance(adapter.draft_decoder, DraftModelDecoder)
+        assert adapter.draft_decoder.draft_model.kwargs["model_path"] == self.draft_path
+
+        result = adapter.generate("Tell me a story", {"max_tokens": 9})
+        speculative = result["speculative"]
+        assert speculative["drafted_tokens"] == 8
+        assert speculative["acceptance_rate"] == 0.5
+
+        adapter.generate("Again", {"max_tokens": 3})
+        assert adapter.draft_decoder.get_stats()["proposals"] == 4
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the pooled asyncio API transport and the clients' async methods.
+"""
+# TASK-REF: AM_001 - API Model Client
+# TASK-REF: AM_002 - Streaming Response Handling
+# CONCEPT-REF: CON-AM-001 - API Model Client
+# DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
+
+import sys
+import time
+import types
+import socket
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.models.api.anthropic_client import AnthropicClient
+from src.models.api.openai_client import OpenAIClient
+from src.models.api.async_http import AsyncHTTPPool, Deadline, close_pools, get_pool
+from src.models.api.exceptions import APIRateLimitError, APITimeoutError
+from src.models.dual_track.api_client import APIClient, APIModelController
+from src.models.dual_track.config import APIModelConfig
+from src.models.utils.cancellation import CancellationToken
+from tests.mocks.mock_api_server import MockAPIServer
+
+
+def make_client(client_class, module, model_id, base_url, **config):
+    """Create a client pointed at the mock server."""
+    with mock.patch(f"src.models.api.{module}.get_credential", return_value="mock-api-key"):
+        client = client_class()
+        client.initialize({"model_id": model_id, "base_url": base_url, "timeout": 5, **config})
+    return client
+
+
+class TestAsyncClients:
+    """Test agenerate and agenerate_stream against the mock provider endpoints."""
+
+    def test_anthropic_requests_reuse_one_connection(self):
+        """Test that sequential requests share one kept-alive connection."""
+        async def scenario():
+            async with MockAPIServer() as server:
+                client = make_client(AnthropicClient, "anthropic_client", "claude-test", server.base_url)
+                responses = [await client.agenerate("Hi") for _ in range(3)]
+                stats = client._pool().get_stats()
+                await close_pools()
+                return server, responses, stats
+
+        server, responses, stats = asyncio.run(scenario())
+        assert responses == ["Hello from the mock API"] * 3
+        assert server.connections == 1
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 2
+        assert server.requests[0]["headers"]["x-api-key"] == "mock-api-key"
+        assert server.requests[0]["payload"]["messages"][0]["content"] == [{"type": "text", "text": "Hi"}]
+
+    def test_stream_formats(self):
+        """Test parsing Anthropic and OpenAI server-sent event streams."""
+        async def scenario():
+            async with MockAPIServer() as server:
+                anthropic = make_client(AnthropicClient, "anthropic_client", "claude-test", server.base_url)
+                openai = make_client(OpenAIClient, "openai_client", "gpt-test", server.base_url)
+                anthropic_chunks = [chunk async for chunk in anthropic.agenerate_stream("Hi")]
+                openai_chunks = [chunk async for chunk in openai.agenerate_stream("Hi")]
+                openai_text = await openai.agenerate("Hi")
+                await close_pools()
+                return server, anthropic_chunks, openai_chunks, openai_text
+
+        server, anthropic_chunks, openai_chunks, openai_text = asyncio.run(scenario())
+        assert anthropic_chunks == ["Hello", " from", " the", " mock", " API"]
+        assert openai_chunks == anthropic_chunks
+        assert openai_text == "Hello from the mock API"
+        # Streams were read to the end, so one connection per provider pool
+        assert server.connections == 2
+        assert server.requests[1]["headers"]["authorization"] == "Bearer mock-api-key"
+
+    def test_deadline_and_errors(self):
+        """Test that deadlines and HTTP errors surface as API exceptions."""
+        async def scenario():
+            async with MockAPIServer(delay=1.0) as server:
+                client = make_client(AnthropicClient, "anthropic_client", "slow", server.base_url)
+                start = time.monotonic()
+                with pytest.raises(APITimeoutError):
+                    await client.agenerate("Hi", {"timeout": 0.1})
+                elapsed = time.monotonic() - start
+
+                limited = make_client(AnthropicClient, "anthropic_client", "rate-limited", server.base_url)
+                with pytest.raises(APIRateLimitError):
+                    await limited.agenerate("Hi")
+                await close_pools()
+                return elapsed
+
+        assert asyncio.run(scenario()) < 0.5
+
+    def test_concurrency_is_bounded(self):
+        """Test that a pool never has more requests in flight than max_connections."""
+        async def scenario():
+            async with MockAPIServer(delay=0.05) as server:
+                pool = AsyncHTTPPool(server.base_url, max_connections=2)
+                await asyncio.gather(*[pool.post_json("/v1/messages", {"model": "slow"}, timeout=5)
+                                       for _ in range(6)])
+                await pool.aclose()
+                return server, pool.get_stats()
+
+        server, stats = asyncio.run(scenario())
+        assert server.max_active == 2
+        assert stats["connections_opened"] == 2
+        assert stats["requests"] == 6
+
+    def test_pools_of_closed_loops_are_closed(self):
+        """Test that a pool left behind by a closed event loop has its sockets shut down."""
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        base_url = "http://127.0.0.1:%d" % listener.getsockname()[1]
+
+        async def first_loop():
+            pool = get_pool("stale-test", base_url, {})
+            connection = await pool._connect(Deadline(1.0))
+            connection.complete = True
+            pool._release(connection)
+
+        async def second_loop():
+            get_pool("stale-test", base_url, {})
+            await close_pools()
+
+        try:
+            asyncio.run(first_loop())
+            server_side, _ = listener.accept()
+            asyncio.run(second_loop())
+            server_side.settimeout(1.0)
+            # The kept-alive connection was shut down, not left open
+            assert server_side.recv(1) == b""
+            server_side.close()
+        finally:
+            listener.close()
+
+
+    def test_deadline_covers_response_headers_on_httpx_client(self):
+        """Test that the deadline bounds the wait for headers on the httpx transport too."""
+        class StalledStream:
+            async def __aenter__(self):
+                await asyncio.sleep(5)
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        class StalledClient:
+            def __init__(self):
+                self.timeouts = []
+
+            def stream(self, method, path, json=None, timeout=None):
+                self.timeouts.append(timeout)
+                return StalledStream()
+
+        async def scenario():
+            pool = AsyncHTTPPool("http://127.0.0.1:9")
+            pool._client = StalledClient()
+            start = time.monotonic()
+            with pytest.raises(APITimeoutError):
+                await pool.post_json("/v1/messages", {"model": "slow"}, timeout=0.1)
+            return time.monotonic() - start, pool
+
+        elapsed, pool = asyncio.run(scenario())
+        assert elapsed < 0.5
+        assert pool.get_stats()["timeouts"] == 1
+        assert pool.get_stats()["in_flight"] == 0
+        # The per-request timeout is passed on as well
+        assert pool._client.timeouts[0] is not None
+
+
+class TestDualTrackAsyncClient:
+    """Test the dual-track API client's event-loop path."""
+
+    def test_agenerate(self):
+        """Test that APIClient.agenerate returns an APIModelResponse via the pool."""
+        module = types.ModuleType("anthropic")
+        module.Anthropic = lambda api_key: object()
+
+        async def scenario():
+            async with MockAPIServer() as server:
+                config = APIModelConfig(model="claude-test", base_url=server.base_url)
+                config.api_key = "mock-api-key"
+                with mock.patch.dict(sys.modules, {"anthropic": module}):
+                    client = APIClient(config)
+                response = await client.agenerate([{"role": "user", "content": "Hi"}],
+                                                  {"user_name": "Ada"})
+                await close_pools()
+                return server, client, response
+
+        server, client, response = asyncio.run(scenario())
+        assert response.content == "Hello from the mock API"
+        assert response.total_tokens == response.usage["input_tokens"] + 5
+        assert client.successful_requests == 1
+        # Per-turn context travels in the volatile tail, ahead of the user's message
+        content = server.requests[0]["payload"]["messages"][0]["content"]
+        assert "user_name: Ada" in content[0]["text"]
+        assert content[-1]["text"] == "Hi"
+
+    def test_cancel_token_returns_cancelled_response(self):
+        """Test that cancelling the token ends the request, not the awaiting task."""
+        module = types.ModuleType("anthropic")
+        module.Anthropic = lambda api_key: object()
+
+        async def scenario():
+            async with MockAPIServer(latencies=[1.0, 0.0]) as server:
+                config = APIModelConfig(model="claude-test", base_url=server.base_url, hedge_requests=False)
+                config.api_key = "mock-api-key"
+                with mock.patch.dict(sys.modules, {"anthropic": module}):
+                    controller = APIModelController(config)
+                token = CancellationToken()
+                asyncio.get_running_loop().call_later(0.1, token.cancel)
+                start = time.monotonic()
+                cancelled = await controller.aprocess_query([{"role": "user", "content": "Hi"}], cancel=token)
+                elapsed = time.monotonic() - start
+
+                streamed = await controller.client.agenerate([{"role": "user", "content": "Hi"}],
+                                                             cancel=CancellationToken())
+                await close_pools()
+                return server, controller.client, cancelled, elapsed, streamed
+
+        server, client, cancelled, elapsed, streamed = asyncio.run(scenario())
+        assert elapsed < 0.5
+        assert cancelled["metadata"]["finish_reason"] == "cancelled"
+        assert client.get_client_stats()["cancellation"]["cancelled"] == 1
+        # With a token the request streams, so the answer can be cut off mid-way
+        assert server.requests[0]["payload"]["stream"] is True
+        assert streamed.content == "Hello from the mock API"
+        assert streamed.finish_reason == "end_turn"
+        assert streamed.usage["output_tokens"] == 5
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for hedged requests, retry budgets and deadline propagation.
+"""
+# TASK-REF: AM_001 - API Model Client
+# TASK-REF: AM_002 - Streaming Response Handling
+# CONCEPT-REF: CON-AM-003 - API Fallback Mechanisms
+# DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
+
+import sys
+import time
+import types
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.models.api.anthropic_client import AnthropicClient
+from src.models.api.async_http import Deadline, close_pools
+from src.models.api.exceptions import APIServiceUnavailableError, APITimeoutError
+from src.models.api.hedging import HedgingPolicy, LatencyTracker
+from src.models.api.retry_strategy import RetryBudget, with_retry
+from src.models.dual_track.api_client import APIClient, APIModelResponse
+from src.models.dual_track.config import APIModelConfig
+from src.models.utils.cancellation import CancellationToken
+from tests.mocks.mock_api_server import MockAPIServer
+from tests.unit.test_api_model.test_async_client import make_client
+
+
+def fast_hedging() -> HedgingPolicy:
+    """A policy that hedges after 50ms."""
+    return HedgingPolicy(LatencyTracker(default_threshold=0.05))
+
+
+class TestHedgingPolicy:
+    """Test racing attempts for the first token."""
+
+    def test_hedge_wins_over_slow_primary(self):
+        """Test that a late primary is hedged and, for a whole-response call, closed at once."""
+        async def scenario():
+            policy = fast_hedging()
+            calls = []
+            finished = []
+
+            async def request():
+                calls.append(time.monotonic())
+                number = len(calls)
+                await asyncio.sleep(0.5 if number == 1 else 0.01)
+                finished.append(number)
+                return f"response {number}"
+
+            start = time.monotonic()
+            result = await policy.call(request, hedge=request)
+            elapsed = time.monotonic() - start
+            await policy.drain()
+            await asyncio.sleep(0.6)
+            return result, elapsed, finished, policy
+
+        result, elapsed, finished, policy = asyncio.run(scenario())
+        assert result == "response 2"
+        assert elapsed < 0.3
+        # The losing primary never ran to completion (and was never billed in full)
+        assert finished == [2]
+        stats = policy.get_stats()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+        assert stats["hedge_rate"] == 1.0
+        # Its wait until closed still counts towards the percentile
+        assert list(policy.call_tracker._samples)[0] >= 0.05
+        assert not policy.tracker._samples
+
+    def test_streamed_loser_observed_until_first_token(self):
+        """Test that a losing streamed primary is timed to its first token, then closed."""
+        async def scenario():
+            policy = fast_hedging()
+            calls = []
+            items = []
+
+            def stream():
+                calls.append(time.monotonic())
+                number = len(calls)
+
+                async def chunks():
+                    await asyncio.sleep(0.3 if number == 1 else 0.01)
+                    for i in range(3):
+                        items.append(number)
+                        yield f"{number}.{i}"
+                return chunks()
+
+            result = [item async for item in policy.stream(stream, hedge=stream)]
+            await policy.drain()
+            return result, items, policy.get_stats()
+
+        result, items, stats = asyncio.run(scenario())
+        assert result == ["2.0", "2.1", "2.2"]
+        # The primary produced its first item only
+        assert items.count(1) == 1
+        assert stats["latency_saved_seconds"] > 0.2
+
+    def test_fast_primary_is_not_hedged(self):
+        """Test that a primary answering before the threshold isn't hedged."""
+        async def scenario():
+            policy = fast_hedging()
+            hedge = mock.AsyncMock(return_value="hedge")
+
+            async def primary():
+                return "primary"
+
+            result = await policy.call(primary, hedge=hedge)
+            return result, hedge, policy.get_stats()
+
+        result, hedge, stats = asyncio.run(scenario())
+        assert result == "primary"
+        hedge.assert_not_called()
+        assert stats["hedge_rate"] == 0.0
+
+    def test_exhausted_budget_denies_hedge(self):
+        """Test that hedges come out of the retry budget."""
+        async def scenario():
+            policy = fast_hedging()
+            budget = RetryBudget(ratio=0.0, initial=0.0)
+
+            async def primary():
+                await asyncio.sleep(0.2)
+                return "primary"
+
+            result = await policy.call(primary, hedge=primary, budget=budget)
+            return result, policy.get_stats()
+
+        result, stats = asyncio.run(scenario())
+        assert result == "primary"
+        assert stats["hedged"] == 0
+        assert stats["budget_denied"] == 1
+
+    def test_failed_primary_is_retried_through_hedge(self):
+        """Test that an early failure uses the hedge as its retry."""
+        async def scenario():
+            policy = fast_hedging()
+
+            async def primary():
+                raise APIServiceUnavailableError("overloaded")
+
+            async def hedge():
+                return "hedge"
+
+            return await policy.call(primary, hedge=hedge)
+
+        assert asyncio.run(scenario()) == "hedge"
+
+    def test_stream_deadline(self):
+        """Test that a stream with no first item by the deadline times out."""
+        async def scenario():
+            policy = HedgingPolicy(LatencyTracker(default_threshold=10))
+
+            async def stalled():
+                await asyncio.sleep(5)
+                yield "late"
+
+            with pytest.raises(APITimeoutError):
+                async for _ in policy.stream(stalled, deadline=Deadline(0.1)):
+                    pass
+
+        start = time.monotonic()
+        asyncio.run(scenario())
+        assert time.monotonic() - start < 1.0
+
+    def test_call_and_stream_latencies_tracked_apart(self):
+        """Test that whole-response times don't set the first-token threshold."""
+        async def scenario():
+            policy = fast_hedging()
+
+            async def request():
+                await asyncio.sleep(0.02)
+                return "response"
+
+            async def stream():
+                yield "token"
+
+            await policy.call(request)
+            _ = [item async for item in policy.stream(stream)]
+            return policy
+
+        policy = asyncio.run(scenario())
+        assert len(policy.call_tracker._samples) == 1
+        assert len(policy.tracker._samples) == 1
+        assert policy.call_tracker._samples[0] > policy.tracker._samples[0]
+        assert policy.call_tracker.default_threshold == 0.05
+
+    def test_threshold_follows_percentile(self):
+        """Test that the threshold is the configured latency percentile."""
+        tracker = LatencyTracker(percentile=0.9, min_samples=10, default_threshold=5.0)
+        assert tracker.threshold() == 5.0
+        for i in range(1, 21):
+            tracker.record(i / 10)
+        assert tracker.threshold() == pytest.approx(1.9)
+
+
+class TestRetryBudgetAndDeadline:
+    """Test retry budgets and deadlines in with_retry."""
+
+    def test_budget_limits_retries(self):
+        """Test that retries stop once the budget is spent."""
+        budget = RetryBudget(ratio=0.0, initial=1.0)
+        failing = mock.Mock(side_effect=APIServiceUnavailableError("overloaded"))
+        with pytest.raises(APIServiceUnavailableError):
+            with_retry(failing, max_attempts=5, backoff_factor=0.01, jitter=False, budget=budget)
+        # One call plus the single retry the budget allowed
+        assert failing.call_count == 2
+        assert budget.get_stats()["denied"] == 1
+
+    def test_no_retry_past_deadline(self):
+        """Test that with_retry won't sleep through the turn deadline."""
+        failing = mock.Mock(side_effect=APIServiceUnavailableError("overloaded"))
+        start = time.monotonic()
+        with pytest.raises(APIServiceUnavailableError):
+            with_retry(failing, max_attempts=3, backoff_factor=1.0, jitter=False,
+                       deadline=time.monotonic() + 0.5)
+        assert failing.call_count == 1
+        assert time.monotonic() - start < 0.5
+
+
+class TestHedgedClients:
+    """Test hedging against the mock server with injected latency."""
+
+    def test_anthropic_client_hedges_slow_request(self):
+        """Test that a second request wins when the first is slow to respond."""
+        async def scenario():
+            async with MockAPIServer(latencies=[0.5]) as server:
+                client = make_client(AnthropicClient, "anthropic_client", "claude-test", server.base_url)
+                client.hedging = fast_hedging()
+                start = time.monotonic()
+                text = await client.agenerate("Hi")
+                elapsed = time.monotonic() - start
+                await client.hedging.drain()
+                await close_pools()
+                return server, text, elapsed, client.hedging.get_stats()
+
+        server, text, elapsed, stats = asyncio.run(scenario())
+        assert text == "Hello from the mock API"
+        assert elapsed < 0.4
+        assert len(server.requests) == 2
+        assert stats["hedge_wins"] == 1
+
+    def test_context_deadline_bounds_request(self):
+        """Test that a context deadline sooner than the timeout is honoured."""
+        async def scenario():
+            async with MockAPIServer(delay=1.0) as server:
+                client = make_client(AnthropicClient, "anthropic_client", "slow", server.base_url,
+                                     hedge_requests=False)
+                with pytest.raises(APITimeoutError):
+                    await client.agenerate("Hi", {"deadline": time.monotonic() + 0.1})
+                await close_pools()
+
+        start = time.monotonic()
+        asyncio.run(scenario())
+        assert time.monotonic() - start < 0.6
+
+    def test_dual_track_local_fallback(self):
+        """Test that the dual-track client falls back to the local track when the API is slow."""
+        module = types.ModuleType("anthropic")
+        module.Anthropic = lambda api_key: object()
+
+        async def scenario():
+            async with MockAPIServer(latencies=[0.5]) as server:
+                config = APIModelConfig(model="claude-test", base_url=server.base_url)
+                config.api_key = "mock-api-key"
+                with mock.patch.dict(sys.modules, {"anthropic": module}):
+                    client = APIClient(config)
+                client.hedging = fast_hedging()
+
+                async def local():
+                    return APIModelResponse(content="Local answer", usage={"total_tokens": 3},
+                                            finish_reason="stop", model="local", provider="local")
+
+                response = await client.agenerate([{"role": "user", "content": "Hi"}],
+                                                  {"session_id": "s1", "deadline": time.monotonic() + 2},
+                                                  fallback=local)
+                await client.hedging.drain()
+                await close_pools()
+                return server, response, client.get_client_stats()
+
+        server, response, stats = asyncio.run(scenario())
+        assert response.content == "Local answer"
+        assert response.provider == "local"
+        assert stats["hedging"]["hedge_wins"] == 1
+        # Control keys aren't leaked into the system prompt
+        assert "deadline" not in server.requests[0]["payload"].get("system", "")
+
+    def test_dual_track_cancellable_request_hedged_on_first_delta(self):
+        """Test that a streamed dual-track attempt is hedged on its first delta."""
+        module = types.ModuleType("anthropic")
+        module.Anthropic = lambda api_key: object()
+
+        async def scenario():
+            async with MockAPIServer(latencies=[0.5]) as server:
+                config = APIModelConfig(model="claude-test", base_url=server.base_url)
+                config.api_key = "mock-api-key"
+                with mock.patch.dict(sys.modules, {"anthropic": module}):
+                    client = APIClient(config)
+                client.hedging = fast_hedging()
+
+                start = time.monotonic()
+                response = await client.agenerate([{"role": "user", "content": "Hi"}],
+                                                  {"session_id": "s1"}, cancel=CancellationToken())
+                elapsed = time.monotonic() - start
+                await client.hedging.drain()
+                await close_pools()
+                return server, response, elapsed, client.hedging
+
+        server, response, elapsed, policy = asyncio.run(scenario())
+        assert response.content == "Hello from the mock API"
+        assert elapsed < 0.4
+        assert len(server.requests) == 2
+        assert policy.get_stats()["hedge_wins"] == 1
+        # Timed on first deltas, not on whole responses
+        assert policy.tracker._samples
+        assert not policy.call_tracker._samples
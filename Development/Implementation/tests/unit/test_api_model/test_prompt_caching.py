@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for prompt-caching request layout and cache usage reporting.
+"""
+# TASK-REF: AM_001 - API Model Client
+# CONCEPT-REF: CON-AM-001 - API Model Client
+# DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
+
+import json
+import asyncio
+from unittest import mock
+
+from src.models.api.anthropic_client import AnthropicClient
+from src.models.api.async_http import close_pools
+from src.models.api.request_builder import (
+    CACHE_CONTROL, format_anthropic_request, format_openai_request, split_prompt_blocks
+)
+from src.models.api.response_parser import extract_response_metadata
+from tests.mocks.mock_api_server import MockAPIServer
+from tests.unit.test_api_model.test_async_client import make_client
+
+SYSTEM_PROMPT = "You are VANTA, a voice assistant. " * 40
+PROFILE = "User profile: prefers metric units, lives in Lisbon."
+
+
+def turn(history, memory, query):
+    """Messages for one turn: stable prefix, history, volatile context, query."""
+    return ([{"role": "system", "content": SYSTEM_PROMPT, "cache": True},
+             {"role": "system", "content": PROFILE, "cache": True},
+             {"role": "system", "content": f"Relevant Context:\n- {memory}", "cache": False}]
+            + history + [{"role": "user", "content": query}])
+
+
+class TestPromptCacheLayout:
+    """Test request builders' prompt-cache layout."""
+
+    def test_split_prompt_blocks(self):
+        """Test stable/volatile classification of system messages."""
+        stable, volatile, conversation = split_prompt_blocks(turn([], "m", "Hi"))
+        assert stable == [SYSTEM_PROMPT, PROFILE]
+        assert volatile == ["Relevant Context:\n- m"]
+        assert conversation == [{"role": "user", "content": "Hi"}]
+
+        # Unmarked: the first system message is the system prompt
+        stable, volatile, _ = split_prompt_blocks([{"role": "system", "content": "A"},
+                                                   {"role": "system", "content": "B"},
+                                                   {"role": "user", "content": "Hi"}])
+        assert (stable, volatile) == (["A"], ["B"])
+
+    def test_anthropic_breakpoints(self):
+        """Test cache breakpoints after the stable prefix and the history."""
+        history = [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi there"}]
+        request = format_anthropic_request(turn(history, "likes tea", "What now?"), "claude-test")
+
+        assert [block["text"] for block in request["system"]] == [SYSTEM_PROMPT, PROFILE]
+        assert request["system"][-1]["cache_control"] == CACHE_CONTROL
+        assert "cache_control" not in request["system"][0]
+        assert request["messages"][1]["content"] == [
+            {"type": "text", "text": "Hi there", "cache_control": CACHE_CONTROL}
+        ]
+        # Volatile context leads the newest user turn
+        assert request["messages"][-1]["content"] == [
+            {"type": "text", "text": "Relevant Context:\n- likes tea"},
+            {"type": "text", "text": "What now?"},
+        ]
+
+    def test_prompt_cache_disabled(self):
+        """Test the plain layout when prompt caching is off."""
+        request = format_anthropic_request(turn([], "m", "Hi"), "claude-test", {"prompt_cache": False})
+        assert request["system"] == "\n\n".join([SYSTEM_PROMPT, PROFILE, "Relevant Context:\n- m"])
+        assert request["messages"] == [{"role": "user", "content": "Hi"}]
+
+    def test_openai_order(self):
+        """Test that volatile system messages follow the history for OpenAI."""
+        history = [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Hi there"}]
+        request = format_openai_request(turn(history, "m", "What now?"), "gpt-test",
+                                        {"prompt_cache_key": "session-1"})
+        assert [(m["role"], m["content"][:10]) for m in request["messages"]] == [
+            ("system", SYSTEM_PROMPT[:10]), ("system", PROFILE[:10]), ("user", "Hello"),
+            ("assistant", "Hi there"), ("system", "Relevant C"), ("user", "What now?")
+        ]
+        assert all("cache" not in message for message in request["messages"])
+        assert request["prompt_cache_key"] == "session-1"
+
+    def test_extract_cache_usage(self):
+        """Test cache read/write token extraction for both providers."""
+        anthropic = extract_response_metadata({"usage": {
+            "input_tokens": 20, "output_tokens": 5,
+            "cache_read_input_tokens": 1000, "cache_creation_input_tokens": 50
+        }})["token_usage"]
+        assert anthropic == {"prompt_tokens": 1070, "completion_tokens": 5, "total_tokens": 1075,
+                             "cache_read_tokens": 1000, "cache_write_tokens": 50}
+
+        openai = extract_response_metadata({"usage": {
+            "prompt_tokens": 1200, "completion_tokens": 8, "total_tokens": 1208,
+            "prompt_tokens_details": {"cached_tokens": 1024}
+        }})["token_usage"]
+        assert openai["cache_read_tokens"] == 1024
+        assert openai["cache_write_tokens"] is None
+
+
+class TestPromptCacheAgainstServer:
+    """Test prefix stability across turns against the mock server."""
+
+    def test_prefix_is_stable_across_turns(self):
+        """Test that later turns read the earlier turns' prefix from the cache."""
+        async def scenario():
+            async with MockAPIServer() as server:
+                client = make_client(AnthropicClient, "anthropic_client", "claude-test", server.base_url)
+                history = []
+                for i, query in enumerate(["Hello", "How far is Porto?", "And Madrid?"]):
+                    text = await client.agenerate(turn(history, f"memory {i}", query))
+                    history += [{"role": "user", "content": query}, {"role": "assistant", "content": text}]
+                await close_pools()
+                return server, client.token_usage
+
+        server, token_usage = asyncio.run(scenario())
+        payloads = [request["payload"] for request in server.requests]
+
+        # The stable system prefix is byte-identical every turn
+        systems = {json.dumps(payload["system"], sort_keys=True) for payload in payloads}
+        assert len(systems) == 1
+        # Each turn's history is a byte-identical prefix of the next turn's
+        first, second, third = (payload["messages"] for payload in payloads)
+        strip = lambda messages: [json.dumps({**m, "content": [{k: v for k, v in b.items() if k != "cache_control"}
+                                                               for b in m["content"]]
+                                              if isinstance(m["content"], list) else m["content"]},
+                                             sort_keys=True) for m in messages]
+        assert strip(second)[:2] == strip(third)[:2]
+
+        assert token_usage["requests"] == 3
+        assert token_usage["cache_write_tokens"] > 0
+        # Turns two and three reused the system prompt; turn three also the first exchange
+        assert token_usage["cache_read_tokens"] > 2 * len(SYSTEM_PROMPT) // 4
+        metadata = extract_response_metadata(
+            {"usage": server._prompt_cache_usage(payloads[2])}
+        )["token_usage"]
+        assert metadata["cache_write_tokens"] == 0
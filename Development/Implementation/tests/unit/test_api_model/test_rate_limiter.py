@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests for the token-bucket rate limiter.
+"""
+# TASK-REF: AM_001 - API Model Client
+# CONCEPT-REF: CON-AM-001 - API Model Client
+# DOC-REF: DOC-PROMPT-AM-001 - API Model Client Implementation
+
+import sys
+import types
+import asyncio
+from unittest import mock
+
+import pytest
+
+from src.models.api.rate_limiter import (
+    RateLimiter,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND
+)
+from src.models.api.exceptions import APIRateLimitError
+from src.models.api.async_http import close_pools
+from src.models.dual_track.api_client import APIClient
+from src.models.dual_track.config import APIModelConfig
+from src.models.dual_track.exceptions import APIRateLimitError as DualTrackRateLimitError
+from tests.mocks.mock_api_server import MockAPIServer
+
+
+class SimulatedClock:
+    """Clock that only moves when slept on or advanced."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_limiter(clock, **limits):
+    return RateLimiter(clock=clock, sleep=clock.sleep, **limits)
+
+
+class TestRateLimiter:
+    """Test admission against a simulated clock."""
+
+    def test_bursts_queue_instead_of_failing(self):
+        """Test that requests past the burst wait for refill at the configured rate."""
+        clock = SimulatedClock()
+        limiter = make_limiter(clock, requests_per_minute=60, burst_seconds=5)
+
+        start = clock.now
+        waits = [limiter.acquire() for _ in range(8)]
+
+        # Five fit in the bucket, then one per second
+        assert waits[:5] == [0.0] * 5
+        assert waits[5:] == pytest.approx([1.0, 1.0, 1.0])
+        assert clock.now - start == pytest.approx(3.0)
+        stats = limiter.get_stats()
+        assert stats["admitted"] == 8
+        assert stats["throttled"] == 3
+        assert stats["wait_p95_seconds"] == pytest.approx(1.0)
+
+    def test_no_double_burst_at_window_boundary(self):
+        """Test that a minute of idling doesn't allow more than the burst."""
+        clock = SimulatedClock()
+        limiter = make_limiter(clock, requests_per_minute=60, burst_seconds=5)
+        for _ in range(5):
+            limiter.acquire()
+        clock.sleep(60)
+
+        immediate = sum(1 for _ in range(10) if limiter.acquire() == 0.0)
+        assert immediate == 5
+
+    def test_token_limit_uses_estimates_and_actuals(self):
+        """Test that large requests wait on the token bucket and usage corrects it."""
+        clock = SimulatedClock()
+        limiter = make_limiter(clock, tokens_per_minute=6000, burst_seconds=10)  # 100 tokens/s, 1000 burst
+
+        assert limiter.acquire(tokens=800) == 0.0
+        assert limiter.acquire(tokens=400) == pytest.approx(2.0)
+
+        # The second request used far less than estimated; the refund admits the next at once
+        limiter.record_usage(estimated_tokens=400, actual_tokens=100)
+        assert limiter.acquire(tokens=300) == 0.0
+
+    def test_interactive_requests_go_first(self):
+        """Test that queued interactive turns are admitted ahead of background work."""
+        clock = SimulatedClock()
+        limiter = make_limiter(clock, requests_per_minute=60, burst_seconds=1)
+        limiter.acquire()
+
+        background = limiter.enqueue(priority=PRIORITY_BACKGROUND)
+        interactive = limiter.enqueue(priority=PRIORITY_INTERACTIVE)
+        assert not background.admitted and not interactive.admitted
+
+        clock.sleep(1.0)
+        limiter.poll()
+        assert interactive.admitted and not background.admitted
+
+        clock.sleep(1.0)
+        limiter.poll()
+        assert background.admitted
+        assert background.wait_seconds == pytest.approx(2.0)
+
+    def test_deadline_rejects_without_waiting_it_out(self):
+        """Test that a request that can't make its deadline fails at once."""
+        clock = SimulatedClock()
+        limiter = make_limiter(clock, requests_per_minute=6, burst_seconds=10)  # one per 10s
+        limiter.acquire()
+
+        start = clock.now
+        with pytest.raises(APIRateLimitError):
+            limiter.acquire(timeout=2.0)
+        assert clock.now == start
+        assert limiter.get_stats()["rejected"] == 1
+        assert limiter.get_stats()["queued"] == 0
+
+    def test_retry_after_pauses_admission(self):
+        """Test that a server retry-after holds every request until it passes."""
+        clock = SimulatedClock()
+        limiter = make_limiter(clock, requests_per_minute=600)
+        limiter.note_retry_after(5.0)
+
+        assert limiter.acquire() == pytest.approx(5.0)
+        assert limiter.get_stats()["server_throttles"] == 1
+
+        # Unlimited limiters still honor the server
+        unlimited = make_limiter(clock)
+        assert unlimited.acquire() == 0.0
+        unlimited.note_retry_after(2.0)
+        assert unlimited.acquire() == pytest.approx(2.0)
+
+    def test_async_acquire(self):
+        """Test queued admission on the event loop."""
+        limiter = RateLimiter(requests_per_minute=600, burst_seconds=0.1)  # one every 0.1s
+
+        async def scenario():
+            return await asyncio.gather(*[limiter.aacquire() for _ in range(3)])
+
+        waits = asyncio.run(scenario())
+        assert waits[0] == 0.0
+        assert 0.05 < waits[2] < 1.0
+
+
+class TestDualTrackRateLimiting:
+    """Test the dual-track client against a throttling server."""
+
+    def test_server_429_pauses_shared_limiter(self):
+        """Test that a 429's retry-after pauses later requests from every client."""
+        module = types.ModuleType("anthropic")
+        module.Anthropic = lambda api_key: object()
+
+        async def scenario():
+            async with MockAPIServer() as server:
+                config = APIModelConfig(model="rate-limited", base_url=server.base_url, rate_limit_wait=0.5)
+                config.api_key = "rate-limit-test-key"
+                with mock.patch.dict(sys.modules, {"anthropic": module}):
+                    first = APIClient(config)
+                    second = APIClient(config)
+                assert first.rate_limiter is second.rate_limiter
+
+                with pytest.raises(DualTrackRateLimitError):
+                    await first.agenerate([{"role": "user", "content": "Hi"}])
+                # The server asked for 30s, more than second may queue for
+                with pytest.raises(DualTrackRateLimitError):
+                    await second.agenerate([{"role": "user", "content": "Hi"}])
+                await close_pools()
+                return server, first.get_client_stats()["rate_limiter"]
+
+        server, stats = asyncio.run(scenario())
+        assert len(server.requests) == 1
+        assert stats["server_throttles"] == 1
+        assert stats["rejected"] == 1
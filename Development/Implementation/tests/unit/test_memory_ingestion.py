@@ -0,0 +1,249 @@
+"""
+Memory Ingestion Unit Tests
+
+This module contains unit tests for batched, write-behind persistence of
+interactions.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+
+from src.memory.core import MemorySystem
+from src.memory.ingestion import WriteBehindIngestor
+from src.memory.storage import vector_storage
+from src.memory.storage.long_term_memory import LongTermMemoryManager
+from src.memory.storage.vector_storage import VectorStoreManager
+
+
+def _fake_embedding(text, model_name=None):
+    """Deterministic bag-of-words embedding so tests don't need a model."""
+    vector = np.zeros(32, dtype=np.float32)
+    for word in text.lower().split():
+        vector[hash(word.strip(".,?!:")) % 32] += 1.0
+    return vector.tolist()
+
+
+class _CountingEmbedder:
+    """Records how many batch embedding calls were made."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, model_name=None):
+        self.calls.append(len(texts))
+        return [_fake_embedding(text) for text in texts]
+
+
+def _interaction(i):
+    return {
+        "user_message": f"question number {i}",
+        "assistant_message": f"answer number {i}",
+    }
+
+
+class TestBatchWrites:
+    """Tests for the batch write methods on the storage managers."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.test_dir = tempfile.mkdtemp()
+        self.embedder = _CountingEmbedder()
+        self._original = vector_storage.batch_get_embeddings
+        vector_storage.batch_get_embeddings = self.embedder
+
+        self.long_term = LongTermMemoryManager({
+            "storage_path": os.path.join(self.test_dir, "ltm"),
+            "backup_enabled": False,
+        })
+        self.long_term.initialize()
+        self.vector_store = VectorStoreManager({
+            "db_path": os.path.join(self.test_dir, "vectors"),
+            "backend": "numpy",
+        })
+        self.vector_store.initialize()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        vector_storage.batch_get_embeddings = self._original
+        self.vector_store.shutdown()
+        self.long_term.shutdown()
+        shutil.rmtree(self.test_dir)
+
+    def test_store_conversations_appends_segment(self):
+        """Test that a batch is written to one segment and is retrievable."""
+        ids = self.long_term.store_conversations([_interaction(i) for i in range(5)])
+
+        assert len(ids) == 5
+        date_dirs = os.listdir(self.long_term.conversations_path)
+        segment_files = [
+            f for d in date_dirs
+            for f in os.listdir(os.path.join(self.long_term.conversations_path, d))
+        ]
+        assert segment_files == [LongTermMemoryManager.SEGMENT_FILENAME]
+
+        retrieved = self.long_term.retrieve_conversations()
+        assert sorted(c["id"] for c in retrieved) == sorted(ids)
+
+    def test_torn_segment_line_is_skipped(self):
+        """Test that a line torn by a crash loses only itself."""
+        ids = self.long_term.store_conversations([_interaction(i) for i in range(3)])
+        date_dir = os.path.join(self.long_term.conversations_path,
+                                os.listdir(self.long_term.conversations_path)[0])
+        with open(os.path.join(date_dir, LongTermMemoryManager.SEGMENT_FILENAME), "a") as f:
+            f.write('{"id": "torn", "user_mess')
+        ids += self.long_term.store_conversations([_interaction(3)])
+
+        retrieved = self.long_term.retrieve_conversations()
+        assert sorted(c["id"] for c in retrieved) == sorted(ids)
+
+    def test_store_embeddings_single_call(self):
+        """Test that a batch uses one embedding call and one add."""
+        ids = self.vector_store.store_embeddings(
+            texts=["first text", "second text", "third text"],
+            metadatas=[{"n": 1}, None, {"n": 3}],
+        )
+
+        assert self.embedder.calls == [3]
+        assert len(ids) == 3
+        assert self.vector_store.get_collection_stats()["count"] == 3
+
+
+class TestWriteBehindIngestor:
+    """Tests for WriteBehindIngestor and its MemorySystem integration."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.test_dir = tempfile.mkdtemp()
+        self.data_path = os.path.join(self.test_dir, "memory_data")
+        self.embedder = _CountingEmbedder()
+        self._original_batch = vector_storage.batch_get_embeddings
+        self._original_single = vector_storage.get_embedding
+        vector_storage.batch_get_embeddings = self.embedder
+        vector_storage.get_embedding = _fake_embedding
+
+        self.memory_system = MemorySystem({
+            "data_path": self.data_path,
+            "working_memory": {"max_tokens": 4000},
+            "long_term_memory": {
+                "storage_path": os.path.join(self.data_path, "conversations"),
+                "backup_enabled": False,
+            },
+            "vector_store": {
+                "db_path": os.path.join(self.data_path, "vectors"),
+                "backend": "numpy",
+            },
+            "ingestion": {
+                "write_behind": True,
+                "batch_size": 8,
+                "flush_interval": 0.05,
+            },
+        })
+        self.memory_system.initialize()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        if self.memory_system._initialized:
+            self.memory_system.shutdown()
+        vector_storage.batch_get_embeddings = self._original_batch
+        vector_storage.get_embedding = self._original_single
+        shutil.rmtree(self.test_dir)
+
+    def test_interactions_are_batched(self):
+        """Test that queued interactions are flushed in batches."""
+        for i in range(20):
+            self.memory_system.store_interaction(_interaction(i))
+
+        # Working memory is updated synchronously
+        assert len(self.memory_system.working_memory.get_messages()) == 40
+
+        assert self.memory_system.flush(timeout=5.0) is True
+        metrics = self.memory_system.get_ingestion_metrics()
+        assert metrics["flushed_items"] == 20
+        assert metrics["flushed_batches"] < 20
+        assert metrics["max_batch_size"] <= 8
+        assert metrics["failed_items"] == 0
+        assert sum(self.embedder.calls) == 20
+        assert self.memory_system.vector_store.get_collection_stats()["count"] == 20
+
+    def test_reads_see_queued_writes(self):
+        """Test that semantic reads can wait for pending writes."""
+        self.memory_system.config["ingestion"]["read_flush_timeout"] = 5.0
+        self.memory_system.store_interaction(_interaction(1))
+
+        results = self.memory_system.retrieve_relevant("question number 1", limit=1)
+        assert len(results) == 1
+
+    def test_reads_wait_only_briefly_for_pending_writes(self):
+        """Test that reads skip the flush when idle and cap it otherwise."""
+        ingestor = self.memory_system.ingestor
+        with mock.patch.object(ingestor, "flush", wraps=ingestor.flush) as flush:
+            self.memory_system.retrieve_relevant("question number 1", limit=1)
+            flush.assert_not_called()
+
+        def slow_embeddings(texts, model_name=None):
+            time.sleep(1.0)
+            return [_fake_embedding(text) for text in texts]
+
+        vector_storage.batch_get_embeddings = slow_embeddings
+        self.memory_system.store_interaction(_interaction(1))
+        start = time.monotonic()
+        self.memory_system.retrieve_relevant("question number 1", limit=1)
+        assert time.monotonic() - start < 0.5
+
+    def test_shutdown_flushes_queue(self):
+        """Test that shutdown drains pending writes."""
+        for i in range(5):
+            self.memory_system.store_interaction(_interaction(i))
+        long_term = self.memory_system.long_term_memory
+        self.memory_system.shutdown()
+
+        long_term.initialize()
+        try:
+            assert len(long_term.retrieve_conversations()) == 5
+        finally:
+            long_term.shutdown()
+
+    def test_flush_does_not_wait_for_batch_to_fill(self):
+        """Test that flush() wakes the flusher instead of waiting out its interval."""
+        ingestor = WriteBehindIngestor(
+            self.memory_system.long_term_memory,
+            self.memory_system.vector_store,
+            {"batch_size": 64, "flush_interval": 5.0},
+        )
+        ingestor.start()
+        try:
+            ingestor.submit(_interaction(1), {"text": "some text", "metadata": {}})
+            start = time.monotonic()
+            assert ingestor.flush(timeout=5.0) is True
+            assert time.monotonic() - start < 1.0
+            assert ingestor.get_metrics()["flushed_items"] == 1
+        finally:
+            ingestor.stop()
+
+    def test_failures_are_counted(self):
+        """Test that a failing vector store is retried and reported."""
+        ingestor = WriteBehindIngestor(
+            self.memory_system.long_term_memory,
+            self.memory_system.vector_store,
+            {"max_retries": 1},
+        )
+
+        def failing(*args, **kwargs):
+            raise RuntimeError("embedding service down")
+
+        vector_storage.batch_get_embeddings = failing
+        ingestor.submit(_interaction(1), {"text": "some text", "metadata": {}})
+
+        metrics = ingestor.get_metrics()
+        assert metrics["vector_failures"] == 2
+        assert metrics["long_term_failures"] == 0
+        assert metrics["failed_items"] == 1
@@ -0,0 +1,188 @@
+"""
+Hierarchical Summarization Unit Tests
+
+This module contains unit tests for the rolling conversation summarizer.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+from src.memory.core import MemorySystem
+from src.memory.summarization import HierarchicalSummarizer, format_entry
+
+
+class RecordingSummarizer:
+    """Summarization backend that records its inputs."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts, max_tokens):
+        with self.lock:
+            self.calls.append(list(texts))
+            return f"S{len(self.calls)}"
+
+
+def _entries(start, count):
+    """Build conversation_history-style entries."""
+    return [
+        {"user_message": f"Question {i}", "assistant_message": f"Answer {i}"}
+        for i in range(start, start + count)
+    ]
+
+
+class TestHierarchicalSummarizer:
+    """Tests for the HierarchicalSummarizer class."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.backend = RecordingSummarizer()
+        self.summarizer = HierarchicalSummarizer(
+            {"chunk_size": 2, "fanout": 2, "max_levels": 2, "background": False},
+            summarize_fn=self.backend,
+        )
+
+    def test_chunks_summarized_once_and_merged_when_level_fills(self):
+        """Test leaf summaries, merges and the verbatim remainder."""
+        self.summarizer.add_entries(_entries(0, 3))
+        assert self.backend.calls == [[format_entry(e) for e in _entries(0, 2)]]
+        assert self.summarizer.get_summary() == "S1\n" + format_entry(_entries(2, 1)[0])
+
+        self.summarizer.add_entries(_entries(3, 1))
+        # Second leaf fills level 0, which merges into level 1
+        assert self.backend.calls[2] == ["S1", "S2"]
+        assert self.summarizer.get_summary() == "S3"
+        assert self.summarizer.get_metrics()["level_sizes"] == [0, 1]
+
+    def test_summary_size_bounded(self):
+        """Test that the rendered summary stays bounded for long sessions."""
+        for i in range(200):
+            self.summarizer.add_entries(_entries(i, 1))
+            sizes = self.summarizer.get_metrics()["level_sizes"]
+            assert sum(sizes) <= (self.summarizer.fanout - 1) * self.summarizer.max_levels
+
+        # Each entry is summarized at leaf level exactly once
+        assert self.summarizer.get_metrics()["chunks_summarized"] == 100
+
+    def test_cache_reused_after_reset(self):
+        """Test that replaying the same history does not call the backend."""
+        self.summarizer.add_entries(_entries(0, 8))
+        calls = len(self.backend.calls)
+        summary = self.summarizer.get_summary()
+
+        self.summarizer.reset()
+        assert self.summarizer.get_summary() == ""
+        self.summarizer.add_entries(_entries(0, 8))
+
+        assert len(self.backend.calls) == calls
+        assert self.summarizer.get_summary() == summary
+
+    def test_backend_failure_falls_back_to_extractive(self):
+        """Test that a failing model does not lose history."""
+        def failing(texts, max_tokens):
+            raise RuntimeError("model unavailable")
+
+        summarizer = HierarchicalSummarizer({"chunk_size": 2, "background": False}, summarize_fn=failing)
+        summarizer.add_entries(_entries(0, 2))
+
+        assert "Question 0" in summarizer.get_summary()
+        assert summarizer.get_metrics()["failures"] == 1
+
+    def test_background_worker(self):
+        """Test summarizing on the worker thread and draining on stop."""
+        summarizer = HierarchicalSummarizer({"chunk_size": 2, "fanout": 3}, summarize_fn=self.backend)
+        summarizer.start()
+        try:
+            summarizer.add_entries(_entries(0, 10))
+            assert summarizer.flush(timeout=5.0) is True
+            assert summarizer.get_metrics()["chunks_summarized"] == 5
+        finally:
+            summarizer.stop()
+
+    def test_pending_chunks_rendered_verbatim(self):
+        """Test that chunks still queued on the worker are not missing from the summary."""
+        release = threading.Event()
+
+        def slow(texts, max_tokens):
+            release.wait(5.0)
+            return "S"
+
+        summarizer = HierarchicalSummarizer({"chunk_size": 2, "fanout": 4}, summarize_fn=slow)
+        summarizer.start()
+        try:
+            summarizer.add_entries(_entries(0, 5))
+            assert summarizer.flush(timeout=0.05) is False
+            summary = summarizer.get_summary()
+            assert all(f"Question {i}" in summary for i in range(5))
+
+            release.set()
+            assert summarizer.flush(timeout=5.0) is True
+            assert summarizer.get_summary() == "S\nS\n" + format_entry(_entries(4, 1)[0])
+            assert summarizer.get_metrics()["pending_chunks"] == 0
+        finally:
+            release.set()
+            summarizer.stop()
+
+    def test_invalid_config_rejected(self):
+        """Test that a fanout below two fails fast."""
+        with pytest.raises(ValueError):
+            HierarchicalSummarizer({"fanout": 1})
+
+
+class TestSessionSummarizers:
+    """Tests for MemorySystem's per-session summarizers."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.test_dir = tempfile.mkdtemp()
+        data_path = os.path.join(self.test_dir, "memory_data")
+        self.memory_system = MemorySystem({
+            "data_path": data_path,
+            "long_term_memory": {
+                "storage_path": os.path.join(data_path, "conversations"),
+                "backup_enabled": False,
+            },
+            "vector_store": {
+                "db_path": os.path.join(data_path, "vectors"),
+                "backend": "numpy",
+            },
+            "summarization": {"chunk_size": 2, "background": False, "max_sessions": 2},
+        })
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        shutil.rmtree(self.test_dir)
+
+    def test_sessions_are_summarized_separately(self):
+        """Test that one session's history never shows up in another's summary."""
+        alpha = self.memory_system.get_summarizer("alpha")
+        beta = self.memory_system.get_summarizer("beta")
+        assert alpha is not beta
+        assert self.memory_system.get_summarizer("alpha") is alpha
+
+        alpha.add_entries([{"user_message": "Plan the apple harvest", "assistant_message": "Sure"}])
+        beta.add_entries([{"user_message": "Book a banana shipment", "assistant_message": "Done"}])
+
+        assert "apple" in alpha.get_summary()
+        assert "banana" not in alpha.get_summary()
+        assert "banana" in beta.get_summary()
+        assert "apple" not in beta.get_summary()
+
+    def test_least_recent_session_dropped(self):
+        """Test that summarizers beyond max_sessions are dropped, least recent first."""
+        first = self.memory_system.get_summarizer("first")
+        second = self.memory_system.get_summarizer("second")
+        self.memory_system.get_summarizer("first")
+        self.memory_system.get_summarizer("third")
+
+        assert self.memory_system.get_summarizer("first") is first
+        assert self.memory_system.get_summarizer("second") is not second
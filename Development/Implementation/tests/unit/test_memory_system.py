@@ -19,7 +19,11 @@ from src.memory.core import MemorySystem
 from src.memory.models.working_memory import WorkingMemoryManager
 from src.memory.storage.long_term_memory import LongTermMemoryManager
 from src.memory.storage.vector_storage import VectorStoreManager
-from src.memory.utils.token_management import count_tokens, truncate_messages_to_token_limit
+from src.memory.utils.token_management import (
+    count_message_tokens,
+    count_tokens,
+    truncate_messages_to_token_limit,
+)
 
 
 class TestWorkingMemory:
@@ -134,6 +138,27 @@ class TestWorkingMemory:
         # Verify token count is under limit
         current_tokens = count_tokens(self.working_memory.messages)
         assert current_tokens <= 200
+    
+    def test_token_count_cached_and_tracked(self):
+        """Test per-message token caching and the running total."""
+        for i in range(5):
+            self.working_memory.add_message({
+                "role": "user",
+                "content": f"Cached token message {i}",
+                "metadata": {"importance": 0.9 if i == 1 else 0.1}
+            })
+        
+        for msg in self.working_memory.messages:
+            assert msg["token_count"] == count_message_tokens(msg, use_cache=False)
+        assert self.working_memory.token_count == count_tokens(self.working_memory.messages)
+        
+        for strategy in ("recency", "importance", "hybrid"):
+            self.working_memory.prune_strategy = strategy
+            self.working_memory.prune_messages(max_tokens=self.working_memory.token_count - 1)
+            assert self.working_memory.token_count == count_tokens(self.working_memory.messages)
+        
+        self.working_memory.clear_history()
+        assert self.working_memory.token_count == 0
 
 
 class TestLongTermMemory:
@@ -0,0 +1,110 @@
+"""
+Tokenizer Registry Unit Tests
+
+This module contains unit tests for the shared tokenizer registry.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+from unittest import mock
+
+from src.memory.utils.tokenizers import TokenizerRegistry, encoding_for_model
+
+
+class CountingTokenizer:
+    """Tokenizer of whitespace-separated words that records its calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return len(text.split())
+
+
+class TestTokenizerRegistry:
+    """Test cases for TokenizerRegistry."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.tokenizer = CountingTokenizer()
+        self.registry = TokenizerRegistry(cache_size=3)
+        self.registry.register("words", self.tokenizer)
+
+    def test_counts_are_memoized(self):
+        """Test that a repeated text is tokenized once."""
+        assert self.registry.count("one two three", "words") == 3
+        assert self.registry.count("one two three", "words") == 3
+        assert self.tokenizer.calls == ["one two three"]
+
+        stats = self.registry.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+        assert stats["tokenizers"] == ["words"]
+
+    def test_cache_is_bounded_lru(self):
+        """Test that the least recently used count is evicted first."""
+        for text in ["a", "b b", "c c c"]:
+            self.registry.count(text, "words")
+        self.registry.count("a", "words")
+        self.registry.count("d d d d", "words")
+        assert self.registry.get_stats()["cached_counts"] == 3
+
+        self.tokenizer.calls.clear()
+        self.registry.count("a", "words")
+        self.registry.count("b b", "words")
+        assert self.tokenizer.calls == ["b b"]
+
+    def test_long_texts_are_not_memoized(self):
+        """Test that texts over max_cached_chars don't displace the history."""
+        registry = TokenizerRegistry(max_cached_chars=10)
+        registry.register("words", self.tokenizer)
+        registry.count("a much longer text than ten characters", "words")
+        assert registry.get_stats()["cached_counts"] == 0
+
+    def test_count_many(self):
+        """Test that count_many keeps order and tokenizes each new text once."""
+        self.registry.count("x y", "words")
+        counts = self.registry.count_many(["a b c", "", "x y", "a b c"], "words")
+        assert counts == [3, 0, 2, 3]
+        assert self.tokenizer.calls == ["x y", "a b c"]
+
+    def test_register_replaces_memoized_counts(self):
+        """Test that re-registering a tokenizer drops its old counts."""
+        self.registry.count("one two", "words")
+        self.registry.register("words", lambda text: 7)
+        assert self.registry.count("one two", "words") == 7
+
+    def test_estimate_only_tokenizer(self):
+        """Test that a tokenizer registered as None is estimated."""
+        self.registry.register("remote", None)
+        assert not self.registry.has_tokenizer("remote")
+        assert self.registry.count("x" * 40, "remote") == 10
+        assert self.registry.count("a b c d e", "remote") == 5  # at least one token per word
+        assert self.registry.get_stats()["estimated"] == 2
+
+    def test_estimator_is_calibrated_by_real_counts(self):
+        """Test that the estimator adopts the observed characters per token."""
+        registry = TokenizerRegistry()
+        registry.register("chars", len)  # one token per character
+        assert registry.chars_per_token == 4.0
+        registry.count("z" * 2000, "chars")
+        assert registry.chars_per_token == 1.0
+        assert registry.estimate("abcdefgh") == 8
+
+    def test_encodings_load_once(self):
+        """Test that a missing encoding is looked up only once."""
+        registry = TokenizerRegistry()
+        with mock.patch.dict("sys.modules", {"tiktoken": None}):
+            assert registry.encoding("cl100k_base") is None
+            registry.count("hello there")
+            registry.count("general kenobi")
+        assert registry.get_stats()["loads"] == 1
+
+    def test_encoding_for_model(self):
+        """Test encoding selection by model name."""
+        assert encoding_for_model("gpt-4o-mini") == "o200k_base"
+        assert encoding_for_model("gpt-4-turbo") == "cl100k_base"
+        assert encoding_for_model(None) == "cl100k_base"
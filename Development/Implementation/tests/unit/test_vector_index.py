@@ -0,0 +1,308 @@
+"""
+Vector Index Unit Tests
+
+This module contains unit tests for the in-process NumPy vector index and
+the VectorStoreManager backend that uses it.
+
+# TASK-REF: MEM_001 - Memory System Implementation
+# CONCEPT-REF: CON-VANTA-004 - Memory System
+# DOC-REF: DOC-ARCH-001 - V0 Architecture Overview
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from src.memory.exceptions import VectorStoreError
+from src.memory.storage import vector_storage
+from src.memory.storage.ivf_index import IVFVectorIndex
+from src.memory.storage.numpy_index import NumpyVectorIndex
+from src.memory.storage.vector_storage import VectorStoreManager
+
+
+def _fake_embedding(text, model_name=None):
+    """Deterministic bag-of-words embedding so tests don't need a model."""
+    vector = np.zeros(32, dtype=np.float32)
+    for word in text.lower().split():
+        vector[hash(word.strip(".,?!")) % 32] += 1.0
+    return vector.tolist()
+
+
+class TestNumpyVectorIndex:
+    """Tests for the NumpyVectorIndex class."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.test_dir = tempfile.mkdtemp()
+        self.index = NumpyVectorIndex("test", persist_directory=self.test_dir, initial_capacity=2)
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        shutil.rmtree(self.test_dir)
+
+    def test_add_and_query_matches_brute_force(self):
+        """Test top-k results against a brute-force cosine ranking."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((50, 8)).astype(np.float32)
+        self.index.add(ids=[str(i) for i in range(50)], embeddings=vectors)
+
+        query = rng.standard_normal(8).astype(np.float32)
+        result = self.index.query(query_embeddings=[query], n_results=5)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+        assert result["ids"][0] == [str(i) for i in expected]
+        assert result["distances"][0] == sorted(result["distances"][0])
+
+    def test_metadata_filter(self):
+        """Test equality filtering through metadata columns."""
+        self.index.add(
+            ids=["a", "b", "c"],
+            embeddings=[[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]],
+            metadatas=[{"category": "tech"}, {"category": "weather"}, {"category": "tech"}],
+        )
+
+        result = self.index.query(query_embeddings=[[1.0, 0.0]], n_results=5,
+                                  where={"category": "tech"})
+        assert result["ids"][0] == ["a", "c"]
+
+        result = self.index.query(query_embeddings=[[1.0, 0.0]], n_results=5,
+                                  where={"missing": "x"})
+        assert result["ids"][0] == []
+
+    def test_update_and_delete(self):
+        """Test in-place updates and swap-remove deletes."""
+        self.index.add(ids=["a", "b", "c"], embeddings=[[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+                       documents=["first", "second", "third"])
+
+        self.index.update(ids=["a"], embeddings=[[0.0, 1.0]], documents=["updated"])
+        self.index.delete(ids=["b"])
+
+        assert self.index.count() == 2
+        assert self.index.get(ids=["b"])["ids"] == []
+        assert self.index.get(ids=["c"])["documents"] == ["third"]
+
+        result = self.index.query(query_embeddings=[[0.0, 1.0]], n_results=1)
+        assert result["ids"][0] == ["a"]
+        assert result["documents"][0] == ["updated"]
+
+    def test_concurrent_writes_and_queries(self):
+        """Test that queries stay consistent while another thread grows and shrinks the matrix."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((4000, 8)).astype(np.float32)
+        errors = []
+
+        def write():
+            try:
+                for i in range(0, 4000, 4):
+                    self.index.add(ids=[str(j) for j in range(i, i + 4)], embeddings=vectors[i:i + 4],
+                                   metadatas=[{"parity": str(j % 2)} for j in range(i, i + 4)])
+                    self.index.delete([str(i)])
+            except Exception as e:
+                errors.append(e)
+
+        # Switch threads often so the writer is interrupted mid-update
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            writer = threading.Thread(target=write)
+            writer.start()
+            while writer.is_alive():
+                result = self.index.query(query_embeddings=[vectors[1]], n_results=3, where={"parity": "1"})
+                assert len(result["ids"][0]) == len(result["distances"][0]) <= 3
+                assert all(meta["parity"] == "1" for meta in result["metadatas"][0])
+            writer.join()
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        assert errors == []
+        assert self.index.count() == 3000
+
+    def test_duplicate_id_rejected(self):
+        """Test that adding an existing ID raises an error."""
+        self.index.add(ids=["a"], embeddings=[[1.0, 0.0]])
+        with pytest.raises(VectorStoreError):
+            self.index.add(ids=["a"], embeddings=[[0.0, 1.0]])
+
+    def test_save_and_load(self):
+        """Test persistence round trip, including writes after a memmap load."""
+        self.index.add(ids=["a", "b"], embeddings=[[1.0, 0.0], [0.0, 1.0]],
+                       metadatas=[{"k": "1"}, {"k": "2"}], documents=["x", "y"])
+        self.index.save()
+
+        loaded = NumpyVectorIndex("test", persist_directory=self.test_dir)
+        assert loaded.load() is True
+        assert loaded.count() == 2
+        assert loaded.query(query_embeddings=[[0.0, 1.0]], n_results=1, where={"k": "2"})["ids"][0] == ["b"]
+
+        loaded.add(ids=["c"], embeddings=[[1.0, 1.0]])
+        loaded.delete(ids=["a"])
+        assert loaded.count() == 2
+        assert sorted(loaded.get()["ids"]) == ["b", "c"]
+
+
+class TestIVFVectorIndex:
+    """Tests for the IVFVectorIndex class."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.test_dir = tempfile.mkdtemp()
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((400, 16)).astype(np.float32)
+        self.ids = [str(i) for i in range(400)]
+        self.index = IVFVectorIndex("test", persist_directory=self.test_dir,
+                                    nlist=8, nprobe=8, min_train_size=200)
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        shutil.rmtree(self.test_dir)
+
+    def test_trains_at_threshold_and_assigns_new_rows(self):
+        """Test automatic training and incremental insertion."""
+        self.index.add(ids=self.ids[:199], embeddings=self.vectors[:199])
+        assert not self.index.is_trained
+
+        self.index.add(ids=self.ids[199:], embeddings=self.vectors[199:])
+        assert self.index.is_trained
+        assert sum(len(lst) for lst in self.index._lists) == 400
+
+    def test_full_probe_matches_exact_search(self):
+        """Test that probing every cluster gives exact results."""
+        exact = NumpyVectorIndex("exact")
+        exact.add(ids=self.ids, embeddings=self.vectors)
+        self.index.add(ids=self.ids, embeddings=self.vectors)
+
+        query = [self.vectors[7] + 0.01]
+        assert (self.index.query(query_embeddings=query, n_results=10)["ids"]
+                == exact.query(query_embeddings=query, n_results=10)["ids"])
+
+    def test_tombstones_and_compaction(self):
+        """Test that deleted rows are hidden and later compacted away."""
+        self.index.compaction_threshold = 0.5
+        self.index.add(ids=self.ids, embeddings=self.vectors)
+
+        self.index.delete(["7"])
+        assert self.index.count() == 399
+        assert self.index._tombstones == 1
+        result = self.index.query(query_embeddings=[self.vectors[7]], n_results=5)
+        assert "7" not in result["ids"][0]
+        assert "7" not in self.index.get()["ids"]
+
+        self.index.delete(self.ids[:300])
+        assert self.index._tombstones == 0
+        assert self.index.count() == 100
+        result = self.index.query(query_embeddings=[self.vectors[350]], n_results=1)
+        assert result["ids"][0] == ["350"]
+
+    def test_save_and_load(self):
+        """Test that centroids and assignments survive a round trip."""
+        self.index.add(ids=self.ids, embeddings=self.vectors)
+        self.index.delete(["3"])
+        self.index.save()
+
+        loaded = IVFVectorIndex("test", persist_directory=self.test_dir, nprobe=8)
+        assert loaded.load() is True
+        assert loaded.is_trained
+        assert loaded.count() == 399
+        result = loaded.query(query_embeddings=[self.vectors[42]], n_results=1)
+        assert result["ids"][0] == ["42"]
+
+
+class TestVectorStoreNumpyBackend:
+    """Tests for VectorStoreManager with the NumPy backend."""
+
+    def setup_method(self):
+        """Set up test environment before each test method."""
+        self.test_dir = tempfile.mkdtemp()
+        self.config = {
+            "db_path": os.path.join(self.test_dir, "vector_db"),
+            "collection_name": "test_collection",
+            "backend": "numpy",
+        }
+        self._original_get_embedding = vector_storage.get_embedding
+        vector_storage.get_embedding = _fake_embedding
+
+        self.vector_store = VectorStoreManager(self.config)
+        self.vector_store.initialize()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        if self.vector_store._initialized:
+            self.vector_store.shutdown()
+        vector_storage.get_embedding = self._original_get_embedding
+        shutil.rmtree(self.test_dir)
+
+    def test_store_search_update_delete(self):
+        """Test the full VectorStoreManager API on the NumPy backend."""
+        tech_id = self.vector_store.store_embedding(
+            text="machine learning and artificial intelligence",
+            metadata={"category": "tech"}
+        )
+        self.vector_store.store_embedding(
+            text="sunny weather in california",
+            metadata={"category": "weather"}
+        )
+
+        results = self.vector_store.search_similar("artificial intelligence", limit=1)
+        assert results[0]["id"] == tech_id
+        assert results[0]["similarity"] > 0.0
+
+        weather = self.vector_store.search_similar("machine learning", metadata_filter={"category": "weather"})
+        assert len(weather) == 1
+        assert "weather" in weather[0]["content"]
+
+        assert self.vector_store.update_embedding(tech_id, "updated machine learning notes",
+                                                  metadata={"category": "tech"}) is True
+        assert self.vector_store.delete_embedding(tech_id) is True
+        assert self.vector_store.delete_embedding(tech_id) is False
+        assert self.vector_store.get_collection_stats()["backend"] == "numpy"
+
+    def test_persists_across_restart(self):
+        """Test that the index is saved on shutdown and reloaded on initialize."""
+        stored_id = self.vector_store.store_embedding(text="remember this fact")
+        self.vector_store.shutdown()
+
+        reopened = VectorStoreManager(self.config)
+        reopened.initialize()
+        try:
+            assert reopened.get_collection_stats()["count"] == 1
+            assert reopened.search_similar("remember this fact", limit=1)[0]["id"] == stored_id
+        finally:
+            reopened.shutdown()
+
+    def test_persists_periodically(self):
+        """Test that the index reaches disk every persist_every writes without a shutdown."""
+        store = VectorStoreManager({**self.config, "collection_name": "periodic", "persist_every": 2})
+        store.initialize()
+        store.store_embedding(text="first fact")
+        store.store_embedding(text="second fact")
+
+        reopened = VectorStoreManager({**self.config, "collection_name": "periodic"})
+        reopened.initialize()
+        try:
+            assert reopened.get_collection_stats()["count"] == 2
+        finally:
+            reopened.shutdown()
+            store.shutdown()
+
+    def test_ivf_index_type(self):
+        """Test selecting the IVF index through configuration."""
+        store = VectorStoreManager({**self.config, "collection_name": "ivf_collection",
+                                    "index_type": "ivf", "index_params": {"nprobe": 4}})
+        store.initialize()
+        try:
+            assert isinstance(store._collection, IVFVectorIndex)
+            assert store._collection.nprobe == 4
+            assert store.get_collection_stats()["index_type"] == "ivf"
+        finally:
+            store.shutdown()
+
+    def test_unknown_backend_rejected(self):
+        """Test that an invalid backend name fails fast."""
+        with pytest.raises(VectorStoreError):
+            VectorStoreManager({"backend": "faiss"})